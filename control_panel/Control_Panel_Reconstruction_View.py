@@ -1,6 +1,7 @@
 # Core imports
 import datetime
 import thread
+import time
 
 # matplotlib imports
 import matplotlib
@@ -25,9 +26,11 @@ from Control_Panel_Reconstruction_Widgets import Graph, Grid, Table, Stream_Reco
 from Control_Panel_Settings_Widgets import SettingsTableWidget
 from Control_Panel_View import Control_Panel_View
 from ..core.Import_Manager import Import_Manager
+from ..reconstruction.Columnar_Dump_Buffer import Columnar_Dump_Buffer
 from ..reconstruction.Coordinator import Coordinator
 from ..reconstruction.Dataset_Buffer import Dataset_Buffer
 from ..reconstruction.Dump_Buffer import Dump_Buffer
+from ..reconstruction.Online_Reconstructor import Online_Reconstructor
 from ..reconstruction.Stream_Buffer import Stream_Buffer
 
 class Control_Panel_Reconstruction_View(Control_Panel_View):
@@ -56,6 +59,11 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
                 "component": "reconstruction_dump",
                 "buffer": Dump_Buffer
             },
+            {
+                "title": "Columnar dump",
+                "component": "reconstruction_columnar_dump",
+                "buffer": Columnar_Dump_Buffer
+            },
             {
                 "title": "Stream",
                 "component": "reconstruction_stream",
@@ -70,6 +78,8 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
         self._source_forms = []
 
         self._pause_time = self._settings.get("reconstruction_pause_time") * 1000
+        self._frame_budget = self._settings.get("reconstruction_frame_budget")
+        self._batch_size = self._settings.get("reconstruction_batch_size")
         self._percentiles = None
         self._interpolation = None
         self._chunk_size = None
@@ -82,6 +92,11 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
 
         self._chunk_count = 0
 
+        # Packets that are not yet handled by the coordinator, and whether an
+        # image is being rendered from the weight matrix in another thread.
+        self._pending_packets = []
+        self._rendering = False
+
         self._import_manager = Import_Manager()
 
         self._stacked_reconstructor = None
@@ -104,8 +119,9 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
         top_tabs, bottom_tabs = self._create_tabs()
 
         # Create the panels. These are tabs containing the forms for each input 
-        # source (dataset, dump and stream). Additionally, there are stacked 
-        # widgets for the reconstructor-specific and model-specific settings.
+        # source (dataset, dump, columnar dump and stream). Additionally, there 
+        # are stacked widgets for the reconstructor-specific and model-specific 
+        # settings.
         self._panels = QtGui.QTabWidget()
         self._panels.setSizePolicy(QtGui.QSizePolicy.Fixed, QtGui.QSizePolicy.Minimum)
 
@@ -311,6 +327,11 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
         # Create the coordinator.
         self._coordinator = Coordinator(self._controller.arguments, self._buffer)
 
+        # The online reconstructor keeps track of the rows that it has seen,
+        # so it must know when links are removed from the weight matrix.
+        if isinstance(self._reconstructor, Online_Reconstructor):
+            self._coordinator.add_remove_callback(self._reconstructor.remove)
+
         # Clear the widgets.
         self._graph.clear()
         self._graph.setup(self._buffer)
@@ -326,6 +347,7 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
 
         # Execute the reconstruction and visualization.
         self._chunk_count = 0
+        self._pending_packets = []
         self._loop()
 
     def _create_buffer(self, source, settings):
@@ -376,49 +398,83 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
     def _execute(self):
         """
         Execute the reconstruction loop by handling incoming packets.
-        """
-
-        # If no packets are available yet, wait for them to arrive.
-        if self._buffer.count() == 0:
-            return
-
-        try:
-            packet, calibrated_rssi = self._buffer.get()
-        except (TypeError, KeyError):
-            # The buffer returned `None` or a calibration value is not
-            # available, so ignore this packet.
-            self._controller.thread_manager.log("control_panel_reconstruction_view")
-            return
 
-        # Update the widgets with the packet.
-        self._graph.update(packet)
-        self._grid.update(packet)
-        self._table.update(packet)
-        if self._stream_recorder is not None:
-            self._stream_recorder.update(packet)
+        Packets are retrieved from the buffer in batches and handled by the
+        coordinator until the frame budget is used up. Packets that are not
+        handled in time are kept for the next frame, and new packets are only
+        retrieved once those are handled. The widgets are updated and an image
+        is rendered at most once per frame.
+        """
 
-        # Only use packets with valid source and destination locations.
-        if not packet.get("from_valid") or not packet.get("to_valid"):
-            return
+        deadline = time.time() + self._frame_budget
+        batch_size = self._batch_size if self._frame_budget > 0 else 1
 
         # Skip rendering when we are calibrating to reduce CPU usage and because
         # the rendered images are not meaningful.
         panel_id = self._panels.currentIndex()
         source_form = self._source_forms[panel_id]
         settings = source_form.get_settings()
+        calibrating = isinstance(self._buffer, Stream_Buffer) and settings.get("stream_calibrate")
+
+        received = []
+        render = False
+        while True:
+            if not self._pending_packets:
+                packets = self._buffer.get_packets(batch_size)
+                if not packets:
+                    break
+
+                received.extend(packet for packet, calibrated_rssi in packets)
+                if not calibrating:
+                    self._pending_packets = packets
+
+            # The weight matrix shares its rows with the coordinator, so it
+            # must not be updated while an image is rendered from it. Keep the
+            # packets for a later frame in that case.
+            if self._rendering and self._pending_packets:
+                break
+
+            if self._pending_packets and self._update_coordinator(deadline):
+                render = True
+
+            if time.time() >= deadline:
+                break
+
+        # Update the widgets with the packets.
+        if received:
+            self._graph.update(received)
+            self._grid.update(received)
+            self._table.update(received)
+            if self._stream_recorder is not None:
+                for packet in received:
+                    self._stream_recorder.update(packet)
 
-        if isinstance(self._buffer, Stream_Buffer) and settings.get("stream_calibrate"):
-            return
+        if render:
+            self._rendering = True
+            thread.start_new_thread(self._render, ())
+
+    def _update_coordinator(self, deadline):
+        """
+        Update the coordinator with the pending packets until the `deadline`.
+        The packets that are handled are removed from the pending packets.
+
+        Returns whether an image should be rendered, i.e., whether the
+        required number of measurements to fill a chunk has been obtained.
+        """
+
+        handled, updated = self._coordinator.update_many(self._pending_packets,
+                                                         deadline)
+        del self._pending_packets[:handled]
 
         # We attempt to reconstruct an image when the coordinator successfully
-        # updated the weight matrix and the RSSI vector and when we have obtained
-        # the required number of measurements to fill a chunk.
-        if self._coordinator.update(packet, calibrated_rssi):
-            self._chunk_count += 1
-            if self._chunk_count >= self._chunk_size:
-                self._chunk_count = 0
+        # updated the weight matrix and the RSSI vector with the required
+        # number of measurements to fill a chunk.
+        self._chunk_count += updated
+        if self._chunk_count < self._chunk_size:
+            return False
 
-                thread.start_new_thread(self._render, ())
+        self._chunk_count %= self._chunk_size
+        return True
 
     def _render(self):
         """
@@ -453,3 +509,5 @@ class Control_Panel_Reconstruction_View(Control_Panel_View):
         except StandardError:
             # There is not enough data yet for the reconstruction algorithm.
             pass
+        finally:
+            self._rendering = False
@@ -66,21 +66,25 @@ class Graph(object):
 
         return self._graph
 
-    def update(self, packet):
+    def update(self, packets):
         """
-        Update the graph with information in `packet`.
+        Update the graph with information in the list of `packets`.
+
+        The curves are only redrawn once for all the packets.
         """
 
         for vehicle in range(1, self._number_of_sensors + 1):
             index = vehicle - 1
 
-            if len(self._graph_data[index]) > self._graph_curve_points:
-                self._graph_data[index].pop(0)
+            data = self._graph_data[index]
+            data.extend(packet.get("rssi") for packet in packets
+                        if packet.get("sensor_id") == vehicle)
 
-            if packet.get("sensor_id") == vehicle:
-                self._graph_data[index].append(packet.get("rssi"))
+            # Keep at most the number of points that fit in the graph.
+            if len(data) > self._graph_curve_points:
+                del data[:len(data) - self._graph_curve_points - 1]
 
-            self._graph_curves[index].setData(self._graph_data[index])
+            self._graph_curves[index].setData(data)
 
     def clear(self):
         """
@@ -201,25 +205,33 @@ class Grid(QtGui.QGraphicsView):
         x, y = self._calculate_offset(position, center=True)
         self._sensors[sensor_id].setOffset(x, y)
 
-    def update(self, packet):
+    def update(self, packets):
         """
-        Update the grid with information in the `packet`, which is a `Packet`
-        object containing information belonging to the `"rssi_ground_station"`
-        specification.
+        Update the grid with information in the list of `packets`, which are
+        `Packet` objects containing information belonging to the
+        `"rssi_ground_station"` specification.
         """
 
-        # Determine the position coordinates.
-        source = (packet.get("from_latitude"), packet.get("from_longitude"))
-        target = (packet.get("to_latitude"), packet.get("to_longitude"))
+        links = []
+        for packet in packets:
+            # Determine the position coordinates.
+            source = (packet.get("from_latitude"), packet.get("from_longitude"))
+            target = (packet.get("to_latitude"), packet.get("to_longitude"))
 
-        # Update the sensor location of the target sensor.
-        self.add_sensor(packet.get("sensor_id"), target)
+            # Update the sensor location of the target sensor.
+            self.add_sensor(packet.get("sensor_id"), target)
 
-        # Add the new link if the locations are valid.
-        if not packet.get("from_valid") or not packet.get("to_valid"):
-            return
+            # Add the new link if the locations are valid.
+            if packet.get("from_valid") and packet.get("to_valid"):
+                links.append((source, target))
 
-        self.add_link(source, target)
+        # Only the last link remains visible if previous links are cleared, so
+        # there is no need to draw the other links.
+        if self._clear:
+            links = links[-1:]
+
+        for source, target in links:
+            self.add_link(source, target)
 
     def toggle(self, state):
         """
@@ -273,34 +285,47 @@ class Table(object):
 
         return self._table
 
-    def update(self, packet):
+    def update(self, packets):
         """
-        Update the table with information in `packet`.
+        Update the table with information in the list of `packets`.
         """
 
-        # Limit the table to a fixed number of rows.
-        if self._table.rowCount() >= self._limit:
-            self._table.removeRow(0)
+        # Packets that would be removed from the table immediately are not
+        # added at all.
+        packets = packets[-self._limit:]
+        if not packets:
+            return
 
-        # Collect and format the data.
-        vehicle = str(packet.get("sensor_id"))
-        source_location = "({}, {})".format(packet.get("from_latitude"), packet.get("from_longitude"))
-        destination_location = "({}, {})".format(packet.get("to_latitude"), packet.get("to_longitude"))
-        rssi = str(packet.get("rssi"))
-
-        # Append a new table row.
-        position = self._table.rowCount()
-        self._table.insertRow(position)
-        self._table.setItem(position, 0, QtGui.QTableWidgetItem(vehicle))
-        self._table.setItem(position, 1, QtGui.QTableWidgetItem(source_location))
-        self._table.setItem(position, 2, QtGui.QTableWidgetItem(destination_location))
-        self._table.setItem(position, 3, QtGui.QTableWidgetItem(rssi))
-
-        # Indicate the validity of the source and destination locations.
         green = QtGui.QColor("#8BD672")
         red = QtGui.QColor("#FA6969")
-        self._table.item(position, 1).setBackground(green if packet.get("from_valid") else red)
-        self._table.item(position, 2).setBackground(green if packet.get("to_valid") else red)
+
+        self._table.setUpdatesEnabled(False)
+
+        # Limit the table to a fixed number of rows.
+        overflow = self._table.rowCount() + len(packets) - self._limit
+        for _ in range(max(0, overflow)):
+            self._table.removeRow(0)
+
+        for packet in packets:
+            # Collect and format the data.
+            vehicle = str(packet.get("sensor_id"))
+            source_location = "({}, {})".format(packet.get("from_latitude"), packet.get("from_longitude"))
+            destination_location = "({}, {})".format(packet.get("to_latitude"), packet.get("to_longitude"))
+            rssi = str(packet.get("rssi"))
+
+            # Append a new table row.
+            position = self._table.rowCount()
+            self._table.insertRow(position)
+            self._table.setItem(position, 0, QtGui.QTableWidgetItem(vehicle))
+            self._table.setItem(position, 1, QtGui.QTableWidgetItem(source_location))
+            self._table.setItem(position, 2, QtGui.QTableWidgetItem(destination_location))
+            self._table.setItem(position, 3, QtGui.QTableWidgetItem(rssi))
+
+            # Indicate the validity of the source and destination locations.
+            self._table.item(position, 1).setBackground(green if packet.get("from_valid") else red)
+            self._table.item(position, 2).setBackground(green if packet.get("to_valid") else red)
+
+        self._table.setUpdatesEnabled(True)
 
         # Automatically scroll the table to the bottom.
         self._table.scrollToBottom()
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+
+class Cache(object):
+    """
+    A bounded cache of values that are not `None`.
+
+    When the cache is full, it evicts either the least recently used entry or
+    the entry that was stored first. The cache keeps track of the number of
+    lookups that were answered from the cache (hits) and those that were not
+    (misses).
+    """
+
+    def __init__(self, size, eviction="lru"):
+        """
+        Initialize the cache with a maximum number of entries given by `size`.
+
+        If the `size` is `0`, then values are never stored in the cache. The
+        `eviction` policy is either "lru" to evict the least recently used
+        entry, or "fifo" to evict the oldest stored entry.
+        """
+
+        if eviction not in ("lru", "fifo"):
+            raise ValueError("Unknown eviction policy '{}'".format(eviction))
+
+        self._size = size
+        self._eviction = eviction
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def size(self):
+        """
+        Retrieve the maximum number of entries in the cache.
+        """
+
+        return self._size
+
+    @property
+    def eviction(self):
+        """
+        Retrieve the eviction policy of the cache.
+        """
+
+        return self._eviction
+
+    @property
+    def hits(self):
+        """
+        Retrieve the number of lookups that found an entry in the cache.
+        """
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Retrieve the number of lookups that did not find an entry.
+        """
+
+        return self._misses
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def lookup(self, key):
+        """
+        Retrieve the value for the given `key` from the cache.
+
+        Returns the value, or `None` if the key is not in the cache.
+        """
+
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        if self._eviction == "lru":
+            # Mark the entry as most recently used.
+            del self._entries[key]
+            self._entries[key] = value
+
+        return value
+
+    def put(self, key, value):
+        """
+        Store a `value` for the given `key` in the cache.
+
+        Entries are evicted when the cache becomes too large.
+        """
+
+        if self._size == 0:
+            return
+
+        self._entries.pop(key, None)
+        while len(self._entries) >= self._size:
+            self._entries.popitem(last=False)
+
+        self._entries[key] = value
+
+    def get(self, key, calculate):
+        """
+        Retrieve the value for the given `key` from the cache.
+
+        If the value is not in the cache, then the callable `calculate` is
+        called without arguments to determine the value, which is then stored
+        in the cache. Returns the value.
+        """
+
+        value = self.lookup(key)
+        if value is None:
+            value = calculate()
+            self.put(key, value)
+
+        return value
+
+    def clear(self):
+        """
+        Remove all entries from the cache and reset the counters.
+        """
+
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
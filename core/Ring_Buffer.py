@@ -0,0 +1,157 @@
+class Ring_Buffer(object):
+    """
+    A bounded first-in, first-out buffer of items.
+
+    The buffer is meant to pass items from one producer thread to one consumer
+    thread without locks. The producer only changes the claim and write
+    positions and the consumer only changes the read position. When the buffer
+    is full, the producer overwrites the oldest items, which the consumer then
+    skips. The buffer keeps track of the number of added, removed and dropped
+    items.
+
+    The producer claims the positions that it is going to write before it
+    writes the items, and publishes them by advancing the write position
+    afterward. The consumer only reads published items, and afterward checks
+    the claim position to find out which of the items it has read may have
+    been overwritten in the meantime, similar to a sequence lock.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize the buffer with room for `size` items.
+        """
+
+        if size < 1:
+            raise ValueError("The size of the buffer must be positive")
+
+        self._size = size
+        self._items = [None] * size
+
+        # The positions increase monotonically. The item at a position is kept
+        # in the list at the position modulo the size of the buffer.
+        self._claim_position = 0
+        self._write_position = 0
+        self._read_position = 0
+
+        self._removed = 0
+        self._dropped = 0
+
+    @property
+    def size(self):
+        """
+        Retrieve the maximum number of items in the buffer.
+        """
+
+        return self._size
+
+    @property
+    def added(self):
+        """
+        Retrieve the total number of items that were put into the buffer.
+        """
+
+        return self._write_position
+
+    @property
+    def removed(self):
+        """
+        Retrieve the total number of items that were retrieved from the buffer.
+        """
+
+        return self._removed
+
+    @property
+    def dropped(self):
+        """
+        Retrieve the total number of items that were overwritten before they
+        could be retrieved from the buffer.
+        """
+
+        return self._dropped
+
+    def __len__(self):
+        return min(self._write_position - self._read_position, self._size)
+
+    def put(self, item):
+        """
+        Put an `item` into the buffer, overwriting the oldest item if the
+        buffer is full.
+
+        This method must only be called from the producer thread.
+        """
+
+        position = self._write_position
+        self._claim_position = position + 1
+        self._items[position % self._size] = item
+        self._write_position = position + 1
+
+    def put_many(self, items):
+        """
+        Put all the `items` from a list into the buffer at once, overwriting
+        the oldest items if the buffer becomes full.
+
+        This method must only be called from the producer thread.
+        """
+
+        position = self._write_position
+        self._claim_position = position + len(items)
+
+        # Items that would be overwritten by later items are never stored.
+        start = max(0, len(items) - self._size)
+        for offset in xrange(start, len(items)):
+            self._items[(position + offset) % self._size] = items[offset]
+
+        self._write_position = position + len(items)
+
+    def get(self):
+        """
+        Retrieve the oldest item from the buffer, or `None` if the buffer is
+        empty.
+
+        This method must only be called from the consumer thread.
+        """
+
+        items = self.get_many(1)
+        if not items:
+            return None
+
+        return items[0]
+
+    def get_many(self, count=None):
+        """
+        Retrieve at most `count` of the oldest items from the buffer at once,
+        or all the items if `count` is not given. Returns a list of items in
+        the order that they were put into the buffer.
+
+        This method must only be called from the consumer thread.
+        """
+
+        position = self._read_position
+        first = position
+        while True:
+            written = self._write_position
+            first = min(max(first, written - self._size), written)
+            end = written
+            if count is not None:
+                end = min(end, first + count)
+
+            items = [self._items[index % self._size] for index in xrange(first, end)]
+
+            # The producer may have claimed the positions of some of the items
+            # while we were reading them, in which case they may have been
+            # overwritten and are dropped as well. If all of them are dropped,
+            # then we continue with the newer items instead.
+            valid = max(first, self._claim_position - self._size)
+            if valid < end or first == end:
+                break
+
+            first = valid
+
+        valid = min(valid, end)
+        items = items[valid - first:]
+
+        self._dropped += valid - position
+        self._removed += len(items)
+        self._read_position = end
+
+        return items
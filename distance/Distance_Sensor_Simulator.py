@@ -1,5 +1,6 @@
 import sys
 import math
+import numpy as np
 from Distance_Sensor import Distance_Sensor
 
 class Distance_Sensor_Simulator(Distance_Sensor):
@@ -155,24 +156,91 @@ class Distance_Sensor_Simulator(Distance_Sensor):
         yaw_angle = self.get_angle(yaw)
         pitch_angle = self.get_pitch(pitch)
 
+        # Cast the ray against the compiled faces of the scene at once.
         distance = self.maximum_distance
-        i = 0
-        for obj in self.environment.get_objects():
+        dist, edge = self.environment.get_scene().get_distance(location,
+                                                               yaw_angle,
+                                                               pitch_angle)
+        if dist < distance:
+            distance = dist
+            self.current_edge = edge
+
+        for i, obj in enumerate(self.environment.get_objects()):
             is_current = i == self.current_object
-            dist, edge = self._get_object_distance(obj, location,
-                                                   yaw_angle, pitch_angle,
-                                                   verbose=is_current)
-            if dist < distance:
-                distance = dist
-                if isinstance(edge, list):
-                    self.current_edge = [i] + edge
-                else:
+            if isinstance(obj, list):
+                # The faces of this object are already in the scene. Only the
+                # current face is checked again if its verbose output is
+                # requested.
+                if is_current and 0 <= self.current_face < len(obj):
+                    self._get_plane_distance(obj[self.current_face], location,
+                                             yaw_angle, pitch_angle,
+                                             verbose=True)
+            else:
+                dist, edge = self._get_object_distance(obj, location,
+                                                       yaw_angle, pitch_angle,
+                                                       verbose=is_current)
+                if dist < distance:
+                    distance = dist
                     self.current_edge = edge
 
-            i = i + 1
-
         return distance
 
+    def get_distances(self, location=None, yaws=None, pitches=None):
+        """
+        Get the distances in meters to objects that we would collide with at
+        each of the given `yaws` and `pitches` from the current `location`.
+
+        The `yaws` and `pitches` are sequences or NumPy arrays of bearings in
+        radians, which are broadcast against each other. If either of them is
+        not given, then the current yaw or pitch of the sensor is used instead.
+        This allows simulating full scans or multiple sensors at once.
+
+        Returns a tuple of NumPy arrays with the shape of the broadcast angles.
+        The first contains the distances, and the second contains the indices
+        of the faces in the scene that were hit, or -1 if the closest object
+        is not a face or if no object is within the maximum distance. Unlike
+        `get_distance`, the current edge is not tracked.
+
+        Only the faces of objects are compiled into the scene and checked for
+        all rays at once. Other objects, such as cylinders and polygons that
+        extend from the ground, are slow to check since they are checked for
+        each ray and each object separately.
+        """
+
+        if location is None:
+            location = self.environment.get_location()
+        if yaws is not None:
+            yaws = np.asarray(yaws, dtype=np.float)
+        if pitches is not None:
+            pitches = np.asarray(pitches, dtype=np.float)
+
+        yaw_angles, pitch_angles = np.broadcast_arrays(self.get_angle(yaws),
+                                                       self.get_pitch(pitches))
+
+        scene = self.environment.get_scene()
+        distances, faces = scene.get_distances(location, yaw_angles,
+                                               pitch_angles)
+        faces[distances >= self.maximum_distance] = -1
+        np.minimum(distances, self.maximum_distance, out=distances)
+
+        # Objects that are not compiled into the scene are checked per ray,
+        # which is the slow path for scenes with many rays and such objects.
+        objects = [
+            obj for obj in self.environment.get_objects()
+            if not isinstance(obj, list)
+        ]
+        if objects:
+            angles = zip(yaw_angles.flat, pitch_angles.flat)
+            for i, (yaw_angle, pitch_angle) in enumerate(angles):
+                for obj in objects:
+                    dist = self._get_object_distance(obj, location, yaw_angle,
+                                                     pitch_angle)[0]
+                    if dist < distances.flat[i]:
+                        distances.flat[i] = dist
+                        faces.flat[i] = -1
+
+        return distances, faces
+
     def get_current_edge(self):
         return self.current_edge
 
@@ -0,0 +1,18 @@
+import os
+import sys
+from __init__ import __package__
+from reconstruction.Columnar_Dump_Buffer import Columnar_Dump_Buffer
+
+def main(argv):
+    if not argv:
+        print("Usage: python2 dump_converter.py <dump.json> [<dump.json> ...]")
+        return
+
+    # Convert each JSON dump to a columnar dump next to it.
+    for json_filename in argv:
+        npz_filename = "{}.npz".format(os.path.splitext(json_filename)[0])
+        Columnar_Dump_Buffer.convert(json_filename, npz_filename)
+        print("Converted {} to {}.".format(json_filename, npz_filename))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,4 +1,6 @@
+import os
 from Environment import Environment
+from Scene import Scene
 from VRML_Loader import VRML_Loader
 
 class Environment_Simulator(Environment):
@@ -30,11 +32,27 @@ class Environment_Simulator(Environment):
 
     def _load_objects(self, scenefile=None, translation=None):
         if scenefile is not None:
-            loader = VRML_Loader(self, scenefile, translation)
+            # Relative cache directories are within the package directory.
+            cache_directory = self.settings.get("scene_cache")
+            if cache_directory:
+                package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                cache_directory = os.path.join(package_directory, cache_directory)
+
+            loader = VRML_Loader(self, scenefile, translation,
+                                 cache_directory=cache_directory)
             self.objects = loader.get_objects()
-            return
+        else:
+            self.objects = self._get_test_objects()
+
+        # The objects are static, so compile their faces once for fast ray
+        # casting by the distance sensors.
+        self.scene = Scene(self.geometry, self.objects)
+
+    def _get_test_objects(self):
+        """
+        Create hardcoded objects around the vehicle for testing.
+        """
 
-        # Use hardcoded objects for testing
         l1 = self.get_location(100, 0, 10)
         l2 = self.get_location(0, 100, 10)
         l3 = self.get_location(-100, 0, 10)
@@ -42,7 +60,7 @@ class Environment_Simulator(Environment):
 
         # Simplify function call
         get_location_meters = self.geometry.get_location_meters
-        self.objects = [
+        return [
             {
                 'center': get_location_meters(self.vehicle.location, 40, -10),
                 'radius': 2.5,
@@ -64,6 +82,13 @@ class Environment_Simulator(Environment):
     def get_objects(self):
         return self.objects
 
+    def get_scene(self):
+        """
+        Retrieve the `Scene` object with the compiled faces of the objects.
+        """
+
+        return self.scene
+
     def set_location_check(self):
         self.vehicle.add_attribute_listener('location.local_frame',
                                             self.check_location)
@@ -77,11 +102,7 @@ class Environment_Simulator(Environment):
 
     def check_location(self, vehicle, attribute, new_location):
         if self.old_location is not None:
-            for obj in self.objects:
-                if isinstance(obj, list):
-                    for face in obj:
-                        factor = self.geometry.get_plane_intersection(face, self.old_location, new_location)[0]
-                        if 0 <= factor <= 1:
-                            raise RuntimeError("Flew through an object")
+            if self.scene.intersects(self.old_location, new_location):
+                raise RuntimeError("Flew through an object")
 
         self.old_location = new_location
@@ -0,0 +1,530 @@
+import sys
+import numpy as np
+
+class Scene(object):
+    """
+    Compiled representation of the faces of simulated objects.
+
+    The objects of a simulated environment are static, so the plane equations
+    of their faces and the edges of the faces projected onto two dimensions
+    are calculated once and stored in NumPy arrays. A bounding volume hierarchy
+    of axis-aligned boxes over the faces limits the faces that a ray or line
+    segment is checked against, so that large scenes remain fast to query.
+
+    Only objects that are lists of faces are compiled. The faces are stored in
+    local coordinates in meters relative to the home location of the geometry
+    at the time of compilation, in (north, east, up) order.
+    """
+
+    # The maximum number of faces in a leaf node of the bounding box tree.
+    LEAF_SIZE = 8
+
+    def __init__(self, geometry, objects=None):
+        """
+        Initialize the scene by compiling the faces of the `objects` using the
+        given `geometry`. Faces with less than three points are ignored, since
+        they do not define a plane.
+        """
+
+        self._geometry = geometry
+        self._reference = geometry.home_location
+
+        if objects is None:
+            objects = []
+
+        points, face_starts, edge_starts, edge_ends = self._compile_faces(objects)
+        self._compile_planes(points, face_starts)
+        self._compile_edges(points, face_starts, edge_starts, edge_ends)
+
+        self._face_order = np.arange(self.count)
+        tree = self._build_tree(points, face_starts)
+        self._node_lower = tree["lower"]
+        self._node_upper = tree["upper"]
+        self._node_children = tree["children"]
+        self._node_ranges = tree["ranges"]
+
+    def _compile_faces(self, objects):
+        """
+        Collect the faces of the `objects` that are lists of faces.
+
+        Returns a tuple of NumPy arrays of the local coordinates of the points
+        of the faces, the indices of the first point of each face, and the
+        indices of the starting and ending points of the edges of the faces.
+        """
+
+        # The object index and the face index within the object of each face.
+        face_objects = []
+        face_indices = []
+
+        # The points of the faces, and the edges of the faces as indices of
+        # the starting points, with an end index that wraps around per face.
+        points = []
+        face_starts = []
+        edge_starts = []
+        edge_ends = []
+
+        for i, obj in enumerate(objects):
+            if not isinstance(obj, list):
+                continue
+
+            for j, face in enumerate(obj):
+                if len(face) < 3:
+                    continue
+
+                start = len(points)
+                points.extend(self.get_local_coordinates(point) for point in face)
+                count = len(face)
+
+                face_objects.append(i)
+                face_indices.append(j)
+                face_starts.append(start)
+                edge_starts.extend(range(start, start + count))
+                edge_ends.extend(range(start + 1, start + count) + [start])
+
+        self._face_objects = np.array(face_objects, dtype=np.int)
+        self._face_indices = np.array(face_indices, dtype=np.int)
+
+        return (np.array(points, dtype=np.float).reshape(-1, 3),
+                np.array(face_starts, dtype=np.int),
+                np.array(edge_starts, dtype=np.int),
+                np.array(edge_ends, dtype=np.int))
+
+    def _compile_planes(self, points, face_starts):
+        """
+        Compile the plane equations of the faces, given the `points` of all
+        faces and the indices of the first point of each face in `face_starts`.
+        """
+
+        # Plane equations of the faces, based on the first three points.
+        # The normal vector is kept unnormalized, like `get_plane_vector`.
+        self._origins = points[face_starts]
+        self._normals = np.cross(points[face_starts + 1] - self._origins,
+                                 points[face_starts + 2] - self._origins)
+        offsets = np.einsum('ij,ij->i', self._normals, self._origins)
+        self._offsets = 0 - offsets
+
+        # Each face is projected onto two dimensions by ignoring the coordinate
+        # in which its plane is the least relevant. Each row contains the
+        # indices of the coordinates that are kept.
+        kept_axes = np.array([(1, 2), (0, 2), (0, 1)], dtype=np.int)
+        self._axes = kept_axes[np.argmax(np.absolute(self._normals), axis=1)].reshape(-1, 2)
+
+    def _compile_edges(self, points, face_starts, edge_starts, edge_ends):
+        """
+        Compile the projected edges of all faces, given the `points` of all
+        faces, the indices of the first point of each face in `face_starts`
+        and the indices of the starting and ending points of the edges in
+        `edge_starts` and `edge_ends`.
+
+        The edges are sorted so that the first projected coordinate increases
+        from the lower to the upper point, which is what the point inside
+        polygon algorithm expects.
+        """
+
+        # The edges of each face are a contiguous range starting at the index
+        # of the first point of the face, with an additional end offset.
+        self._edge_offsets = np.append(face_starts, len(points))
+        self._edge_faces = np.repeat(np.arange(len(face_starts)),
+                                     np.diff(self._edge_offsets))
+
+        axes = self._axes[self._edge_faces]
+        starts = points[edge_starts[:, np.newaxis], axes].reshape(-1, 2)
+        ends = points[edge_ends[:, np.newaxis], axes].reshape(-1, 2)
+        swap = starts[:, 0] > ends[:, 0]
+        self._edge_lower = np.where(swap[:, np.newaxis], ends, starts).reshape(-1, 2)
+        self._edge_upper = np.where(swap[:, np.newaxis], starts, ends).reshape(-1, 2)
+
+        # The slopes of the projected edges, with the maximum float value for
+        # edges that are parallel to the first projected axis.
+        delta = self._edge_upper - self._edge_lower
+        steep = np.absolute(delta[:, 1]) <= self._geometry.EPSILON
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._edge_slopes = np.where(steep, sys.float_info.max,
+                                         delta[:, 0] / delta[:, 1])
+
+    def _build_tree(self, points, face_starts):
+        """
+        Build a bounding volume hierarchy over the faces, given the `points`
+        of all faces and the indices of the first point of each face in
+        `face_starts`.
+
+        Returns a dictionary of NumPy arrays with the properties of the nodes
+        of the tree. Each node has a bounding box with `lower` and `upper`
+        corners and the indices of its two `children`, which are -1 for leaf
+        nodes. The faces of a node are a contiguous range in the face order,
+        given by the start and end index in `ranges`.
+        """
+
+        tree = {
+            "lower": [],
+            "upper": [],
+            "children": [],
+            "ranges": []
+        }
+
+        if face_starts.size > 0:
+            # The axis-aligned bounding boxes of the faces, which are slightly
+            # enlarged so that flat faces still have a volume.
+            epsilon = self._geometry.EPSILON
+            # pylint: disable=no-member
+            face_lower = np.minimum.reduceat(points, face_starts) - epsilon
+            face_upper = np.maximum.reduceat(points, face_starts) + epsilon
+            # pylint: enable=no-member
+            self._add_node(tree, 0, self.count, face_lower, face_upper)
+
+        return {
+            "lower": np.array(tree["lower"]).reshape(-1, 3),
+            "upper": np.array(tree["upper"]).reshape(-1, 3),
+            "children": np.array(tree["children"], dtype=np.int).reshape(-1, 2),
+            "ranges": np.array(tree["ranges"], dtype=np.int).reshape(-1, 2)
+        }
+
+    def _add_node(self, tree, start, end, face_lower, face_upper):
+        """
+        Add a node to the lists of node properties in the `tree` dictionary
+        for the faces in the range from `start` to `end` in the face order.
+        The `face_lower` and `face_upper` arrays contain the corners of the
+        bounding boxes of all faces.
+
+        Nodes with too many faces are split in half along the axis in which
+        the centers of the bounding boxes of the faces are spread the most.
+        Returns the index of the node.
+        """
+
+        faces = self._face_order[start:end]
+        index = len(tree["lower"])
+        tree["lower"].append(face_lower[faces].min(axis=0))
+        tree["upper"].append(face_upper[faces].max(axis=0))
+        tree["children"].append([-1, -1])
+        tree["ranges"].append([start, end])
+
+        if end - start > self.LEAF_SIZE:
+            centers = face_lower[faces] + face_upper[faces]
+            axis = np.argmax(np.ptp(centers, axis=0))
+            order = np.argsort(centers[:, axis], kind='mergesort')
+            self._face_order[start:end] = faces[order]
+
+            middle = (start + end) // 2
+            tree["children"][index] = [
+                self._add_node(tree, start, middle, face_lower, face_upper),
+                self._add_node(tree, middle, end, face_lower, face_upper)
+            ]
+
+        return index
+
+    @property
+    def count(self):
+        """
+        Retrieve the number of compiled faces in the scene.
+        """
+
+        return len(self._face_objects)
+
+    def get_local_coordinates(self, location):
+        """
+        Convert a `location` object to local coordinates of the scene.
+
+        Returns a tuple of north, east and up coordinates in meters relative
+        to the reference location of the scene.
+        """
+
+        return self._geometry.diff_location_meters(self._reference, location)
+
+    def get_face(self, index):
+        """
+        Retrieve the object index and the face index within the object of the
+        compiled face with the given `index`.
+        """
+
+        return int(self._face_objects[index]), int(self._face_indices[index])
+
+    def _get_directions(self, yaw_angles, pitch_angles):
+        """
+        Retrieve the direction vectors of rays with the given `yaw_angles` and
+        `pitch_angles`, which are NumPy arrays of the same shape, in local
+        coordinates.
+
+        Each vector matches the offset to the location that is one meter ahead
+        according to `Geometry.get_location_angle`. Returns a NumPy array with
+        a row for each ray.
+        """
+
+        yaw_angles = np.ravel(yaw_angles)
+        pitch_angles = np.ravel(pitch_angles)
+        return np.column_stack([
+            np.cos(pitch_angles) * np.sin(yaw_angles),
+            np.cos(yaw_angles),
+            np.sin(pitch_angles)
+        ])
+
+    def _get_ranges(self, starts, ends):
+        """
+        Expand the ranges of indices from the `starts` to the `ends` NumPy
+        arrays into a single array.
+
+        Returns a tuple of the array of the range index that each index belongs
+        to and the array of the indices themselves.
+        """
+
+        lengths = ends - starts
+        owners = np.repeat(np.arange(len(starts)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths,
+                                                       lengths)
+        return owners, np.repeat(starts, lengths) + offsets
+
+    def _get_candidates(self, origin, directions, limit=np.inf):
+        """
+        Find the faces whose bounding boxes intersect with lines through an
+        `origin` along each row of `directions`, between the origin and the
+        point at `limit` times the direction vector.
+
+        The bounding volume hierarchy is traversed one level at a time for all
+        rays at once. Returns a tuple of NumPy arrays of ray indices and face
+        indices of the candidate pairs, sorted by ray and then by face.
+        """
+
+        ray_candidates = []
+        face_candidates = []
+        rays = np.arange(len(directions) * min(1, len(self._node_children)))
+        nodes = np.zeros(len(rays), dtype=np.int)
+
+        while rays.size > 0:
+            hits = self._get_box_hits(nodes, origin, directions[rays], limit)
+            rays = rays[hits]
+            nodes = nodes[hits]
+
+            leaves = self._node_children[nodes, 0] < 0
+            ranges = self._node_ranges[nodes[leaves]]
+            owners, positions = self._get_ranges(ranges[:, 0], ranges[:, 1])
+            ray_candidates.append(rays[leaves][owners])
+            face_candidates.append(self._face_order[positions])
+
+            rays = np.repeat(rays[~leaves], 2)
+            nodes = self._node_children[nodes[~leaves]].ravel()
+
+        if not ray_candidates:
+            return np.empty(0, dtype=np.int), np.empty(0, dtype=np.int)
+
+        rays = np.concatenate(ray_candidates)
+        faces = np.concatenate(face_candidates)
+        order = np.lexsort((faces, rays))
+        return rays[order], faces[order]
+
+    def _get_box_hits(self, nodes, origin, directions, limit):
+        """
+        Check whether the bounding boxes of the `nodes` intersect with lines
+        through an `origin` along the row of `directions` in the same row
+        position, between the origin and the point at `limit` times the
+        direction vector.
+
+        Returns a boolean NumPy array indicating whether each line intersects
+        with the bounding box of its node.
+        """
+
+        lower = self._node_lower[nodes] - origin
+        upper = self._node_upper[nodes] - origin
+        parallel = directions == 0
+
+        # Slab test of the lines against the bounding boxes. Axes to which
+        # a line is parallel are either always or never inside the slab.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            near = lower / directions
+            far = upper / directions
+
+        inside = (lower <= 0) & (upper >= 0)
+        enter = np.where(parallel, np.where(inside, -np.inf, np.inf),
+                         np.minimum(near, far)).max(axis=1)
+        leave = np.where(parallel, np.where(inside, np.inf, -np.inf),
+                         np.maximum(near, far)).min(axis=1)
+
+        return (enter <= leave) & (leave >= 0) & (enter <= limit)
+
+    def _get_factors(self, origin, directions, faces):
+        """
+        Calculate the intersection factors of lines through an `origin` along
+        each row of `directions` with the planes of the `faces` in the same
+        row position.
+
+        Returns a NumPy array of factors, which are positive if and only if
+        there is a positive ray intersection, and NaN if the line is parallel
+        to the plane.
+        """
+
+        # http://geomalgorithms.com/a05-_intersect-1.html#Line-Plane-Intersection
+        normals = self._normals[faces]
+        dots = np.einsum('ij,ij->i', normals, directions)
+        valid = np.absolute(dots) > self._geometry.EPSILON
+        distances = normals.dot(origin) + self._offsets[faces]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(valid, -distances / dots, np.nan)
+
+    def _get_inside(self, faces, points):
+        """
+        Check whether the given `points`, which are local coordinates on the
+        planes of the given `faces`, are inside the polygons of the faces.
+
+        The `faces` is a NumPy array of face indices, and `points` is a NumPy
+        array with a row of coordinates for each face index. Returns a boolean
+        NumPy array indicating whether each point is inside its face.
+        """
+
+        # Select the edges of the faces and the projected point for each edge.
+        owners, edges = self._get_ranges(self._edge_offsets[faces],
+                                         self._edge_offsets[faces + 1])
+
+        projected_y, projected_x = self._get_projections(faces, points)
+        projected_y = projected_y[owners]
+        projected_x = projected_x[owners]
+
+        lower_y, lower_x = self._edge_lower[edges].T
+        upper_y, upper_x = self._edge_upper[edges].T
+
+        # Perform the ray casting algorithm of `ray_intersects_segment` for
+        # all edges at once, counting the crossings of a ray from each point
+        # along the second projected axis.
+        epsilon = self._geometry.EPSILON
+        on_line = (projected_y == lower_y) | (projected_y == upper_y)
+        projected_y = np.where(on_line, projected_y + epsilon, projected_y)
+
+        in_range = (projected_y >= lower_y) & (projected_y <= upper_y)
+        before = projected_x < np.minimum(lower_x, upper_x)
+        after = projected_x > np.maximum(lower_x, upper_x)
+
+        steep = np.absolute(lower_x - projected_x) <= epsilon
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.where(steep, sys.float_info.max,
+                              (projected_y - lower_y) / (projected_x - lower_x))
+
+        crossings = in_range & ~after & (before | (slopes >= self._edge_slopes[edges]))
+        counts = np.bincount(owners[crossings], minlength=len(faces))
+        return counts % 2 == 1
+
+    def _get_projections(self, faces, points):
+        """
+        Project the given `points` onto two dimensions in the same way as the
+        edges of the `faces` in the same row position.
+
+        Returns a tuple of NumPy arrays of the first and second projected
+        coordinates of the points.
+        """
+
+        axes = self._axes[faces]
+        rows = np.arange(len(faces))
+        return points[rows, axes[:, 0]], points[rows, axes[:, 1]]
+
+    def _get_hits(self, origin, directions, limit=np.inf):
+        """
+        Find the intersections of lines through an `origin` along each row of
+        `directions` with the faces of the scene, between the origin and the
+        point at `limit` times the direction vector.
+
+        Returns a tuple of NumPy arrays of the ray indices, face indices and
+        factors of the intersections, sorted by ray and then by face.
+        """
+
+        rays, faces = self._get_candidates(origin, directions, limit)
+        factors = self._get_factors(origin, directions[rays], faces)
+
+        with np.errstate(invalid='ignore'):
+            valid = (factors >= 0) & (factors <= limit)
+
+        rays = rays[valid]
+        faces = faces[valid]
+        factors = factors[valid]
+
+        points = origin + factors[:, np.newaxis] * directions[rays]
+        inside = self._get_inside(faces, points)
+        return rays[inside], faces[inside], factors[inside]
+
+    def _get_closest(self, origin, directions):
+        """
+        Find the closest face that each ray from an `origin` along each row of
+        `directions` intersects with in front of the origin.
+
+        Returns a tuple of NumPy arrays of the factors of the intersections,
+        which are infinite for rays without intersection, and the face indices,
+        which are -1 for rays without intersection.
+        """
+
+        factors = np.full(len(directions), np.inf)
+        faces = np.full(len(directions), -1, dtype=np.int)
+
+        hit_rays, hit_faces, hit_factors = self._get_hits(origin, directions)
+        ahead = hit_factors > 0
+        hit_rays = hit_rays[ahead]
+        hit_faces = hit_faces[ahead]
+        hit_factors = hit_factors[ahead]
+
+        # Select the closest intersection of each ray. Faces are ordered by
+        # object, so ties go to the first object.
+        order = np.lexsort((hit_faces, hit_factors, hit_rays))
+        first = np.ones(len(order), dtype=np.bool)
+        first[1:] = hit_rays[order][1:] != hit_rays[order][:-1]
+        closest = order[first]
+
+        factors[hit_rays[closest]] = hit_factors[closest]
+        faces[hit_rays[closest]] = hit_faces[closest]
+        return factors, faces
+
+    def get_distance(self, location, yaw_angle, pitch_angle):
+        """
+        Get the distance from the `location` to the closest face that a ray
+        with yaw and pitch radian angles given by `yaw_angle` and `pitch_angle`
+        intersects with.
+
+        Returns a tuple of the distance in meters and the detected edge, which
+        is a list of the object index, the face index within the object and
+        the intersection location object. If no face is intersected, then the
+        maximum float value and `None` are returned.
+        """
+
+        origin = np.array(self.get_local_coordinates(location))
+        directions = self._get_directions(yaw_angle, pitch_angle)
+        factors, faces = self._get_closest(origin, directions)
+        if faces[0] < 0:
+            return (sys.float_info.max, None)
+
+        offset = factors[0] * directions[0]
+        loc_point = self._geometry.get_location_meters(location, *offset)
+
+        object_index, face_index = self.get_face(faces[0])
+        distance = factors[0] * np.linalg.norm(directions[0])
+        return (distance, [object_index, face_index, loc_point])
+
+    def get_distances(self, location, yaw_angles, pitch_angles):
+        """
+        Get the distances from the `location` to the closest faces that rays
+        with yaw and pitch radian angles given by `yaw_angles` and
+        `pitch_angles` intersect with. The angles are NumPy arrays or scalars
+        that are broadcast against each other.
+
+        Returns a tuple of NumPy arrays with the shape of the broadcast angles.
+        The first contains the distances in meters, or the maximum float value
+        if no face is intersected. The second contains the indices of the
+        intersected faces, which can be converted with `get_face`, or -1 if no
+        face is intersected.
+        """
+
+        yaw_angles, pitch_angles = np.broadcast_arrays(yaw_angles,
+                                                       pitch_angles)
+
+        origin = np.array(self.get_local_coordinates(location))
+        directions = self._get_directions(yaw_angles, pitch_angles)
+        factors, faces = self._get_closest(origin, directions)
+
+        distances = factors * np.linalg.norm(directions, axis=1)
+        distances[faces < 0] = sys.float_info.max
+        return (distances.reshape(yaw_angles.shape),
+                faces.reshape(yaw_angles.shape))
+
+    def intersects(self, location1, location2):
+        """
+        Check whether the line segment between the location objects
+        `location1` and `location2` intersects with any face of the scene.
+        """
+
+        origin = np.array(self.get_local_coordinates(location1))
+        direction = np.array(self.get_local_coordinates(location2)) - origin
+        rays = self._get_hits(origin, direction[np.newaxis], limit=1.0)[0]
+        return rays.size > 0
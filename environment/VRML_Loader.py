@@ -1,4 +1,9 @@
+import hashlib
+import logging
 import os
+import tempfile
+import zipfile
+import zlib
 import numpy as np
 from vrml.vrml97 import basenodes, nodetypes, parser, parseprocessor
 
@@ -6,9 +11,18 @@ class VRML_Loader(object):
     """
     Parser for VRML files. The VRML language is described in its specification
     at http://www.web3d.org/documents/specifications/14772/V2.0/index.html
+
+    The parsed scene can be stored in a cache directory, which contains the
+    flattened faces in a compact binary file. The cache file is keyed by the
+    path of the scene file and the translation, and it is only used when the
+    modification times of the scene file and its inline files still match.
     """
 
-    def __init__(self, environment, filename, translation=None, transform=None):
+    # Version of the format of the cached scene files.
+    CACHE_VERSION = 1
+
+    def __init__(self, environment, filename, translation=None, transform=None,
+                 cache_directory=None):
         self.environment = environment
         self.filename = filename
 
@@ -19,12 +33,15 @@ class VRML_Loader(object):
 
         self.translation = tuple(translation)
         self._transform = transform
+        self._cache_directory = cache_directory
 
-        vrml_parser = parser.Parser(parser.grammar, "vrmlFile")
-        processor = parseprocessor.ParseProcessor(baseURI=self.filename)
-        with open(self.filename, 'r') as f:
-            data = f.read()
-            self._scene = vrml_parser.parse(data, processor=processor)[1][1]
+        # The flattened scene: the points of all faces, the number of points
+        # in each face and the number of faces in each object, as well as the
+        # files that the scene is made of.
+        self._points = []
+        self._face_sizes = []
+        self._object_sizes = []
+        self._files = [self.filename]
 
         self._objects = None
 
@@ -38,11 +55,153 @@ class VRML_Loader(object):
         """
 
         if self._objects is None:
-            self._objects = []
-            self._parse_children(self._scene, self._transform)
+            arrays = self._load_cache()
+            if arrays is None:
+                arrays = self._parse()
+                self._save_cache(arrays)
+
+            self._objects = self._build_objects(arrays)
 
         return self._objects
 
+    def get_cache_filename(self):
+        """
+        Retrieve the path to the cache file of the scene, or `None` if the
+        scene is not cached.
+        """
+
+        if not self._cache_directory:
+            return None
+
+        key = repr((os.path.abspath(self.filename), self.translation))
+        name = hashlib.sha1(key).hexdigest()
+        return os.path.join(self._cache_directory, "{}.npz".format(name))
+
+    def _get_modification_times(self, files):
+        """
+        Retrieve the modification times of the given `files` as a NumPy array.
+        """
+
+        return np.array([os.path.getmtime(path) for path in files])
+
+    def _load_cache(self):
+        """
+        Load the flattened scene from the cache file.
+
+        Returns a dictionary of NumPy arrays, or `None` if there is no valid
+        cache file for the scene.
+        """
+
+        cache_filename = self.get_cache_filename()
+        if cache_filename is None or not os.path.exists(cache_filename):
+            return None
+
+        try:
+            with np.load(cache_filename) as data:
+                arrays = dict(data.items())
+
+            if arrays["version"] != self.CACHE_VERSION:
+                return None
+
+            mtimes = self._get_modification_times(arrays["files"])
+        except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile,
+                zlib.error):
+            return None
+
+        if not np.array_equal(mtimes, arrays["mtimes"]):
+            return None
+
+        return arrays
+
+    def _save_cache(self, arrays):
+        """
+        Store the flattened scene given by the `arrays` dictionary in the
+        cache file, if caching is enabled.
+
+        If the cache file cannot be written, then the error is logged and the
+        scene is not cached.
+        """
+
+        cache_filename = self.get_cache_filename()
+        if cache_filename is None:
+            return
+
+        path = None
+        try:
+            if not os.path.exists(self._cache_directory):
+                os.makedirs(self._cache_directory)
+
+            # Write to a temporary file first, so that other processes never
+            # read an incomplete cache file.
+            handle, path = tempfile.mkstemp(dir=self._cache_directory)
+            with os.fdopen(handle, 'wb') as f:
+                np.savez_compressed(
+                    f, version=self.CACHE_VERSION,
+                    mtimes=self._get_modification_times(arrays["files"]),
+                    **arrays
+                )
+
+            os.rename(path, cache_filename)
+        except (IOError, OSError) as error:
+            logging.warning("Unable to cache the scene in '%s': %s",
+                            cache_filename, error)
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    def _parse(self):
+        """
+        Parse the VRML scene file and flatten its objects.
+
+        Returns a dictionary of NumPy arrays containing the `points` of all
+        faces, the `face_sizes` and `object_sizes`, and the `files` that were
+        parsed.
+        """
+
+        vrml_parser = parser.Parser(parser.grammar, "vrmlFile")
+        processor = parseprocessor.ParseProcessor(baseURI=self.filename)
+        with open(self.filename, 'r') as f:
+            data = f.read()
+            scene = vrml_parser.parse(data, processor=processor)[1][1]
+
+        self._parse_children(scene, self._transform)
+
+        if self._points:
+            points = np.concatenate(self._points)
+        else:
+            points = np.empty((0, 3))
+
+        return {
+            "points": points,
+            "face_sizes": np.array(self._face_sizes, dtype=np.int),
+            "object_sizes": np.array(self._object_sizes, dtype=np.int),
+            "files": np.array(self._files)
+        }
+
+    def _build_objects(self, arrays):
+        """
+        Convert the flattened scene given by the `arrays` dictionary to lists
+        of faces with point locations.
+        """
+
+        locations = [
+            self.environment.get_location(*point)
+            for point in arrays["points"].tolist()
+        ]
+
+        faces = []
+        start = 0
+        for size in arrays["face_sizes"].tolist():
+            faces.append(locations[start:start+size])
+            start += size
+
+        objects = []
+        start = 0
+        for size in arrays["object_sizes"].tolist():
+            objects.append(faces[start:start+size])
+            start += size
+
+        return objects
+
     def _parse_children(self, group, transform=None):
         for child in group.children:
             if isinstance(child, basenodes.Inline):
@@ -52,7 +211,11 @@ class VRML_Loader(object):
                 loader = VRML_Loader(self.environment, path,
                                      translation=self.translation,
                                      transform=transform)
-                self._objects.extend(loader.get_objects())
+                arrays = loader._parse()
+                self._points.append(arrays["points"])
+                self._face_sizes.extend(arrays["face_sizes"])
+                self._object_sizes.extend(arrays["object_sizes"])
+                self._files.extend(arrays["files"])
             elif isinstance(child, basenodes.Transform):
                 # Jumble up transformation matrices, in case they are nested.
                 forward = child.localMatrices().data[0]
@@ -73,32 +236,39 @@ class VRML_Loader(object):
                 self._parse_geometry(child.geometry, transform)
 
     def _parse_geometry(self, geometry, transform=None):
-        faces = []
-        face = []
+        points = np.array(geometry.coord.point, dtype=np.float).reshape(-1, 3)
+        if transform is not None:
+            # The translation matrices from the VRML library are for affine
+            # translations, but they are transposed for some reason. See
+            # vrml.vrml97.transformmatrix, e.g. line 319. Transform all points
+            # at once using homogeneous coordinates.
+            homogeneous = np.column_stack([points, np.ones(len(points))])
+            points = np.dot(homogeneous, transform)[:, :3]
+
+        # VRML geometry notation is in (x,z,y) where y is the vertical axis
+        # (using GL notation here). We have to convert it to (z,x,y) since the
+        # z/x are related to distances on the ground in north and east
+        # directions, respectively, and y is still the altitude.
+        points = np.column_stack([
+            points[:, 1] + self.translation[0],
+            points[:, 0] - self.translation[1],
+            points[:, 2] + self.translation[2]
+        ])
+
+        indices = []
+        face_sizes = []
+        size = 0
         for i in geometry.coordIndex:
             if i == -1:
-                faces.append(face)
-                face = []
+                face_sizes.append(size)
+                size = 0
             else:
-                point = geometry.coord.point[i]
-                if transform is not None:
-                    # The translation matrices from the VRML library are for 
-                    # affine translations, but they are transposed for some 
-                    # reason. See vrml.vrml97.transformmatrix, e.g. line 319.
-                    point = np.dot(transform.T, np.append(point, 1).T)
-
-                # Convert to Location
-                # VRML geometry notation is in (x,z,y) where y is the vertical 
-                # axis (using GL notation here). We have to convert it to 
-                # (z,x,y) since the z/x are related to distances on the ground 
-                # in north and east directions, respectively, and y is still 
-                # the altitude.
-                north = point[1] + self.translation[0]
-                east = point[0] - self.translation[1]
-                alt = point[2] + self.translation[2]
-                loc = self.environment.get_location(north, east, alt)
-                face.append(loc)
-
-        if len(face) > 0:
-            faces.append(face)
-        self._objects.append(faces)
+                indices.append(i)
+                size += 1
+
+        if size > 0:
+            face_sizes.append(size)
+
+        self._points.append(points[np.array(indices, dtype=np.int)])
+        self._face_sizes.extend(face_sizes)
+        self._object_sizes.append(len(face_sizes))
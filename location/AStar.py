@@ -1,4 +1,5 @@
 from collections import deque
+import heapq
 import math
 import numpy as np
 
@@ -40,22 +41,23 @@ class AStar(object):
         # memory map index.
         self._locations = {}
 
-        # A set of indices that are out of bounds but reachable in one step 
-        # during the assignment.
-        self._out_of_bounds = set()
-        self._out_of_bounds.update([(-1, i) for i in range(-1, self._size + 1)])
-        self._out_of_bounds.update([(i, -1) for i in range(-1, self._size + 1)])
-        self._out_of_bounds.update([
-            (self._size, i) for i in range(-1, self._size + 1)
-        ])
-        self._out_of_bounds.update([
-            (i, self._size) for i in range(-1, self._size + 1)
-        ])
+        # The search works on flat integer node identifiers of a grid that has 
+        # the size of the memory map plus a border of indices that are out of 
+        # bounds but reachable in one step during the assignment.
+        self._width = self._size + 2
+        self._neighbor_nodes = [
+            int(i * self._width + j) for i, j in self._neighbors
+        ]
+
+        border = np.ones((self._width, self._width), dtype=np.bool)
+        border[1:-1, 1:-1] = False
+        self._border = border.ravel()
 
         # State variables used during the search algorithm.
         self._close = None
-        self._evaluated = None
-        self._open_nodes = None
+        self._closed = None
+        self._open = None
+        self._heap = None
         self._came_from = None
 
         self._d = None
@@ -97,6 +99,21 @@ class AStar(object):
 
         return close
 
+    def _get_node(self, idx):
+        """
+        Convert a memory map index `idx` to a node identifier.
+        """
+
+        return (idx[0] + 1) * self._width + idx[1] + 1
+
+    def _get_index(self, node):
+        """
+        Convert a node identifier `node` to a memory map index.
+        """
+
+        i, j = divmod(int(node), self._width)
+        return (i - 1, j - 1)
+
     def _get_location(self, idx):
         """
         Retrieve the location for the memory map index `idx`.
@@ -147,7 +164,9 @@ class AStar(object):
             start_idx = self._memory_map.get_index(start)
             goal_idx = self._memory_map.get_index(goal)
 
-        self._close = self._get_close_map(closeness)
+        close = np.zeros((self._width, self._width), dtype=np.bool)
+        close[1:-1, 1:-1] = self._get_close_map(closeness) != 0
+        self._close = close.ravel()
 
         if start_idx == goal_idx:
             # Already at the requested location, simply return it as the 
@@ -156,12 +175,16 @@ class AStar(object):
             # `use_indices` is enabled.
             return [goal], [goal], 0.0, direction
 
-        if not self._memory_map.index_in_bounds(*goal_idx):
-            # No safe path to the location since the location is outside of the 
-            # memory map.
+        if not self._memory_map.index_in_bounds(*start_idx) or \
+           not self._memory_map.index_in_bounds(*goal_idx):
+            # No safe path to the location since the start or goal location 
+            # is outside of the memory map.
             return [], [], np.inf, direction
 
-        if self._close[goal_idx]:
+        start_node = self._get_node(start_idx)
+        goal_node = self._get_node(goal_idx)
+
+        if self._close[goal_node]:
             # No safe path to the location since the location is unsafe, due to 
             # being too close to an object.
             return [], [], np.inf, direction
@@ -169,118 +192,140 @@ class AStar(object):
         # If we are allowed to move on the bounds of the memory map, but not 
         # outside it, then we can speed up the out of bounds check by 
         # considering these indices as evaluated. Thus they are skipped without 
-        # having a memory map call overhead.
-        self._evaluated = set()
+        # having a bounds check overhead.
         if self._allow_at_bounds:
-            self._evaluated.update(self._out_of_bounds)
+            self._closed = self._border.copy()
+        else:
+            self._closed = np.zeros(self._width**2, dtype=np.bool)
 
-        self._open_nodes = set([start_idx])
-        self._came_from = {}
+        # The open nodes are kept in a binary heap of estimated total costs 
+        # and node identifiers. Nodes whose cost improves are pushed again, 
+        # and outdated entries are skipped when they are popped.
+        self._open = np.zeros(self._width**2, dtype=np.bool)
+        self._open[start_node] = True
+        self._heap = []
+        self._came_from = np.full(self._width**2, -1, dtype=np.int)
 
         # Direction of the vehicle along best known path
-        self._d = np.full((self._size, self._size), np.nan)
-        self._d[start_idx] = direction
+        self._d = np.full(self._width**2, np.nan)
+        self._d[start_node] = direction
 
         # Estimated total cost from start to goal when passing through 
-        # a specific index whose best known path is already known.
-        self._f = np.full((self._size, self._size), np.inf)
-        self._f[start_idx] = self._get_cost(start_idx, goal_idx, turning_cost)
+        # a specific node whose best known path is already known.
+        self._f = np.full(self._width**2, np.inf)
+        self._f[start_node] = self._get_cost(start_node, goal_node, turning_cost)
+        heapq.heappush(self._heap, (self._f[start_node], start_node))
 
         # Cost along best known path
-        self._g = np.full((self._size, self._size), np.inf)
-        self._g[start_idx] = 0.0
+        self._g = np.full(self._width**2, np.inf)
+        self._g[start_node] = 0.0
 
-        return self._search(start_idx, goal_idx, closeness, turning_cost)
+        return self._search(start_node, goal_node, closeness, turning_cost)
 
-    def _search(self, start_idx, goal_idx, closeness, turning_cost):
+    def _search(self, start, goal, closeness, turning_cost):
         """
         Perform the actual search algorithm after initial setup.
 
-        The `start_idx` and `goal_idx` are memory map indexes of the start and
-        goal locations, respectively. The other arguments as well as the return
+        The `start` and `goal` are node identifiers of the start and goal
+        locations, respectively. The other arguments as well as the return
         value are the same as the `assign` method.
         """
 
-        while self._open_nodes:
-            # Get the node in open_nodes with the lowest f score
-            open_indices = zip(*self._open_nodes)
-            min_idx = np.argmin(self._f[open_indices])
-            current_idx = (open_indices[0][min_idx], open_indices[1][min_idx])
-
-            # If we reached the goal index, then we have found the fastest 
+        # Get the open node with the lowest f score
+        current = self._pop()
+        while current is not None:
+            # If we reached the goal node, then we have found the fastest 
             # safest path to it, thus reconstruct this path.
-            if current_idx == goal_idx:
-                path, trending_path = self._reconstruct(goal_idx)
-                return path, trending_path, self._g[goal_idx], self._d[goal_idx]
+            if current == goal:
+                path, trending_path = self._reconstruct(goal)
+                return path, trending_path, self._g[goal], self._d[goal]
 
             # Evaluate the new node
-            self._open_nodes.remove(current_idx)
-            self._evaluated.add(current_idx)
+            self._open[current] = False
+            self._closed[current] = True
 
-            neighborhood = zip(current_idx + self._neighbors,
-                               self._neighbor_directions)
-            for neighbor_coord, neighbor_direction in neighborhood:
-                # Create the neighbor index and check whether we have evaluated 
+            neighborhood = zip(self._neighbor_nodes, self._neighbor_directions)
+            for offset, neighbor_direction in neighborhood:
+                # Create the neighbor node and check whether we have evaluated 
                 # it before.
-                neighbor_idx = tuple(neighbor_coord)
-                if neighbor_idx in self._evaluated:
+                neighbor = current + offset
+                if self._closed[neighbor]:
                     continue
 
-                # Check whether the neighbor index is still in bounds. We can 
+                # Check whether the neighbor node is still in bounds. We can 
                 # break if it is not in bounds, because that means that the 
                 # current location is close to the memory map bounds, which 
                 # could be considered unsafe. But if we have the possibility to 
                 # move at the boundary, then try the next neighbor instead.
                 # When `allow_at_bounds` is enabled, then this check is already 
                 # performed when checking for evaluated neighbors.
-                if not self._allow_at_bounds and \
-                   not self._memory_map.index_in_bounds(*neighbor_idx):
+                if self._border[neighbor]:
                     break
 
-                # Check whether the neighbor index is inside the region of 
+                # Check whether the neighbor node is inside the region of 
                 # influence of any other object. Only do so when we are not 
                 # leaving a region of influence around the start location, 
                 # since we should be able to leave this region if it exists.
-                if self._close[neighbor_idx]:
-                    if self._left_start_area(start_idx, current_idx, closeness):
+                if self._close[neighbor]:
+                    if self._left_start_area(start, current, closeness):
                         continue
 
                 # Calculate the new tentative distances to the point
-                cost = self._get_cost(current_idx, neighbor_idx, turning_cost,
+                cost = self._get_cost(current, neighbor, turning_cost,
                                       direction=neighbor_direction)
-                tentative_g = self._g[current_idx] + cost
-                if tentative_g >= self._g[neighbor_idx]:
+                tentative_g = self._g[current] + cost
+                if tentative_g >= self._g[neighbor]:
                     # Not a better path, thus we do not need to update anything 
                     # for this neighbor which has a different, faster path.
                     continue
 
-                self._open_nodes.add(neighbor_idx)
-                self._came_from[neighbor_idx] = current_idx
-                self._g[neighbor_idx] = tentative_g
+                self._came_from[neighbor] = current
+                self._g[neighbor] = tentative_g
+
+                predicted_cost = self._get_cost(neighbor, goal, turning_cost)
+                self._f[neighbor] = tentative_g + predicted_cost
+                self._d[neighbor] = neighbor_direction
 
-                predicted_cost = self._get_cost(neighbor_idx, goal_idx,
-                                                turning_cost)
-                self._f[neighbor_idx] = tentative_g + predicted_cost
-                self._d[neighbor_idx] = neighbor_direction
+                self._open[neighbor] = True
+                heapq.heappush(self._heap, (self._f[neighbor], neighbor))
 
-        direction = None if np.isnan(self._d[start_idx]) else self._d[start_idx]
+            current = self._pop()
+
+        direction = None if np.isnan(self._d[start]) else self._d[start]
         return [], [], np.inf, direction
 
-    def _left_start_area(self, start_idx, current_idx, closeness):
+    def _pop(self):
+        """
+        Remove the open node with the lowest estimated total cost from the heap
+        and return its node identifier.
+
+        Entries of nodes that have been evaluated before or whose cost has
+        improved since they were pushed are outdated, and are skipped. If there
+        are no more open nodes, then `None` is returned.
+        """
+
+        while self._heap:
+            cost, node = heapq.heappop(self._heap)
+            if self._open[node] and cost <= self._f[node]:
+                return node
+
+        return None
+
+    def _left_start_area(self, start, current, closeness):
         """
-        Check whether the memory map index `current_idx` is outside of the
-        area of influence that the starting location of `start_idx` is also in.
+        Check whether the node `current` is outside of the area of influence
+        that the starting node `start` is also in.
 
         The area of influence is at most `closeness` meters in radius. If there
         is no such area of influence, then we have always left the area.
         """
 
-        return not self._close[start_idx] or self._g[current_idx] >= closeness
+        return not self._close[start] or self._g[current] >= closeness
 
     def _reconstruct(self, current):
         """
-        Reconstruct the path from the starting location to `current`, a memory
-        map index of the goal location. This only works once the optimal path
+        Reconstruct the path from the starting location to `current`, a node
+        identifier of the goal location. This only works once the optimal path
         to the goal has been found in `_search`.
 
         The resulting lists contain either memory map index tuples or `Location`
@@ -295,7 +340,7 @@ class AStar(object):
         trending_path = deque()
 
         # The previous point, initially the goal point.
-        previous = current
+        previous = self._get_index(current)
 
         # Whether we are adding the first point to the path.
         first = True
@@ -307,13 +352,14 @@ class AStar(object):
         # The trend of the differences between the coordinates of the previous 
         # poisition and the one before that.
         trend = (0, 0)
-        while current in self._came_from:
-            current = self._came_from.pop(current)
+        while self._came_from[current] >= 0:
+            current = int(self._came_from[current])
+            index = self._get_index(current)
 
             # Track the current trend of the point differences. If it is the 
             # same kind of difference, then we may be able to skip this point 
             # in our list of waypoints.
-            d = tuple(np.sign(current[i] - previous[i]) for i in [0, 1])
+            d = tuple(np.sign(index[i] - previous[i]) for i in [0, 1])
             alt_trend = (trend[i] != 0 and d[i] != trend[i] for i in [0, 1])
             trending = any(alt_trend)
 
@@ -327,15 +373,15 @@ class AStar(object):
                 trending_path.appendleft(location)
 
             trend = d
-            previous = current
+            previous = index
             first = False
 
         return list(full_path), list(trending_path)
 
-    def _get_cost(self, start_idx, goal_idx, turning_cost, direction=None):
+    def _get_cost(self, start, goal, turning_cost, direction=None):
         """
-        Calculate the cost from traveling from a location with memory map index
-        `start_idx` to a location with memory map index `goal_idx`. This
+        Calculate the cost from traveling from a location with node identifier
+        `start` to a location with node identifier `goal`. This
         is the bird's-eye distance between the two locations, which should be
         the "real" traveling distance for directly connected indices, plus any
         cost from turning into the correct direction, where `turning_cost` is
@@ -351,30 +397,33 @@ class AStar(object):
         # evenly spread out coordinates. This saves some Location object 
         # overhead, as well as some geometry internal call overhead.
         if self._norm:
-            dNorth = (goal_idx[0] - start_idx[0]) / self._resolution
-            dEast = (goal_idx[1] - start_idx[1]) / self._resolution
-            if turning_cost == 0.0 or np.isnan(self._d[start_idx]):
+            start_i, start_j = divmod(start, self._width)
+            goal_i, goal_j = divmod(goal, self._width)
+            dNorth = (goal_i - start_i) / self._resolution
+            dEast = (goal_j - start_j) / self._resolution
+            if turning_cost == 0.0 or np.isnan(self._d[start]):
                 turn = 0.0
             else:
                 if direction is None:
                     direction = math.atan2(dEast, dNorth)
 
-                turn = abs(self._geometry.diff_angle(self._d[start_idx],
+                turn = abs(self._geometry.diff_angle(self._d[start],
                                                      direction))
 
             return self._norm(dNorth, dEast) + turning_cost * turn
 
-        start = self._get_location(start_idx)
-        goal = self._get_location(goal_idx)
-        distance = self._geometry.get_distance_meters(start, goal)
+        start_location = self._get_location(self._get_index(start))
+        goal_location = self._get_location(self._get_index(goal))
+        distance = self._geometry.get_distance_meters(start_location,
+                                                      goal_location)
 
-        if turning_cost == 0.0 or np.isnan(self._d[start_idx]):
+        if turning_cost == 0.0 or np.isnan(self._d[start]):
             turn = 0.0
         else:
             if direction is None:
-                angle = self._geometry.get_angle(start, goal)
+                angle = self._geometry.get_angle(start_location, goal_location)
                 direction = self._geometry.angle_to_bearing(angle)
 
-            turn = abs(self._geometry.diff_angle(self._d[start_idx], direction))
+            turn = abs(self._geometry.diff_angle(self._d[start], direction))
 
         return distance + turning_cost * turn
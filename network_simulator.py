@@ -0,0 +1,27 @@
+import sys
+import traceback
+from __init__ import __package__
+from core.Thread_Manager import Thread_Manager
+from settings import Arguments
+from zigbee.Network_Simulator import Network_Simulator
+
+def main(argv):
+    thread_manager = Thread_Manager()
+
+    arguments = Arguments("settings.json", argv)
+    network_simulator = Network_Simulator(arguments, thread_manager)
+
+    arguments.check_help()
+
+    try:
+        statistics = network_simulator.run()
+    except:
+        traceback.print_exc()
+        thread_manager.destroy()
+        return
+
+    for key, value in sorted(statistics.items()):
+        print("{}: {}".format(key, value))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -98,6 +98,16 @@ def main(argv):
 
     indices = runner.start()
 
+    # Show how often the weight matrices could reuse cached calculations in 
+    # this process.
+    caches = [
+        ("Distance", runner.problem.distance_cache),
+        ("Link", runner.problem.link_cache)
+    ]
+    for name, cache in caches:
+        print("{} cache: {} hits, {} misses".format(name, cache.hits,
+                                                    cache.misses))
+
     # Show feasible solutions in a sorted manner.
     if len(indices) == 0:
         print("No feasible solutions found after {} iterations!".format(t_max))
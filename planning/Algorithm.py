@@ -1,5 +1,7 @@
 # Core imports
 import itertools
+import multiprocessing
+import threading
 import time
 from collections import OrderedDict
 from functools import partial
@@ -8,10 +10,33 @@ from functools import partial
 import numpy as np
 
 # Package imports
+from Hypervolume_Archive import Hypervolume_Archive
+from Pareto_Archive import Pareto_Archive
 from ..settings import Arguments
 
 __all__ = ["NSGA", "SMS_EMOA"]
 
+# State of a worker process in the evaluation pool.
+_worker_state = {}
+
+def _initialize_worker(problem):
+    """
+    Set up a worker process of the evaluation pool with the given `problem`.
+
+    The pool forks the worker processes, so the problem instance is a copy
+    of the original problem, including its own weight matrix and assignment
+    objects. Thus the workers can safely evaluate individuals concurrently.
+    """
+
+    _worker_state["problem"] = problem
+
+def _evaluate_worker(points):
+    """
+    Evaluate a list of individuals `points` in a worker process.
+    """
+
+    return _worker_state["problem"].evaluate(points)
+
 class Algorithm(object):
     """
     Evolutionary Multiobjective Optimization algorithm
@@ -29,10 +54,34 @@ class Algorithm(object):
         self.t_callback = self.settings.get("iteration_callback")
         self.iteration_callback = None
 
+        # Number of offspring to generate and evaluate in each iteration. If 
+        # this is more than one, then the algorithm is generational rather 
+        # than steady-state.
+        self.offspring_size = self.settings.get("offspring_size")
+
+        # Number of worker processes to evaluate individuals with.
+        self.processes = self.settings.get("processes")
+        self._pool = None
+
+        # Incremental archive of the nondominated front, and unique keys of 
+        # the individuals in the population and their population indices.
+        self._archive = None
+        self._keys = []
+        self._indices = {}
+        self._key_count = None
+
         # Make steps as long as necessary, and convert to numpy array for easy 
         # per-component application.
         self.steps = self.problem.format_steps(self.settings.get("step_size"))
 
+        # Check whether the algorithm can handle the objectives of the problem 
+        # before it starts evolving, since the archive rejects individuals 
+        # with an unsupported number of objective values.
+        dimension = len(self.problem.objectives)
+        if not self.supports_objectives(dimension):
+            msg = "The {} algorithm does not support problems with {} objectives"
+            raise ValueError(msg.format(self.get_name(), dimension))
+
     def set_iteration_callback(self, callback):
         if not hasattr(callback, "__call__"):
             raise TypeError("Iteration callback is not callable")
@@ -42,14 +91,82 @@ class Algorithm(object):
     def evolve(self):
         """
         Perform the evolutionary algorithm and find solutions.
+
+        If the algorithm uses multiple processes, then a pool of worker
+        processes is started for the duration of the run to evaluate the
+        individuals concurrently. The pool forks the current process, which is
+        only safe when no other threads are running, since locks held by those
+        threads would remain locked in the workers. Therefore, the individuals
+        are evaluated in this process when the algorithm runs in a thread, for
+        example when it is started by a `Planning_Runner` from the control
+        panel, or when other threads are active.
+        """
+
+        if self.processes > 1 and self._is_single_threaded():
+            self._pool = multiprocessing.Pool(self.processes,
+                                              initializer=_initialize_worker,
+                                              initargs=(self.problem,))
+
+        try:
+            return self._evolve()
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+
+    def _is_single_threaded(self):
+        """
+        Check whether the algorithm runs in the main thread of the process and
+        no other threads are active, so that it is safe to fork.
+        """
+
+        current_thread = threading.current_thread()
+        return current_thread.name == "MainThread" and \
+               threading.active_count() == 1
+
+    def _evaluate(self, points):
+        """
+        Evaluate a list of individuals `points` for feasibility and objective
+        values using the problem.
+
+        If there are multiple worker processes, then the evaluation is split
+        into parts for each worker, and the evaluation results are combined.
         """
 
+        if self._pool is None or len(points) <= 1:
+            return self.problem.evaluate(points)
+
+        # Split the points into contiguous chunks for each worker process.
+        chunk_size = -(-len(points) // self.processes)
+        chunks = [
+            points[i:i+chunk_size] for i in range(0, len(points), chunk_size)
+        ]
+
+        Feasible = []
+        Objectives = []
+        for ChunkFeasible, ChunkObjectives in self._pool.map(_evaluate_worker,
+                                                             chunks):
+            Feasible.extend(ChunkFeasible)
+            Objectives.extend(ChunkObjectives)
+
+        return Feasible, Objectives
+
+    def _evolve(self):
         # For our initial population of size mu, generate random vectors with 
         # values in a feasible interval using domain specification.
         P = [self.problem.get_random_vector() for _ in range(self.mu)]
 
         # Evaluate objectives and constraints for points in the population.
-        Feasible, Objectives = self.problem.evaluate(P)
+        Feasible, Objectives = self._evaluate(P)
+
+        # Track the population in the archive.
+        self._archive = self.get_archive()
+        self._keys = []
+        self._indices = {}
+        self._key_count = itertools.count()
+        self._add(P, Feasible, Objectives)
+
         Deletions = {
             "infeasible": 0,
             "dominated": 0,
@@ -86,53 +203,61 @@ class Algorithm(object):
         return P, Objectives, Feasible
 
     def _mutate_and_select(self, P, Feasible, Objectives, Deletions):
-        # Select random index s of the mu points
-        s = np.random.randint(self.mu)
-        # Create a mutated point x_new from x(s) by altering each component 
+        # Select random indices s of the mu points for each offspring.
+        S = np.random.randint(self.mu, size=self.offspring_size)
+        # Create mutated points x_new from x(s) by altering each component 
         # with a normal distributed random number generator. This is done on 
         # each component using numpy broadcasting.
-        x_new = self.problem.mutate(P[s], self.steps)
+        X_new = [self.problem.mutate(P[s], self.steps) for s in S]
+
+        # Evaluate objectives and constraints for all the x_new
+        NewFeasible, NewObjectives = self._evaluate(X_new)
+        P.extend(X_new)
+        Feasible.extend(NewFeasible)
+        Objectives.extend(NewObjectives)
+        self._add(P, Feasible, Objectives)
 
-        # Evaluate objectives and constraints for x_new
-        NewFeasible, NewObjectives = self.problem.evaluate([x_new])
-        P.append(x_new)
-        Feasible.append(NewFeasible[0])
-        Objectives.append(NewObjectives[0])
+        # Reduce the population to its original size by deleting the worst 
+        # individual one by one.
+        while len(P) > self.mu:
+            self._select(P, Feasible, Objectives, Deletions)
+
+    def _add(self, P, Feasible, Objectives):
+        """
+        Add the individuals at the end of the population list `P` that are
+        not yet tracked to the archive.
+        """
 
-        # Track which points are dominated or infeasible. We track the indices 
-        # from the points list.
-        Delete = np.nonzero(np.logical_not(np.array(Feasible)))[0]
+        for idx in range(len(self._keys), len(P)):
+            key = self._key_count.next()
+            self._keys.append(key)
+            self._indices[key] = idx
+            self._archive.add(key, Objectives[idx], Feasible[idx])
 
+    def _select(self, P, Feasible, Objectives, Deletions):
         # First delete the infeasible solutions, then we will care about the 
         # nondominated solutions. This differs from the original 
-        # implementation, hopefully this is a good decision.
-        if len(Delete) > 0:
-            Deletions["infeasible"] += 1
-        else:
-            R = self.sort_nondominated(Objectives, all_layers=False)
-            Delete = list(itertools.chain(*[Rk.keys() for Rk in R[1:]]))
-            if len(Delete) > 0:
-                Deletions["dominated"] += 1
-
-        if len(Delete) > 0:
-            # Randomly delete one of the solutions. If it is the new point, 
-            # then we do not need to do anything (we just forget it in next 
-            # iteration), otherwise we replace the deleted point with the new 
-            # point.
-            # We use numpy.random.randint to select key instead of 
-            # numpy.random.choice because of compatibility with older Numpy.
-            idx = Delete[np.random.randint(len(Delete))]
-        else:
-            # Delete the individual with the smallest crowding distance (NSGA) 
-            # or hypervolume contribution (SMS-EMOA)
-            C = self.sort_contribution(R[0])
-
-            idx = np.argmin(C)
-            Deletions["contribution"] += 1
-
-        del P[idx]
-        del Feasible[idx]
-        del Objectives[idx]
+        # implementation, hopefully this is a good decision. If there are no 
+        # dominated solutions either, then delete the individual with the 
+        # smallest crowding distance (NSGA) or hypervolume contribution 
+        # (SMS-EMOA). The archive selects a random infeasible or dominated 
+        # solution and keeps track of the contributions.
+        key, reason = self._archive.get_worst()
+        Deletions[reason] += 1
+
+        self._archive.remove(key)
+        idx = self._indices.pop(key)
+
+        # Move the last individual to the position of the deleted individual 
+        # in the population, so that we do not need to shift the indices of 
+        # all the individuals after it.
+        last = len(P) - 1
+        for values in (P, Feasible, Objectives, self._keys):
+            values[idx] = values[last]
+            values.pop()
+
+        if idx != last:
+            self._indices[self._keys[idx]] = idx
 
     def KLP(self, P, Objectives):
         """
@@ -202,6 +327,41 @@ class Algorithm(object):
     def sort_contribution(self, Rk):
         return Rk
 
+    def supports_objectives(self, dimension):
+        """
+        Check whether the algorithm supports problems with the given number of
+        objectives, `dimension`.
+
+        The default archive only supports problems with two objectives.
+        """
+
+        return dimension == 2
+
+    def get_archive(self):
+        """
+        Create an archive that keeps track of the nondominated front and the
+        contributions of the individuals in the population.
+
+        The default archive supports problems with two objectives, and uses
+        the contributions from `get_contribution`.
+        """
+
+        return Pareto_Archive(self.get_contribution)
+
+    def get_contribution(self, previous, current, following):
+        """
+        Calculate the contribution of an individual with objective values
+        `current` in a two-dimensional nondominated front, where `previous` and
+        `following` are the objective values of the individuals before and
+        after it in the front when it is sorted on the first objective.
+        These neighbors are `None` if the individual is at the start or end of
+        the front, respectively.
+
+        The contribution indicates how useful the individual is to keep.
+        """
+
+        raise NotImplementedError("Subclasses must implement `get_contribution`")
+
     def get_name(self):
         """
         Get the displayable name of the algorithm.
@@ -228,15 +388,17 @@ class NSGA(Algorithm):
             return C
 
         keys = []
+        locations = []
         for obj in xrange(len(Rk.values()[0])):
             # Sort the keys of the points according to the objective j (obj)
             keys.append(sorted(Rk.keys(), key=partial(lambda j, i: Rk[i][j], obj)))
+            locations.append(dict((idx, v) for v, idx in enumerate(keys[-1])))
 
         for idx in Rk.keys():
             for j in xrange(len(Rk[idx])):
                 # Location of the index idx in the sorted keys
                 k = keys[j]
-                v = k.index(idx)
+                v = locations[j][idx]
                 l = Rk[k[v-1]][j] if v > 0 else np.NINF
                 u = Rk[k[v+1]][j] if v < len(Rk)-1 else np.inf
                 C[i] += 2 * (u - l)
@@ -248,6 +410,15 @@ class NSGA(Algorithm):
     def sort_contribution(self, Rk):
         return self.crowding_distance(Rk)
 
+    def get_contribution(self, previous, current, following):
+        # In a two-dimensional front, the neighbors in the second objective 
+        # are the same as in the first objective, but in reverse order.
+        if previous is None or following is None:
+            return np.inf
+
+        return 2 * (following[0] - previous[0]) + \
+               2 * (previous[1] - following[1])
+
     def get_name(self):
         return "NSGA-II"
 
@@ -264,18 +435,41 @@ class SMS_EMOA(Algorithm):
         """
 
         # 2D only.
-        # Sort by first coordinate
+        # Sort by first coordinate, but return the contributions in the order 
+        # of the individuals in Rk.
         X = sorted(Rk.keys(), key=lambda i: Rk[i][0])
+        keys = dict((idx, i) for i, idx in enumerate(Rk.keys()))
         C = np.zeros(len(X))
         for i, idx in enumerate(X):
-            l = Rk[X[i-1]][1] if i > 0 else np.NINF
-            u = Rk[X[i+1]][0] if i < len(Rk)-1 else np.inf
-            C[i] = (Rk[idx][1] - l) * (u - Rk[idx][0])
+            l = Rk[X[i-1]] if i > 0 else None
+            u = Rk[X[i+1]] if i < len(Rk)-1 else None
+            C[keys[idx]] = self.get_contribution(l, Rk[idx], u)
 
         return C
 
     def sort_contribution(self, Rk):
         return self.hypervolume_contribution(Rk)
 
+    def supports_objectives(self, dimension):
+        # The hypervolume archive supports any number of objectives.
+        return dimension >= 2
+
+    def get_archive(self):
+        # Use exact hypervolume contributions for more than two objectives.
+        dimension = len(self.problem.objectives)
+        if dimension > 2:
+            return Hypervolume_Archive(dimension)
+
+        return super(SMS_EMOA, self).get_archive()
+
+    def get_contribution(self, previous, current, following):
+        # The area between the individual and its neighbors that is dominated 
+        # only by this individual. The individuals at the boundaries of the 
+        # front have an infinite contribution.
+        if previous is None or following is None:
+            return np.inf
+
+        return (previous[1] - current[1]) * (following[0] - current[0])
+
     def get_name(self):
         return "SMS-EMOA"
@@ -0,0 +1,199 @@
+# Library imports
+import numpy as np
+
+# Package imports
+from Pareto_Archive import Pareto_Archive
+
+class Hypervolume_Archive(Pareto_Archive):
+    """
+    Incremental archive of individuals with any number of objective values,
+    where the contribution of an individual in the nondominated front is its
+    exclusive hypervolume.
+
+    The exclusive hypervolumes are calculated exactly using the WFG algorithm.
+    When an individual enters or leaves the front, only the contributions of
+    the individuals whose exclusive region is changed are recalculated.
+
+    The reference point of the hypervolume lies slightly beyond the worst
+    objective values of the front. Individuals that have the best value of
+    the front for one of the objectives have an infinite contribution, just
+    like the boundary individuals of a two-dimensional front. Since the
+    reference point and the best values follow the front, the updates are
+    only incremental as long as these points stay the same. When a change of
+    the front moves either of them, all the contributions are recalculated.
+    """
+
+    def __init__(self, dimension):
+        """
+        Initialize the archive for individuals with `dimension` objectives.
+        """
+
+        super(Hypervolume_Archive, self).__init__(None)
+
+        self._dimension = dimension
+
+        # Objective values of the individuals in the front, in the same order
+        # as the keys of the front.
+        self._front_points = np.empty((0, dimension))
+
+        # Best objective values in the front and the reference point.
+        self._ideal = None
+        self._reference = None
+
+    def _get_nondominated(self, points):
+        """
+        Filter a NumPy array of `points` so that only the points that are not
+        weakly dominated by another point remain. Only one point of a group of
+        duplicate points is kept.
+        """
+
+        # Determine for each pair of points whether the first is weakly
+        # dominated by the second.
+        weak = np.all(points[:, np.newaxis, :] >= points[np.newaxis, :, :],
+                      axis=2)
+        # Keep the first of equal points.
+        equal = weak & weak.T
+        dominated = (weak & ~equal) | np.tril(equal, k=-1)
+
+        return points[~np.any(dominated, axis=1)]
+
+    def _get_hypervolume(self, points, reference):
+        """
+        Calculate the hypervolume of a NumPy array of mutually nondominated
+        `points` with respect to the `reference` point.
+        """
+
+        if points.shape[0] == 0:
+            return 0.0
+        if points.shape[0] == 1:
+            return np.prod(reference - points[0])
+
+        if points.shape[1] == 2:
+            # Calculate the area in the two-dimensional case by sweeping over
+            # the points sorted on the first objective.
+            points = points[np.argsort(points[:, 0])]
+            widths = np.diff(np.append(points[:, 0], reference[0]))
+            return np.sum(widths * (reference[1] - points[:, 1]))
+
+        # Sum the exclusive hypervolumes of each point with respect to the
+        # points after it, sorted on the last objective, as in WFG.
+        points = points[np.argsort(points[:, -1])]
+        return sum(
+            self._get_exclusive_hypervolume(point, points[i+1:], reference)
+            for i, point in enumerate(points)
+        )
+
+    def _get_exclusive_hypervolume(self, point, others, reference):
+        """
+        Calculate the hypervolume that is dominated by a `point`, but not by
+        any of the points in the NumPy array `others`, with respect to the
+        `reference` point.
+        """
+
+        volume = np.prod(reference - point)
+        if others.shape[0] == 0:
+            return volume
+
+        limited = self._get_nondominated(others.clip(min=point))
+        return volume - self._get_hypervolume(limited, reference)
+
+    def _get_affected(self, points, point, dominators):
+        """
+        Determine which of the front `points` have an exclusive hypervolume
+        that changes when the given `point` enters or leaves the front.
+
+        The exclusive region of a front point changes if and only if the
+        corner where its dominated region meets that of `point` is not weakly
+        dominated by any other point. The `dominators` is a NumPy array of
+        these other points, where the first points are the same as `points`
+        and are therefore not considered for their own corner.
+
+        Returns a boolean NumPy array indicating which points are affected.
+        """
+
+        corners = points.clip(min=point)
+        weak = np.all(dominators[np.newaxis, :, :] <= corners[:, np.newaxis, :],
+                      axis=2)
+        weak[np.arange(len(points)), np.arange(len(points))] = False
+
+        return ~np.any(weak, axis=1)
+
+    def _update_contributions(self, affected):
+        """
+        Recalculate the contributions of the front individuals.
+
+        If the best objective values or the reference point of the front has
+        changed, then all contributions are recalculated. Otherwise, only the
+        individuals indicated by the boolean NumPy array `affected` are.
+        """
+
+        points = self._front_points
+        if points.shape[0] == 0:
+            return
+
+        ideal = np.min(points, axis=0)
+        nadir = np.max(points, axis=0)
+        span = nadir - ideal
+        span[span == 0] = 1.0
+        reference = nadir + 0.1 * span
+
+        if not np.array_equal(ideal, self._ideal) or \
+           not np.array_equal(reference, self._reference):
+            self._ideal = ideal
+            self._reference = reference
+            affected = np.ones(len(points), dtype=bool)
+
+        for i in np.nonzero(affected)[0]:
+            if np.any(points[i] == ideal):
+                value = np.inf
+            else:
+                others = np.delete(points, i, axis=0)
+                value = self._get_exclusive_hypervolume(points[i], others,
+                                                        reference)
+
+            self._set_contribution(self._front_keys[i], value)
+
+    def get_front(self):
+        order = np.argsort(self._front_points[:, 0], kind='mergesort')
+        return [self._front_keys[i] for i in order]
+
+    def _add_front(self, key, objectives):
+        point = np.array(objectives, dtype=np.float)
+        front = self._front_points
+        if np.any(np.all(front <= point, axis=1)):
+            self._add_key(self._dominated, key)
+            return
+
+        # Move the individuals that the new individual dominates out of the
+        # front.
+        dominated = np.all(point <= front, axis=1)
+        kept = ~dominated
+        for i in np.nonzero(dominated)[0]:
+            dominated_key = self._front_keys[i]
+            del self._contributions[dominated_key]
+            self._add_key(self._dominated, dominated_key)
+
+        # The dominated individuals have no effect on the changed exclusive
+        # regions, since the new individual dominates their regions.
+        kept_points = front[kept]
+        affected = self._get_affected(kept_points, point,
+                                      np.vstack([kept_points, front[dominated]]))
+
+        self._front_keys = [
+            front_key for front_key, keep in zip(self._front_keys, kept) if keep
+        ]
+        self._front_keys.append(key)
+        self._front_points = np.vstack([kept_points, point])
+        self._update_contributions(np.append(affected, True))
+
+    def _remove_front(self, key):
+        position = self._front_keys.index(key)
+        point = self._front_points[position]
+
+        del self._front_keys[position]
+        del self._contributions[key]
+        self._front_points = np.delete(self._front_points, position, axis=0)
+
+        affected = self._get_affected(self._front_points, point,
+                                      self._front_points)
+        self._update_contributions(affected)
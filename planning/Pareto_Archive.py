@@ -0,0 +1,257 @@
+# Core imports
+import bisect
+import heapq
+
+# Library imports
+import numpy as np
+
+class Pareto_Archive(object):
+    """
+    Incremental archive of individuals with two objective values.
+
+    The archive keeps track of which individuals are infeasible, which ones are
+    dominated and which ones are in the nondominated front. The front is kept
+    sorted on the first objective value, which means that the second objective
+    values are sorted in descending order. Inserting or removing an individual
+    thus only requires a binary search and updates for its neighbors instead
+    of sorting the entire population again.
+
+    The contributions of the individuals in the front are cached in a heap with
+    lazy deletion, such that the individual with the smallest contribution can
+    be found quickly.
+    """
+
+    def __init__(self, contribution):
+        """
+        Initialize the archive.
+
+        The `contribution` is a callable that determines the contribution of an
+        individual in the front. It receives three arguments: the objective
+        values of the individual in the front before the current individual,
+        of the current individual itself and of the individual after it. The
+        first or last argument is `None` if the current individual is at the
+        start or the end of the front, respectively. The callable returns
+        a number indicating how useful it is to keep the current individual.
+        """
+
+        self._contribution = contribution
+
+        # Number of objective values that the individuals must have.
+        self._dimension = 2
+
+        # Objective values of all the individuals, indexed by key.
+        self._objectives = {}
+
+        # Keys of the individuals in the front and their first objective
+        # values, both sorted on those values.
+        self._front_keys = []
+        self._front_values = []
+
+        # Contributions of individuals in the front and a heap containing
+        # tuples of contributions and keys, possibly with outdated entries.
+        self._contributions = {}
+        self._heap = []
+
+        # Lists of keys of individuals that are dominated or infeasible, with
+        # dictionaries of the positions of those keys in the lists.
+        self._dominated = ([], {})
+        self._infeasible = ([], {})
+
+    def _add_key(self, keys, key):
+        """
+        Add a `key` to a tuple `keys` of a list and position dictionary.
+        """
+
+        keys[1][key] = len(keys[0])
+        keys[0].append(key)
+
+    def _remove_key(self, keys, key):
+        """
+        Remove a `key` from a tuple `keys` of a list and position dictionary.
+
+        The last key in the list is moved to the position of the removed key.
+        Returns whether the key was in the list.
+        """
+
+        if key not in keys[1]:
+            return False
+
+        position = keys[1].pop(key)
+        last = keys[0].pop()
+        if last != key:
+            keys[0][position] = last
+            keys[1][last] = position
+
+        return True
+
+    def _update_contribution(self, position):
+        """
+        Recalculate the contribution of the individual at the given `position`
+        in the front, if there is such an individual.
+        """
+
+        if position < 0 or position >= len(self._front_keys):
+            return
+
+        neighbors = []
+        for neighbor in (position - 1, position + 1):
+            if 0 <= neighbor < len(self._front_keys):
+                neighbors.append(self._objectives[self._front_keys[neighbor]])
+            else:
+                neighbors.append(None)
+
+        key = self._front_keys[position]
+        value = self._contribution(neighbors[0], self._objectives[key],
+                                   neighbors[1])
+        self._set_contribution(key, value)
+
+    def _set_contribution(self, key, value):
+        """
+        Change the contribution of the individual in the front with the given
+        `key` to the new `value`.
+        """
+
+        self._contributions[key] = value
+        heapq.heappush(self._heap, (value, key))
+
+        # Rebuild the heap when it contains too many outdated entries.
+        if len(self._heap) > 2 * len(self._contributions) + 16:
+            self._heap = [
+                (contribution, front_key)
+                for front_key, contribution in self._contributions.iteritems()
+            ]
+            heapq.heapify(self._heap)
+
+    def add(self, key, objectives, feasible=True):
+        """
+        Add an individual to the archive.
+
+        The `key` is a unique hashable identifier for the individual and
+        `objectives` is a sequence of its objective values. If `feasible`
+        is `False`, then the individual is kept apart from the other ones.
+
+        Individuals in the front that are dominated by the new individual are
+        moved to the dominated individuals.
+        """
+
+        if len(objectives) != self._dimension:
+            raise ValueError("Only {} objective values are supported".format(
+                self._dimension
+            ))
+
+        self._objectives[key] = objectives
+        if feasible:
+            self._add_front(key, objectives)
+        else:
+            self._add_key(self._infeasible, key)
+
+    def _add_front(self, key, objectives):
+        """
+        Add a feasible individual with the given `key` and `objectives` to the
+        front, or to the dominated individuals if it is dominated.
+        """
+
+        x, y = objectives
+        position = bisect.bisect_left(self._front_values, x)
+
+        # Check whether the individual is (weakly) dominated by the individual
+        # before it or an individual with the same first objective value.
+        for neighbor in (position - 1, position):
+            if 0 <= neighbor < len(self._front_keys):
+                other = self._objectives[self._front_keys[neighbor]]
+                if other[0] <= x and other[1] <= y:
+                    self._add_key(self._dominated, key)
+                    return
+
+        # Move the individuals that the new individual dominates out of the
+        # front. These are located directly after the insertion position.
+        end = position
+        while end < len(self._front_keys) and \
+                self._objectives[self._front_keys[end]][1] >= y:
+            dominated_key = self._front_keys[end]
+            del self._contributions[dominated_key]
+            self._add_key(self._dominated, dominated_key)
+            end += 1
+
+        self._front_keys[position:end] = [key]
+        self._front_values[position:end] = [x]
+
+        for neighbor in (position - 1, position, position + 1):
+            self._update_contribution(neighbor)
+
+    def remove(self, key):
+        """
+        Remove the individual with the given `key` from the archive.
+
+        If the individual is in the front, then its neighbors are updated, and
+        any dominated individuals that may become nondominated are reinserted.
+        """
+
+        if self._remove_key(self._infeasible, key) or \
+           self._remove_key(self._dominated, key):
+            del self._objectives[key]
+            return
+
+        self._remove_front(key)
+        del self._objectives[key]
+
+        if self._dominated[0]:
+            dominated = self._dominated[0]
+            self._dominated = ([], {})
+            for dominated_key in dominated:
+                self.add(dominated_key, self._objectives[dominated_key])
+
+    def _remove_front(self, key):
+        """
+        Remove the individual with the given `key` from the front and update
+        the contributions of its neighbors.
+        """
+
+        objectives = self._objectives[key]
+        position = bisect.bisect_left(self._front_values, objectives[0])
+        del self._front_keys[position]
+        del self._front_values[position]
+        del self._contributions[key]
+
+        for neighbor in (position - 1, position):
+            self._update_contribution(neighbor)
+
+    def get_front(self):
+        """
+        Retrieve the keys of the individuals in the nondominated front, sorted
+        on their first objective value.
+        """
+
+        return list(self._front_keys)
+
+    def get_worst(self):
+        """
+        Select the individual that is the least useful to keep.
+
+        If there are infeasible individuals, then one of them is selected at
+        random. Otherwise, if there are dominated individuals, then one of them
+        is randomly selected. If neither exist, then the individual in the
+        front with the smallest contribution is selected.
+
+        Returns the key of the individual and a string describing the reason of
+        the selection, which is one of "infeasible", "dominated" or
+        "contribution". If the archive is empty, then `None` is returned.
+        """
+
+        for keys, reason in ((self._infeasible, "infeasible"),
+                             (self._dominated, "dominated")):
+            if keys[0]:
+                # We use numpy.random.randint to select key instead of
+                # numpy.random.choice because of compatibility with older
+                # Numpy.
+                return keys[0][np.random.randint(len(keys[0]))], reason
+
+        # Discard outdated entries from the heap.
+        while self._heap:
+            value, key = self._heap[0]
+            if self._contributions.get(key) == value:
+                return key, "contribution"
+
+            heapq.heappop(self._heap)
+
+        return None
@@ -3,6 +3,7 @@ import math
 import numpy as np
 
 from Greedy_Assignment import Greedy_Assignment
+from ..core.Cache import Cache
 from ..geometry.Geometry_Grid import Geometry_Grid
 from ..reconstruction.Weight_Matrix import Weight_Matrix
 from ..settings import Arguments
@@ -84,7 +85,7 @@ class Problem(object):
 
         return v
 
-    def evaluate(self, points):
+    def evaluate(self, points, feasible=None):
         """
         Evaluate a list of vectors containing variable values.
 
@@ -92,12 +93,19 @@ class Problem(object):
         according to all of the problem constraints, and calculates the
         objective function values for them. These two evaluations are returned,
         each as a list of evaluations for every vector.
+
+        If `feasible` is given, then it is a list of feasibility values of the
+        points, which are passed to `evaluate_point`.
         """
 
+        if feasible is None:
+            feasible = [None for _ in points]
+
         Feasible = [True for _ in points]
         Objectives = [[] for _ in points]
         for idx, x in enumerate(points):
-            Feasible[idx], Objectives[idx] = self.evaluate_point(x)
+            Feasible[idx], Objectives[idx] = self.evaluate_point(x,
+                                                                 feasible[idx])
 
         return Feasible, Objectives
 
@@ -286,6 +294,13 @@ class Reconstruction_Plan(Problem):
         self.network_size = self.settings.get("network_size")
         self.padding = self.settings.get("network_padding")
 
+        # Whether to use the pixel weight variance as a third objective.
+        self.variance_objective = self.settings.get("variance_objective")
+
+        # Maximum number of individuals whose weight matrix rows are
+        # calculated at once.
+        self.evaluation_chunk_size = self.settings.get("evaluation_chunk_size")
+
         num_variables, domain = self.get_domain()
         super(Reconstruction_Plan, self).__init__(num_variables, domain)
 
@@ -294,6 +309,14 @@ class Reconstruction_Plan(Problem):
         self.network_height = self.network_size[1] - self.padding[1]*2
         self.size = [self.network_width, self.network_height]
 
+        # Caches of pixel distances for sensor positions and rows of links, 
+        # which are shared by all the weight matrices that the problem creates.
+        cache_size = reconstruction_settings.get("distance_cache_size")
+        self.distance_cache = Cache(cache_size)
+        cache_size = reconstruction_settings.get("link_cache_size")
+        eviction = reconstruction_settings.get("link_cache_eviction")
+        self.link_cache = Cache(cache_size, eviction=eviction)
+
         # Initial weight matrix object which can be filled with current 
         # locations during evaluations and reset to be reused.
         self.weight_matrix = self.get_weight_matrix()
@@ -328,10 +351,15 @@ class Reconstruction_Plan(Problem):
     def get_weight_matrix(self):
         """
         Create a clean weight matrix for the problem's parameters.
+
+        The weight matrix shares the caches of pixel distances and link rows
+        with the other weight matrices of the problem.
         """
 
         return Weight_Matrix(self.arguments, self.padding, self.size,
-                             snap_inside=True, number_of_links=self.N)
+                             snap_inside=True, number_of_links=self.N,
+                             distance_cache=self.distance_cache,
+                             link_cache=self.link_cache)
 
     def format_steps(self, steps):
         # Convert a list of step sizes that has the same number of elements as 
@@ -387,6 +415,67 @@ class Reconstruction_Plan(Problem):
 
         return np.array(positions), unsnappable
 
+    def generate_batch_positions(self, points):
+        """
+        Generate the pairs of positions for all the measurements of multiple
+        individuals at once.
+
+        The `points` is a two-dimensional NumPy array with one individual in
+        final form, as provided by `format_point`, in each row. The result is
+        a NumPy array with four dimensions, the first grouping individuals and
+        the other three being the same as those of the array from
+        `get_positions`, but including the unsnapped position pairs of every
+        measurement.
+
+        Subclasses may override this method with an implementation that uses
+        NumPy operations on all the individuals in one go.
+        """
+
+        return np.array([
+            [self.generate_positions(point, i) for i in range(self.N)]
+            for point in points
+        ], dtype=np.float)
+
+    def select_batch_positions(self, sensor_points, snapped_points):
+        """
+        Select the positions for multiple measurements at once, given the
+        NumPy arrays `sensor_points` of generated position pairs and their
+        respective `snapped_points` from the weight matrix.
+
+        This is the batch version of `select_positions`. The returned array
+        contains the final positions for the sensors, but does not take into
+        account which links were unsnappable.
+        """
+
+        return snapped_points
+
+    def get_batch_positions(self, points):
+        """
+        Generate and snap the pairs of positions for multiple individuals.
+
+        The `points` is a two-dimensional NumPy array with one individual in
+        final form in each row.
+
+        The result is a tuple of three NumPy arrays. The first has four
+        dimensions, grouped by individual, measurement, position and coordinate,
+        and contains the final selected positions. The second array has the
+        same form and contains the snapped positions that belong to the links
+        in the weight matrix. The final array is a two-dimensional boolean
+        array that indicates which measurements of the individuals are valid,
+        i.e., they could be snapped to the network.
+        """
+
+        sensor_points = self.generate_batch_positions(points)
+        links = sensor_points.reshape(-1, 2, 2)
+        snapped, valid = self.weight_matrix.snap_links(links[:, 0, :],
+                                                       links[:, 1, :])
+
+        shape = sensor_points.shape
+        snapped = snapped.reshape(shape)
+        selected = self.select_batch_positions(sensor_points, snapped)
+
+        return selected, snapped, valid.reshape(shape[:2])
+
     def select_positions(self, sensor_points, weight_matrix):
         """
         Select the positions for the given `sensor_points` using the weight
@@ -401,43 +490,119 @@ class Reconstruction_Plan(Problem):
         snapped_points = weight_matrix.update(*sensor_points)
         return snapped_points
 
-    def evaluate_point(self, point, feasible=None):
-        self.weight_matrix.reset()
-        positions, unsnappable = self.get_positions(point, self.weight_matrix)
-
-        # Set up variables used by the constraint and objective functions.
-        if positions.size > 0:
-            # Generate distances between all the pairs of sensor positions.
-            pair_diffs = positions[:, 0, :] - positions[:, 1, :]
-            self.sensor_distances = np.linalg.norm(pair_diffs, axis=1)
-        else:
-            self.sensor_distances = np.empty(0)
+    def evaluate(self, points, feasible=None):
+        """
+        Evaluate a list of vectors containing variable values.
 
-        self.unsnappable = unsnappable
+        This performs the same evaluation as `Problem.evaluate`, but generates
+        and snaps the positions of the individuals and calculates the weight
+        matrix rows for their links at once using NumPy operations, instead
+        of updating the weight matrix for each individual and link separately.
+        The individuals are evaluated in chunks of at most the evaluation chunk
+        size, so that the memory used for the weight matrix rows does not
+        depend on the size of the population.
 
-        # Check whether the point is feasible before performing more 
-        # calculations that are only used for objective functions.
-        if feasible is None:
-            point = self.format_point(point)
-            feasible = self.is_feasible(point)
-
-        if feasible:
-            self.matrix = self.weight_matrix.output()
-
-            # If the sensor distances to waypoint distances ratio is 1, then 
-            # there is no need to calculate the waypoint distance.
-            if self.delta_rate < 1.0:
-                distance = self.assigner.assign(positions)[1]
-                self.travel_distance = float(distance)
-                if self.travel_distance == np.inf:
-                    feasible = False
+        If `feasible` is given, then it is a list of feasibility values of the
+        points which are used instead of checking the constraints, like in
+        `evaluate_point`.
+        """
+
+        Feasible = []
+        Objectives = []
+
+        for start in xrange(0, len(points), self.evaluation_chunk_size):
+            end = start + self.evaluation_chunk_size
+            chunk_feasible = None if feasible is None else feasible[start:end]
+            chunk = self._evaluate_chunk(points[start:end], chunk_feasible)
+            Feasible.extend(chunk[0])
+            Objectives.extend(chunk[1])
+
+        return Feasible, Objectives
+
+    def _evaluate_chunk(self, points, feasible=None):
+        """
+        Evaluate a chunk of `points` with the batched evaluation of `evaluate`,
+        with `feasible` being a list of feasibility values of the points or
+        `None`.
+
+        Returns the feasibility values and the objective values of the points.
+        """
+
+        Feasible = [True for _ in points]
+        Objectives = [[] for _ in points]
+
+        points = np.array([self.format_point(point) for point in points])
+        selected, snapped, valid = self.get_batch_positions(points)
+
+        links = snapped[valid]
+        rows = np.zeros(valid.shape + (self.network_width * self.network_height,))
+        if links.size > 0:
+            rows[valid] = self.weight_matrix.get_link_rows(links[:, 0, :],
+                                                           links[:, 1, :])
+
+        pair_diffs = selected[:, :, 0, :] - selected[:, :, 1, :]
+        distances = np.linalg.norm(pair_diffs, axis=2)
+        unsnappable = self.N - np.sum(valid, axis=1)
+
+        for idx, point in enumerate(points):
+            self.matrix = rows[idx][valid[idx]]
+            self.sensor_distances = distances[idx][valid[idx]]
+            self.unsnappable = unsnappable[idx]
+
+            # Check whether the point is feasible before performing more 
+            # calculations that are only used for objective functions.
+            if feasible is None:
+                is_feasible = self.is_feasible(point)
             else:
-                self.travel_distance = 0.0
+                is_feasible = feasible[idx]
+
+            if is_feasible:
+                positions = selected[idx][valid[idx]]
+                is_feasible = self._calculate_travel_distance(positions)
+
+            Feasible[idx], Objectives[idx] = \
+                super(Reconstruction_Plan, self).evaluate_point(point,
+                                                                is_feasible)
+
+        return Feasible, Objectives
+
+    def _calculate_travel_distance(self, positions):
+        """
+        Calculate the travel distance of the vehicles for visiting the given
+        selected `positions` of a feasible individual.
+
+        Returns whether the individual remains feasible, which is not the case
+        when the positions cannot be assigned to the vehicles.
+        """
+
+        # If the sensor distances to waypoint distances ratio is 1, then there 
+        # is no need to calculate the waypoint distance.
+        if self.delta_rate < 1.0:
+            distance = self.assigner.assign(positions)[1]
+            self.travel_distance = float(distance)
+            if self.travel_distance == np.inf:
+                return False
+        else:
+            self.travel_distance = 0.0
+
+        return True
+
+    def evaluate_point(self, point, feasible=None):
+        """
+        Evaluate a single individual `point`.
+
+        This uses the batched evaluation of `evaluate`, such that the results
+        are the same as when the point is evaluated as part of a population.
+        """
 
-        return super(Reconstruction_Plan, self).evaluate_point(point, feasible)
+        if feasible is not None:
+            feasible = [feasible]
+
+        Feasible, Objectives = self.evaluate([point], feasible=feasible)
+        return Feasible[0], Objectives[0]
 
     def get_objectives(self):
-        return [
+        objectives = [
             # Matrix should have many columns (pixels) that have multiple links 
             # (measurements) intersecting that pixel.
             lambda x: -np.sum(np.sum(self.matrix > 0, axis=0)),
@@ -446,13 +611,22 @@ class Reconstruction_Plan(Problem):
             # the reconstruction.
             lambda x: self.delta_rate * self.sensor_distances.sum() + \
                       (1 - self.delta_rate) * self.travel_distance
-            # Matrix should have values that are similar to each other in the 
-            # columns, so that pixels are evenly measured by links
-            #lambda x: np.var(self.matrix, axis=0).mean()
         ]
+        if self.variance_objective:
+            objectives.extend([
+                # Matrix should have values that are similar to each other in 
+                # the columns, so that pixels are evenly measured by links
+                lambda x: np.var(self.matrix, axis=0).mean()
+            ])
+
+        return objectives
 
     def get_objective_names(self):
-        return ["intersections", "distances"]
+        names = ["intersections", "distances"]
+        if self.variance_objective:
+            names.append("variance")
+
+        return names
 
     def get_constraints(self):
         constraints = super(Reconstruction_Plan, self).get_constraints()
@@ -462,7 +636,7 @@ class Reconstruction_Plan(Problem):
             # This is mostly a baseline to push the evolutionary algorithm in 
             # the right direction, since we also have an objective to make them 
             # intersect more often.
-            lambda x: self.weight_matrix.check(),
+            lambda x: np.all(self.matrix.any(axis=0)),
             # Variables should not be in such a way that a pair of positions do 
             # not intersect with the network. At least it should not happen too 
             # often, otherwise the mission is useless. It can be useful to 
@@ -528,6 +702,34 @@ class Reconstruction_Plan_Continuous(Reconstruction_Plan):
         b = offset / math.sin(beta)
         return [[0, b], [self.network_size[0], a*self.network_size[0]+b]]
 
+    def generate_batch_positions(self, points):
+        offsets = points[:, :self.N]
+        angles = points[:, self.N:2*self.N]
+        cardinals = points[:, 2*self.N:] != 0
+
+        vertical = (angles == math.pi/2) | (
+            cardinals & self.geometry.check_angle(angles, math.pi/2, math.pi/8)
+        )
+        horizontal = cardinals & self.geometry.check_angle(angles, 0.0,
+                                                           math.pi/8)
+
+        # Calculate the line functions y = ax + b for all the lines, and 
+        # replace those that are straight upward afterward.
+        betas = np.where(angles < math.pi/2, math.pi/2 - angles,
+                         angles - math.pi/2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = np.where(horizontal, 0.0, np.tan(angles))
+            b = offsets / np.sin(betas)
+
+        width, height = self.network_size
+        positions = np.empty(points.shape[:1] + (self.N, 2, 2))
+        positions[:, :, 0, 0] = np.where(vertical, offsets, 0)
+        positions[:, :, 0, 1] = np.where(vertical, 0, b)
+        positions[:, :, 1, 0] = np.where(vertical, offsets, width)
+        positions[:, :, 1, 1] = np.where(vertical, height, a*width + b)
+
+        return positions
+
 class Reconstruction_Plan_Discrete(Reconstruction_Plan):
     def __init__(self, arguments, import_manager):
         super(Reconstruction_Plan_Discrete, self).__init__(arguments,
@@ -601,6 +803,19 @@ class Reconstruction_Plan_Discrete(Reconstruction_Plan):
             [int(point[index+2*self.N]), int(point[index+3*self.N])]
         ]
 
+    def generate_batch_positions(self, points):
+        positions = points.reshape(points.shape[0], 2, 2, self.N)
+        return np.trunc(positions).transpose(0, 3, 1, 2)
+
+    def select_batch_positions(self, sensor_points, snapped_points):
+        # Keep valid unsnapped points and round the other snapped points to 
+        # grid positions like in `select_positions`. The rounding is done half 
+        # away from zero to match the rounding of the single points.
+        valid = self.weight_matrix.is_valid_points(sensor_points)
+        rounded = np.sign(snapped_points) * \
+                  np.floor(np.absolute(snapped_points) + 0.5)
+        return np.where(valid[..., np.newaxis], sensor_points, rounded)
+
     def select_positions(self, sensor_points, weight_matrix):
         # Check whether the points are acceptable for the weight matrix, 
         # otherwise we discard the points.
@@ -1,10 +1,15 @@
-import Queue
+import numpy as np
+from ..core.Ring_Buffer import Ring_Buffer
 from ..zigbee.Packet import Packet
 
 class Buffer(object):
-    def __init__(self, settings=None):
+    def __init__(self, settings=None, size=1000):
         """
         Initialize the buffer object.
+
+        The buffer holds at most `size` packets. When it is full, the oldest
+        packets are dropped, so that a slow consumer never holds up the
+        producer, such as the RF sensor thread.
         """
 
         if settings is None:
@@ -14,7 +19,7 @@ class Buffer(object):
         self._origin = (0, 0)
         self._size = (0, 0)
 
-        self._queue = Queue.Queue()
+        self._queue = Ring_Buffer(size)
         self._calibration = {}
 
     def get(self):
@@ -22,11 +27,36 @@ class Buffer(object):
         Get a packet from the buffer (or None if the queue is empty).
         """
 
-        if self._queue.empty():
-            return None
-
         return self._queue.get()
 
+    def get_packets(self, count):
+        """
+        Get at most `count` packets from the buffer at once.
+
+        The return value is a list of tuples of the original packet and the
+        calibrated RSSI value, like those returned by the `get` method of the
+        buffers for the reconstruction sources. The calibrated RSSI value is
+        NaN if the link of the packet is not in the calibration file.
+        """
+
+        return [
+            (packet, self._get_calibrated_rssi(packet))
+            for packet in self._queue.get_many(count)
+        ]
+
+    def _get_calibrated_rssi(self, packet):
+        """
+        Calibrate the RSSI value of a `Packet` object `packet` using the
+        calibration value of its link, or return NaN if the link is not in the
+        calibration file.
+        """
+
+        source = (packet.get("from_latitude"), packet.get("from_longitude"))
+        destination = (packet.get("to_latitude"), packet.get("to_longitude"))
+        link = (source, destination)
+
+        return packet.get("rssi") - self._calibration.get(link, np.nan)
+
     def put(self, packet):
         """
         Put a packet into the buffer.
@@ -37,12 +67,23 @@ class Buffer(object):
 
         self._queue.put(packet)
 
+    def put_many(self, packets):
+        """
+        Put a list of packets into the buffer at once.
+        """
+
+        for packet in packets:
+            if not isinstance(packet, Packet):
+                raise ValueError("The provided packet is not a `Packet` object.")
+
+        self._queue.put_many(packets)
+
     def count(self):
         """
         Count the number of packets in the buffer.
         """
 
-        return self._queue.qsize()
+        return len(self._queue)
 
     @property
     def number_of_sensors(self):
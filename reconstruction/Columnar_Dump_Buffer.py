@@ -0,0 +1,335 @@
+# Core imports
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zipfile
+
+# Library imports
+import numpy as np
+
+# Package imports
+from Buffer import Buffer
+from ..zigbee.Compact_Packet import Compact_Packet
+
+class Columnar_Dump_Buffer(Buffer):
+    # The columns of a columnar dump, which correspond to the fields in the
+    # RSSI ground station packet (in order), and their data types.
+    COLUMNS = [
+        ("sensor_id", np.int32),
+        ("from_latitude", np.float64),
+        ("from_longitude", np.float64),
+        ("from_valid", np.bool_),
+        ("to_latitude", np.float64),
+        ("to_longitude", np.float64),
+        ("to_valid", np.bool_),
+        ("rssi", np.float64)
+    ]
+
+    # The local file header of a member of a ZIP archive, as described in
+    # section 4.3.7 of the .ZIP file format specification: the signature, the
+    # versions, flags, compression method, modification time and date, CRC-32
+    # checksum, compressed and uncompressed sizes, and the lengths of the file
+    # name and extra field that follow the header.
+    LOCAL_FILE_HEADER = struct.Struct("<4s5H3L2H")
+    LOCAL_FILE_HEADER_SIGNATURE = "PK\x03\x04"
+
+    def __init__(self, settings=None):
+        """
+        Initialize the columnar dump buffer object.
+
+        The buffer reads dumps in a columnar format, which is an uncompressed
+        NumPy `.npz` file containing an array for each column of the dump as
+        well as the `number_of_sensors`, `origin` and `size` of the network.
+        The column arrays are memory-mapped, so that even large dumps are
+        loaded without reading them completely. JSON dumps are converted to
+        the columnar format when they are first loaded, and the columnar dump
+        is stored in the cache directory from the "columnar_dump_cache"
+        setting. Without a cache directory, JSON dumps are converted in memory.
+        """
+
+        super(Columnar_Dump_Buffer, self).__init__(settings)
+
+        self._packet_class = Compact_Packet.get_class("rssi_ground_station")
+
+        # Relative cache directories are within the package directory.
+        cache_directory = settings.get("columnar_dump_cache")
+        if cache_directory:
+            package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_directory = os.path.join(package_directory, cache_directory)
+
+        # Read the data from the empty network (for calibration). Only the
+        # first measurement of each link with valid locations is used.
+        data = self.load(settings.get("columnar_dump_calibration_file"),
+                         cache_directory)
+        links = self._get_links(data)
+        valid = data["from_valid"] & data["to_valid"]
+        links, first = np.unique(links[valid], axis=0, return_index=True)
+
+        self._calibration_links = links
+        self._calibration_rssi = np.asarray(data["rssi"][valid][first])
+        self._calibration = dict(zip(
+            [((link[0], link[1]), (link[2], link[3])) for link in links.tolist()],
+            self._calibration_rssi.tolist()
+        ))
+
+        # Read the provided dump file.
+        self._data = self.load(settings.get("columnar_dump_file"),
+                               cache_directory)
+        self._number_of_sensors = int(self._data["number_of_sensors"])
+        self._origin = tuple(self._data["origin"].tolist())
+        self._size = tuple(self._data["size"].tolist())
+
+        self._index = 0
+        self._length = len(self._data["rssi"])
+
+    @classmethod
+    def load(cls, filename, cache_directory=None):
+        """
+        Load a dump from the file with the given `filename`.
+
+        If the file is a JSON dump, then it is converted to the columnar format.
+        If a `cache_directory` is given, then the converted dump is stored there
+        and loaded like a columnar dump, unless it is older than the JSON dump.
+        Otherwise, the dump is converted in memory. Columnar dumps have their
+        uncompressed arrays memory-mapped. Returns a dictionary of NumPy arrays.
+        """
+
+        if filename.endswith(".json"):
+            if not cache_directory:
+                return cls.convert(filename)
+
+            npz_filename = cls.get_cache_filename(filename, cache_directory)
+            if not os.path.exists(npz_filename) or \
+               os.path.getmtime(npz_filename) < os.path.getmtime(filename):
+                cls._save_cache(filename, npz_filename)
+
+            filename = npz_filename
+
+        data = {}
+        with zipfile.ZipFile(filename, "r") as archive:
+            members = archive.infolist()
+
+        with np.load(filename) as npz:
+            for info in members:
+                name = info.filename[:-len(".npy")]
+                if info.compress_type == zipfile.ZIP_STORED:
+                    data[name] = cls._map_member(filename, info)
+                else:
+                    data[name] = npz[name]
+
+        return data
+
+    @classmethod
+    def get_cache_filename(cls, json_filename, cache_directory):
+        """
+        Retrieve the path to the columnar dump in the `cache_directory` that is
+        converted from the JSON dump with the given `json_filename`.
+        """
+
+        name = hashlib.sha1(os.path.abspath(json_filename)).hexdigest()
+        return os.path.join(cache_directory, "{}.npz".format(name))
+
+    @classmethod
+    def _save_cache(cls, json_filename, npz_filename):
+        """
+        Convert the JSON dump with the given `json_filename` and store the
+        columnar dump in the cache file `npz_filename`.
+        """
+
+        cache_directory = os.path.dirname(npz_filename)
+        if not os.path.exists(cache_directory):
+            os.makedirs(cache_directory)
+
+        # Write to a temporary file first, so that other processes never
+        # read an incomplete cache file.
+        handle, path = tempfile.mkstemp(dir=cache_directory)
+        with os.fdopen(handle, "wb") as npz_file:
+            cls.convert(json_filename, npz_file)
+
+        os.rename(path, npz_filename)
+
+    @classmethod
+    def _map_member(cls, filename, info):
+        """
+        Memory-map the array of an uncompressed member of an `.npz` file with
+        the given `filename`, described by the `ZipInfo` object `info`.
+        """
+
+        with open(filename, "rb") as npz_file:
+            # Skip the local file header of the member, which is followed by
+            # the file name and the extra field. These may differ from those
+            # in the central directory, so use the lengths from the header.
+            npz_file.seek(info.header_offset)
+            header = npz_file.read(cls.LOCAL_FILE_HEADER.size)
+            member = "Member '{}' of '{}'".format(info.filename, filename)
+            if len(header) != cls.LOCAL_FILE_HEADER.size:
+                raise ValueError("{} is truncated".format(member))
+
+            fields = cls.LOCAL_FILE_HEADER.unpack(header)
+            if fields[0] != cls.LOCAL_FILE_HEADER_SIGNATURE:
+                raise ValueError("{} has no valid local file header".format(member))
+            if fields[3] != zipfile.ZIP_STORED:
+                raise ValueError("{} is compressed and cannot be memory-mapped".format(member))
+
+            name_length, extra_length = fields[-2:]
+            npz_file.seek(name_length + extra_length, 1)
+
+            # Read the header of the array using the reader for its version.
+            version = np.lib.format.read_magic(npz_file)
+            read_header = getattr(np.lib.format,
+                                  "read_array_header_{}_{}".format(*version))
+            shape, fortran_order, dtype = read_header(npz_file)
+            offset = npz_file.tell()
+
+        # Arrays without elements cannot be memory-mapped.
+        if np.prod(shape) == 0:
+            return np.empty(shape, dtype=dtype)
+
+        order = "F" if fortran_order else "C"
+        return np.memmap(filename, dtype=dtype, mode="r", offset=offset,
+                         shape=shape, order=order)
+
+    @classmethod
+    def convert(cls, json_filename, npz_filename=None):
+        """
+        Convert a JSON dump with the given `json_filename` to the columnar
+        format. If `npz_filename` is given, then the columnar dump is written
+        to that file, which may also be a file object. Returns a dictionary
+        of NumPy arrays.
+        """
+
+        # The JSON file has the following structure:
+        #
+        # - number_of_sensors: number of sensors in the network (excluding ground station)
+        # - origin: a list containing the coordinates of the network's origin
+        # - size: a list containing the width and height of the network
+        # - packets: a list containing one list per packet, where each packet list
+        #            contains the data from the packet specification
+        #            "rssi_ground_station" (in order)
+        with open(json_filename, "r") as json_file:
+            dump = json.load(json_file)
+
+        packets = dump["packets"]
+        data = {
+            "number_of_sensors": np.array(dump["number_of_sensors"]),
+            "origin": np.array(dump["origin"]),
+            "size": np.array(dump["size"])
+        }
+        for index, (name, dtype) in enumerate(cls.COLUMNS):
+            data[name] = np.array([packet[index] for packet in packets],
+                                  dtype=dtype)
+
+        if npz_filename is not None:
+            np.savez(npz_filename, **data)
+
+        return data
+
+    def _get_links(self, data, start=0, end=None):
+        """
+        Retrieve an array of the source and destination locations of the
+        packets between `start` and `end` in the columnar `data`.
+
+        Each row contains the latitude and longitude of the source location
+        followed by those of the destination location.
+        """
+
+        columns = ["from_latitude", "from_longitude", "to_latitude", "to_longitude"]
+        return np.column_stack([data[column][start:end] for column in columns])
+
+    def get(self):
+        """
+        Get a packet from the buffer (or None if the buffer is empty). We create
+        the `Packet` object from the columns on demand. The return value is a
+        tuple of the original packet and the calibrated RSSI value.
+        """
+
+        if self._index >= self._length:
+            return None
+
+        index = self._index
+        self._index += 1
+
+        packet = self._packet_class(*[
+            self._data[name][index].item() for name, _ in self.COLUMNS
+        ])
+
+        source = (packet.get("from_latitude"), packet.get("from_longitude"))
+        destination = (packet.get("to_latitude"), packet.get("to_longitude"))
+        rssi = packet.get("rssi")
+
+        link = (source, destination)
+        if link not in self._calibration:
+            raise KeyError("Link {} not in calibration file".format(link))
+
+        return (packet, rssi - self._calibration[link])
+
+    def get_many(self, count):
+        """
+        Get at most `count` packets from the buffer at once.
+
+        The return value is a tuple of NumPy arrays containing the source and
+        destination locations of the packets as `(x, y)` coordinate pairs and
+        the calibrated RSSI values. The x coordinate corresponds to the
+        longitude and the y coordinate corresponds to the latitude. The
+        calibrated RSSI value is NaN for packets with invalid locations or
+        links that are not in the calibration file.
+        """
+
+        start = self._index
+        end = min(start + count, self._length)
+        self._index = end
+
+        links = self._get_links(self._data, start, end)
+        sources = links[:, [1, 0]]
+        destinations = links[:, [3, 2]]
+
+        # Look up the calibration values of the links by finding the unique
+        # links among both the calibrated links and the requested links.
+        known = len(self._calibration_links)
+        unique, inverse = np.unique(np.vstack([self._calibration_links, links]),
+                                    axis=0, return_inverse=True)
+        calibration = np.full(len(unique), np.nan)
+        calibration[inverse[:known]] = self._calibration_rssi
+        calibration = calibration[inverse[known:]]
+
+        valid = self._data["from_valid"][start:end] & self._data["to_valid"][start:end]
+        calibration[~valid] = np.nan
+
+        return sources, destinations, self._data["rssi"][start:end] - calibration
+
+    def get_packets(self, count):
+        """
+        Get at most `count` packets from the buffer at once.
+
+        The return value is a list of tuples of the original packet and the
+        calibrated RSSI value, where the `Packet` objects are created from
+        slices of the columns and the calibrated RSSI values are determined by
+        `get_many`. They are therefore NaN for packets with invalid locations
+        or links that are not in the calibration file.
+        """
+
+        start = self._index
+        calibrated_rssi = self.get_many(count)[2]
+
+        columns = [
+            self._data[name][start:self._index].tolist() for name, _ in self.COLUMNS
+        ]
+        packets = [self._packet_class(*values) for values in zip(*columns)]
+        return zip(packets, calibrated_rssi.tolist())
+
+    def put(self, packet):
+        """
+        Put a packet into the buffer. This is not supported since the packets
+        are read from the dump file.
+        """
+
+        raise TypeError("Packets cannot be put into a columnar dump buffer")
+
+    def count(self):
+        """
+        Count the number of packets in the buffer.
+        """
+
+        return self._length - self._index
@@ -1,32 +1,84 @@
-import copy
+# Core imports
+from collections import OrderedDict
+import time
+
+# Library imports
+import numpy as np
+
+# Package imports
 from Weight_Matrix import Weight_Matrix
 
 class Coordinator(object):
-    def __init__(self, arguments, buffer):
+    def __init__(self, arguments, buffer, capacity=256):
         """
         Initialize the coordinator object.
 
         The coordinator maintains the weight matrix and the RSSI vector for the
-        reconstruction process.
+        reconstruction process. The weight matrix rows are kept in the storage
+        of a `Weight_Matrix` object, while the RSSI values and the time at
+        which each link was last measured are kept in NumPy arrays. Both
+        initially have room for `capacity` links. The links are indexed by
+        their endpoints in a dictionary.
+
+        If the "link_window" setting is not `0`, then links that have not been
+        measured in this number of most recent measurements are removed, which
+        bounds the size of the weight matrix. The last link then takes the
+        place of the removed link, and the callbacks registered with
+        `add_remove_callback` are called.
+        """
+
+        settings = arguments.get_settings("reconstruction")
+        self._window = settings.get("link_window")
+
+        if self._window > 0:
+            # At most one link is measured in each measurement of the window,
+            # and a new link is added before stale links are removed.
+            capacity = self._window + 1
+
+        self._weight_matrix = Weight_Matrix(arguments, buffer.origin,
+                                            buffer.size,
+                                            number_of_links=capacity)
+        self._rssi = np.empty(capacity)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+
+        # Dictionary of link endpoints to their index in the arrays. The links
+        # are ordered by the time at which they were last measured.
+        self._links = OrderedDict()
+        self._endpoints = [None] * capacity
+
+        self._remove_callbacks = []
+
+        self._link_count = 0
+        self._time = 0
+
+    def add_remove_callback(self, callback):
+        """
+        Register a `callback` that is called whenever a link is removed from
+        the weight matrix and the RSSI vector. The callback receives the index
+        of the removed link and the index of the last link, which has taken
+        the place of the removed link. Reconstructors that keep track of earlier rows,
+        such as the online reconstructor, must be notified of this, since the
+        moved row would otherwise look like an updated RSSI value.
         """
 
-        self._weight_matrix = Weight_Matrix(arguments, buffer.origin, buffer.size)
-        self._rssi = []
-        self._endpoints = []
+        self._remove_callbacks.append(callback)
 
     def get_weight_matrix(self):
         """
-        Get the weight matrix (as a NumPy array).
+        Get the weight matrix (as a NumPy array or a SciPy sparse matrix).
+
+        The matrix shares its data with the coordinator, so it must not be
+        changed, and later updates may change its rows.
         """
 
         return self._weight_matrix.output()
 
     def get_rssi_vector(self):
         """
-        Get the RSSI vector (as a list).
+        Get the RSSI vector (as a NumPy array).
         """
 
-        return copy.copy(self._rssi)
+        return self._rssi[:self._link_count].copy()
 
     def update(self, packet, calibrated_rssi):
         """
@@ -45,15 +97,102 @@ class Coordinator(object):
         # we can simply replace the existing RSSI value for the link. This keeps both the
         # weight matrix and the RSSI vector minimal.
         endpoints = (source, destination)
-        if endpoints in self._endpoints:
-            index = self._endpoints.index(endpoints)
-            self._rssi[index] = rssi
-            return True
-
-        # If the weight matrix has been updated, store the RSSI value.
-        if self._weight_matrix.update(source, destination) is not None:
-            self._rssi.append(rssi)
-            self._endpoints.append(endpoints)
-            return True
-
-        return False
+        index = self._links.pop(endpoints, None)
+        if index is None:
+            if self._weight_matrix.update(source, destination) is None:
+                return False
+
+            index = self._add_link(endpoints)
+
+        self._links[endpoints] = index
+        self._rssi[index] = rssi
+        self._timestamps[index] = self._time
+        self._time += 1
+
+        self._remove_stale()
+        return True
+
+    def update_many(self, packets, deadline=None):
+        """
+        Update the weight matrix and RSSI vector given a list of `packets`,
+        which contains tuples of `Packet` objects and calibrated RSSI values.
+
+        Packets with invalid source or destination locations or without
+        a calibrated RSSI value, i.e., NaN, are skipped. If `deadline` is
+        given, then no more packets are handled once `time.time` has reached
+        the deadline, but at least one packet is handled. Returns a tuple of
+        the number of handled packets from the start of the list and the
+        number of packets that successfully updated the weight matrix and the
+        RSSI vector.
+        """
+
+        handled = 0
+        updated = 0
+        for packet, calibrated_rssi in packets:
+            if deadline is not None and handled > 0 and time.time() >= deadline:
+                break
+
+            handled += 1
+
+            # Only use packets with valid source and destination locations.
+            if not packet.get("from_valid") or not packet.get("to_valid"):
+                continue
+            if np.isnan(calibrated_rssi):
+                continue
+
+            if self.update(packet, calibrated_rssi):
+                updated += 1
+
+        return handled, updated
+
+    def _add_link(self, endpoints):
+        """
+        Add a new link with the given `endpoints`, whose row has just been
+        added to the weight matrix, to the arrays, growing them if necessary.
+        Returns the index of the link.
+        """
+
+        index = self._link_count
+        capacity = self._rssi.shape[0]
+        if index >= capacity:
+            size = max(1, 2 * capacity)
+            self._rssi = np.resize(self._rssi, size)
+            self._timestamps = np.resize(self._timestamps, size)
+            self._endpoints.extend([None] * (size - capacity))
+
+        self._endpoints[index] = endpoints
+        self._link_count += 1
+        return index
+
+    def _remove_stale(self):
+        """
+        Remove the links that have not been measured within the window of most
+        recent measurements.
+        """
+
+        if self._window == 0:
+            return
+
+        oldest = self._time - self._window
+        while self._links:
+            endpoints, index = next(self._links.iteritems())
+            if self._timestamps[index] >= oldest:
+                return
+
+            del self._links[endpoints]
+
+            # Move the last link into the place of the removed link.
+            self._weight_matrix.remove(index)
+            last = self._link_count - 1
+            if index != last:
+                moved = self._endpoints[last]
+                self._rssi[index] = self._rssi[last]
+                self._timestamps[index] = self._timestamps[last]
+                self._endpoints[index] = moved
+                self._links[moved] = index
+
+            self._endpoints[last] = None
+            self._link_count = last
+
+            for callback in self._remove_callbacks:
+                callback(index, last)
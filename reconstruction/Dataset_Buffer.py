@@ -1,6 +1,6 @@
-import csv
+import numpy as np
 from Buffer import Buffer
-from ..zigbee.Packet import Packet
+from ..zigbee.Compact_Packet import Compact_Packet
 
 class Dataset_Buffer(Buffer):
     def __init__(self, settings=None):
@@ -10,6 +10,8 @@ class Dataset_Buffer(Buffer):
 
         super(Dataset_Buffer, self).__init__(settings)
 
+        self._packet_class = Compact_Packet.get_class("rssi_ground_station")
+
         # Read the provided dataset file. The CSV file is a radio tomographic
         # imaging dataset provided by the University of Utah. Refer to
         # http://span.ece.utah.edu/rti-data-set for more information on how the
@@ -24,70 +26,92 @@ class Dataset_Buffer(Buffer):
         self._number_of_sensors = len(self._positions)
         self._size = (21, 21)
 
-        # Read the data from the empty network (for calibration).
-        calibration_filename = settings.get("dataset_calibration_file")
-        with open(calibration_filename, "r") as dataset_calibration_file:
-            for line in csv.reader(dataset_calibration_file):
-                destination_id = int(line[0])
-
-                for source_id in range(self._number_of_sensors):
-                    # Ignore entries that indicate sending to ourselves.
-                    if source_id == destination_id:
-                        continue
+        # Mapping from positions to sensor IDs, and the position array.
+        self._position_ids = dict(
+            (position, sensor_id) for sensor_id, position in enumerate(self._positions)
+        )
+        self._position_array = np.array(self._positions, dtype=np.float)
+
+        # Read the data from the empty network (for calibration). The matrix
+        # contains the calibration value for each destination (row) and source
+        # (column). If the file has multiple rows for a destination, then the
+        # last row is used. Missing calibration values are NaN.
+        destination_ids, rssi = self._load(settings.get("dataset_calibration_file"))
+        reverse_ids = destination_ids[::-1]
+        unique_ids, last = np.unique(reverse_ids, return_index=True)
+
+        self._calibration_matrix = np.full((self._number_of_sensors,) * 2, np.nan)
+        self._calibration_matrix[unique_ids] = rssi[::-1][last]
+
+        links = zip(*[array.tolist() for array in self._get_links(destination_ids, rssi)])
+        for source_id, destination_id, value in links:
+            source = self._positions[source_id]
+            destination = self._positions[destination_id]
+            self._calibration[(source, destination)] = value
+
+        # Read the data from the nonempty network. Each measurement of a link
+        # is stored in flat arrays of source IDs, destination IDs and RSSI.
+        # The arrays may have room for more measurements that are put into the
+        # buffer later on, so only the first `self._length` entries are used.
+        self._sources, self._destinations, self._rssi = \
+            self._get_links(*self._load(settings.get("dataset_file")))
+
+        self._index = 0
+        self._length = len(self._rssi)
+
+    def _load(self, filename):
+        """
+        Read a CSV file with the given `filename` from the dataset at once.
 
-                    source = self._positions[source_id]
-                    destination = self._positions[destination_id]
-                    rssi = int(line[source_id + 1])
+        Returns a NumPy array of destination sensor IDs, one for each row, and
+        a NumPy array of RSSI values with a row for each destination and
+        a column for each source sensor.
+        """
 
-                    self._calibration[(source, destination)] = rssi
+        data = np.loadtxt(filename, delimiter=",", dtype=np.int,
+                          usecols=range(self._number_of_sensors + 1), ndmin=2)
+        return data[:, 0], data[:, 1:]
 
-        # Read the data from the nonempty network.
-        with open(settings.get("dataset_file"), "r") as dataset_file:
-            for line in csv.reader(dataset_file):
-                destination_id = int(line[0])
+    def _get_links(self, destination_ids, rssi):
+        """
+        Convert the destination sensor IDs and the matrix of RSSI values from
+        a dataset file to flat NumPy arrays of source IDs, destination IDs and
+        RSSI values of links, in the order of the file.
 
-                for source_id in range(self._number_of_sensors):
-                    # Ignore entries that indicate sending to ourselves.
-                    if source_id == destination_id:
-                        continue
+        Entries that indicate sending to ourselves are ignored.
+        """
 
-                    source = self._positions[source_id]
-                    destination = self._positions[destination_id]
-                    rssi = int(line[source_id + 1])
+        source_ids = np.arange(self._number_of_sensors)
+        mask = source_ids != destination_ids[:, np.newaxis]
 
-                    self.put([source, destination, rssi])
+        sources = np.broadcast_to(source_ids, mask.shape)[mask]
+        destinations = np.broadcast_to(destination_ids[:, np.newaxis], mask.shape)[mask]
+        return sources, destinations, rssi[mask]
 
     def get(self):
         """
-        Get a packet from the buffer (or None if the queue is empty). We create
-        the `Packet` object from the list on demand (as further explained
+        Get a packet from the buffer (or None if the buffer is empty). We create
+        the `Packet` object from the arrays on demand (as further explained
         in the `put` method). The return value is a tuple of the original packet
         and the calibrated RSSI value.
         """
 
-        if self._queue.empty():
+        if self._index >= self._length:
             return None
 
-        packet = self._queue.get()
+        index = self._index
+        self._index += 1
 
-        source = packet[0]
-        destination = packet[1]
-        destination_id = self._positions.index(destination) + 1
-        rssi = packet[2]
+        source = self._positions[self._sources[index]]
+        destination = self._positions[self._destinations[index]]
+        rssi = int(self._rssi[index])
 
         # The x coordinate corresponds to the longitude and the y
         # coordinate corresponds to the latitude, which is why we
         # inverted the indexing.
-        packet = Packet()
-        packet.set("specification", "rssi_ground_station")
-        packet.set("sensor_id", destination_id)
-        packet.set("from_latitude", source[1])
-        packet.set("from_longitude", source[0])
-        packet.set("from_valid", True)
-        packet.set("to_latitude", destination[1])
-        packet.set("to_longitude", destination[0])
-        packet.set("to_valid", True)
-        packet.set("rssi", rssi)
+        packet = self._packet_class(int(self._destinations[index]) + 1,
+                                    source[1], source[0], True,
+                                    destination[1], destination[0], True, rssi)
 
         link = (source, destination)
         if link not in self._calibration:
@@ -95,13 +119,75 @@ class Dataset_Buffer(Buffer):
 
         return (packet, rssi - self._calibration[link])
 
+    def get_many(self, count):
+        """
+        Get at most `count` packets from the buffer at once.
+
+        The return value is a tuple of NumPy arrays containing the source and
+        destination locations of the links as `(x, y)` coordinate pairs and
+        the calibrated RSSI values. The calibrated RSSI value is NaN for links
+        that are not in the calibration file.
+        """
+
+        start = self._index
+        end = min(start + count, self._length)
+        self._index = end
+
+        sources = self._sources[start:end]
+        destinations = self._destinations[start:end]
+        calibration = self._calibration_matrix[destinations, sources]
+
+        return (self._position_array[sources],
+                self._position_array[destinations],
+                self._rssi[start:end] - calibration)
+
+    def get_packets(self, count):
+        """
+        Get at most `count` packets from the buffer at once.
+
+        The return value is a list of tuples of the original packet and the
+        calibrated RSSI value, where the calibrated RSSI values are determined
+        by `get_many`. They are therefore NaN for links that are not in the
+        calibration file.
+        """
+
+        start = self._index
+        calibrated_rssi = self.get_many(count)[2]
+        end = self._index
+
+        packets = []
+        links = zip(self._sources[start:end].tolist(),
+                    self._destinations[start:end].tolist(),
+                    self._rssi[start:end].tolist())
+        for source_id, destination_id, rssi in links:
+            source = self._positions[source_id]
+            destination = self._positions[destination_id]
+            packets.append(self._packet_class(destination_id + 1,
+                                              source[1], source[0], True,
+                                              destination[1], destination[0],
+                                              True, rssi))
+
+        return zip(packets, calibrated_rssi.tolist())
+
+    def iterate(self, count):
+        """
+        Iterate over the remaining packets in the buffer in chunks of at most
+        `count` packets.
+
+        Each chunk is a tuple of NumPy arrays as returned by `get_many`.
+        """
+
+        while self.count() > 0:
+            yield self.get_many(count)
+
     def put(self, packet):
         """
         Put a packet into the buffer. The difference with the base class method
         is that a packet is not a `Packet` object, but instead a list that
         contains the source sensor location, the destination sensor location and
-        the RSSI value. `Packet` objects will be generated from this information
-        on demand in the `get` method. This optimization is required because the
+        the RSSI value. The locations must be positions of sensors in the
+        dataset. `Packet` objects will be generated from this information on
+        demand in the `get` method. This optimization is required because the
         datasets typically contain many rows and columns, making creating all
         `Packet` objects at once very time-consuming.
         """
@@ -109,4 +195,28 @@ class Dataset_Buffer(Buffer):
         if not isinstance(packet, list) or len(packet) != 3:
             raise ValueError("The provided packet is not a valid list.")
 
-        self._queue.put(packet)
+        source, destination, rssi = packet
+        if source not in self._position_ids or destination not in self._position_ids:
+            raise ValueError("The provided packet has unknown sensor positions.")
+
+        # Grow the arrays by doubling their capacity, so that putting many
+        # packets into the buffer takes amortized constant time per packet.
+        index = self._length
+        capacity = len(self._rssi)
+        if index >= capacity:
+            size = max(1, 2 * capacity)
+            self._sources = np.resize(self._sources, size)
+            self._destinations = np.resize(self._destinations, size)
+            self._rssi = np.resize(self._rssi, size)
+
+        self._sources[index] = self._position_ids[source]
+        self._destinations[index] = self._position_ids[destination]
+        self._rssi[index] = rssi
+        self._length += 1
+
+    def count(self):
+        """
+        Count the number of packets in the buffer.
+        """
+
+        return self._length - self._index
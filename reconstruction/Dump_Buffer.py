@@ -1,6 +1,7 @@
 import json
 from Buffer import Buffer
-from ..zigbee.Packet import Packet
+from ..core.Ring_Buffer import Ring_Buffer
+from ..zigbee.Compact_Packet import Compact_Packet
 
 class Dump_Buffer(Buffer):
     def __init__(self, settings=None):
@@ -10,6 +11,8 @@ class Dump_Buffer(Buffer):
 
         super(Dump_Buffer, self).__init__(settings)
 
+        self._packet_class = Compact_Packet.get_class("rssi_ground_station")
+
         # Read the data from the empty network (for calibration).
         # Note that the indices used here correspond to the fields in the
         # RSSI ground station packet (in order).
@@ -41,6 +44,9 @@ class Dump_Buffer(Buffer):
             self._origin = tuple(data["origin"])
             self._size = tuple(data["size"])
 
+            # Make room for all packets, since the buffer drops the oldest
+            # packets when it is full.
+            self._queue = Ring_Buffer(max(1, len(data["packets"])))
             for packet in data["packets"]:
                 self.put(packet)
 
@@ -52,14 +58,11 @@ class Dump_Buffer(Buffer):
         and the calibrated RSSI value.
         """
 
-        if self._queue.empty():
-            return None
-
         dump = self._queue.get()
+        if dump is None:
+            return None
 
-        packet = Packet()
-        packet.set("specification", "rssi_ground_station")
-        packet.set_dump(dump)
+        packet = self._packet_class(*dump)
 
         source = (packet.get("from_latitude"), packet.get("from_longitude"))
         destination = (packet.get("to_latitude"), packet.get("to_longitude"))
@@ -71,6 +74,16 @@ class Dump_Buffer(Buffer):
 
         return (packet, rssi - self._calibration[link])
 
+    def get_packets(self, count):
+        """
+        Get at most `count` packets from the buffer at once. The return value
+        is a list of tuples of the original packet and the calibrated RSSI
+        value, which is NaN if the link is not in the calibration file.
+        """
+
+        packets = [self._packet_class(*dump) for dump in self._queue.get_many(count)]
+        return [(packet, self._get_calibrated_rssi(packet)) for packet in packets]
+
     def put(self, packet):
         """
         Put a packet into the buffer. The difference with the base class method
@@ -29,6 +29,9 @@ class Ellipse_Model(Model):
 
         return "reconstruction_ellipse_model"
 
+    def get_extent(self):
+        return self._lambda
+
     def assign(self, length, source_distances, destination_distances):
         """
         Assign weights to all pixels on the grid for a given link.
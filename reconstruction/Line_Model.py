@@ -26,6 +26,9 @@ class Line_Model(Model):
 
         return "reconstruction_line_model"
 
+    def get_extent(self):
+        return self._threshold
+
     def assign(self, length, source_distances, destination_distances):
         """
         Assign weights to all pixels on the grid for a given link.
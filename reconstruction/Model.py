@@ -1,3 +1,6 @@
+# Library imports
+import numpy as np
+
 # Package imports
 from ..settings import Arguments
 
@@ -32,6 +35,28 @@ class Model(object):
     def type(self):
         raise NotImplementedError("Subclasses must implement the `type` property")
 
+    def get_cache_key(self):
+        """
+        Retrieve a tuple that identifies the model type and its settings.
+
+        Models with equal keys assign equal weights to the same links.
+        """
+
+        return (self.type,) + tuple(sorted(self._settings.get_all()))
+
+    def get_extent(self):
+        """
+        Retrieve the maximum excess length of the path from the source sensor
+        via a pixel to the destination sensor, compared to the length of the
+        link itself, for which the model may assign a nonzero weight to the
+        pixel. The pixels with such weights thus lie within an ellipse that
+        has the sensors as its foci.
+
+        Models that may assign nonzero weights to every pixel return infinity.
+        """
+
+        return np.inf
+
     def assign(self, length, source_distances, destination_distances):
         raise NotImplementedError("Subclasses must implement `assign(length, \
                                    source_distances, destination_distances)`")
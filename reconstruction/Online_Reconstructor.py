@@ -0,0 +1,171 @@
+# Core imports
+import threading
+
+# Library imports
+import numpy as np
+import scipy.sparse
+
+# Package imports
+from Reconstructor import Reconstructor
+
+class Online_Reconstructor(Reconstructor):
+    def __init__(self, arguments):
+        """
+        Initialize the online reconstructor object.
+
+        The reconstructor keeps track of the weight matrix rows and the RSSI
+        values that it has seen in earlier calls to `execute`, so that later
+        calls only need to process the changes. The nonzero weights of the
+        rows are kept as well, so that rows can be removed with `remove`.
+        """
+
+        super(Online_Reconstructor, self).__init__(arguments)
+
+        self._regularization = self._settings.get("regularization")
+
+        # Lock for the state, since reconstructions may run in threads.
+        self._lock = threading.Lock()
+
+        self._covariance = None
+        self._solution = None
+        self._rssi = None
+        self._rows = None
+
+    @property
+    def type(self):
+        """
+        Get the type of the reconstructor.
+
+        The type is equal to the name of the settings group.
+        """
+
+        return "reconstruction_online_reconstructor"
+
+    def reset(self, pixels=0):
+        """
+        Forget the rows and RSSI values seen before and start with an empty
+        image of `pixels` pixels.
+        """
+
+        self._covariance = np.eye(pixels) / self._regularization
+        self._solution = np.zeros(pixels)
+        self._rssi = np.empty(0)
+        self._rows = []
+
+    def execute(self, weight_matrix, rssi, buffer=None):
+        """
+        Perform the recursive least squares algorithm. We aim to solve `Ax = b`
+        where `A` is the weight matrix and `b` is a column vector of signal
+        strength measurements. We solve this equation to obtain `x`, containing
+        the intensities for the pixels of the reconstructed image.
+
+        The solution minimizes `||Ax - b||^2 + lambda * ||x||^2`. We keep the
+        inverse of `A^T A + lambda * I` and the solution, and update them with
+        a rank-one update for each row that was appended to the weight matrix
+        since the previous call. Changed RSSI values of earlier rows also only
+        require a matrix-vector product. Rows that were seen before must not
+        change, unless they are removed with `remove` first. If the weight
+        matrix has fewer rows than before, or another number of pixels, then
+        the state is reset.
+        """
+
+        b = np.array(rssi, dtype=np.float)
+        with self._lock:
+            if self._covariance is None or \
+               len(self._rows) > weight_matrix.shape[0] or \
+               self._covariance.shape[0] != weight_matrix.shape[1]:
+                self.reset(weight_matrix.shape[1])
+
+            # Rows that were not seen before have an unknown RSSI value, which
+            # never equals the new value.
+            count = len(self._rows)
+            known = np.full(b.shape, np.nan)
+            known[:count] = self._rssi
+            self._rows.extend([None] * (len(b) - count))
+
+            for i in np.flatnonzero(b != known):
+                if self._rows[i] is None:
+                    self._add_row(weight_matrix, i, b[i])
+                else:
+                    # A changed RSSI value of a row `a` changes the solution by
+                    # the change in value times the covariance multiplied with
+                    # `a`.
+                    pixels, values = self._rows[i]
+                    change = b[i] - known[i]
+                    self._solution += self._covariance[:, pixels].dot(values) * \
+                                      change
+
+            self._rssi = b
+            return self._solution.copy()
+
+    def remove(self, index, last):
+        """
+        Remove the row at `index` of the weight matrix from the solution, and
+        move the `last` row of the weight matrix into its place.
+
+        This must be called when a row is removed from the weight matrix in
+        this way between calls to `execute`, for example as a remove callback
+        of the `Coordinator`. The solution is then updated with a rank-one
+        downdate if the row was seen before.
+        """
+
+        with self._lock:
+            count = len(self._rows) if self._rows is not None else 0
+            if index < count and self._rows[index] is not None:
+                self._remove_row(index)
+
+            if last < count:
+                self._rows[index] = self._rows[last]
+                self._rssi[index] = self._rssi[last]
+            elif index < count:
+                # The moved row has not been seen before.
+                self._rows[index] = None
+                self._rssi[index] = np.nan
+
+            if last < count:
+                del self._rows[last:]
+                self._rssi = self._rssi[:last]
+
+    def _get_row(self, weight_matrix, i):
+        """
+        Retrieve the nonzero pixels and values of row `i` of `weight_matrix`,
+        which is either a NumPy array or a SciPy sparse matrix.
+        """
+
+        if scipy.sparse.issparse(weight_matrix):
+            row = weight_matrix.getrow(i).toarray()[0]
+        else:
+            row = np.asarray(weight_matrix[i], dtype=np.float)
+
+        pixels = np.flatnonzero(row)
+        return pixels, row[pixels]
+
+    def _add_row(self, weight_matrix, i, value):
+        """
+        Update the covariance and solution for the appended row `i` of the
+        `weight_matrix` with its RSSI `value` using the Sherman-Morrison
+        formula.
+        """
+
+        pixels, values = self._get_row(weight_matrix, i)
+        projection = self._covariance[:, pixels].dot(values)
+        gain = projection / (1.0 + values.dot(projection[pixels]))
+
+        error = value - values.dot(self._solution[pixels])
+        self._solution += gain * error
+        self._covariance -= np.outer(gain, projection)
+        self._rows[i] = (pixels, values)
+
+    def _remove_row(self, i):
+        """
+        Update the covariance and solution for the removal of the seen row `i`
+        with its known RSSI value using the Sherman-Morrison formula.
+        """
+
+        pixels, values = self._rows[i]
+        projection = self._covariance[:, pixels].dot(values)
+        gain = projection / (1.0 - values.dot(projection[pixels]))
+
+        error = self._rssi[i] - values.dot(self._solution[pixels])
+        self._solution -= gain * error
+        self._covariance += np.outer(gain, projection)
@@ -2,7 +2,8 @@ from ..settings import Arguments
 
 # pylint: disable=undefined-all-variable
 __all__ = [
-    "Maximum_Entropy_Reconstructor", "SVD_Reconstructor",
+    "Maximum_Entropy_Reconstructor", "Online_Reconstructor",
+    "SVD_Reconstructor", "Tikhonov_Reconstructor",
     "Total_Variation_Reconstructor", "Truncated_SVD_Reconstructor"
 ]
 
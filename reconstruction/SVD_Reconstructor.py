@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse
 from Reconstructor import Reconstructor
 
 class SVD_Reconstructor(Reconstructor):
@@ -29,6 +30,9 @@ class SVD_Reconstructor(Reconstructor):
         """
 
         A = weight_matrix
+        if scipy.sparse.issparse(A):
+            A = A.toarray()
+
         b = rssi
         U, S, Vt = np.linalg.svd(A, full_matrices=False)
         A_inv = np.dot(np.dot(Vt.T, np.diag(np.reciprocal(S))), U.T)
@@ -1,4 +1,5 @@
 from collections import namedtuple
+import numpy as np
 
 Point = namedtuple('Point', ['x', 'y'])
 
@@ -31,6 +32,24 @@ class Snap_To_Boundary(object):
 
         return not in_network
 
+    def is_outside_points(self, points):
+        """
+        Check which of the given `points` are outside the network.
+
+        The `points` is a NumPy array whose last dimension contains coordinate
+        pairs. Returns a boolean NumPy array with the same shape as `points`
+        without its last dimension.
+        """
+
+        x = points[..., 0]
+        y = points[..., 1]
+        in_network = ((x > self._origin.x) &
+                      (x < self._origin.x + self._width) &
+                      (y > self._origin.y) &
+                      (y < self._origin.y + self._height))
+
+        return ~in_network
+
     def _is_x_inside(self, x):
         return x >= self._origin.x and x <= self._origin.x + self._width
 
@@ -281,3 +300,210 @@ class Snap_To_Boundary(object):
             snapped_points.append(snapped_point)
 
         return list(order(snapped_points))
+
+    def _are_x_inside(self, x):
+        return (x >= self._origin.x) & (x <= self._origin.x + self._width)
+
+    def _are_y_inside(self, y):
+        return (y >= self._origin.y) & (y <= self._origin.y + self._height)
+
+    def _are_intersecting(self, start, end, slope):
+        """
+        Check which lines, defined by NumPy arrays of `start` and `end` points
+        and their `slope`, intersect with at least one of the four boundaries
+        of the network. This is the batch version of `_is_intersecting`.
+        """
+
+        vertical = end[:, 0] - start[:, 0] == 0
+        horizontal = ~vertical & (end[:, 1] - start[:, 1] == 0)
+
+        # Check whether straight lines cross one of the two boundaries that 
+        # are perpendicular to them.
+        low = np.stack([start, end]).min(axis=0)
+        high = np.stack([start, end]).max(axis=0)
+        lower = np.array(self._origin)
+        upper = lower + np.array([self._width, self._height])
+        crosses = ((low <= lower) & (high >= lower)) | \
+                  ((low <= upper) & (high >= upper))
+
+        # Use the line equation y = ax + b for the other lines, like the 
+        # sloped intersection check.
+        b = end[:, 1] - (slope * end[:, 0])
+        intersecting = (self._are_y_inside((slope * lower[0]) + b) |
+                        self._are_y_inside((slope * upper[0]) + b) |
+                        self._are_x_inside((upper[1] - b) / slope) |
+                        self._are_x_inside((lower[1] - b) / slope))
+
+        return np.where(vertical,
+                        self._are_x_inside(end[:, 0]) & crosses[:, 1],
+                        np.where(horizontal,
+                                 self._are_y_inside(end[:, 1]) & crosses[:, 0],
+                                 intersecting))
+
+    def _get_boundaries(self, points):
+        """
+        Check which boundary the given `points`, a NumPy array of coordinate
+        pairs, are positioned on. This is the batch version of `_get_boundary`.
+
+        Returns an integer NumPy array of `Snap_Boundary` identifiers, with
+        zeros for points that are not on a boundary.
+        """
+
+        x = points[:, 0]
+        y = points[:, 1]
+        boundaries = np.zeros(len(points), dtype=int)
+
+        # Check the vertical boundaries first, so that the horizontal 
+        # boundaries take precedence at the corners.
+        y_inside = self._are_y_inside(y)
+        boundaries[y_inside & (x == self._origin.x)] = Snap_Boundary.LEFT
+        right = self._origin.x + self._width
+        boundaries[y_inside & (x == right)] = Snap_Boundary.RIGHT
+
+        x_inside = self._are_x_inside(x)
+        boundaries[x_inside & (y == self._origin.y)] = Snap_Boundary.BOTTOM
+        top = self._origin.y + self._height
+        boundaries[x_inside & (y == top)] = Snap_Boundary.TOP
+
+        return boundaries
+
+    def _snap_points(self, points, slope, previous_boundaries):
+        """
+        Snap the `points` of links between two sensor points. This is the
+        batch version of `_snap_point`.
+
+        The `points` is a NumPy array of coordinate pairs, and `slope` is
+        a NumPy array of the slopes of the lines. `previous_boundaries` is an
+        integer NumPy array of the boundaries that the other points of the
+        links were snapped to, with zeros for points that are snapped first.
+
+        Returns a NumPy array of the snapped points and an integer NumPy array
+        of the boundaries they were snapped to. Points inside the network that
+        could not be snapped have NaN coordinates and a zero boundary.
+        """
+
+        x = points[:, 0]
+        y = points[:, 1]
+        snapped = points.copy()
+        boundaries = self._get_boundaries(points)
+
+        unknown = boundaries == 0
+        y_inside = self._are_y_inside(y)
+        to_left = unknown & y_inside & (x <= self._origin.x)
+        to_right = unknown & y_inside & ~to_left & \
+                   (x >= self._origin.x + self._width)
+        inside = unknown & y_inside & ~to_left & ~to_right
+        to_bottom = unknown & ~y_inside & (y <= self._origin.y)
+
+        # Move the points along their lines to the boundary in front of them, 
+        # using the distance to that boundary as one side of the triangle.
+        sides = np.abs(np.column_stack([
+            self._origin.x - x, (self._origin.x + self._width) - x,
+            self._origin.y - y, (self._origin.y + self._height) - y
+        ]))
+        moves = [
+            (to_left, Snap_Boundary.LEFT,
+             [x + sides[:, 0], y + slope * sides[:, 0]]),
+            (to_right, Snap_Boundary.RIGHT,
+             [x - sides[:, 1], y - slope * sides[:, 1]]),
+            (to_bottom, Snap_Boundary.BOTTOM,
+             [x + sides[:, 2] / slope, y + sides[:, 2]]),
+            (unknown & ~y_inside & ~to_bottom, Snap_Boundary.TOP,
+             [x - sides[:, 3] / slope, y - sides[:, 3]])
+        ]
+        for mask, boundary, moved in moves:
+            snapped[mask] = np.column_stack(moved)[mask]
+            boundaries[mask] = boundary
+
+        # Snap points inside the network away from the other point's boundary.
+        result = self._snap_points_inside(points, slope, previous_boundaries)
+        snapped[inside] = result[0][inside]
+        boundaries[inside] = result[1][inside]
+
+        return snapped, boundaries
+
+    def _snap_points_inside(self, points, slope, previous_boundaries):
+        """
+        Snap the `points` as if they are inside the network to the closest
+        boundary that is not in `previous_boundaries`. This is the batch
+        version of `_snap_point_inside`.
+
+        Returns a NumPy array of the snapped points and an integer NumPy array
+        of the chosen boundaries. Points that could not be snapped have NaN
+        coordinates and a zero boundary.
+        """
+
+        x = points[:, 0]
+        y = points[:, 1]
+
+        negative = slope < 0
+        away = (previous_boundaries == Snap_Boundary.LEFT) | \
+               (negative & (previous_boundaries == Snap_Boundary.TOP)) | \
+               (~negative & (previous_boundaries == Snap_Boundary.BOTTOM))
+        bx = np.where(away, self._origin.x + self._width, self._origin.x)
+        by = np.where(negative != away, self._origin.y + self._height,
+                      self._origin.y)
+
+        dx = x - bx
+        dy = y - by
+        candidates = [
+            np.column_stack([x - dx, y - dx * slope]),
+            np.column_stack([x - np.where(slope != 0, dy / slope, dx), y - dy])
+        ]
+
+        snapped = np.full(points.shape, np.nan)
+        boundaries = np.zeros(len(points), dtype=int)
+        for candidate in candidates:
+            candidate_boundaries = self._get_boundaries(candidate)
+            found = (boundaries == 0) & (candidate_boundaries != 0)
+            snapped[found] = candidate[found]
+            boundaries[found] = candidate_boundaries[found]
+
+        return snapped, boundaries
+
+    def execute_batch(self, links):
+        """
+        Perform the snap to boundary algorithm for multiple links at once.
+
+        The `links` is a NumPy array of shape `(N, 2, 2)` with the start and
+        end points of each link. Returns a tuple containing a NumPy array of
+        the same shape with the snapped points, and a boolean NumPy array
+        which indicates whether each link could be snapped. The snapped points
+        of valid links are equal to the points that `execute` returns, while
+        those of invalid links are zero. Links with a point inside the network
+        that cannot be snapped to a boundary are invalid as well.
+        """
+
+        links = np.asarray(links, dtype=float).reshape(-1, 2, 2)
+        start = links[:, 0, :]
+        end = links[:, 1, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = end - start
+            slope = np.where(delta[:, 0] == 0, delta[:, 1] * np.inf,
+                             delta[:, 1] / delta[:, 0])
+
+            valid = np.any(start != end, axis=1)
+            outsiders = self.is_outside_points(links)
+            all_outside = np.all(outsiders, axis=1)
+            if not self._snap_inside:
+                valid &= all_outside
+
+            valid &= ~all_outside | self._are_intersecting(start, end, slope)
+
+            # Snap the points that have a known boundary beforehand first.
+            forward = outsiders[:, 0] | ~outsiders[:, 1]
+            first = np.where(forward[:, np.newaxis], start, end)
+            second = np.where(forward[:, np.newaxis], end, start)
+
+            no_boundaries = np.zeros(len(links), dtype=int)
+            first, boundaries = self._snap_points(first, slope, no_boundaries)
+            second = self._snap_points(second, slope, boundaries)[0]
+
+        snapped = np.where(forward[:, np.newaxis, np.newaxis],
+                           np.stack([first, second], axis=1),
+                           np.stack([second, first], axis=1))
+
+        valid &= ~np.any(np.isnan(snapped), axis=(1, 2))
+        snapped[~valid] = 0.0
+        return snapped, valid
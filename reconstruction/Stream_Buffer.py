@@ -1,5 +1,8 @@
 import json
 from Buffer import Buffer
+from ..core.Ring_Buffer import Ring_Buffer
+from ..zigbee.Compact_Packet import Compact_Packet
+from ..zigbee.Packet import Packet
 
 class Stream_Buffer(Buffer):
     def __init__(self, settings=None):
@@ -9,11 +12,15 @@ class Stream_Buffer(Buffer):
 
         super(Stream_Buffer, self).__init__(settings)
 
+        self._queue = Ring_Buffer(settings.get("stream_buffer_size"))
+
         self._origin = settings.get("stream_network_origin")
         self._size = settings.get("stream_network_size")
 
         self._calibrate = settings.get("stream_calibrate")
 
+        self._packet_class = Compact_Packet.get_class("rssi_ground_station")
+
         # Read the data from the empty network (for calibration).
         if not self._calibrate:
             calibration_filename = settings.get("stream_calibration_file")
@@ -41,6 +48,22 @@ class Stream_Buffer(Buffer):
         self._number_of_sensors = rf_sensor.number_of_sensors
         rf_sensor.buffer = self
 
+    def put(self, packet):
+        """
+        Put a packet into the buffer. RSSI ground station batch packets are
+        unpacked into an RSSI ground station packet for each measurement.
+        """
+
+        if isinstance(packet, Packet) and packet.get("specification") == "rssi_ground_station_batch":
+            sensor_id = packet.get("sensor_id")
+            self.put_many([
+                self._packet_class(sensor_id, *measurement)
+                for measurement in packet.get("measurements")
+            ])
+            return
+
+        super(Stream_Buffer, self).put(packet)
+
     def get(self):
         """
         Get a packet from the buffer (or None if the queue is empty). The return
@@ -49,10 +72,9 @@ class Stream_Buffer(Buffer):
         value because there is no complete calibration yet.
         """
 
-        if self._queue.empty():
-            return None
-
         packet = self._queue.get()
+        if packet is None:
+            return None
 
         if self._calibrate:
             # We are in calibration mode. There is no complete calibration yet,
@@ -68,3 +90,19 @@ class Stream_Buffer(Buffer):
             raise KeyError("Link {} not in calibration file".format(link))
 
         return (packet, rssi - self._calibration[link])
+
+    def get_packets(self, count):
+        """
+        Get at most `count` packets from the buffer at once. The return value
+        is a list of tuples of the original packet and the calibrated RSSI
+        value, which is NaN if the link is not in the calibration file. If
+        calibration mode is enabled, then the original RSSI value is returned.
+        """
+
+        if self._calibrate:
+            return [
+                (packet, packet.get("rssi"))
+                for packet in self._queue.get_many(count)
+            ]
+
+        return super(Stream_Buffer, self).get_packets(count)
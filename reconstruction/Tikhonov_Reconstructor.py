@@ -0,0 +1,119 @@
+# Library imports
+import numpy as np
+import scipy.sparse
+from scipy.linalg import cho_factor, cho_solve
+
+# Package imports
+from Reconstructor import Reconstructor
+
+class Tikhonov_Reconstructor(Reconstructor):
+    def __init__(self, arguments):
+        """
+        Initialize the Tikhonov reconstructor object.
+        """
+
+        super(Tikhonov_Reconstructor, self).__init__(arguments)
+
+        self._alpha = self._settings.get("alpha")
+        self._regularization = self._settings.get("regularization")
+
+        # The weight matrix and network size for which the projection matrix
+        # and the Cholesky factor were calculated.
+        self._weight_matrix = None
+        self._size = None
+        self._factor = None
+        self._projection = None
+
+    @property
+    def type(self):
+        """
+        Get the type of the reconstructor.
+
+        The type is equal to the name of the settings group.
+        """
+
+        return "reconstruction_tikhonov_reconstructor"
+
+    def execute(self, weight_matrix, rssi, buffer=None):
+        """
+        Perform the Tikhonov regularization algorithm. We aim to solve `Ax = b`
+        where `A` is the weight matrix and `b` is a column vector of signal
+        strength measurements. We solve this equation to obtain `x`, containing
+        the intensities for the pixels of the reconstructed image.
+
+        The solution is `x = (A^T A + alpha * Q)^-1 A^T b`, where `Q` is either
+        the identity matrix or a matrix that penalizes differences between
+        neighboring pixels. The projection matrix before `b` is only calculated
+        again when the weight matrix changes, so reconstructions of new RSSI
+        values for the same links only require a matrix-vector product.
+        """
+
+        if self._regularization == "difference" and buffer is None:
+            raise ValueError("Buffer has not been provided")
+
+        size = buffer.size if buffer is not None else None
+        if not self._is_cached(weight_matrix, size):
+            self._update_projection(weight_matrix, size)
+
+        return self._projection.dot(np.asarray(rssi, dtype=np.float))
+
+    def _is_cached(self, weight_matrix, size):
+        """
+        Check whether the cached projection matrix belongs to the given
+        `weight_matrix` and network `size`.
+        """
+
+        cached = self._weight_matrix
+        if cached is None or cached.shape != weight_matrix.shape:
+            return False
+        if self._regularization == "difference" and size != self._size:
+            return False
+
+        if scipy.sparse.issparse(weight_matrix):
+            return (weight_matrix != cached).nnz == 0
+
+        return np.array_equal(weight_matrix, cached)
+
+    def _get_regularization_matrix(self, pixels, size):
+        """
+        Create the regularization matrix `Q` for a network with the given
+        number of `pixels` and its `size`.
+        """
+
+        if self._regularization == "identity":
+            return np.eye(pixels)
+
+        # Create a matrix with a row for each pair of horizontally or
+        # vertically neighboring pixels, containing their difference.
+        width, height = size
+        grid = np.arange(width * height).reshape(height, width)
+        pairs = np.vstack([
+            np.column_stack([grid[:, :-1].ravel(), grid[:, 1:].ravel()]),
+            np.column_stack([grid[:-1, :].ravel(), grid[1:, :].ravel()])
+        ])
+        rows = np.repeat(np.arange(len(pairs)), 2)
+        values = np.tile([1.0, -1.0], len(pairs))
+        differences = scipy.sparse.csr_matrix((values, (rows, pairs.ravel())),
+                                              shape=(len(pairs), pixels))
+        Q = (differences.T * differences).toarray()
+
+        # Keep the matrix positive definite by penalizing the mean as well.
+        return Q + np.ones((pixels, pixels)) / pixels
+
+    def _update_projection(self, weight_matrix, size):
+        """
+        Calculate the Cholesky factor of `A^T A + alpha * Q` and the projection
+        matrix for the given `weight_matrix` and network `size`.
+        """
+
+        if scipy.sparse.issparse(weight_matrix):
+            A = weight_matrix.toarray()
+            self._weight_matrix = weight_matrix.copy()
+        else:
+            A = np.array(weight_matrix, dtype=np.float)
+            self._weight_matrix = A
+
+        Q = self._get_regularization_matrix(A.shape[1], size)
+        self._factor = cho_factor(A.T.dot(A) + self._alpha * Q)
+        self._projection = cho_solve(self._factor, A.T)
+        self._size = size
@@ -1,14 +1,19 @@
+# Core imports
+from functools import partial
+
 # Library imports
 import numpy as np
+import scipy.sparse
 
 # Package imports
 from Snap_To_Boundary import Snap_To_Boundary, Point
+from ..core.Cache import Cache
 from ..core.Import_Manager import Import_Manager
 from ..settings import Arguments
 
 class Weight_Matrix(object):
     def __init__(self, arguments, origin, size, snap_inside=False,
-                 number_of_links=0):
+                 number_of_links=0, distance_cache=None, link_cache=None):
         """
         Initialize the weight matrix object.
 
@@ -19,9 +24,22 @@ class Weight_Matrix(object):
 
         If `snap_inside` is `True`, then sensor locations inside the network are
         allowed, but snapped to the network boundary. Otherwise, they are
-        silently excluded. If `number_of_links` is not `0`, then the weight
-        matrix is prefilled with this number of rows, which may be useful in
-        contexts where we know the number of measurements beforehand.
+        silently excluded. If `number_of_links` is not `0`, then room for this
+        number of rows is reserved, which may be useful in contexts where we
+        know the number of measurements beforehand. The matrix grows beyond
+        this number of rows if necessary.
+
+        If the "sparse_matrix" setting is enabled, then only the nonzero
+        weights of each link are stored in compressed sparse row form, and
+        the output is a SciPy sparse matrix. The weights of a link are then
+        only calculated for the pixels that the model may assign weights to.
+
+        The `distance_cache` is a `Cache` object for the distances from sensor
+        positions to the pixels on the grid. It can be shared between weight
+        matrices, even those with other network sizes, in order to keep the
+        distances across resets. Likewise, `link_cache` is a `Cache` object
+        for the weight matrix rows of links between snapped sensor positions.
+        If the caches are not given, then the weight matrix creates its own.
         """
 
         if isinstance(arguments, Arguments):
@@ -35,10 +53,25 @@ class Weight_Matrix(object):
         model_type = import_manager.load_class(model_class,
                                                relative_module="reconstruction")
         self._model = model_type(arguments)
+        self._sparse = settings.get("sparse_matrix")
+
+        if distance_cache is None:
+            distance_cache = Cache(settings.get("distance_cache_size"))
+
+        self._distance_cache = distance_cache
+
+        if link_cache is None:
+            link_cache = Cache(settings.get("link_cache_size"),
+                               eviction=settings.get("link_cache_eviction"))
+
+        self._link_cache = link_cache
 
-        # Initialize variables for the matrix.
-        self._distances = None
+        # Initialize variables for the matrix. In sparse mode, the matrix is
+        # stored in the data, indices and index pointer arrays instead.
         self._matrix = None
+        self._data = None
+        self._indices = None
+        self._indptr = None
 
         # Retrieve parameters.
         self._origin = origin
@@ -53,9 +86,18 @@ class Weight_Matrix(object):
         # grid that we use to determine which pixels are intersected by a link. The
         # value 0.5 is used to obtain the center of each pixel.
         offset_x, offset_y = self._origin
-        x = np.linspace(offset_x + 0.5, offset_x + self._width - 0.5, self._width)
-        y = np.linspace(offset_y + 0.5, offset_y + self._height - 0.5, self._height)
-        self._grid_x, self._grid_y = np.meshgrid(x, y)
+        self._x = np.linspace(offset_x + 0.5, offset_x + self._width - 0.5,
+                              self._width)
+        self._y = np.linspace(offset_y + 0.5, offset_y + self._height - 0.5,
+                              self._height)
+        self._grid_x, self._grid_y = np.meshgrid(self._x, self._y)
+        self._pixels_x = self._grid_x.flatten()
+        self._pixels_y = self._grid_y.flatten()
+
+        # Part of the cache keys that identifies the grid and the model.
+        self._geometry = (self._origin[0], self._origin[1], self._width,
+                          self._height)
+        self._link_key = self._geometry + self._model.get_cache_key()
 
         self.reset()
 
@@ -91,34 +133,6 @@ class Weight_Matrix(object):
 
         source, destination = snapped_points
 
-        # Get the index of the source sensor. Add it if it does not exist.
-        new_sensors = []
-        try:
-            source_index = self._sensors[source]
-        except KeyError:
-            source_index = len(self._sensors)
-            self._sensors[source] = source_index
-            new_sensors.append(source)
-
-        # Get the index of the destination sensor. Add it if it does not exist.
-        try:
-            destination_index = self._sensors[destination]
-        except KeyError:
-            destination_index = len(self._sensors)
-            self._sensors[destination] = destination_index
-            new_sensors.append(destination)
-
-        # Calculate the distance from a sensor to each center of a pixel on the
-        # grid using the Pythagorean theorem. Do this only for new sensors.
-        for sensor in new_sensors:
-            distance = np.sqrt((self._grid_x - sensor[0]) ** 2 + (self._grid_y - sensor[1]) ** 2)
-            if self._distance_count >= self._number_of_links:
-                self._distances = np.vstack([self._distances, distance.flatten()])
-            else:
-                self._distances[self._distance_count, :] = distance.flatten()
-
-            self._distance_count += 1
-
         # Update the weight matrix by adding a row for the new link. We use the
         # Pythagorean theorem for calculation of the link's length. The weight matrix
         # contains the weight of each pixel on the grid for each link. An ellipse
@@ -132,39 +146,379 @@ class Weight_Matrix(object):
             # snapping the points to the boundaries.
             return None
 
-        row = self._model.assign(length, self._distances[source_index],
-                                 self._distances[destination_index])
-        if self._link_count >= self._number_of_links:
-            self._matrix = np.vstack([self._matrix, row])
+        if self._sparse:
+            pixels, weights = self._get_sparse_row(source, destination, length)
+            self._add_sparse_row(pixels, weights)
         else:
+            key = self._link_key + source + destination
+            row = self._link_cache.lookup(key)
+            if row is None:
+                # Calculate the distance from the sensors to each center of
+                # a pixel on the grid, or look them up in the distance cache.
+                distances = self._get_distances(np.array([source, destination]))
+                row = self._model.assign(length, distances[0], distances[1])
+                self._store_link_row(key, row)
+
+            self._matrix = self._grow(self._matrix, self._link_count + 1)
             self._matrix[self._link_count, :] = row
 
         self._link_count += 1
 
         return snapped_points
 
+    def remove(self, index):
+        """
+        Remove the row of the link at `index` from the weight matrix.
+
+        The last row of the matrix is moved into the place of the removed row,
+        so that the other rows keep their index. In sparse mode, the weights of
+        the rows in between are shifted when the moved row has another number
+        of nonzero weights than the removed row.
+        """
+
+        last = self._link_count - 1
+        if not 0 <= index <= last:
+            raise IndexError("Row index {} is out of range".format(index))
+
+        if self._sparse:
+            self._move_sparse_row(last, index)
+        elif index != last:
+            self._matrix[index] = self._matrix[last]
+
+        self._link_count = last
+
+    def _move_sparse_row(self, last, index):
+        """
+        Move the nonzero weights of the `last` row of the sparse matrix into
+        the place of the row at `index`, overwriting its weights.
+        """
+
+        if index == last:
+            return
+
+        start, end = self._indptr[index:index + 2]
+        last_start, last_end = self._indptr[last:last + 2]
+        data = self._data[last_start:last_end].copy()
+        indices = self._indices[last_start:last_end].copy()
+
+        # Shift the weights of the rows in between. The shifted weights never
+        # extend beyond the weights of the last row.
+        delta = len(data) - (end - start)
+        self._data[end + delta:last_start + delta] = self._data[end:last_start]
+        self._indices[end + delta:last_start + delta] = \
+            self._indices[end:last_start]
+        self._indptr[index + 1:last + 1] += delta
+
+        self._data[start:start + len(data)] = data
+        self._indices[start:start + len(indices)] = indices
+
+    def _store_link_row(self, key, row):
+        """
+        Store a NumPy array `row` of weights for a link in the link cache under
+        the given `key`.
+        """
+
+        # The row may be shared with other weight matrices.
+        row = np.array(row)
+        row.flags.writeable = False
+        self._link_cache.put(key, row)
+
+    def _grow(self, array, size):
+        """
+        Ensure that the given NumPy `array` has at least `size` elements in its
+        first dimension.
+
+        If the array is too small, then a new array is allocated whose first
+        dimension is at least twice as large, and the existing contents are
+        copied into it. The uninitialized elements are not cleared. Returns the
+        `array` itself or the new array.
+        """
+
+        capacity = array.shape[0]
+        if size <= capacity:
+            return array
+
+        shape = (max(size, 2 * capacity),) + array.shape[1:]
+        grown = np.empty(shape, dtype=array.dtype)
+        grown[:capacity] = array
+        return grown
+
+    def _get_sparse_row(self, source, destination, length):
+        """
+        Calculate the nonzero weights of a link between the snapped `source`
+        and `destination` sensor positions with the given `length`.
+
+        The model only assigns weights to pixels within an ellipse which has
+        the sensors as its foci, so only the pixels within the bounding box of
+        this ellipse are considered. The result is a tuple of NumPy arrays
+        containing the indices of the pixels with a nonzero weight in the
+        flattened grid and their weights. The result is looked up in and added
+        to the link cache.
+        """
+
+        key = self._link_key + ("sparse",) + source + destination
+        sparse_row = self._link_cache.lookup(key)
+        if sparse_row is not None:
+            return sparse_row
+
+        start_x, end_x, start_y, end_y = \
+            self._get_bounding_box(source, destination, length)
+        grid_x, grid_y = np.meshgrid(self._x[start_x:end_x],
+                                     self._y[start_y:end_y])
+        source_distances = np.sqrt((grid_x - source[0]) ** 2 +
+                                   (grid_y - source[1]) ** 2)
+        destination_distances = np.sqrt((grid_x - destination[0]) ** 2 +
+                                        (grid_y - destination[1]) ** 2)
+        weights = self._model.assign(length, source_distances,
+                                     destination_distances)
+
+        # Convert the positions of the nonzero weights in the bounding box to
+        # indices in the flattened grid.
+        rows, columns = np.nonzero(weights)
+        pixels = (rows + start_y) * self._width + columns + start_x
+        sparse_row = (pixels.astype(np.int32),
+                      np.asarray(weights[rows, columns], dtype=np.float))
+
+        # The sparse row may be shared with other weight matrices.
+        for array in sparse_row:
+            array.flags.writeable = False
+
+        self._link_cache.put(key, sparse_row)
+        return sparse_row
+
+    def _get_bounding_box(self, source, destination, length):
+        """
+        Determine the pixels within the bounding box of the ellipse around
+        a link between the `source` and `destination` sensor positions with
+        the given `length`.
+
+        The ellipse has the sensors as its foci and its size is determined by
+        the extent of the model. Returns the start and end indices of the
+        pixel ranges along the x and y axes of the grid.
+        """
+
+        extent = self._model.get_extent()
+        if np.isinf(extent):
+            half_width = half_height = np.inf
+        else:
+            # Determine the semi-axes of the ellipse, whose major axis lies on
+            # the link, and project them onto the axes of the grid.
+            major = (length + extent) / 2.0
+            minor = np.sqrt(max(major ** 2 - (length / 2.0) ** 2, 0.0))
+            cos = (destination[0] - source[0]) / length
+            sin = (destination[1] - source[1]) / length
+            half_width = np.sqrt((major * cos) ** 2 + (minor * sin) ** 2)
+            half_height = np.sqrt((major * sin) ** 2 + (minor * cos) ** 2)
+
+        center_x = (source[0] + destination[0]) / 2.0
+        center_y = (source[1] + destination[1]) / 2.0
+        return self._get_pixel_range(self._x, center_x, half_width) + \
+               self._get_pixel_range(self._y, center_y, half_height)
+
+    def _get_pixel_range(self, centers, center, half_size):
+        """
+        Determine the range of pixels along one axis of the grid whose
+        `centers` lie within `half_size` of the given `center` coordinate.
+
+        Returns the start and end indices of the range, where the end index is
+        exclusive. The range may be empty.
+        """
+
+        start = np.searchsorted(centers, center - half_size, side='left')
+        end = np.searchsorted(centers, center + half_size, side='right')
+        return int(start), int(end)
+
+    def _add_sparse_row(self, pixels, weights):
+        """
+        Add the nonzero `weights` of a link to the sparse matrix, where the
+        `pixels` are the indices of the weights in the flattened grid.
+        """
+
+        start = self._indptr[self._link_count]
+        end = start + len(pixels)
+
+        self._data = self._grow(self._data, end)
+        self._indices = self._grow(self._indices, end)
+        self._data[start:end] = weights
+        self._indices[start:end] = pixels
+
+        self._indptr = self._grow(self._indptr, self._link_count + 2)
+        self._indptr[self._link_count + 1] = end
+
+    def _get_distances(self, points):
+        """
+        Retrieve the distances from each of the given `points` to each center
+        of a pixel on the grid.
+
+        The `points` is a NumPy array of coordinate pairs. The result is
+        a NumPy array with a flattened row of pixel distances for each point.
+        The distances for each unique point are looked up in the distance
+        cache, keyed by the point and the geometry of the grid.
+        """
+
+        if points.size == 0:
+            return np.empty((0, self._width * self._height))
+
+        unique, inverse = np.unique(points, axis=0, return_inverse=True)
+        distances = [
+            self._distance_cache.get(self._geometry + (x, y),
+                                     partial(self._calculate_distances, x, y))
+            for x, y in unique.tolist()
+        ]
+        return np.array(distances)[inverse]
+
+    def _calculate_distances(self, x, y):
+        """
+        Calculate the distances from a point with coordinates `x` and `y` to
+        each center of a pixel on the grid using the Pythagorean theorem.
+        """
+
+        distances = np.sqrt((self._pixels_x - x) ** 2 +
+                            (self._pixels_y - y) ** 2)
+
+        # The distances may be shared with other weight matrices.
+        distances.flags.writeable = False
+        return distances
+
+    def get_distance_cache(self):
+        """
+        Retrieve the `Cache` object of the distances from sensor positions to
+        the pixels on the grid.
+        """
+
+        return self._distance_cache
+
+    def get_link_cache(self):
+        """
+        Retrieve the `Cache` object of the weight matrix rows of links.
+        """
+
+        return self._link_cache
+
+    def is_valid_points(self, points):
+        """
+        Check whether the given `points`, a NumPy array whose last dimension
+        contains coordinate pairs, are valid sensor positions, i.e., whether
+        they are outside the network.
+
+        Returns a boolean NumPy array with the same shape as the `points` array
+        without its last dimension.
+        """
+
+        return self._snapper.is_outside_points(points)
+
+    def snap_links(self, sources, destinations):
+        """
+        Snap multiple links between `sources` and `destinations` to the
+        boundaries of the network without updating the weight matrix.
+
+        The `sources` and `destinations` are NumPy arrays of coordinate pairs
+        of the same length. The result is a tuple containing a NumPy array of
+        snapped source and destination pairs, and a boolean NumPy array which
+        indicates whether each link could be snapped and has a nonzero length.
+        Coordinates of invalid links are set to zero in the snapped array.
+        """
+
+        links = np.stack([sources, destinations], axis=1)
+        snapped, valid = self._snapper.execute_batch(links)
+
+        # Links that are snapped to the same position are not usable.
+        valid[np.all(snapped[:, 0, :] == snapped[:, 1, :], axis=1)] = False
+        return snapped, valid
+
+    def get_link_rows(self, sources, destinations):
+        """
+        Calculate weight matrix rows for multiple links between `sources` and
+        `destinations` without updating the weight matrix.
+
+        The `sources` and `destinations` are NumPy arrays of coordinate pairs
+        of the same length which must already be snapped to the boundaries of
+        the network and have a nonzero length, for example using `snap_links`.
+        The result is a NumPy array with the row for each link, as it would be
+        added to the matrix by `update`. Rows are looked up in and added to
+        the link cache.
+        """
+
+        rows = np.empty((len(sources), self._width * self._height))
+        keys = []
+        missing = []
+        for i, link in enumerate(np.hstack([sources, destinations]).tolist()):
+            key = self._link_key + tuple(link)
+            row = self._link_cache.lookup(key)
+            if row is None:
+                keys.append(key)
+                missing.append(i)
+            else:
+                rows[i] = row
+
+        if not missing:
+            return rows
+
+        # Calculate the remaining rows at once.
+        sources = sources[missing]
+        destinations = destinations[missing]
+        lengths = np.sqrt((destinations[:, 0] - sources[:, 0]) ** 2 +
+                          (destinations[:, 1] - sources[:, 1]) ** 2)
+        rows[missing] = self._model.assign(lengths[:, np.newaxis],
+                                           self._get_distances(sources),
+                                           self._get_distances(destinations))
+        for key, row in zip(keys, rows[missing]):
+            self._store_link_row(key, row)
+
+        return rows
+
     def check(self):
         """
         Check if the weight matrix is complete, i.e., if the columns of the
         matrix all contain at least one non-zero entry.
         """
 
-        return all(self._matrix.any(axis=0))
+        if self._sparse:
+            end = self._indptr[self._link_count]
+            pixels = np.bincount(self._indices[:end],
+                                 minlength=self._width * self._height)
+            return all(pixels > 0)
+
+        return all(self._matrix[:self._link_count].any(axis=0))
 
     def output(self):
         """
         Output the weight matrix.
+
+        The matrix has a row for each added link. In sparse mode, the matrix
+        is a SciPy CSR matrix, otherwise it is a NumPy array. In both cases,
+        the matrix shares its data with the internal arrays, so it must not be
+        changed.
         """
 
-        return self._matrix
+        if self._sparse:
+            # Set the arrays of an empty matrix, since the constructor copies
+            # arrays that are much smaller than the array that they are from.
+            end = self._indptr[self._link_count]
+            matrix = scipy.sparse.csr_matrix(
+                (self._link_count, self._width * self._height)
+            )
+            matrix.data = self._data[:end]
+            matrix.indices = self._indices[:end]
+            matrix.indptr = self._indptr[:self._link_count + 1]
+            return matrix
+
+        return self._matrix[:self._link_count]
 
     def reset(self):
         """
         Reset the weight matrix object to its default state.
         """
 
+        pixels = self._width * self._height
+
         self._link_count = 0
-        self._distance_count = 0
-        self._matrix = np.empty((self._number_of_links, self._width * self._height))
-        self._distances = np.empty((self._number_of_links, self._width * self._height))
-        self._sensors = {}
+
+        if self._sparse:
+            # Reserve room for links that each cross the network once.
+            nonzero = self._number_of_links * max(self._width, self._height)
+            self._data = np.empty(nonzero)
+            self._indices = np.empty(nonzero, dtype=np.int32)
+            self._indptr = np.zeros(self._number_of_links + 1, dtype=np.int32)
+        else:
+            self._matrix = np.empty((self._number_of_links, pixels))
@@ -0,0 +1,100 @@
+import unittest
+from mock import Mock
+from ..core.Cache import Cache
+
+class TestCoreCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = Cache(2)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Cache(2, eviction="random")
+
+        self.assertEqual(self.cache._size, 2)
+        self.assertEqual(self.cache._eviction, "lru")
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache._hits, 0)
+        self.assertEqual(self.cache._misses, 0)
+
+    def test_interface(self):
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(self.cache.eviction, "lru")
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_get(self):
+        calculate = Mock(return_value=42)
+        self.assertEqual(self.cache.get("a", calculate), 42)
+        self.assertEqual(self.cache.get("a", calculate), 42)
+        calculate.assert_called_once_with()
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+        # The least recently used entry is evicted when the cache is full.
+        self.cache.get("b", Mock(return_value=1))
+        self.cache.get("a", calculate)
+        self.cache.get("c", Mock(return_value=2))
+        self.assertEqual(len(self.cache), 2)
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_get_fifo(self):
+        cache = Cache(2, eviction="fifo")
+        cache.get("a", Mock(return_value=42))
+        cache.get("b", Mock(return_value=1))
+        cache.get("a", Mock())
+        cache.get("c", Mock(return_value=2))
+
+        # The oldest entry is evicted even if it was used recently.
+        self.assertNotIn("a", cache)
+        self.assertIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_get_disabled(self):
+        cache = Cache(0)
+        calculate = Mock(return_value=42)
+        self.assertEqual(cache.get("a", calculate), 42)
+        self.assertEqual(cache.get("a", calculate), 42)
+        self.assertEqual(calculate.call_count, 2)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 2)
+
+    def test_lookup(self):
+        self.assertIsNone(self.cache.lookup("a"))
+        self.assertEqual(self.cache.misses, 1)
+
+        self.cache.put("a", 42)
+        self.cache.put("b", 1)
+        self.assertEqual(self.cache.lookup("a"), 42)
+        self.assertEqual(self.cache.hits, 1)
+
+        # The entry that was looked up is not evicted.
+        self.cache.put("c", 2)
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+
+    def test_put(self):
+        self.cache.put("a", 42)
+        self.cache.put("b", 1)
+        self.cache.put("a", 43)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.lookup("a"), 43)
+
+        # Counters are not changed by storing values.
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 0)
+
+        cache = Cache(0)
+        cache.put("a", 42)
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        self.cache.get("a", Mock(return_value=42))
+        self.cache.get("a", Mock(return_value=42))
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 0)
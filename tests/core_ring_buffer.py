@@ -0,0 +1,159 @@
+import unittest
+from ..core.Ring_Buffer import Ring_Buffer
+
+class TestCoreRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.ring_buffer = Ring_Buffer(3)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Ring_Buffer(0)
+
+        self.assertEqual(self.ring_buffer._size, 3)
+        self.assertEqual(self.ring_buffer._items, [None, None, None])
+        self.assertEqual(self.ring_buffer._claim_position, 0)
+        self.assertEqual(self.ring_buffer._write_position, 0)
+        self.assertEqual(self.ring_buffer._read_position, 0)
+        self.assertEqual(self.ring_buffer._removed, 0)
+        self.assertEqual(self.ring_buffer._dropped, 0)
+        self.assertEqual(len(self.ring_buffer), 0)
+
+    def test_interface(self):
+        self.assertEqual(self.ring_buffer.size, 3)
+        self.assertEqual(self.ring_buffer.added, 0)
+        self.assertEqual(self.ring_buffer.removed, 0)
+        self.assertEqual(self.ring_buffer.dropped, 0)
+
+    def test_put(self):
+        self.ring_buffer.put(1)
+        self.ring_buffer.put(2)
+        self.assertEqual(len(self.ring_buffer), 2)
+        self.assertEqual(self.ring_buffer.added, 2)
+
+        # The oldest items are overwritten when the buffer is full.
+        self.ring_buffer.put(3)
+        self.ring_buffer.put(4)
+        self.assertEqual(len(self.ring_buffer), 3)
+        self.assertEqual(self.ring_buffer.added, 4)
+        self.assertEqual(self.ring_buffer._items, [4, 2, 3])
+
+    def test_put_many(self):
+        self.ring_buffer.put_many([1, 2])
+        self.assertEqual(len(self.ring_buffer), 2)
+        self.assertEqual(self.ring_buffer.added, 2)
+
+        self.ring_buffer.put_many([3, 4])
+        self.assertEqual(len(self.ring_buffer), 3)
+        self.assertEqual(self.ring_buffer._items, [4, 2, 3])
+
+        # Only the last items of a large list are stored.
+        self.ring_buffer.put_many(range(5, 10))
+        self.assertEqual(self.ring_buffer.added, 9)
+        self.assertEqual(self.ring_buffer._items, [7, 8, 9])
+        self.assertEqual(self.ring_buffer.get_many(), [7, 8, 9])
+        self.assertEqual(self.ring_buffer.dropped, 6)
+
+    def test_get(self):
+        self.assertIsNone(self.ring_buffer.get())
+
+        self.ring_buffer.put_many([1, 2, 3, 4])
+        self.assertEqual(self.ring_buffer.get(), 2)
+        self.assertEqual(self.ring_buffer.get(), 3)
+        self.assertEqual(self.ring_buffer.removed, 2)
+        self.assertEqual(self.ring_buffer.dropped, 1)
+
+        self.ring_buffer.put(5)
+        self.assertEqual(self.ring_buffer.get(), 4)
+        self.assertEqual(self.ring_buffer.get(), 5)
+        self.assertIsNone(self.ring_buffer.get())
+        self.assertEqual(len(self.ring_buffer), 0)
+        self.assertEqual(self.ring_buffer.removed, 4)
+        self.assertEqual(self.ring_buffer.dropped, 1)
+
+    def test_get_many(self):
+        self.assertEqual(self.ring_buffer.get_many(), [])
+
+        self.ring_buffer.put_many([1, 2, 3])
+        self.assertEqual(self.ring_buffer.get_many(2), [1, 2])
+        self.assertEqual(len(self.ring_buffer), 1)
+
+        self.ring_buffer.put_many([4, 5])
+        self.assertEqual(self.ring_buffer.get_many(5), [3, 4, 5])
+        self.assertEqual(self.ring_buffer.removed, 5)
+        self.assertEqual(self.ring_buffer.dropped, 0)
+
+    def _simulate_producer(self, items):
+        """
+        Simulate a producer thread that puts the given `items` into the ring
+        buffer as soon as the consumer starts reading from the buffer.
+        """
+
+        ring_buffer = self.ring_buffer
+
+        class Producer_List(list):
+            def __getitem__(self, index):
+                item = super(Producer_List, self).__getitem__(index)
+                ring_buffer._items = list(self)
+                ring_buffer.put_many(items)
+                return item
+
+        ring_buffer._items = Producer_List(ring_buffer._items)
+
+    def test_get_many_overwritten(self):
+        # The first two items are overwritten while reading them.
+        self.ring_buffer.put_many([1, 2, 3])
+        self._simulate_producer([4, 5])
+        self.assertEqual(self.ring_buffer.get_many(), [3])
+        self.assertEqual(self.ring_buffer.dropped, 2)
+        self.assertEqual(self.ring_buffer.get_many(), [4, 5])
+        self.assertEqual(self.ring_buffer.removed, 3)
+
+        # All the requested items and more are overwritten, so the newer
+        # items are retrieved instead.
+        self.ring_buffer.put(6)
+        self._simulate_producer([7, 8, 9, 10])
+        self.assertEqual(self.ring_buffer.get_many(1), [8])
+        self.assertEqual(self.ring_buffer.dropped, 4)
+        self.assertEqual(self.ring_buffer.get_many(), [9, 10])
+        self.assertEqual(self.ring_buffer.dropped, 4)
+        self.assertEqual(self.ring_buffer.removed, 6)
+
+    def test_get_many_claimed(self):
+        # The producer claims the position of a new item and overwrites the
+        # oldest item while we are reading it, but only publishes the new item
+        # after we are done reading.
+        self.ring_buffer.put_many([1, 2, 3])
+        ring_buffer = self.ring_buffer
+
+        class Claim_List(list):
+            def __getitem__(self, index):
+                item = super(Claim_List, self).__getitem__(index)
+                ring_buffer._items = list(self)
+                ring_buffer._claim_position = 4
+                ring_buffer._items[0] = 4
+                return item
+
+        ring_buffer._items = Claim_List(ring_buffer._items)
+
+        # The overwritten item is neither retrieved as the oldest item nor
+        # retrieved again after the new item is published.
+        self.assertEqual(self.ring_buffer.get_many(), [2, 3])
+        self.assertEqual(self.ring_buffer.dropped, 1)
+        self.assertEqual(self.ring_buffer.get_many(), [])
+
+        ring_buffer._write_position = 4
+        self.assertEqual(self.ring_buffer.get_many(), [4])
+        self.assertEqual(self.ring_buffer.removed, 3)
+
+        # If all the published items are overwritten by claimed items, then
+        # nothing is retrieved until the claimed items are published.
+        ring_buffer._claim_position = 10
+        ring_buffer._items = [9, 7, 8]
+        ring_buffer._write_position = 6
+        self.assertEqual(self.ring_buffer.get_many(), [])
+        self.assertEqual(self.ring_buffer.dropped, 3)
+        self.assertEqual(len(self.ring_buffer), 0)
+
+        ring_buffer._write_position = 10
+        self.assertEqual(self.ring_buffer.get_many(), [7, 8, 9])
+        self.assertEqual(self.ring_buffer.dropped, 4)
@@ -1,6 +1,7 @@
 import math
+import numpy as np
 from dronekit import LocationGlobalRelative
-from mock import call, MagicMock, Mock
+from mock import call, patch, MagicMock, Mock
 from environment import EnvironmentTestCase
 from ..bench.Method_Coverage import covers
 
@@ -116,6 +117,69 @@ class TestDistanceSensorSimulator(EnvironmentTestCase):
         self.distance_sensor.get_distance()
         self.check_draw_current_edge_calls(-1)
 
+        # The detected edge contains the object and face indices from the
+        # compiled scene.
+        object_index, face_index = self.distance_sensor.current_edge[:2]
+        self.assertIsInstance(self.environment.get_objects()[object_index], list)
+
+        # The current face is only checked again if its verbose output is
+        # requested, which does not change the detected distance.
+        distance = self.distance_sensor.get_distance()
+        self.distance_sensor.current_object = object_index
+        with patch.object(self.distance_sensor, "_get_plane_distance",
+                          wraps=self.distance_sensor._get_plane_distance) as plane_mock:
+            self.assertEqual(self.distance_sensor.get_distance(), distance)
+            plane_mock.assert_not_called()
+
+            self.distance_sensor.current_face = face_index
+            with patch("sys.stdout"):
+                self.assertEqual(self.distance_sensor.get_distance(), distance)
+
+            self.assertEqual(plane_mock.call_count, 1)
+            self.assertTrue(plane_mock.call_args[1]["verbose"])
+
+    def test_get_distances(self):
+        self.environment._load_objects()
+
+        # The hardcoded objects are not part of the scene, but the distances
+        # to them are still measured for each of the rays.
+        yaws = [0.0, math.pi, 0.25*math.pi]
+        distances, faces = self.distance_sensor.get_distances(yaws=yaws)
+        self.assertEqual(distances.shape, (3,))
+        for yaw, distance in zip(yaws, distances):
+            self.assertEqual(distance, self.distance_sensor.get_distance(yaw=yaw))
+
+        self.assertEqual(faces.tolist(), [-1, -1, -1])
+
+        # The distances and faces from the scene are combined with the pitches.
+        self.environment._load_objects(scenefile="tests/vrml/castle.wrl")
+        scene = self.environment.get_scene()
+        location = self.environment.get_location(0, 0, 1)
+        yaws = np.linspace(0, 2*math.pi, 8, endpoint=False)
+        pitches = [[0.0], [1.8*math.pi]]
+        distances, faces = self.distance_sensor.get_distances(location, yaws,
+                                                              pitches)
+        self.assertEqual(distances.shape, (2, 8))
+        self.assertEqual(faces.shape, (2, 8))
+        self.assertTrue(np.any(faces >= 0))
+
+        for i, pitch in enumerate(pitches):
+            for j, yaw in enumerate(yaws):
+                distance = self.distance_sensor.get_distance(location, yaw,
+                                                             pitch[0])
+                self.assertAlmostEqual(distances[i, j], distance)
+                if distance < self.distance_sensor.maximum_distance:
+                    edge = self.distance_sensor.current_edge
+                    self.assertEqual(scene.get_face(faces[i, j]),
+                                     tuple(edge[:2]))
+                else:
+                    self.assertEqual(faces[i, j], -1)
+
+        # The current yaw and pitch are used when they are not given.
+        distances, faces = self.distance_sensor.get_distances(location)
+        self.assertEqual(distances.shape, ())
+        self.assertEqual(distances, self.distance_sensor.get_distance(location))
+
     def test_get_distance_other(self):
         self.environment.objects = [None]
         with self.assertRaises(ValueError):
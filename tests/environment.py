@@ -42,7 +42,8 @@ class EnvironmentTestCase(LocationTestCase, SettingsTestCase,
                            use_infrared_sensor=True):
         self._argv = argv
         self._argv.extend([
-            "--rf-sensor-class", "RF_Sensor_Simulator", "--rf-sensor-id", "1"
+            "--rf-sensor-class", "RF_Sensor_Simulator", "--rf-sensor-id", "1",
+            "--scene-cache", ""
         ])
 
         self._simulated = simulated
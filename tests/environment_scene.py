@@ -0,0 +1,376 @@
+import math
+import sys
+import numpy as np
+from ..environment.Scene import Scene
+from environment import EnvironmentTestCase
+
+class TestEnvironmentScene(EnvironmentTestCase):
+    def setUp(self):
+        self.register_arguments([
+            "--geometry-class", "Geometry", "--vehicle-class", "Mock_Vehicle"
+        ], distance_sensors=[0], use_infrared_sensor=False)
+
+        super(TestEnvironmentScene, self).setUp()
+
+        get_location = self.environment.get_location
+
+        # A square wall to the east, an incomplete face and a triangle on the
+        # ground to the north. The other object types are not compiled.
+        self.wall = [
+            get_location(-5, 10, 0), get_location(5, 10, 0),
+            get_location(5, 10, 10), get_location(-5, 10, 10)
+        ]
+        self.triangle = [
+            get_location(10, -5, 0), get_location(20, 5, 0),
+            get_location(10, 5, 0)
+        ]
+        self.objects = [
+            {'center': get_location(0, -10, 0), 'radius': 2.5},
+            [self.wall, self.wall[:2]],
+            (get_location(0, 0, 0), get_location(1, 0, 0),
+             get_location(1, 1, 0)),
+            [self.triangle]
+        ]
+        self.scene = Scene(self.environment.geometry, self.objects)
+
+    def test_initialization(self):
+        self.assertEqual(self.scene._face_objects.tolist(), [1, 3])
+        self.assertEqual(self.scene._face_indices.tolist(), [0, 0])
+
+        # The plane equations of the faces are calculated.
+        self.assertEqual(self.scene._origins.tolist(), [[-5, 10, 0], [10, -5, 0]])
+        self.assertEqual(self.scene._normals.tolist(), [[0, -100, 0], [0, 0, 100]])
+        self.assertEqual(self.scene._offsets.tolist(), [1000, 0])
+
+        # The wall ignores the east coordinate and the triangle ignores the
+        # altitude in the projections.
+        self.assertEqual(self.scene._axes.tolist(), [[0, 2], [0, 1]])
+
+        # The projected edges are sorted on their first coordinate.
+        self.assertEqual(self.scene._edge_faces.tolist(), [0, 0, 0, 0, 1, 1, 1])
+        self.assertEqual(self.scene._edge_lower.tolist(), [
+            [-5, 0], [5, 0], [-5, 10], [-5, 10], [10, -5], [10, 5], [10, 5]
+        ])
+        self.assertEqual(self.scene._edge_upper.tolist(), [
+            [5, 0], [5, 10], [5, 10], [-5, 0], [20, 5], [20, 5], [10, -5]
+        ])
+        self.assertEqual(self.scene._edge_slopes.tolist(), [
+            sys.float_info.max, 0.0, sys.float_info.max, 0.0, 1.0,
+            sys.float_info.max, 0.0
+        ])
+
+        # The bounding volume hierarchy has a single leaf node for few faces.
+        epsilon = self.environment.geometry.EPSILON
+        self.assertEqual(self.scene._face_order.tolist(), [0, 1])
+        self.assertTrue(np.allclose(self.scene._node_lower,
+                                    [[-5 - epsilon, -5 - epsilon, -epsilon]]))
+        self.assertTrue(np.allclose(self.scene._node_upper,
+                                    [[20 + epsilon, 10 + epsilon, 10 + epsilon]]))
+        self.assertEqual(self.scene._node_children.tolist(), [[-1, -1]])
+        self.assertEqual(self.scene._node_ranges.tolist(), [[0, 2]])
+
+        # A scene without objects has no faces.
+        scene = Scene(self.environment.geometry)
+        self.assertEqual(scene.count, 0)
+        self.assertEqual(scene._normals.shape, (0, 3))
+        self.assertEqual(scene._edge_lower.shape, (0, 2))
+        self.assertEqual(scene._node_lower.shape, (0, 3))
+        self.assertEqual(scene._node_children.shape, (0, 2))
+
+    def _get_grid_scene(self):
+        # A grid of small triangles on the ground, one per square meter.
+        get_location = self.environment.get_location
+        faces = [
+            [get_location(x, y, 0), get_location(x + 1, y, 0),
+             get_location(x, y + 1, 0)]
+            for x in range(8) for y in range(8)
+        ]
+        return Scene(self.environment.geometry, [faces])
+
+    def test_add_node(self):
+        scene = self._get_grid_scene()
+        self.assertEqual(scene.count, 64)
+
+        # The tree is split until the leaves have few enough faces.
+        children = scene._node_children
+        ranges = scene._node_ranges
+        self.assertEqual(children.shape, (15, 2))
+        self.assertEqual(ranges[0].tolist(), [0, 64])
+        self.assertEqual(sorted(scene._face_order.tolist()), range(64))
+
+        leaves = children[:, 0] < 0
+        self.assertEqual(leaves.sum(), 8)
+        self.assertTrue(np.all(ranges[leaves, 1] - ranges[leaves, 0] <= Scene.LEAF_SIZE))
+
+        # The bounding boxes of the nodes contain the boxes of their children.
+        for node, (left, right) in enumerate(children[~leaves]):
+            node = np.flatnonzero(~leaves)[node]
+            for child in (left, right):
+                self.assertTrue(np.all(scene._node_lower[node] <= scene._node_lower[child]))
+                self.assertTrue(np.all(scene._node_upper[node] >= scene._node_upper[child]))
+                self.assertTrue(ranges[node, 0] <= ranges[child, 0])
+                self.assertTrue(ranges[child, 1] <= ranges[node, 1])
+
+    def test_interface(self):
+        self.assertEqual(self.scene.count, 2)
+
+    def test_get_local_coordinates(self):
+        location = self.environment.get_location(1, 2, 3)
+        self.assertEqual(self.scene.get_local_coordinates(location), (1, 2, 3))
+
+    def test_get_face(self):
+        self.assertEqual(self.scene.get_face(0), (1, 0))
+        self.assertEqual(self.scene.get_face(1), (3, 0))
+
+    def test_get_directions(self):
+        geometry = self.environment.geometry
+        location = self.environment.get_location(0, 0, 0)
+        yaws = np.array([0.0, 0.3, math.pi])
+        pitches = np.array([0.0, 0.2, -0.4])
+        directions = self.scene._get_directions(yaws, pitches)
+        self.assertEqual(directions.shape, (3, 3))
+        for yaw, pitch, direction in zip(yaws, pitches, directions):
+            ahead = geometry.get_location_angle(location, 1.0, yaw, pitch)
+            expected = geometry.diff_location_meters(location, ahead)
+            self.assertTrue(np.allclose(direction, expected))
+
+        # Single angles result in a single direction vector.
+        directions = self.scene._get_directions(0.0, 0.0)
+        self.assertEqual(directions.tolist(), [[0.0, 1.0, 0.0]])
+
+    def test_get_ranges(self):
+        owners, indices = self.scene._get_ranges(np.array([2, 7, 4]),
+                                                 np.array([5, 7, 6]))
+        self.assertEqual(owners.tolist(), [0, 0, 0, 2, 2])
+        self.assertEqual(indices.tolist(), [2, 3, 4, 4, 5])
+
+        owners, indices = self.scene._get_ranges(np.array([], dtype=np.int),
+                                                 np.array([], dtype=np.int))
+        self.assertEqual(owners.tolist(), [])
+        self.assertEqual(indices.tolist(), [])
+
+    def test_get_candidates(self):
+        origin = np.array([0.0, 0.0, 5.0])
+
+        # Scenes with few faces have a single leaf node with all faces.
+        rays, faces = self.scene._get_candidates(origin,
+                                                 np.array([[0.0, 1.0, 0.0]]))
+        self.assertEqual(rays.tolist(), [0, 0])
+        self.assertEqual(faces.tolist(), [0, 1])
+
+        # Rays only select the faces in leaves with bounding boxes that lie
+        # in the direction of the ray.
+        scene = self._get_grid_scene()
+        rays, faces = scene._get_candidates(np.array([0.5, 0.25, 1.0]),
+                                            np.array([[0.0, 0.0, 1.0],
+                                                      [0.0, 0.0, -1.0]]))
+        self.assertTrue(np.all(rays == 1))
+        self.assertEqual(faces.tolist(), sorted(faces.tolist()))
+        self.assertIn(0, faces.tolist())
+        self.assertLessEqual(len(faces), Scene.LEAF_SIZE)
+
+        rays, faces = scene._get_candidates(np.array([-1.0, 0.25, 0.0]),
+                                            np.array([[-1.0, 0.0, 0.0]]))
+        self.assertEqual(rays.tolist(), [])
+        self.assertEqual(faces.tolist(), [])
+
+        # Line segments do not select faces beyond their end point.
+        rays, faces = scene._get_candidates(np.array([0.5, 0.25, 1.0]),
+                                            np.array([[0.0, 0.0, -0.5]]),
+                                            limit=1.0)
+        self.assertEqual(faces.tolist(), [])
+
+        # Scenes without faces have no candidates.
+        scene = Scene(self.environment.geometry, [])
+        rays, faces = scene._get_candidates(origin, np.array([[0.0, 1.0, 0.0]]))
+        self.assertEqual(rays.tolist(), [])
+        self.assertEqual(faces.tolist(), [])
+
+    def test_get_factors(self):
+        # A ray to the east intersects with the wall but is parallel to the
+        # ground triangle.
+        origin = np.array([0.0, 0.0, 5.0])
+        faces = np.array([0, 1])
+        directions = np.array([[0.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+        factors = self.scene._get_factors(origin, directions, faces)
+        self.assertEqual(factors[0], 10.0)
+        self.assertTrue(np.isnan(factors[1]))
+
+        # The factor is negative for intersections behind the origin.
+        directions = np.array([[0.0, -1.0, -1.0], [0.0, -1.0, -1.0]])
+        factors = self.scene._get_factors(origin, directions, faces)
+        self.assertEqual(factors.tolist(), [-10.0, 5.0])
+
+        # Each face uses the direction in the same row.
+        faces = np.array([1, 0, 1])
+        directions = np.array([[0.0, 0.0, -1.0], [0.0, 2.0, 0.0],
+                               [0.0, 0.0, -0.5]])
+        factors = self.scene._get_factors(origin, directions, faces)
+        self.assertEqual(factors.tolist(), [5.0, 5.0, 10.0])
+
+    def test_get_inside(self):
+        faces = np.array([0, 1])
+        points = np.array([[0.0, 10.0, 5.0], [15.0, 2.0, 0.0]])
+        self.assertEqual(self.scene._get_inside(faces, points).tolist(),
+                         [True, True])
+
+        points = np.array([[6.0, 10.0, 5.0], [15.0, -3.0, 0.0]])
+        self.assertEqual(self.scene._get_inside(faces, points).tolist(),
+                         [False, False])
+
+        # Points on the lines of edges are handled in the same way as when
+        # checking the faces one by one.
+        geometry = self.environment.geometry
+        for point in [(10.0, -5.0, 0.0), (10.0, 0.0, 0.0), (20.0, 5.0, 0.0)]:
+            expected = geometry.point_inside_plane(self.triangle,
+                                                   self.scene._normals[1],
+                                                   self.environment.get_location(*point))
+            inside = self.scene._get_inside(np.array([1]), np.array([point]))
+            self.assertEqual(inside.tolist(), [expected])
+
+        # The same face may be checked for multiple points.
+        faces = np.array([1, 0, 1])
+        points = np.array([[15.0, 2.0, 0.0], [0.0, 10.0, 5.0],
+                           [15.0, -3.0, 0.0]])
+        self.assertEqual(self.scene._get_inside(faces, points).tolist(),
+                         [True, True, False])
+
+    def test_get_hits(self):
+        origin = np.array([0.0, 0.0, 5.0])
+        directions = np.array([
+            [0.0, 1.0, 0.0], [0.0, -1.0, 0.0], [1.0, 0.0, -0.4],
+            [0.0, 1.0, -0.4]
+        ])
+        rays, faces, factors = self.scene._get_hits(origin, directions)
+
+        # The rays hit the wall, nothing, the ground triangle, and the wall
+        # as well as the plane of the triangle outside of the triangle.
+        self.assertEqual(rays.tolist(), [0, 2, 3])
+        self.assertEqual(faces.tolist(), [0, 1, 0])
+        self.assertEqual(factors.tolist(), [10.0, 12.5, 10.0])
+
+        # Intersections beyond the limit are not included.
+        rays, faces, factors = self.scene._get_hits(origin, directions,
+                                                    limit=11.0)
+        self.assertEqual(rays.tolist(), [0, 3])
+
+    def test_get_closest(self):
+        # A wider wall behind the other wall is partially hidden by it.
+        get_location = self.environment.get_location
+        back_wall = [
+            get_location(-15, 20, 0), get_location(15, 20, 0),
+            get_location(15, 20, 10), get_location(-15, 20, 10)
+        ]
+        scene = Scene(self.environment.geometry, [[back_wall], [self.wall]])
+
+        origin = np.array([0.0, 0.0, 5.0])
+        directions = np.array([[0.0, 1.0, 0.0], [0.0, -1.0, 0.0],
+                               [0.7, 1.0, 0.0]])
+        factors, faces = scene._get_closest(origin, directions)
+        self.assertEqual(factors[0], 10.0)
+        self.assertEqual(factors[1], np.inf)
+        self.assertEqual(factors[2], 20.0)
+        self.assertEqual(faces.tolist(), [1, -1, 0])
+
+        # Intersections at the origin are not in front of it.
+        factors, faces = scene._get_closest(np.array([0.0, 10.0, 5.0]),
+                                            directions[:1])
+        self.assertEqual(factors.tolist(), [10.0])
+        self.assertEqual(faces.tolist(), [0])
+
+    def test_get_distance(self):
+        location = self.environment.get_location(0, 0, 5)
+
+        distance, edge = self.scene.get_distance(location, 0.0, 0.0)
+        self.assertEqual(distance, 10.0)
+        self.assertEqual(edge[:2], [1, 0])
+        self.assertEqual(self.environment.geometry.get_coordinates(edge[2]),
+                         (0, 10, 5))
+
+        # Rays that intersect with the plane of a face but not the face itself,
+        # as well as rays that point away from the faces, do not hit anything.
+        self.assertEqual(self.scene.get_distance(location, 0.0, 0.6),
+                         (sys.float_info.max, None))
+        self.assertEqual(self.scene.get_distance(location, math.pi, 0.0),
+                         (sys.float_info.max, None))
+
+        # Rays may intersect with faces that are not vertical.
+        other_location = self.environment.get_location(0, 2, 5)
+        distance, edge = self.scene.get_distance(other_location, 0.5 * math.pi,
+                                                 -math.atan2(5, 15))
+        self.assertAlmostEqual(distance, math.sqrt(15 ** 2 + 5 ** 2))
+        self.assertEqual(edge[:2], [3, 0])
+
+        # The distances are equal to the distances calculated per face.
+        sensor = self.environment.get_distance_sensors()[0]
+        for yaw, pitch in [(0.1, 0.1), (0.4 * math.pi, -0.2), (1.9 * math.pi, 0.0)]:
+            distance = self.scene.get_distance(location, yaw, pitch)[0]
+            expected = min(
+                sensor._get_object_distance(self.objects[i], location, yaw, pitch)[0]
+                for i in (1, 3)
+            )
+            self.assertAlmostEqual(distance, expected)
+
+        # Scenes without faces do not intersect.
+        scene = Scene(self.environment.geometry, [])
+        self.assertEqual(scene.get_distance(location, 0.0, 0.0),
+                         (sys.float_info.max, None))
+
+        # Rays that only intersect with the bounding box of a face, but not
+        # with its plane, do not hit anything.
+        ground_location = self.environment.get_location(15, 0, 0)
+        self.assertEqual(self.scene.get_distance(ground_location, 0.0, 0.0),
+                         (sys.float_info.max, None))
+
+    def test_get_distances(self):
+        location = self.environment.get_location(0, 0, 5)
+        yaws = np.array([0.0, math.pi, 0.1])
+        distances, faces = self.scene.get_distances(location, yaws, 0.0)
+        self.assertEqual(distances.shape, (3,))
+        self.assertEqual(distances[0], 10.0)
+        self.assertEqual(distances[1], sys.float_info.max)
+        self.assertAlmostEqual(distances[2], 10.0 / math.cos(0.1))
+        self.assertEqual(faces.tolist(), [0, -1, 0])
+
+        # The angles are broadcast against each other.
+        pitches = np.array([[0.0], [-math.atan2(5, 10)]])
+        distances, faces = self.scene.get_distances(location, yaws, pitches)
+        self.assertEqual(distances.shape, (2, 3))
+        self.assertEqual(faces.shape, (2, 3))
+        self.assertEqual(faces[1].tolist(), [0, -1, 0])
+
+        # The distances are equal to the distances of single rays.
+        for i, pitch in enumerate(pitches[:, 0]):
+            for j, yaw in enumerate(yaws):
+                distance = self.scene.get_distance(location, yaw, pitch)[0]
+                self.assertAlmostEqual(distances[i, j], distance)
+
+        # Scenes without faces do not intersect.
+        scene = Scene(self.environment.geometry, [])
+        distances, faces = scene.get_distances(location, yaws, 0.0)
+        self.assertEqual(distances.tolist(), [sys.float_info.max] * 3)
+        self.assertEqual(faces.tolist(), [-1] * 3)
+
+    def test_intersects(self):
+        get_location = self.environment.get_location
+
+        # Line segments through the wall intersect with it.
+        self.assertTrue(self.scene.intersects(get_location(0, 5, 5),
+                                              get_location(0, 15, 5)))
+
+        # Line segments that end before the wall or pass it by do not.
+        self.assertFalse(self.scene.intersects(get_location(0, 5, 5),
+                                               get_location(0, 9, 5)))
+        self.assertFalse(self.scene.intersects(get_location(8, 5, 5),
+                                               get_location(8, 15, 5)))
+
+        # Line segments that intersect with the plane of a face outside of
+        # the face, within its bounding box, do not intersect.
+        self.assertFalse(self.scene.intersects(get_location(19, -4, 1),
+                                               get_location(19, -4, -1)))
+        self.assertTrue(self.scene.intersects(get_location(12, 4, 1),
+                                              get_location(12, 4, -1)))
+
+        # Locations that do not change do not intersect.
+        location = get_location(0, 10, 5)
+        self.assertFalse(self.scene.intersects(location, location))
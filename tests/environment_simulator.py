@@ -1,5 +1,8 @@
+import os
 from dronekit import LocationLocal
 from mock import patch
+from ..environment.Scene import Scene
+from ..environment.VRML_Loader import VRML_Loader
 from ..geometry.Geometry_Spherical import Geometry_Spherical
 from environment import EnvironmentTestCase
 
@@ -16,6 +19,9 @@ class TestEnvironmentSimulator(EnvironmentTestCase):
         super(TestEnvironmentSimulator, self).setUp()
 
     def test_initialization(self):
+        # The scene cache is disabled in the tests.
+        self.assertEqual(self.environment.settings.get("scene_cache"), "")
+
         self.assertTrue(self.environment.has_location_check)
         self.assertIsNone(self.environment.old_location)
         home = self.environment.vehicle.home_location
@@ -36,8 +42,8 @@ class TestEnvironmentSimulator(EnvironmentTestCase):
         self.assertFalse(self.environment.has_location_check)
 
     def test_check_location(self):
-        with patch.object(Geometry_Spherical, "get_plane_intersection",
-                          side_effect=[(2,), (0.5,)]) as plane_intersection_mock:
+        with patch.object(Scene, "intersects",
+                          return_value=True) as intersects_mock:
             self.environment.vehicle.set_location(1.2, 2.1, 3.4)
             self.assertEqual(self.environment.old_location,
                              LocationLocal(1.2, 2.1, -3.4))
@@ -49,8 +55,49 @@ class TestEnvironmentSimulator(EnvironmentTestCase):
             # has some rounding due to coordinate precision.
             coord_delta = 0.02 / Geometry_Spherical.EARTH_RADIUS
 
-            self.assertEqual(plane_intersection_mock.call_count, 2)
-            args = plane_intersection_mock.call_args[0]
-            self.assertAlmostEqual(args[2].north, 3.5, delta=coord_delta)
-            self.assertAlmostEqual(args[2].east, 5.3, delta=coord_delta)
-            self.assertAlmostEqual(args[2].down, -7.9, delta=coord_delta)
+            self.assertEqual(intersects_mock.call_count, 1)
+            args = intersects_mock.call_args[0]
+            self.assertAlmostEqual(args[1].north, 3.5, delta=coord_delta)
+            self.assertAlmostEqual(args[1].east, 5.3, delta=coord_delta)
+            self.assertAlmostEqual(args[1].down, -7.9, delta=coord_delta)
+
+    def test_check_location_scene(self):
+        # Moving within the open space of the scene is allowed, but flying
+        # through the walls of the objects in the scene is detected.
+        self.environment.vehicle.set_location(0, 0, 1)
+        self.environment.vehicle.set_location(0, 1, 1)
+        with self.assertRaises(RuntimeError):
+            self.environment.vehicle.set_location(0, 20, 5)
+
+    def test_get_test_objects(self):
+        objects = self.environment._get_test_objects()
+        self.assertEqual(len(objects), 5)
+        self.assertIsInstance(objects[0], dict)
+        for obj in objects[1:]:
+            self.assertIsInstance(obj, tuple)
+            self.assertEqual(len(obj), 4)
+
+    def test_get_scene(self):
+        # The faces of the objects from the scene file are compiled.
+        scene = self.environment.get_scene()
+        self.assertIsInstance(scene, Scene)
+        faces = sum(len(obj) for obj in self.environment.get_objects())
+        self.assertEqual(scene.count, faces)
+
+        # The hardcoded objects do not have any faces to compile.
+        self.environment._load_objects()
+        self.assertEqual(self.environment.get_scene().count, 0)
+
+    def test_load_objects(self):
+        # Relative cache directories are within the package directory rather
+        # than the current working directory.
+        self.environment.settings.set("scene_cache", "cache")
+        package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with patch.object(VRML_Loader, "get_objects", return_value=[]):
+            with patch.object(VRML_Loader, "__init__",
+                              return_value=None) as init_mock:
+                self.environment._load_objects(scenefile="tests/vrml/castle.wrl")
+                self.assertEqual(init_mock.call_args[1]["cache_directory"],
+                                 os.path.join(package_directory, "cache"))
+
+        self.assertEqual(self.environment.get_objects(), [])
@@ -1,3 +1,9 @@
+import os
+import shutil
+import struct
+import tempfile
+import numpy as np
+from mock import patch
 from ..environment.VRML_Loader import VRML_Loader
 from environment import EnvironmentTestCase
 
@@ -9,6 +15,45 @@ class TestEnvironmentVRMLLoader(EnvironmentTestCase):
 
         super(TestEnvironmentVRMLLoader, self).setUp()
 
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        super(TestEnvironmentVRMLLoader, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def _copy_scene(self, *names):
+        """
+        Copy VRML scene files with the given `names` to the temporary directory
+        and return the path to the first copied scene file.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        paths = []
+        for name in names:
+            path = os.path.join(self.directory, "{}.wrl".format(name))
+            shutil.copy("tests/vrml/{}.wrl".format(name), path)
+            paths.append(path)
+
+        return paths[0]
+
+    def _check_objects(self, objects, expected_objects):
+        """
+        Check whether the `objects` have the same faces and point locations
+        as the `expected_objects`.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        self.assertEqual(len(objects), len(expected_objects))
+        for obj, expected_obj in zip(objects, expected_objects):
+            self.assertEqual(len(obj), len(expected_obj))
+            for face, expected_face in zip(obj, expected_obj):
+                self.assertEqual(len(face), len(expected_face))
+                for point, expected_point in zip(face, expected_face):
+                    self.assertEqual(point, expected_point)
+
     def test_initialization(self):
         filename = "tests/vrml/castle.wrl"
         # Translation must have correct length.
@@ -19,6 +64,9 @@ class TestEnvironmentVRMLLoader(EnvironmentTestCase):
         self.assertEqual(loader.environment, self.environment)
         self.assertEqual(loader.filename, filename)
         self.assertEqual(loader.translation, (1, 2, 3))
+        self.assertIsNone(loader._cache_directory)
+        self.assertEqual(loader._files, [filename])
+        self.assertIsNone(loader._objects)
 
     def test_get_objects(self):
         filename = "tests/vrml/castle.wrl"
@@ -33,3 +81,204 @@ class TestEnvironmentVRMLLoader(EnvironmentTestCase):
         loader = VRML_Loader(self.environment, "tests/vrml/inline.wrl")
         self.assertEqual(loader.translation, (0, 0, 0))
         self.assertEqual(len(loader.get_objects()), 15)
+
+        # The objects are parsed only once.
+        with patch.object(loader, "_parse") as parse_mock:
+            loader.get_objects()
+            parse_mock.assert_not_called()
+
+        # Objects from a cached scene file are the same as from the parser.
+        loader = VRML_Loader(self.environment, filename,
+                             translation=[40.0, 3.14, 5.67],
+                             cache_directory=self.cache_directory)
+        objects = loader.get_objects()
+        self.assertTrue(os.path.exists(loader.get_cache_filename()))
+
+        loader = VRML_Loader(self.environment, filename,
+                             translation=[40.0, 3.14, 5.67],
+                             cache_directory=self.cache_directory)
+        with patch.object(loader, "_parse") as parse_mock:
+            self._check_objects(loader.get_objects(), objects)
+            parse_mock.assert_not_called()
+
+    def test_get_cache_filename(self):
+        filename = "tests/vrml/castle.wrl"
+        loader = VRML_Loader(self.environment, filename)
+        self.assertIsNone(loader.get_cache_filename())
+
+        loader = VRML_Loader(self.environment, filename,
+                             cache_directory=self.cache_directory)
+        cache_filename = loader.get_cache_filename()
+        self.assertEqual(os.path.dirname(cache_filename), self.cache_directory)
+        self.assertTrue(cache_filename.endswith(".npz"))
+
+        # The cache file depends on the absolute path and the translation.
+        other_loader = VRML_Loader(self.environment,
+                                   os.path.abspath(filename),
+                                   cache_directory=self.cache_directory)
+        self.assertEqual(other_loader.get_cache_filename(), cache_filename)
+
+        other_loader = VRML_Loader(self.environment, filename,
+                                   translation=[1, 2, 3],
+                                   cache_directory=self.cache_directory)
+        self.assertNotEqual(other_loader.get_cache_filename(), cache_filename)
+
+    def test_get_modification_times(self):
+        path = self._copy_scene("deranged_house")
+        os.utime(path, (1234.0, 5678.0))
+
+        loader = VRML_Loader(self.environment, path)
+        mtimes = loader._get_modification_times([path, path])
+        self.assertEqual(mtimes.tolist(), [5678.0, 5678.0])
+
+    def test_load_cache(self):
+        path = self._copy_scene("inline", "trees_river")
+        inline_path = os.path.join(self.directory, "trees_river.wrl")
+        os.utime(inline_path, (1000.0, 1000.0))
+
+        # Without a cache directory or cache file, nothing is loaded.
+        loader = VRML_Loader(self.environment, path)
+        self.assertIsNone(loader._load_cache())
+
+        loader = VRML_Loader(self.environment, path,
+                             cache_directory=self.cache_directory)
+        self.assertIsNone(loader._load_cache())
+
+        arrays = loader._parse()
+        loader._save_cache(arrays)
+
+        cached_arrays = loader._load_cache()
+        self.assertEqual(cached_arrays["version"], VRML_Loader.CACHE_VERSION)
+        self.assertEqual(cached_arrays["files"].tolist(), [path, inline_path])
+        for key in ("points", "face_sizes", "object_sizes"):
+            self.assertTrue(np.array_equal(cached_arrays[key], arrays[key]))
+
+        # Changing the scene file or its inline files invalidates the cache.
+        os.utime(inline_path, (1010.0, 1010.0))
+        self.assertIsNone(loader._load_cache())
+        os.utime(inline_path, (1000.0, 1000.0))
+        self.assertIsNotNone(loader._load_cache())
+
+        os.remove(inline_path)
+        self.assertIsNone(loader._load_cache())
+
+        # Cache files with another format version are ignored.
+        with patch.object(VRML_Loader, "CACHE_VERSION", 0):
+            self.assertIsNone(loader._load_cache())
+
+        # Invalid cache files are ignored.
+        with open(loader.get_cache_filename(), 'w') as f:
+            f.write("foo")
+
+        self.assertIsNone(loader._load_cache())
+
+        with open(loader.get_cache_filename(), 'w') as f:
+            f.write("PK\x03\x04foo")
+
+        self.assertIsNone(loader._load_cache())
+
+        # Cache files with corrupted compressed data in a valid archive are
+        # ignored, and the scene is parsed instead.
+        self._copy_scene("trees_river")
+        loader._save_cache(arrays)
+        with open(loader.get_cache_filename(), 'rb') as f:
+            data = bytearray(f.read())
+
+        name_length, extra_length = struct.unpack("<HH", str(data[26:30]))
+        data[30 + name_length + extra_length] ^= 0xff
+        with open(loader.get_cache_filename(), 'wb') as f:
+            f.write(data)
+
+        self.assertIsNone(loader._load_cache())
+        objects = loader.get_objects()
+        self.assertNotEqual(objects, [])
+        self.assertIsNotNone(loader._load_cache())
+
+    def test_save_cache(self):
+        path = self._copy_scene("deranged_house")
+
+        # Without a cache directory, nothing is saved.
+        loader = VRML_Loader(self.environment, path)
+        loader._save_cache(loader._parse())
+        self.assertEqual(os.listdir(self.directory), ["deranged_house.wrl"])
+
+        # The cache directory is created and contains only the cache file.
+        loader = VRML_Loader(self.environment, path,
+                             cache_directory=self.cache_directory)
+        arrays = loader._parse()
+        loader._save_cache(arrays)
+        self.assertEqual(os.listdir(self.cache_directory),
+                         [os.path.basename(loader.get_cache_filename())])
+
+        with np.load(loader.get_cache_filename()) as data:
+            self.assertEqual(sorted(data.keys()), [
+                "face_sizes", "files", "mtimes", "object_sizes", "points",
+                "version"
+            ])
+            self.assertEqual(data["mtimes"].tolist(),
+                             [os.path.getmtime(path)])
+
+        # Errors while writing the cache file are logged and the scene is not
+        # cached, without leaving a temporary file behind.
+        os.remove(loader.get_cache_filename())
+        with patch("logging.warning") as warning_mock:
+            with patch("os.rename", side_effect=OSError):
+                loader._save_cache(arrays)
+
+            self.assertEqual(os.listdir(self.cache_directory), [])
+            self.assertEqual(warning_mock.call_count, 1)
+
+            loader = VRML_Loader(self.environment, path,
+                                 cache_directory=os.path.join(path, "cache"))
+            self.assertNotEqual(loader.get_objects(), [])
+            self.assertEqual(warning_mock.call_count, 2)
+            self.assertFalse(os.path.exists(loader.get_cache_filename()))
+
+    def test_parse(self):
+        loader = VRML_Loader(self.environment, "tests/vrml/deranged_house.wrl",
+                             translation=[1, 2, 3])
+        arrays = loader._parse()
+
+        self.assertEqual(arrays["object_sizes"].tolist(), [68, 96])
+        self.assertEqual(len(arrays["face_sizes"]), 164)
+        self.assertEqual(arrays["points"].shape,
+                         (arrays["face_sizes"].sum(), 3))
+        self.assertEqual(arrays["files"].tolist(),
+                         ["tests/vrml/deranged_house.wrl"])
+
+        # Scenes without shapes have no points.
+        path = os.path.join(self.directory, "empty.wrl")
+        with open(path, 'w') as f:
+            f.write("#VRML V2.0 utf8\nGroup { children [] }\n")
+
+        loader = VRML_Loader(self.environment, path)
+        arrays = loader._parse()
+        self.assertEqual(arrays["points"].shape, (0, 3))
+        self.assertEqual(arrays["face_sizes"].tolist(), [])
+        self.assertEqual(arrays["object_sizes"].tolist(), [])
+        self.assertEqual(loader.get_objects(), [])
+
+    def test_build_objects(self):
+        loader = VRML_Loader(self.environment, "tests/vrml/castle.wrl")
+        arrays = {
+            "points": np.array([
+                [0, 0, 0], [1, 0, 0], [1, 1, 0], [2, 2, 2], [3, 2, 2],
+                [3, 3, 2]
+            ], dtype=np.float),
+            "face_sizes": np.array([3, 0, 3]),
+            "object_sizes": np.array([2, 0, 1])
+        }
+
+        get_location = self.environment.get_location
+        self._check_objects(loader._build_objects(arrays), [
+            [
+                [get_location(0, 0, 0), get_location(1, 0, 0),
+                 get_location(1, 1, 0)],
+                []
+            ],
+            [],
+            [
+                [get_location(2, 2, 2), get_location(3, 2, 2),
+                 get_location(3, 3, 2)]
+            ]
+        ])
@@ -1,3 +1,4 @@
+import heapq
 import math
 import numpy as np
 from ..bench.Method_Coverage import covers
@@ -28,6 +29,55 @@ class TestLocationAStar(EnvironmentTestCase):
         self.assertEqual(self.astar._resolution, self.resolution)
         self.assertEqual(self.astar._size, self.size * self.resolution)
 
+        # The search grid has a border around the memory map.
+        width = self.size * self.resolution + 2
+        self.assertEqual(self.astar._width, width)
+        self.assertEqual(self.astar._neighbor_nodes, [
+            width - 1, width, width + 1, -1, 1, -width - 1, -width, -width + 1
+        ])
+        self.assertEqual(self.astar._border.shape, (width**2,))
+        self.assertEqual(self.astar._border.sum(), 4 * width - 4)
+        self.assertTrue(self.astar._border[0])
+        self.assertFalse(self.astar._border[width + 1])
+
+    def test_get_node(self):
+        width = self.astar._width
+        self.assertEqual(self.astar._get_node((0, 0)), width + 1)
+        self.assertEqual(self.astar._get_node((2, 3)), 3 * width + 4)
+        self.assertEqual(self.astar._get_node((-1, -1)), 0)
+
+    def test_get_index(self):
+        for idx in [(0, 0), (2, 3), (-1, -1), (49, 50)]:
+            node = self.astar._get_node(idx)
+            self.assertEqual(self.astar._get_index(node), idx)
+            self.assertEqual(self.astar._get_index(np.int64(node)), idx)
+
+        index = self.astar._get_index(np.int64(self.astar._width + 1))
+        self.assertIsInstance(index[0], int)
+        self.assertIsInstance(index[1], int)
+
+    def test_pop(self):
+        size = self.astar._width**2
+        self.astar._open = np.zeros(size, dtype=np.bool)
+        self.astar._f = np.full(size, np.inf)
+        self.astar._heap = []
+
+        # Entries of closed nodes and entries with outdated costs are skipped.
+        self.astar._open[[1, 2, 3]] = True
+        self.astar._f[[1, 2, 3]] = [5.0, 2.0, 3.0]
+        for entry in [(1.0, 4), (2.0, 2), (3.0, 3), (4.0, 2), (6.0, 1),
+                      (5.0, 1), (0.5, 2)]:
+            heapq.heappush(self.astar._heap, entry)
+
+        self.assertEqual(self.astar._pop(), 2)
+        self.astar._open[2] = False
+        self.assertEqual(self.astar._pop(), 3)
+        self.astar._open[3] = False
+        self.assertEqual(self.astar._pop(), 1)
+        self.astar._open[1] = False
+        self.assertIsNone(self.astar._pop())
+        self.assertEqual(self.astar._heap, [])
+
     def test_assign(self):
         # Add some walls to the memory map
         for i in range(self.resolution * 2, (self.size - 2) * self.resolution):
@@ -73,6 +123,14 @@ class TestLocationAStar(EnvironmentTestCase):
         self.assertEqual(distance, np.inf)
         self.assertEqual(direction, east)
 
+        # There is no path from a start location outside the memory map.
+        start = self.environment.get_location(-50, 0, self.altitude)
+        path, trend, distance, direction = self.astar.assign(start, end, 1.0,
+                                                             direction=east)
+        self.assertEqual(path, [])
+        self.assertEqual(distance, np.inf)
+        self.assertEqual(direction, east)
+
     def test_assign_impossible(self):
         for i in range(self.size * self.resolution):
             self.memory_map.set((i, 20), 1)
@@ -105,6 +163,23 @@ class TestLocationAStar(EnvironmentTestCase):
         self.assertTrue(0 < distance < np.inf)
         self.assertTrue(0 <= direction <= 2*math.pi)
 
+    def test_assign_shortest(self):
+        # Without obstacles, the shortest path has as many diagonal steps as
+        # possible and goes straight ahead for the remainder.
+        astar = AStar(self.geometry, self.memory_map, use_indices=True)
+        path, trend, distance, direction = astar.assign((5, 5), (15, 40), 1.0)
+
+        self.assertEqual(len(path), 35)
+        self.assertEqual(path[-1], (15, 40))
+        self.assertEqual(trend[-1], (15, 40))
+        self.assertAlmostEqual(distance,
+                               (10 * math.sqrt(2) + 25) / self.resolution,
+                               delta=0.01)
+        self.assertTrue(0 <= direction <= 2*math.pi)
+        for idx in path:
+            self.assertIsInstance(idx[0], int)
+            self.assertIsInstance(idx[1], int)
+
     def test_assign_equal(self):
         start = self.environment.get_location(4, 4, self.altitude)
         path, trend, distance, direction = self.astar.assign(start, start, 1.0,
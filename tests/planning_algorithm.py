@@ -0,0 +1,384 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+import numpy as np
+from mock import patch, MagicMock
+from ..bench.Method_Coverage import covers
+from ..planning.Algorithm import Algorithm, NSGA, SMS_EMOA, \
+    _initialize_worker, _evaluate_worker
+from ..planning.Hypervolume_Archive import Hypervolume_Archive
+from ..planning.Pareto_Archive import Pareto_Archive
+from ..planning.Problem import Problem
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class Convex_Problem(Problem):
+    """
+    Problem with two variables and two objectives whose Pareto front is convex.
+    """
+
+    def __init__(self):
+        super(Convex_Problem, self).__init__(2)
+
+    def get_objectives(self):
+        return [
+            lambda x: x[0],
+            lambda x: 1 - np.sqrt(x[0]) + x[1]
+        ]
+
+    def get_objective_names(self):
+        return ["first", "second"]
+
+class PlanningAlgorithmTestCase(SettingsTestCase):
+    """
+    Test case base class for evolutionary algorithms of planning problems.
+    """
+
+    def setUp(self):
+        super(PlanningAlgorithmTestCase, self).setUp()
+
+        self.problem = Convex_Problem()
+        self.arguments = Arguments("settings.json", [
+            "--population-size", "8", "--iteration-limit", "30",
+            "--iteration-callback", "10", "--step-size", "0.1"
+        ])
+        self.settings = self.arguments.get_settings("planning_algorithm")
+
+    def _evolve(self, algorithm_class, processes=1, offspring_size=1):
+        """
+        Run the algorithm with the given `algorithm_class` from a fixed random
+        seed using a number of worker `processes` and `offspring_size`.
+
+        Returns the algorithm and the results of the run.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        self.settings.set("processes", processes)
+        self.settings.set("offspring_size", offspring_size)
+        algorithm = algorithm_class(self.problem, self.arguments)
+
+        np.random.seed(42)
+        with patch.object(algorithm, "_is_single_threaded", return_value=True):
+            results = algorithm.evolve()
+
+        return algorithm, results
+
+    def _check_front(self, algorithm, P, Objectives, Feasible):
+        """
+        Check whether the results of a run of the `algorithm` have a valid
+        population and nondominated front.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        self.assertEqual(len(P), algorithm.mu)
+        self.assertEqual(len(Objectives), algorithm.mu)
+        self.assertEqual(len(Feasible), algorithm.mu)
+        self.assertTrue(all(Feasible))
+
+        front = [Objectives[algorithm._indices[key]]
+                 for key in algorithm._archive.get_front()]
+        self.assertEqual(front, sorted(front))
+        for current, following in zip(front, front[1:]):
+            self.assertGreater(current[1], following[1])
+
+    def _check_results(self, results, expected_results):
+        """
+        Check whether the results of a run are the same as `expected_results`.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        P, Objectives, Feasible = results
+        expected_P, expected_Objectives, expected_Feasible = expected_results
+        self.assertEqual(len(P), len(expected_P))
+        for point, expected_point in zip(P, expected_P):
+            self.assertEqual(point.tolist(), expected_point.tolist())
+
+        self.assertEqual(Objectives, expected_Objectives)
+        self.assertEqual(Feasible, expected_Feasible)
+
+class TestPlanningAlgorithm(PlanningAlgorithmTestCase):
+    def setUp(self):
+        super(TestPlanningAlgorithm, self).setUp()
+
+        self.algorithm = Algorithm(self.problem, self.arguments)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Algorithm(self.problem, None)
+
+        # Problems with an unsupported number of objectives are rejected.
+        self.problem.objectives.append(lambda x: x[1])
+        with self.assertRaisesRegexp(ValueError, "NSGA-II .* 3 objectives"):
+            NSGA(self.problem, self.arguments)
+
+        SMS_EMOA(self.problem, self.arguments)
+        self.problem.objectives.pop()
+
+        self.assertEqual(self.algorithm.problem, self.problem)
+        self.assertEqual(self.algorithm.mu, 8)
+        self.assertEqual(self.algorithm.t_current, 0)
+        self.assertEqual(self.algorithm.t_max, 30)
+        self.assertEqual(self.algorithm.t_callback, 10)
+        self.assertIsNone(self.algorithm.iteration_callback)
+        self.assertEqual(self.algorithm.offspring_size, 1)
+        self.assertEqual(self.algorithm.processes, 1)
+        self.assertIsNone(self.algorithm._pool)
+        self.assertIsNone(self.algorithm._archive)
+        self.assertEqual(self.algorithm._keys, [])
+        self.assertEqual(self.algorithm._indices, {})
+        self.assertIsNone(self.algorithm._key_count)
+        self.assertEqual(self.algorithm.steps.tolist(), [0.1, 0.1])
+
+    def test_set_iteration_callback(self):
+        with self.assertRaises(TypeError):
+            self.algorithm.set_iteration_callback(None)
+
+        callback = MagicMock()
+        self.algorithm.set_iteration_callback(callback)
+        self.assertEqual(self.algorithm.iteration_callback, callback)
+
+    def test_evolve(self):
+        callback = MagicMock()
+        self.settings.set("processes", 1)
+        algorithm = NSGA(self.problem, self.arguments)
+        algorithm.set_iteration_callback(callback)
+
+        np.random.seed(42)
+        with patch("multiprocessing.Pool") as pool_mock:
+            P, Objectives, Feasible = algorithm.evolve()
+            pool_mock.assert_not_called()
+
+        self._check_front(algorithm, P, Objectives, Feasible)
+        self.assertEqual(algorithm.t_current, 30)
+        self.assertEqual(callback.call_count, 4)
+        for i, call in enumerate(callback.call_args_list):
+            args = call[0]
+            self.assertEqual(args[0], algorithm)
+            self.assertEqual(args[1]["iteration"], i * 10)
+            self.assertEqual(args[1]["population"], P)
+            self.assertEqual(sorted(args[1]["deletions"].keys()),
+                             ["contribution", "dominated", "infeasible"])
+
+        deletions = callback.call_args[0][1]["deletions"]
+        self.assertEqual(sum(deletions.values()), 30)
+
+    @covers("evolve")
+    def test_evolve_generational(self):
+        algorithm, results = self._evolve(NSGA, offspring_size=5)
+        self._check_front(algorithm, *results)
+
+        # Each iteration creates and evaluates the offspring together.
+        self.settings.set("offspring_size", 5)
+        algorithm = NSGA(self.problem, self.arguments)
+        np.random.seed(42)
+        with patch.object(self.problem, "mutate",
+                          wraps=self.problem.mutate) as mutate_mock:
+            with patch.object(algorithm, "_evaluate",
+                              wraps=algorithm._evaluate) as evaluate_mock:
+                self._check_results(algorithm.evolve(), results)
+
+                self.assertEqual(mutate_mock.call_count, 30 * 5)
+                self.assertEqual(evaluate_mock.call_count, 1 + 30)
+                sizes = [len(call[0][0])
+                         for call in evaluate_mock.call_args_list]
+                self.assertEqual(sizes, [8] + [5] * 30)
+
+    @covers("evolve")
+    def test_evolve_processes(self):
+        # The pooled evaluation gives the same results as the evaluation in
+        # the process of the algorithm itself.
+        for algorithm_class in (NSGA, SMS_EMOA):
+            serial_results = self._evolve(algorithm_class, offspring_size=4)[1]
+            with patch("multiprocessing.Pool",
+                       wraps=multiprocessing.Pool) as pool_mock:
+                algorithm, results = self._evolve(algorithm_class, processes=3,
+                                                  offspring_size=4)
+                self.assertEqual(pool_mock.call_count, 1)
+
+            self.assertIsNone(algorithm._pool)
+            self._check_results(results, serial_results)
+
+        # The pool is not used when there may be other threads.
+        self.settings.set("processes", 3)
+        algorithm = NSGA(self.problem, self.arguments)
+        with patch.object(algorithm, "_is_single_threaded", return_value=False):
+            with patch("multiprocessing.Pool") as pool_mock:
+                algorithm.evolve()
+                pool_mock.assert_not_called()
+
+        # The pool is cleaned up when the run fails.
+        algorithm = NSGA(self.problem, self.arguments)
+        with patch.object(algorithm, "_is_single_threaded", return_value=True):
+            with patch.object(algorithm, "_evolve", side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    algorithm.evolve()
+
+        self.assertIsNone(algorithm._pool)
+
+    def test_is_single_threaded(self):
+        with patch.object(threading, "active_count", return_value=1):
+            self.assertTrue(self.algorithm._is_single_threaded())
+
+        with patch.object(threading, "active_count", return_value=2):
+            self.assertFalse(self.algorithm._is_single_threaded())
+
+        results = []
+        with patch.object(threading, "active_count", return_value=1):
+            thread = threading.Thread(target=lambda: results.append(
+                self.algorithm._is_single_threaded()
+            ))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(results, [False])
+
+    def test_evaluate(self):
+        points = [np.array([0.1 * i, 0.05 * i]) for i in range(7)]
+        expected = self.problem.evaluate(points)
+        self.assertEqual(self.algorithm._evaluate(points), expected)
+
+        # The points are split into contiguous chunks for the workers.
+        self.algorithm.processes = 3
+        self.algorithm._pool = MagicMock()
+        self.algorithm._pool.map.side_effect = lambda function, chunks: [
+            self.problem.evaluate(chunk) for chunk in chunks
+        ]
+        self.assertEqual(self.algorithm._evaluate(points), expected)
+        chunks = self.algorithm._pool.map.call_args[0][1]
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+
+        # A single point is evaluated without the pool.
+        self.algorithm._pool.map.reset_mock()
+        self.assertEqual(self.algorithm._evaluate(points[:1]),
+                         self.problem.evaluate(points[:1]))
+        self.algorithm._pool.map.assert_not_called()
+
+        # The worker processes evaluate the points with their problem.
+        _initialize_worker(self.problem)
+        self.assertEqual(_evaluate_worker(points), expected)
+
+    def test_KLP(self):
+        Objectives = [[1.0, 5.0], [2.0, 6.0], [3.0, 2.0], [4.0, 2.0]]
+        T, todelete = self.algorithm.KLP([0, 1, 2, 3], Objectives)
+        self.assertEqual(T, OrderedDict([(0, [1.0, 5.0]), (2, [3.0, 2.0])]))
+        self.assertEqual(todelete, [0, 2])
+
+        Objectives = [[1.0, np.inf], [2.0, np.inf]]
+        T, todelete = self.algorithm.KLP([1, 0], Objectives)
+        self.assertEqual(T, OrderedDict([(1, [2.0, np.inf]),
+                                         (0, [1.0, np.inf])]))
+        self.assertEqual(todelete, [0, 1])
+
+    def test_sort_nondominated(self):
+        Objectives = [[4.0, 2.0], [1.0, 5.0], [2.0, 6.0], [3.0, 2.0]]
+        R = self.algorithm.sort_nondominated(Objectives)
+        self.assertEqual(R, [
+            OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0])]),
+            OrderedDict([(2, [2.0, 6.0]), (0, [4.0, 2.0])])
+        ])
+
+        R = self.algorithm.sort_nondominated(Objectives, all_layers=False)
+        self.assertEqual(R, [
+            OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0])]),
+            OrderedDict([(2, [2.0, 6.0]), (0, [4.0, 2.0])])
+        ])
+
+        R = self.algorithm.sort_nondominated(Objectives[1:2],
+                                             all_layers=False)
+        self.assertEqual(R, [OrderedDict([(0, [1.0, 5.0])])])
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk), Rk)
+
+    def test_supports_objectives(self):
+        self.assertFalse(self.algorithm.supports_objectives(1))
+        self.assertTrue(self.algorithm.supports_objectives(2))
+        self.assertFalse(self.algorithm.supports_objectives(3))
+
+    def test_get_archive(self):
+        self.assertIsInstance(self.algorithm.get_archive(), Pareto_Archive)
+
+    def test_get_contribution(self):
+        with self.assertRaises(NotImplementedError):
+            self.algorithm.get_contribution(None, [1.0, 2.0], None)
+
+    def test_get_name(self):
+        with self.assertRaises(NotImplementedError):
+            self.algorithm.get_name()
+
+@covers(NSGA)
+class TestPlanningAlgorithmNSGA(PlanningAlgorithmTestCase):
+    def setUp(self):
+        super(TestPlanningAlgorithmNSGA, self).setUp()
+
+        self.algorithm = NSGA(self.problem, self.arguments)
+
+    def test_crowding_distance(self):
+        self.assertEqual(self.algorithm.crowding_distance(OrderedDict()).tolist(),
+                         [])
+
+        Rk = OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0]), (4, [2.0, 3.0])])
+        C = self.algorithm.crowding_distance(Rk)
+        self.assertEqual(C.tolist(), [np.inf, np.inf, 2 * 2.0 + 2 * 3.0])
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0]), (4, [2.0, 3.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk).tolist(),
+                         self.algorithm.crowding_distance(Rk).tolist())
+
+    def test_get_contribution(self):
+        self.assertEqual(self.algorithm.get_contribution(None, [1.0, 5.0],
+                                                         [2.0, 3.0]),
+                         np.inf)
+        self.assertEqual(self.algorithm.get_contribution([1.0, 5.0],
+                                                         [2.0, 3.0],
+                                                         [3.0, 2.0]),
+                         2 * 2.0 + 2 * 3.0)
+
+    def test_get_name(self):
+        self.assertEqual(self.algorithm.get_name(), "NSGA-II")
+
+@covers(SMS_EMOA)
+class TestPlanningAlgorithmSMSEMOA(PlanningAlgorithmTestCase):
+    def setUp(self):
+        super(TestPlanningAlgorithmSMSEMOA, self).setUp()
+
+        self.algorithm = SMS_EMOA(self.problem, self.arguments)
+
+    def test_hypervolume_contribution(self):
+        Rk = OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0]), (4, [2.0, 3.0])])
+        C = self.algorithm.hypervolume_contribution(Rk)
+        self.assertEqual(C.tolist(), [np.inf, np.inf, 2.0])
+
+    def test_sort_contribution(self):
+        Rk = OrderedDict([(1, [1.0, 5.0]), (3, [3.0, 2.0]), (4, [2.0, 3.0])])
+        self.assertEqual(self.algorithm.sort_contribution(Rk).tolist(),
+                         self.algorithm.hypervolume_contribution(Rk).tolist())
+
+    def test_supports_objectives(self):
+        self.assertFalse(self.algorithm.supports_objectives(1))
+        self.assertTrue(self.algorithm.supports_objectives(2))
+        self.assertTrue(self.algorithm.supports_objectives(3))
+
+    def test_get_archive(self):
+        self.assertIsInstance(self.algorithm.get_archive(), Pareto_Archive)
+
+        self.problem.objectives.append(lambda x: x[1])
+        self.assertIsInstance(self.algorithm.get_archive(),
+                              Hypervolume_Archive)
+
+    def test_get_contribution(self):
+        self.assertEqual(self.algorithm.get_contribution([1.0, 5.0],
+                                                         [2.0, 3.0], None),
+                         np.inf)
+        self.assertEqual(self.algorithm.get_contribution([1.0, 5.0],
+                                                         [2.0, 3.0],
+                                                         [3.0, 2.0]),
+                         2.0)
+
+    def test_get_name(self):
+        self.assertEqual(self.algorithm.get_name(), "SMS-EMOA")
@@ -0,0 +1,162 @@
+import numpy as np
+from ..planning.Hypervolume_Archive import Hypervolume_Archive
+from planning_pareto_archive import TestPlanningParetoArchive
+
+class TestPlanningHypervolumeArchive(TestPlanningParetoArchive):
+    """
+    Hypervolume archive test case.
+
+    This tests the `Hypervolume_Archive` class with two objectives using the
+    tests of `TestPlanningParetoArchive`, since its contributions are the same
+    for nondominated fronts with two objectives, but some tests are overridden
+    here and additional tests check fronts with three objectives.
+    """
+
+    def setUp(self):
+        self.archive = Hypervolume_Archive(2)
+
+    def test_init(self):
+        super(TestPlanningHypervolumeArchive, self).test_init()
+
+        self.assertEqual(self.archive._dimension, 2)
+        self.assertEqual(self.archive._front_points.shape, (0, 2))
+        self.assertIsNone(self.archive._ideal)
+        self.assertIsNone(self.archive._reference)
+
+    def test_add(self):
+        with self.assertRaises(ValueError):
+            self.archive.add(0, [1.0, 2.0, 3.0])
+
+        self.archive.add(0, [1.0, 5.0])
+        self.archive.add(1, [5.0, 1.0])
+        self.archive.add(2, [3.0, 3.0])
+        self.assertEqual(self.archive.get_front(), [0, 2, 1])
+        self.assertEqual(self.archive._contributions, {
+            0: np.inf,
+            1: np.inf,
+            2: 4.0
+        })
+
+        self.archive.add(3, [0.0, 0.0], feasible=False)
+        self.assertEqual(self.archive._infeasible, ([3], {3: 0}))
+
+        self.archive.add(4, [4.0, 3.0])
+        self.archive.add(5, [1.0, 5.0])
+        self.assertEqual(self.archive._dominated, ([4, 5], {4: 0, 5: 1}))
+
+        self.archive.add(6, [2.0, 2.0])
+        self.assertEqual(self.archive.get_front(), [0, 6, 1])
+        self.assertEqual(self.archive._dominated[0], [4, 5, 2])
+        self.assertNotIn(2, self.archive._contributions)
+        self.assertEqual(self.archive._contributions[6], 9.0)
+
+    def test_add_heap_rebuild(self):
+        # Every new individual changes the best objective values, so all the
+        # contributions are recalculated, which causes rebuilds of the heap.
+        for key in range(20):
+            self.archive.add(key, [float(key), -float(key)])
+
+        self.assertLessEqual(len(self.archive._heap),
+                             2 * len(self.archive._contributions) + 16)
+
+    def test_add_three_objectives(self):
+        archive = Hypervolume_Archive(3)
+        archive.add(0, [0.0, 4.0, 4.0])
+        archive.add(1, [4.0, 0.0, 4.0])
+        archive.add(2, [4.0, 4.0, 0.0])
+        archive.add(3, [2.0, 2.0, 2.0])
+
+        self.assertEqual(archive._reference.tolist(), [4.4, 4.4, 4.4])
+        self.assertEqual(archive._contributions[0], np.inf)
+
+        # The exclusive hypervolume of the middle individual is its box to the
+        # reference point, minus the parts dominated by the others.
+        expected = 2.4 ** 3 - 3 * (2.4 * 0.4 * 0.4) + 3 * 0.4 ** 3 - 0.4 ** 3
+        self.assertAlmostEqual(archive._contributions[3], expected)
+
+        # Individuals that are not affected by a new individual keep their
+        # contribution without a recalculation.
+        heap_size = len(archive._heap)
+        archive.add(4, [1.0, 1.0, 4.0])
+        self.assertEqual(archive.get_front(), [0, 4, 3, 1, 2])
+        self.assertEqual(len(archive._heap), heap_size + 4)
+        self.assertLess(archive._contributions[3], expected)
+
+        # Adding a dominating individual removes dominated individuals.
+        archive.add(5, [1.0, 1.0, 1.0])
+        self.assertEqual(archive.get_front(), [0, 5, 1, 2])
+        self.assertEqual(archive._dominated[0], [3, 4])
+
+    def test_remove(self):
+        super(TestPlanningHypervolumeArchive, self).test_remove()
+
+        # Removing the last individual from the front does not recalculate
+        # any contributions.
+        self.archive.remove(1)
+        self.archive.remove(5)
+        self.assertEqual(self.archive.get_front(), [])
+        self.assertEqual(self.archive._contributions, {})
+
+    def test_get_front(self):
+        super(TestPlanningHypervolumeArchive, self).test_get_front()
+
+        archive = Hypervolume_Archive(3)
+        archive.add(0, [2.0, 1.0, 3.0])
+        archive.add(1, [1.0, 2.0, 3.0])
+        archive.add(2, [1.0, 3.0, 2.0])
+        self.assertEqual(archive.get_front(), [1, 2, 0])
+
+    def test_get_nondominated(self):
+        points = np.array([
+            [1.0, 2.0, 3.0],
+            [1.0, 2.0, 4.0],
+            [3.0, 2.0, 1.0],
+            [1.0, 2.0, 3.0]
+        ])
+        nondominated = self.archive._get_nondominated(points)
+        self.assertEqual(nondominated.tolist(),
+                         [[1.0, 2.0, 3.0], [3.0, 2.0, 1.0]])
+
+    def test_get_hypervolume(self):
+        reference = np.array([4.0, 4.0, 4.0])
+        self.assertEqual(self.archive._get_hypervolume(np.empty((0, 3)),
+                                                       reference), 0.0)
+
+        points = np.array([[2.0, 2.0, 2.0]])
+        self.assertEqual(self.archive._get_hypervolume(points, reference), 8.0)
+
+        points = np.array([[1.0, 3.0, 3.0], [3.0, 1.0, 3.0], [2.0, 2.0, 2.0]])
+        # Two boxes of 3 * 1 * 1 and one of 2 * 2 * 2, with overlaps between
+        # the pairs of boxes and one overlap between all of them.
+        self.assertEqual(self.archive._get_hypervolume(points, reference),
+                         2 * 3.0 + 8.0 - (1.0 + 2 * 2.0) + 1.0)
+
+        points = np.array([[1.0, 3.0], [3.0, 1.0], [2.0, 2.0]])
+        self.assertEqual(self.archive._get_hypervolume(points, reference[:2]),
+                         6.0)
+
+    def test_get_exclusive_hypervolume(self):
+        reference = np.array([4.0, 4.0, 4.0])
+        point = np.array([2.0, 2.0, 2.0])
+        self.assertEqual(self.archive._get_exclusive_hypervolume(
+            point, np.empty((0, 3)), reference
+        ), 8.0)
+
+        others = np.array([[1.0, 3.0, 3.0], [3.0, 1.0, 3.0]])
+        self.assertEqual(self.archive._get_exclusive_hypervolume(
+            point, others, reference
+        ), 8.0 - (2 * 2.0 - 1.0))
+
+    def test_get_affected(self):
+        points = np.array([[1.0, 3.0, 3.0], [3.0, 1.0, 3.0], [2.0, 2.0, 2.0]])
+        point = np.array([3.0, 3.0, 1.0])
+
+        # The corners between the outer points and the new point are dominated
+        # by the other outer point, so only the middle point is affected.
+        affected = self.archive._get_affected(points, point, points)
+        self.assertEqual(affected.tolist(), [False, False, True])
+
+        # Additional dominators are taken into account for all points.
+        dominators = np.vstack([points, [[2.0, 2.0, 2.0]]])
+        affected = self.archive._get_affected(points, point, dominators)
+        self.assertEqual(affected.tolist(), [False, False, False])
@@ -0,0 +1,143 @@
+import unittest
+import numpy as np
+from ..planning.Pareto_Archive import Pareto_Archive
+
+class TestPlanningParetoArchive(unittest.TestCase):
+    def setUp(self):
+        # Use the two-dimensional hypervolume contribution, with an infinite
+        # contribution for the individuals at the boundaries of the front.
+        def contribution(previous, current, following):
+            if previous is None or following is None:
+                return np.inf
+
+            return (previous[1] - current[1]) * (following[0] - current[0])
+
+        self.archive = Pareto_Archive(contribution)
+
+    def test_init(self):
+        self.assertEqual(self.archive._objectives, {})
+        self.assertEqual(self.archive._front_keys, [])
+        self.assertEqual(self.archive._front_values, [])
+        self.assertEqual(self.archive._contributions, {})
+        self.assertEqual(self.archive._heap, [])
+        self.assertEqual(self.archive._dominated, ([], {}))
+        self.assertEqual(self.archive._infeasible, ([], {}))
+
+    def test_add(self):
+        with self.assertRaises(ValueError):
+            self.archive.add(0, [1.0, 2.0, 3.0])
+
+        self.archive.add(0, [1.0, 5.0])
+        self.archive.add(1, [5.0, 1.0])
+        self.archive.add(2, [3.0, 3.0])
+        self.assertEqual(self.archive.get_front(), [0, 2, 1])
+        self.assertEqual(self.archive._front_values, [1.0, 3.0, 5.0])
+        self.assertEqual(self.archive._contributions, {
+            0: np.inf,
+            1: np.inf,
+            2: 4.0
+        })
+
+        # Infeasible individuals are kept apart.
+        self.archive.add(3, [0.0, 0.0], feasible=False)
+        self.assertEqual(self.archive._infeasible, ([3], {3: 0}))
+        self.assertEqual(self.archive.get_front(), [0, 2, 1])
+
+        # Dominated individuals and duplicates do not enter the front.
+        self.archive.add(4, [4.0, 3.0])
+        self.archive.add(5, [1.0, 5.0])
+        self.assertEqual(self.archive._dominated, ([4, 5], {4: 0, 5: 1}))
+        self.assertEqual(self.archive.get_front(), [0, 2, 1])
+
+        # A new individual moves the individuals it dominates out of the front
+        # and updates the contributions of its neighbors.
+        self.archive.add(6, [2.0, 2.0])
+        self.assertEqual(self.archive.get_front(), [0, 6, 1])
+        self.assertEqual(self.archive._dominated[0], [4, 5, 2])
+        self.assertNotIn(2, self.archive._contributions)
+        self.assertEqual(self.archive._contributions[6], 9.0)
+
+        # An individual with the same first objective value but a lower second
+        # objective value dominates the existing individual.
+        self.archive.add(7, [1.0, 4.0])
+        self.assertEqual(self.archive.get_front(), [7, 6, 1])
+        self.assertEqual(self.archive._contributions[6], 6.0)
+
+    def test_add_heap_rebuild(self):
+        # Repeatedly updating the same individuals causes a rebuild of the
+        # heap, which then only contains current contributions.
+        self.archive.add(0, [0.0, 100.0])
+        self.archive.add(1, [100.0, 0.0])
+        for key in range(2, 30):
+            self.archive.add(key, [50.0, 100.0 - key])
+
+        self.assertEqual(self.archive.get_front(), [0, 29, 1])
+        self.assertLessEqual(len(self.archive._heap),
+                             2 * len(self.archive._contributions) + 16)
+
+        for key in range(2, 29):
+            self.archive.remove(key)
+
+        self.assertEqual(self.archive.get_worst(), (29, "contribution"))
+
+    def test_remove(self):
+        self.archive.add(0, [1.0, 5.0])
+        self.archive.add(1, [5.0, 1.0])
+        self.archive.add(2, [3.0, 3.0])
+        self.archive.add(3, [4.0, 4.0])
+        self.archive.add(4, [0.0, 0.0], feasible=False)
+        self.archive.add(5, [4.0, 3.5])
+
+        self.archive.remove(4)
+        self.assertEqual(self.archive._infeasible, ([], {}))
+        self.assertNotIn(4, self.archive._objectives)
+
+        self.archive.remove(3)
+        self.assertEqual(self.archive._dominated, ([5], {5: 0}))
+        self.assertNotIn(3, self.archive._objectives)
+
+        # Removing an individual from the front updates its neighbors and
+        # reinserts dominated individuals that are no longer dominated.
+        self.archive.remove(2)
+        self.assertEqual(self.archive.get_front(), [0, 5, 1])
+        self.assertEqual(self.archive._dominated, ([], {}))
+        self.assertEqual(self.archive._contributions[5], 1.5)
+
+        self.archive.remove(0)
+        self.assertEqual(self.archive.get_front(), [5, 1])
+        self.assertEqual(self.archive._contributions, {5: np.inf, 1: np.inf})
+
+    def test_get_front(self):
+        self.assertEqual(self.archive.get_front(), [])
+
+        self.archive.add(0, [2.0, 1.0])
+        self.archive.add(1, [1.0, 2.0])
+
+        front = self.archive.get_front()
+        self.assertEqual(front, [1, 0])
+
+        # The front is a copy.
+        front.append(2)
+        self.assertEqual(self.archive.get_front(), [1, 0])
+
+    def test_get_worst(self):
+        self.assertIsNone(self.archive.get_worst())
+
+        self.archive.add(0, [1.0, 5.0])
+        self.archive.add(1, [5.0, 1.0])
+        self.archive.add(2, [2.0, 3.0])
+        self.archive.add(3, [3.0, 2.5])
+        self.archive.add(4, [4.0, 4.0])
+        self.archive.add(5, [0.0, 0.0], feasible=False)
+
+        self.assertEqual(self.archive.get_worst(), (5, "infeasible"))
+        self.archive.remove(5)
+        self.assertEqual(self.archive.get_worst(), (4, "dominated"))
+        self.archive.remove(4)
+
+        # The individual with the smallest contribution is selected, even
+        # after outdated contributions are left in the heap.
+        self.assertEqual(self.archive.get_worst(), (3, "contribution"))
+        self.archive.remove(2)
+        self.assertEqual(self.archive.get_worst(), (3, "contribution"))
+        self.assertEqual(self.archive._contributions[3], 5.0)
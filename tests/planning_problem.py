@@ -0,0 +1,409 @@
+import math
+import numpy as np
+from mock import patch
+from ..bench.Method_Coverage import covers
+from ..core.Import_Manager import Import_Manager
+from ..planning.Problem import Problem, Reconstruction_Plan, \
+    Reconstruction_Plan_Continuous, Reconstruction_Plan_Discrete
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class TestPlanningProblem(SettingsTestCase):
+    def setUp(self):
+        super(TestPlanningProblem, self).setUp()
+
+        self.domain = (
+            np.array([0.0, 0.0, 0]),
+            np.array([5.0, 10, 1]),
+            np.array([np.float, np.int, bool])
+        )
+        self.problem = Problem(3, self.domain)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Problem(2, [0.0])
+
+        problem = Problem(2)
+        self.assertEqual(problem.dim, 2)
+        self.assertEqual(problem.domain, (0.0, 1.0))
+        self.assertEqual(problem._bool_indices, ())
+        self.assertEqual(problem._int_indices, ())
+        self.assertEqual(problem.objectives, [])
+        self.assertEqual(len(problem.constraints), 2)
+
+        self.assertEqual(self.problem.dim, 3)
+        self.assertEqual(self.problem.domain, self.domain)
+        self.assertEqual(self.problem._bool_indices[0].tolist(), [2])
+        self.assertEqual(self.problem._int_indices[0].tolist(), [1])
+
+    def test_format_steps(self):
+        self.assertEqual(self.problem.format_steps([0.1]).tolist(),
+                         [0.1, 0.1, 0.1])
+        self.assertEqual(self.problem.format_steps([0.1, 0.2]).tolist(),
+                         [0.1, 0.2, 0.1])
+
+    def test_get_random_vector(self):
+        for _ in range(10):
+            vector = self.problem.get_random_vector()
+            self.assertEqual(vector.shape, (3,))
+            self.assertTrue(self.problem.is_feasible(vector))
+            self.assertIn(vector[2], (0, 1))
+
+        problem = Problem(2)
+        vector = problem.get_random_vector()
+        self.assertTrue(np.all((vector >= 0.0) & (vector < 1.0)))
+
+    def test_evaluate(self):
+        points = [np.array([1.0, 2.0, 1]), np.array([6.0, 2.0, 0])]
+        self.assertEqual(self.problem.evaluate(points),
+                         ([True, False], [[], []]))
+        self.assertEqual(self.problem.evaluate(points, feasible=[False, True]),
+                         ([False, True], [[], []]))
+
+    def test_is_feasible(self):
+        self.assertTrue(self.problem.is_feasible(np.array([1.0, 2.0, 1])))
+        self.assertFalse(self.problem.is_feasible(np.array([-1.0, 2.0, 1])))
+        self.assertFalse(self.problem.is_feasible(np.array([5.0, 2.0, 1])))
+
+    def test_evaluate_point(self):
+        self.problem.objectives = [lambda x: x[0] + x[1]]
+        self.assertEqual(self.problem.evaluate_point(np.array([1.0, 2.4, 1])),
+                         (True, [3.0]))
+        self.assertEqual(self.problem.evaluate_point(np.array([6.0, 2.0, 0])),
+                         (False, [np.inf]))
+
+        # The given feasibility is used instead of the constraints.
+        self.assertEqual(self.problem.evaluate_point(np.array([6.0, 2.0, 0]),
+                                                     feasible=True),
+                         (True, [8.0]))
+        self.assertEqual(self.problem.evaluate_point(np.array([1.0, 2.0, 1]),
+                                                     feasible=False),
+                         (False, [np.inf]))
+
+    def test_mutate(self):
+        np.random.seed(1)
+        point = np.array([1.0, 9.0, 1])
+
+        # Binary variables are always flipped with a zero step size.
+        mutated = self.problem.mutate(point, np.array([1.0, 5.0, 0.0]))
+        self.assertEqual(mutated[2], 0)
+        self.assertTrue(0 <= mutated[1] < 10)
+        mutated = self.problem.format_point(mutated)
+        self.assertTrue(self.problem.is_feasible(mutated))
+
+        # Binary variables are never flipped with a step size of one.
+        mutated = self.problem.mutate(point, np.array([1.0, 5.0, 1.0]))
+        self.assertEqual(mutated[2], 1)
+
+        problem = Problem(2)
+        mutated = problem.mutate(np.array([0.5, 0.5]), np.array([0.1, 0.1]))
+        self.assertEqual(mutated.shape, (2,))
+
+        problem = Problem(1, (np.array([0.0]), np.array([1.0]),
+                              np.array([np.float])))
+        mutated = problem.mutate(np.array([0.5]), np.array([0.1]))
+        self.assertEqual(mutated.shape, (1,))
+
+    def test_format_point(self):
+        point = np.array([1.2, 2.6, 1])
+        self.assertEqual(self.problem.format_point(point).tolist(),
+                         [1.2, 3.0, 1])
+        self.assertEqual(point.tolist(), [1.2, 2.6, 1])
+
+        problem = Problem(2)
+        self.assertIs(problem.format_point(point), point)
+
+    def test_get_objectives(self):
+        self.assertEqual(self.problem.get_objectives(), [])
+
+    def test_get_objective_names(self):
+        self.assertEqual(self.problem.get_objective_names(), [])
+
+    def test_get_constraints(self):
+        constraints = self.problem.get_constraints()
+        self.assertEqual(len(constraints), 2)
+
+        problem = Problem(1, (np.array([0.0]), np.array([1.0]),
+                              np.array([np.float])))
+        constraints = problem.get_constraints()
+        self.assertEqual(len(constraints), 2)
+        self.assertTrue(constraints[0](np.array([0.5])))
+        self.assertFalse(constraints[1](np.array([1.0])))
+
+class PlanningProblemTestCase(SettingsTestCase):
+    """
+    Test case base class for reconstruction planning problems.
+    """
+
+    def setUp(self):
+        super(PlanningProblemTestCase, self).setUp()
+
+        self.arguments = Arguments("settings.json", [
+            "--number-of-measurements", "30",
+            "--network-size", "10", "10",
+            "--network-padding", "2", "2",
+            "--unsnappable-rate", "1.0",
+            "--evaluation-chunk-size", "16"
+        ])
+        self.import_manager = Import_Manager()
+        self.problem = self.create_problem()
+
+    def create_problem(self):
+        """
+        Create the problem instance that is tested.
+        """
+
+        raise NotImplementedError("Subclass must implement `create_problem`")
+
+    def _check_evaluate(self, count=50):
+        """
+        Check whether the batched evaluation of `count` random individuals
+        provides the same results as evaluating the individuals one by one,
+        and whether the weight matrix rows match those of a weight matrix that
+        is updated with the positions of the individual link by link.
+
+        This is a helper function for other test cases, not a test itself.
+        """
+
+        np.random.seed(123)
+        points = [self.problem.get_random_vector() for _ in range(count)]
+
+        # The individuals are evaluated in chunks of limited size.
+        with patch.object(self.problem, "get_batch_positions",
+                          wraps=self.problem.get_batch_positions) as batch_mock:
+            Feasible, Objectives = self.problem.evaluate(points)
+            self.assertEqual(batch_mock.call_count, (count + 15) // 16)
+            for args in batch_mock.call_args_list:
+                self.assertLessEqual(len(args[0][0]), 16)
+
+        self.assertEqual(len(Feasible), count)
+        self.assertEqual(len(Objectives), count)
+
+        for point, feasible, objectives in zip(points, Feasible, Objectives):
+            weight_matrix = self.problem.get_weight_matrix()
+            positions, unsnappable = self.problem.get_positions(point,
+                                                                weight_matrix)
+
+            self.assertEqual(self.problem.evaluate_point(point),
+                             (feasible, objectives))
+            self.assertEqual(self.problem.unsnappable, unsnappable)
+
+            matrix = weight_matrix.output()[:len(positions)]
+            self.assertTrue(np.allclose(self.problem.matrix, matrix))
+
+            if positions.size > 0:
+                pair_diffs = positions[:, 0, :] - positions[:, 1, :]
+                distances = np.linalg.norm(pair_diffs, axis=1)
+                self.assertTrue(np.allclose(self.problem.sensor_distances,
+                                            distances))
+
+        # The problem's evaluation works on an empty population.
+        self.assertEqual(self.problem.evaluate([]), ([], []))
+
+        # The given feasibility is used instead of the constraints.
+        self.assertEqual(self.problem.evaluate_point(points[0], feasible=False),
+                         (False, [np.inf] * len(self.problem.objectives)))
+
+        return Feasible
+
+@covers(Reconstruction_Plan_Continuous)
+class TestPlanningProblemContinuous(PlanningProblemTestCase):
+    def create_problem(self):
+        return Reconstruction_Plan_Continuous(self.arguments,
+                                              self.import_manager)
+
+    def test_get_domain(self):
+        num_variables, domain = self.problem.get_domain()
+        self.assertEqual(num_variables, 90)
+        self.assertEqual(len(domain), 3)
+        self.assertEqual(domain[0].tolist(), [-10.0] * 30 + [0.0] * 60)
+        self.assertEqual(domain[1].tolist(),
+                         [math.sqrt(200)] * 30 + [math.pi] * 30 + [1] * 30)
+        self.assertEqual(domain[2].tolist(),
+                         [np.float] * 60 + [bool] * 30)
+
+    def test_format_steps(self):
+        steps = self.problem.format_steps([0.5, 0.1])
+        self.assertEqual(steps.tolist(), [0.5] * 30 + [0.1] * 30 + [0.5] * 30)
+
+        steps = self.problem.format_steps([0.5, 0.1, 1.0])
+        self.assertEqual(steps.tolist(), [0.5] * 30 + [0.1] * 30 + [1.0] * 30)
+
+        steps = self.problem.format_steps([0.5, 0.1, 1.0, 2.0])
+        self.assertEqual(steps.tolist(), [0.5, 0.1, 1.0, 2.0] * 22 + [0.5, 0.1])
+
+    def test_generate_positions(self):
+        point = np.zeros(90)
+        point[[0, 30]] = [3.0, math.pi/2]
+        point[[1, 31, 61]] = [2.0, 1.5, 1.0]
+        point[[2, 32, 62]] = [2.0, 0.1, 1.0]
+        point[[3, 33]] = [2.0, math.pi/4]
+
+        self.assertEqual(self.problem.generate_positions(point, 0),
+                         [[3.0, 0], [3.0, 10]])
+        self.assertEqual(self.problem.generate_positions(point, 1),
+                         [[2.0, 0], [2.0, 10]])
+        self.assertEqual(self.problem.generate_positions(point, 2),
+                         [[0, 2.0 / math.sin(math.pi/2 - 0.1)],
+                          [10, 2.0 / math.sin(math.pi/2 - 0.1)]])
+
+        positions = self.problem.generate_positions(point, 3)
+        self.assertEqual(positions[0], [0, 2.0 / math.sin(math.pi/4)])
+        self.assertAlmostEqual(positions[1][1],
+                               10 + 2.0 / math.sin(math.pi/4))
+
+        # Reconstruction problems must implement the position generation.
+        with self.assertRaises(NotImplementedError):
+            Reconstruction_Plan.generate_positions(self.problem, point, 0)
+
+    def test_generate_batch_positions(self):
+        np.random.seed(1)
+        points = np.array([
+            self.problem.format_point(self.problem.get_random_vector())
+            for _ in range(10)
+        ])
+        points[0, [0, 30]] = [3.0, math.pi/2]
+
+        positions = self.problem.generate_batch_positions(points)
+        self.assertEqual(positions.shape, (10, 30, 2, 2))
+        for point, point_positions in zip(points, positions):
+            for i in range(30):
+                self.assertTrue(np.allclose(
+                    point_positions[i],
+                    self.problem.generate_positions(point, i)
+                ))
+
+        # The generic batch generation provides the same positions.
+        generic_positions = Reconstruction_Plan.generate_batch_positions(
+            self.problem, points
+        )
+        self.assertTrue(np.allclose(generic_positions, positions))
+
+    @covers("generate_batch_positions")
+    def test_evaluate(self):
+        Feasible = self._check_evaluate()
+
+        # Some individuals are feasible and others are not.
+        self.assertIn(True, Feasible)
+        self.assertIn(False, Feasible)
+
+        # Individuals whose positions cannot be assigned to the vehicles are
+        # not feasible.
+        np.random.seed(123)
+        points = [self.problem.get_random_vector() for _ in range(10)]
+        with patch.object(self.problem.assigner, "assign",
+                          return_value=([], np.inf)):
+            self.assertNotIn(True, self.problem.evaluate(points)[0])
+
+        # Without travel distances, the sensor distances are the objective.
+        self.problem.delta_rate = 1.0
+        Feasible, Objectives = self.problem.evaluate(points)
+        for feasible, objectives in zip(Feasible, Objectives):
+            if feasible:
+                self.assertEqual(self.problem.travel_distance, 0.0)
+                self.assertGreater(objectives[1], 0.0)
+
+        # The variance of the pixel weights is an optional third objective.
+        settings = self.arguments.get_settings("planning_problem")
+        settings.set("variance_objective", True)
+        self.problem = self.create_problem()
+        self.assertEqual(self.problem.get_objective_names(),
+                         ["intersections", "distances", "variance"])
+        Feasible, Objectives = self.problem.evaluate(points)
+        self.assertEqual([len(objectives) for objectives in Objectives],
+                         [3] * 10)
+        self.assertEqual(Feasible, self._check_evaluate(count=10))
+
+@covers(Reconstruction_Plan_Discrete)
+class TestPlanningProblemDiscrete(PlanningProblemTestCase):
+    def create_problem(self):
+        return Reconstruction_Plan_Discrete(self.arguments, self.import_manager)
+
+    def test_initialization(self):
+        with self.assertRaises(ValueError):
+            Reconstruction_Plan_Discrete(None, self.import_manager)
+
+        # Reconstruction problems must implement the domain.
+        with self.assertRaises(NotImplementedError):
+            Reconstruction_Plan(self.arguments, self.import_manager)
+
+        self.assertFalse(self.problem._use_mutation_operator)
+        self.assertEqual(self.problem.dim, 120)
+        self.assertEqual(self.problem.evaluation_chunk_size, 16)
+
+    def test_get_domain(self):
+        num_variables, domain = self.problem.get_domain()
+        self.assertEqual(num_variables, 120)
+        self.assertEqual(len(domain), 3)
+        self.assertEqual(domain[0].tolist(), [0] * 120)
+        self.assertEqual(domain[1].tolist(), [11] * 120)
+        self.assertEqual(domain[2].tolist(), [np.int] * 120)
+
+    def test_format_steps(self):
+        steps = self.problem.format_steps([1, 2])
+        self.assertEqual(steps.tolist(), ([1] * 30 + [2] * 30) * 2)
+
+        steps = self.problem.format_steps([1, 2, 3, 4])
+        self.assertEqual(steps.tolist(),
+                         [1] * 30 + [2] * 30 + [3] * 30 + [4] * 30)
+
+    def test_mutate(self):
+        np.random.seed(1)
+        point = self.problem.format_point(self.problem.get_random_vector())
+        steps = self.problem.format_steps([1, 1])
+
+        mutated = self.problem.mutate(point, steps)
+        self.assertEqual(mutated.shape, point.shape)
+        self.assertFalse(np.array_equal(mutated, point))
+
+        # The specialized mutation operator moves one of the positions of
+        # a measurement to the other side of the network, while leaving the
+        # original individual untouched.
+        self.problem._use_mutation_operator = True
+        original = np.copy(point)
+        mutated = self.problem.mutate(point, steps)
+        self.assertTrue(np.array_equal(point, original))
+        self.assertEqual(mutated.shape, point.shape)
+        self.assertTrue(np.all(mutated >= 0))
+        self.assertTrue(np.all(mutated <= 11))
+
+    def test_generate_positions(self):
+        point = np.arange(120) + 0.5
+        self.assertEqual(self.problem.generate_positions(point, 1),
+                         [[1, 31], [61, 91]])
+
+    def test_generate_batch_positions(self):
+        points = np.array([np.arange(120) % 12, np.arange(120) % 7])
+        positions = self.problem.generate_batch_positions(points)
+        self.assertEqual(positions.shape, (2, 30, 2, 2))
+        for point, point_positions in zip(points, positions):
+            for i in range(30):
+                self.assertEqual(point_positions[i].tolist(),
+                                 self.problem.generate_positions(point, i))
+
+    def test_select_batch_positions(self):
+        sensor_points = np.array([[[[0, 1], [11, 5]], [[3, 0], [3, 5]]]],
+                                 dtype=np.float)
+        snapped_points = np.array([[[[2, 1], [8, 5]], [[3, 2], [3, 7.5]]]])
+
+        selected = self.problem.select_batch_positions(sensor_points,
+                                                       snapped_points)
+        self.assertEqual(selected.tolist(),
+                         [[[[0, 1], [11, 5]], [[3, 0], [3, 8]]]])
+
+    def test_select_positions(self):
+        weight_matrix = self.problem.get_weight_matrix()
+        self.assertIsNone(self.problem.select_positions([[0, 0], [0, 11]],
+                                                        weight_matrix))
+
+        positions = self.problem.select_positions([[0, 1], [11, 5]],
+                                                  weight_matrix)
+        self.assertEqual(positions, [[0, 1], [11, 5]])
+
+        positions = self.problem.select_positions([[3, 0], [3, 5]],
+                                                  weight_matrix)
+        self.assertEqual(positions, [[3, 0], [3, 8]])
+
+    @covers("generate_batch_positions")
+    def test_evaluate(self):
+        self._check_evaluate()
@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+from ..core.Ring_Buffer import Ring_Buffer
 from ..reconstruction.Buffer import Buffer
 from ..zigbee.Packet import Packet
 
@@ -31,6 +33,12 @@ class TestReconstructionBuffer(unittest.TestCase):
         with self.assertRaises(ValueError):
             Buffer()
 
+        self.assertIsInstance(self.buffer._queue, Ring_Buffer)
+        self.assertEqual(self.buffer._queue.size, 1000)
+
+        buffer = Buffer({}, size=2)
+        self.assertEqual(buffer._queue.size, 2)
+
     def test_get(self):
         # If the buffer is empty, we should get None.
         self.assertEqual(self.buffer.get(), None)
@@ -44,6 +52,26 @@ class TestReconstructionBuffer(unittest.TestCase):
 
         self.assertEqual(self.buffer.get(), None)
 
+    def test_get_packets(self):
+        self.assertEqual(self.buffer.get_packets(2), [])
+
+        # The RSSI values are calibrated, or NaN if the calibration value is
+        # missing.
+        link = ((12.3456789, 21.3456789), (13.4567892, 14.4567892))
+        self.buffer._calibration[link] = -40
+        self.buffer.put_many(self.packets)
+
+        packets = self.buffer.get_packets(2)
+        self.assertEqual(packets, [
+            (self.packets[0], 0 - -40), (self.packets[1], 1 - -40)
+        ])
+
+        self.buffer._calibration = {}
+        packets = self.buffer.get_packets(2)
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(packets[0][0], self.packets[2])
+        self.assertTrue(np.isnan(packets[0][1]))
+
     def test_put(self):
         # Invalid packets should not be inserted.
         with self.assertRaises(ValueError):
@@ -53,6 +81,19 @@ class TestReconstructionBuffer(unittest.TestCase):
         self.buffer.put(self.packets[0])
         self.assertEqual(self.buffer.get(), self.packets[0])
 
+    def test_put_many(self):
+        # Invalid packets should not be inserted, and no packets are inserted
+        # when any of them is invalid.
+        with self.assertRaises(ValueError):
+            self.buffer.put_many([self.packets[0], "foo"])
+
+        self.assertEqual(self.buffer.count(), 0)
+
+        # Valid packets should be inserted in order.
+        self.buffer.put_many(self.packets)
+        for packet in self.packets:
+            self.assertEqual(self.buffer.get(), packet)
+
     def test_count(self):
         self.assertEqual(self.buffer.count(), 0)
 
@@ -61,6 +102,16 @@ class TestReconstructionBuffer(unittest.TestCase):
 
         self.assertEqual(self.buffer.count(), self.packets_count)
 
+        # The oldest packets are dropped when the buffer is full.
+        buffer = Buffer({}, size=2)
+        for packet in self.packets:
+            buffer.put(packet)
+
+        self.assertEqual(buffer.count(), 2)
+        self.assertEqual(buffer.get(), self.packets[1])
+        self.assertEqual(buffer.get(), self.packets[2])
+        self.assertEqual(buffer.count(), 0)
+
     def test_number_of_sensors(self):
         self.assertEqual(self.buffer.number_of_sensors, 0)
 
@@ -0,0 +1,349 @@
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from mock import patch
+from ..reconstruction.Columnar_Dump_Buffer import Columnar_Dump_Buffer
+from ..settings import Arguments
+from settings import SettingsTestCase
+
+class TestReconstructionColumnarDumpBuffer(SettingsTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, "cache")
+
+        # Columnar dump buffers read JSON dumps by converting them, so we can
+        # use the same test files as for the dump buffer.
+        self.arguments = Arguments("settings.json", [
+            "--columnar-dump-calibration-file", "tests/reconstruction/dump_empty.json",
+            "--columnar-dump-file", "tests/reconstruction/dump.json",
+            "--columnar-dump-cache", self.cache_directory
+        ])
+        self.settings = self.arguments.get_settings("reconstruction_columnar_dump")
+        self.columnar_dump_buffer = Columnar_Dump_Buffer(self.settings)
+
+    def tearDown(self):
+        super(TestReconstructionColumnarDumpBuffer, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_initialization(self):
+        self.assertEqual(self.columnar_dump_buffer.number_of_sensors, 2)
+        self.assertEqual(self.columnar_dump_buffer.origin, (0, 0))
+        self.assertEqual(self.columnar_dump_buffer.size, (10, 10))
+
+        # The calibration values are indexed by the link locations.
+        self.assertEqual(self.columnar_dump_buffer._calibration, {
+            ((0, 2), (6, 10)): -38,
+            ((1, 0), (1, 10)): -36
+        })
+        self.assertEqual(self.columnar_dump_buffer._calibration_links.tolist(),
+                         [[0, 2, 6, 10], [1, 0, 1, 10]])
+        self.assertEqual(self.columnar_dump_buffer._calibration_rssi.tolist(),
+                         [-38, -36])
+
+        self.assertEqual(self.columnar_dump_buffer._index, 0)
+        self.assertEqual(self.columnar_dump_buffer._length, 2)
+
+        # The converted JSON dumps are stored in the cache directory.
+        self.assertEqual(sorted(os.listdir(self.cache_directory)), sorted([
+            os.path.basename(Columnar_Dump_Buffer.get_cache_filename(
+                filename, self.cache_directory
+            )) for filename in ("tests/reconstruction/dump_empty.json",
+                                "tests/reconstruction/dump.json")
+        ]))
+        self.assertIsInstance(self.columnar_dump_buffer._data["rssi"],
+                              np.memmap)
+
+        # Relative cache directories are within the package directory, and
+        # without a cache directory the dumps are converted in memory.
+        data = Columnar_Dump_Buffer.load("tests/reconstruction/dump.json")
+        for cache_directory, expected in (("cache", "cache"), ("", "")):
+            self.settings.set("columnar_dump_cache", cache_directory)
+            with patch.object(Columnar_Dump_Buffer, "load",
+                              return_value=data) as load_mock:
+                Columnar_Dump_Buffer(self.settings)
+                path = load_mock.call_args[0][1]
+                if expected:
+                    package = os.path.dirname(os.path.dirname(
+                        os.path.abspath(__file__)
+                    ))
+                    self.assertEqual(path, os.path.join(package, expected))
+                else:
+                    self.assertEqual(path, expected)
+
+        # Columnar dumps can be used as well.
+        self.settings.set("columnar_dump_cache", self.cache_directory)
+        npz_filename = os.path.join(self.directory, "dump.npz")
+        Columnar_Dump_Buffer.convert("tests/reconstruction/dump.json",
+                                     npz_filename)
+        self.settings.set("columnar_dump_file", npz_filename)
+        columnar_dump_buffer = Columnar_Dump_Buffer(self.settings)
+        self.assertEqual(columnar_dump_buffer.number_of_sensors, 2)
+        self.assertEqual(columnar_dump_buffer.origin, (0, 0))
+        self.assertEqual(columnar_dump_buffer.size, (10, 10))
+        self.assertEqual(columnar_dump_buffer.count(), 2)
+
+    def test_load(self):
+        data = Columnar_Dump_Buffer.load("tests/reconstruction/dump.json")
+        self.assertEqual(data["rssi"].tolist(), [-38, -41])
+        self.assertNotIsInstance(data["rssi"], np.memmap)
+
+        # Converted JSON dumps are loaded from the cache directory, until the
+        # JSON dump is changed.
+        json_filename = os.path.join(self.directory, "dump.json")
+        shutil.copy("tests/reconstruction/dump.json", json_filename)
+        os.utime(json_filename, (1000.0, 1000.0))
+        npz_filename = Columnar_Dump_Buffer.get_cache_filename(
+            json_filename, self.cache_directory
+        )
+
+        with patch.object(Columnar_Dump_Buffer, "convert",
+                          wraps=Columnar_Dump_Buffer.convert) as convert_mock:
+            cached_data = Columnar_Dump_Buffer.load(json_filename,
+                                                    self.cache_directory)
+            self.assertEqual(convert_mock.call_count, 1)
+            self.assertTrue(os.path.exists(npz_filename))
+            self.assertIsInstance(cached_data["rssi"], np.memmap)
+            self.assertEqual(cached_data["rssi"].tolist(), [-38, -41])
+
+            Columnar_Dump_Buffer.load(json_filename, self.cache_directory)
+            self.assertEqual(convert_mock.call_count, 1)
+
+            os.utime(npz_filename, (900.0, 900.0))
+            Columnar_Dump_Buffer.load(json_filename, self.cache_directory)
+            self.assertEqual(convert_mock.call_count, 2)
+
+        # Uncompressed columnar dumps are memory-mapped.
+        npz_filename = os.path.join(self.directory, "dump.npz")
+        np.savez(npz_filename, **data)
+        mapped_data = Columnar_Dump_Buffer.load(npz_filename)
+        self.assertEqual(sorted(mapped_data.keys()), sorted(data.keys()))
+        for name, array in data.iteritems():
+            self.assertIsInstance(mapped_data[name], np.memmap)
+            self.assertEqual(mapped_data[name].dtype, array.dtype)
+            self.assertTrue(np.array_equal(mapped_data[name], array))
+
+        # Compressed columnar dumps are read completely.
+        compressed_filename = os.path.join(self.directory, "compressed.npz")
+        np.savez_compressed(compressed_filename, **data)
+        compressed_data = Columnar_Dump_Buffer.load(compressed_filename)
+        for name, array in data.iteritems():
+            self.assertNotIsInstance(compressed_data[name], np.memmap)
+            self.assertTrue(np.array_equal(compressed_data[name], array))
+
+        # Empty columns cannot be memory-mapped, but can be loaded.
+        json_filename = os.path.join(self.directory, "empty.json")
+        with open(json_filename, "w") as json_file:
+            json.dump({
+                "number_of_sensors": 2,
+                "origin": [0, 0],
+                "size": [10, 10],
+                "packets": []
+            }, json_file)
+
+        Columnar_Dump_Buffer.convert(json_filename, npz_filename)
+        empty_data = Columnar_Dump_Buffer.load(npz_filename)
+        self.assertNotIsInstance(empty_data["rssi"], np.memmap)
+        self.assertEqual(empty_data["rssi"].shape, (0,))
+        self.assertEqual(empty_data["number_of_sensors"], 2)
+
+    def test_get_cache_filename(self):
+        filename = "tests/reconstruction/dump.json"
+        cache_filename = Columnar_Dump_Buffer.get_cache_filename(
+            filename, self.cache_directory
+        )
+        self.assertEqual(os.path.dirname(cache_filename), self.cache_directory)
+        self.assertTrue(cache_filename.endswith(".npz"))
+
+        # The cache file depends on the absolute path of the JSON dump.
+        self.assertEqual(Columnar_Dump_Buffer.get_cache_filename(
+            os.path.abspath(filename), self.cache_directory
+        ), cache_filename)
+        self.assertNotEqual(Columnar_Dump_Buffer.get_cache_filename(
+            "tests/reconstruction/dump_empty.json", self.cache_directory
+        ), cache_filename)
+
+    def test_save_cache(self):
+        cache_directory = os.path.join(self.directory, "other")
+        npz_filename = os.path.join(cache_directory, "dump.npz")
+        Columnar_Dump_Buffer._save_cache("tests/reconstruction/dump.json",
+                                         npz_filename)
+
+        # The cache directory is created and contains only the cache file.
+        self.assertEqual(os.listdir(cache_directory), ["dump.npz"])
+        with np.load(npz_filename) as npz:
+            self.assertEqual(npz["rssi"].tolist(), [-38, -41])
+
+    def test_map_member(self):
+        data = Columnar_Dump_Buffer.load("tests/reconstruction/dump.json")
+        npz_filename = os.path.join(self.directory, "dump.npz")
+        np.savez(npz_filename, **data)
+        with zipfile.ZipFile(npz_filename, "r") as archive:
+            info = archive.getinfo("rssi.npy")
+
+        mapped = Columnar_Dump_Buffer._map_member(npz_filename, info)
+        self.assertEqual(mapped.tolist(), [-38, -41])
+
+        # Members with an invalid local file header are rejected.
+        with open(npz_filename, "r+b") as npz_file:
+            npz_file.seek(info.header_offset)
+            npz_file.write("PK\x01\x02")
+
+        with self.assertRaises(ValueError):
+            Columnar_Dump_Buffer._map_member(npz_filename, info)
+
+        # So are compressed members, even if they are not compressed according
+        # to the central directory.
+        compressed_filename = os.path.join(self.directory, "compressed.npz")
+        np.savez_compressed(compressed_filename, **data)
+        with zipfile.ZipFile(compressed_filename, "r") as archive:
+            info = archive.getinfo("rssi.npy")
+
+        with self.assertRaises(ValueError):
+            Columnar_Dump_Buffer._map_member(compressed_filename, info)
+
+        # Truncated files are rejected as well.
+        with open(npz_filename, "wb") as npz_file:
+            npz_file.write("PK")
+
+        with self.assertRaises(ValueError):
+            Columnar_Dump_Buffer._map_member(npz_filename, info)
+
+    def test_convert(self):
+        npz_filename = os.path.join(self.directory, "dump.npz")
+        data = Columnar_Dump_Buffer.convert("tests/reconstruction/dump.json",
+                                            npz_filename)
+
+        self.assertEqual(data["number_of_sensors"], 2)
+        self.assertEqual(data["origin"].tolist(), [0, 0])
+        self.assertEqual(data["size"].tolist(), [10, 10])
+        for name, dtype in Columnar_Dump_Buffer.COLUMNS:
+            self.assertEqual(data[name].dtype, dtype)
+
+        self.assertEqual(data["sensor_id"].tolist(), [1, 2])
+        self.assertEqual(data["from_latitude"].tolist(), [1, 0])
+        self.assertEqual(data["from_longitude"].tolist(), [0, 2])
+        self.assertEqual(data["from_valid"].tolist(), [True, True])
+        self.assertEqual(data["to_latitude"].tolist(), [1, 6])
+        self.assertEqual(data["to_longitude"].tolist(), [10, 10])
+        self.assertEqual(data["to_valid"].tolist(), [True, True])
+        self.assertEqual(data["rssi"].tolist(), [-38, -41])
+
+        # The columnar dump file contains the same arrays.
+        with np.load(npz_filename) as npz:
+            self.assertEqual(sorted(npz.files), sorted(data.keys()))
+            for name, array in data.iteritems():
+                self.assertTrue(np.array_equal(npz[name], array))
+
+    def test_get(self):
+        # The calibration RSSI value for the link must be subtracted
+        # from the originally measured RSSI value.
+        first_packet, first_calibrated_rssi = self.columnar_dump_buffer.get()
+        self.assertEqual(first_packet.get_all(), {
+            "specification": "rssi_ground_station",
+            "sensor_id": 1,
+            "from_latitude": 1,
+            "from_longitude": 0,
+            "from_valid": True,
+            "to_latitude": 1,
+            "to_longitude": 10,
+            "to_valid": True,
+            "rssi": -38
+        })
+        self.assertEqual(first_calibrated_rssi, -38 - -36)
+
+        second_packet, second_calibrated_rssi = self.columnar_dump_buffer.get()
+        self.assertEqual(second_packet.get_all(), {
+            "specification": "rssi_ground_station",
+            "sensor_id": 2,
+            "from_latitude": 0,
+            "from_longitude": 2,
+            "from_valid": True,
+            "to_latitude": 6,
+            "to_longitude": 10,
+            "to_valid": True,
+            "rssi": -41
+        })
+        self.assertEqual(second_calibrated_rssi, -41 - -38)
+
+        self.assertEqual(self.columnar_dump_buffer.get(), None)
+        self.assertEqual(self.columnar_dump_buffer.count(), 0)
+
+    def test_get_missing_calibration(self):
+        # When a calibration value is missing, a `KeyError` must be raised.
+        self.columnar_dump_buffer._calibration = {}
+
+        with self.assertRaises(KeyError):
+            self.columnar_dump_buffer.get()
+
+        # The packet is removed from the buffer nonetheless.
+        self.assertEqual(self.columnar_dump_buffer.count(), 1)
+
+    def test_get_many(self):
+        sources, destinations, calibrated_rssi = \
+            self.columnar_dump_buffer.get_many(1)
+
+        # The locations are given as `(x, y)` coordinate pairs.
+        self.assertEqual(sources.tolist(), [[0, 1]])
+        self.assertEqual(destinations.tolist(), [[10, 1]])
+        self.assertEqual(calibrated_rssi.tolist(), [-38 - -36])
+        self.assertEqual(self.columnar_dump_buffer.count(), 1)
+
+        # Calibrated RSSI values of invalid measurements are NaN.
+        self.columnar_dump_buffer._data["to_valid"] = np.array([True, False])
+        sources, destinations, calibrated_rssi = \
+            self.columnar_dump_buffer.get_many(3)
+        self.assertEqual(sources.tolist(), [[2, 0]])
+        self.assertEqual(destinations.tolist(), [[10, 6]])
+        self.assertTrue(np.isnan(calibrated_rssi[0]))
+        self.assertEqual(self.columnar_dump_buffer.count(), 0)
+
+        # Links that are not in the calibration file have NaN values.
+        self.columnar_dump_buffer._index = 0
+        self.columnar_dump_buffer._calibration_links = np.array([[1, 0, 1, 10]])
+        self.columnar_dump_buffer._calibration_rssi = np.array([-30])
+        sources, destinations, calibrated_rssi = \
+            self.columnar_dump_buffer.get_many(2)
+        self.assertEqual(calibrated_rssi[0], -38 - -30)
+        self.assertTrue(np.isnan(calibrated_rssi[1]))
+
+        # No packets are returned for an empty buffer.
+        sources, destinations, calibrated_rssi = \
+            self.columnar_dump_buffer.get_many(2)
+        self.assertEqual(sources.shape, (0, 2))
+        self.assertEqual(destinations.shape, (0, 2))
+        self.assertEqual(calibrated_rssi.shape, (0,))
+
+    def test_get_packets(self):
+        # The packets are equal to those from `get`.
+        expected = [self.columnar_dump_buffer.get() for _ in range(2)]
+        self.columnar_dump_buffer._index = 0
+
+        packets = self.columnar_dump_buffer.get_packets(1)
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(packets[0][0].get_all(), expected[0][0].get_all())
+        self.assertEqual(packets[0][1], expected[0][1])
+        self.assertEqual(self.columnar_dump_buffer.count(), 1)
+
+        # Calibrated RSSI values of invalid measurements are NaN.
+        self.columnar_dump_buffer._data["to_valid"] = np.array([True, False])
+        packets = self.columnar_dump_buffer.get_packets(3)
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(packets[0][0].get("to_valid"), False)
+        self.assertEqual(packets[0][0].get("rssi"), -41)
+        self.assertTrue(np.isnan(packets[0][1]))
+        self.assertEqual(self.columnar_dump_buffer.count(), 0)
+
+        self.assertEqual(self.columnar_dump_buffer.get_packets(2), [])
+
+    def test_put(self):
+        # Packets cannot be put in the buffer.
+        with self.assertRaises(TypeError):
+            self.columnar_dump_buffer.put([1, 1, 0, True, 1, 10, True, -38])
+
+    def test_count(self):
+        self.assertEqual(self.columnar_dump_buffer.count(), 2)
+        self.columnar_dump_buffer.get_many(1)
+        self.assertEqual(self.columnar_dump_buffer.count(), 1)
@@ -0,0 +1,246 @@
+import numpy as np
+import scipy.sparse
+from mock import Mock, call, patch
+from ..reconstruction.Coordinator import Coordinator
+from ..reconstruction.Weight_Matrix import Weight_Matrix
+from ..settings.Arguments import Arguments
+from ..zigbee.Packet import Packet
+from settings import SettingsTestCase
+
+class TestReconstructionCoordinator(SettingsTestCase):
+    def setUp(self):
+        self.arguments = Arguments("settings.json", [])
+        self.settings = self.arguments.get_settings("reconstruction")
+        self.buffer = Mock(origin=(0, 0), size=(4, 4))
+        self.coordinator = Coordinator(self.arguments, self.buffer, capacity=2)
+
+        # Links between sensors on the boundaries of the network.
+        self.links = [
+            ((0, 1), (4, 1)), ((0, 2), (4, 3)), ((1, 0), (1, 4)),
+            ((0, 3), (2, 4))
+        ]
+
+    def _create_packet(self, source, destination):
+        """
+        Create a packet for a measurement between the `source` and the
+        `destination` sensors, given in `(x, y)` form.
+        """
+
+        packet = Packet()
+        packet.set("specification", "rssi_ground_station")
+        packet.set_dump([1, source[1], source[0], True,
+                         destination[1], destination[0], True, -40])
+        return packet
+
+    def _update(self, coordinator, link_indices, offset=0):
+        """
+        Update the `coordinator` with measurements of the links at the given
+        `link_indices`. The RSSI value of each measurement is its index in the
+        list plus the `offset`.
+        """
+
+        for value, index in enumerate(link_indices):
+            source, destination = self.links[index]
+            packet = self._create_packet(source, destination)
+            self.assertTrue(coordinator.update(packet, value + offset))
+
+    def test_initialization(self):
+        self.assertEqual(self.coordinator._window, 0)
+        self.assertIsInstance(self.coordinator._weight_matrix, Weight_Matrix)
+        self.assertEqual(self.coordinator._weight_matrix._matrix.shape, (2, 16))
+        self.assertEqual(self.coordinator._rssi.shape, (2,))
+        self.assertEqual(self.coordinator._timestamps.shape, (2,))
+        self.assertEqual(self.coordinator._links, {})
+        self.assertEqual(self.coordinator._endpoints, [None, None])
+        self.assertEqual(self.coordinator._remove_callbacks, [])
+        self.assertEqual(self.coordinator._link_count, 0)
+        self.assertEqual(self.coordinator._time, 0)
+
+        # The arrays have room for the links in the window and a new link.
+        self.settings.set("link_window", 3)
+        coordinator = Coordinator(self.arguments, self.buffer, capacity=2)
+        self.assertEqual(coordinator._window, 3)
+        self.assertEqual(coordinator._weight_matrix._matrix.shape, (4, 16))
+        self.assertEqual(coordinator._rssi.shape, (4,))
+
+    def test_add_remove_callback(self):
+        callback = Mock()
+        self.coordinator.add_remove_callback(callback)
+        self.assertEqual(self.coordinator._remove_callbacks, [callback])
+
+    def test_get_weight_matrix(self):
+        self.assertEqual(self.coordinator.get_weight_matrix().shape, (0, 16))
+
+        self._update(self.coordinator, [0, 1, 2])
+
+        # The rows are equal to those of a weight matrix with the same links.
+        weight_matrix = Weight_Matrix(self.arguments, (0, 0), (4, 4))
+        for index in [0, 1, 2]:
+            weight_matrix.update(*self.links[index])
+
+        matrix = self.coordinator.get_weight_matrix()
+        self.assertTrue(np.array_equal(matrix, weight_matrix.output()))
+
+        # The matrix shares the rows of the weight matrix.
+        self.assertTrue(np.may_share_memory(
+            matrix, self.coordinator._weight_matrix._matrix
+        ))
+
+        self.settings.set("sparse_matrix", True)
+        coordinator = Coordinator(self.arguments, self.buffer)
+        self._update(coordinator, [0, 1, 2])
+        matrix = coordinator.get_weight_matrix()
+        self.assertTrue(scipy.sparse.isspmatrix_csr(matrix))
+        self.assertTrue(np.array_equal(matrix.toarray(),
+                                       weight_matrix.output()))
+        self.assertTrue(np.may_share_memory(
+            matrix.data, coordinator._weight_matrix._data
+        ))
+
+    def test_get_rssi_vector(self):
+        self._update(self.coordinator, [0, 1, 2])
+
+        rssi = self.coordinator.get_rssi_vector()
+        self.assertEqual(rssi.tolist(), [0, 1, 2])
+
+        # The vector is a copy of the RSSI values.
+        rssi[0] = 42
+        self.assertEqual(self.coordinator.get_rssi_vector().tolist(),
+                         [0, 1, 2])
+
+    def test_update(self):
+        # Invalid links are not added.
+        packet = self._create_packet((1, 1), (4, 1))
+        self.assertFalse(self.coordinator.update(packet, -40))
+        packet = self._create_packet((0, 1), (0, 1))
+        self.assertFalse(self.coordinator.update(packet, -40))
+        self.assertEqual(self.coordinator._link_count, 0)
+        self.assertEqual(self.coordinator._time, 0)
+
+        # Links that were measured before have their RSSI value replaced.
+        self._update(self.coordinator, [0, 1, 2, 1, 3])
+        self.assertEqual(self.coordinator._link_count, 4)
+        self.assertEqual(self.coordinator._weight_matrix.output().shape,
+                         (4, 16))
+        self.assertEqual(self.coordinator._rssi.shape, (4,))
+        self.assertEqual(self.coordinator.get_rssi_vector().tolist(),
+                         [0, 3, 2, 4])
+        self.assertEqual(self.coordinator._timestamps[:4].tolist(),
+                         [0, 3, 2, 4])
+        self.assertEqual(self.coordinator._time, 5)
+
+        # The links are ordered by the time of their last measurement.
+        self.assertEqual(self.coordinator._links.keys(), [
+            self.links[0], self.links[2], self.links[1], self.links[3]
+        ])
+        self.assertEqual(self.coordinator._links.values(), [0, 2, 1, 3])
+        self.assertEqual(self.coordinator._endpoints, [
+            self.links[0], self.links[1], self.links[2], self.links[3]
+        ])
+
+    def test_update_many(self):
+        packets = [
+            (self._create_packet(source, destination), value)
+            for value, (source, destination) in enumerate(self.links)
+        ]
+
+        # Packets with invalid locations or without calibrated RSSI values
+        # are handled, but do not update the coordinator.
+        packets[1][0].set("to_valid", False)
+        packets[2] = (packets[2][0], np.nan)
+        self.assertEqual(self.coordinator.update_many(packets), (4, 2))
+        self.assertEqual(self.coordinator.get_rssi_vector().tolist(), [0, 3])
+        self.assertEqual(self.coordinator.update_many([]), (0, 0))
+
+    def test_update_many_deadline(self):
+        packets = [
+            (self._create_packet(source, destination), value)
+            for value, (source, destination) in enumerate(self.links)
+        ]
+
+        # Packets are handled until the deadline is reached, but at least one
+        # packet is handled even if the deadline has already passed.
+        with patch("time.time", side_effect=[1.0, 1.5, 2.0]):
+            self.assertEqual(self.coordinator.update_many(packets, 1.5),
+                             (2, 2))
+
+        self.assertEqual(self.coordinator.get_rssi_vector().tolist(), [0, 1])
+
+        with patch("time.time", return_value=3.0):
+            self.assertEqual(self.coordinator.update_many(packets[2:], 1.5),
+                             (1, 1))
+
+        self.assertEqual(self.coordinator.get_rssi_vector().tolist(),
+                         [0, 1, 2])
+
+    def test_update_window(self):
+        self.settings.set("link_window", 3)
+        coordinator = Coordinator(self.arguments, self.buffer)
+        callback = Mock()
+        coordinator.add_remove_callback(callback)
+
+        self._update(coordinator, [0, 1, 0, 2])
+        callback.assert_not_called()
+        self.assertEqual(coordinator._link_count, 3)
+        self.assertEqual(coordinator.get_rssi_vector().tolist(), [2, 1, 3])
+
+        # The second link has not been measured in the last three measurements,
+        # so the last link takes its place.
+        self._update(coordinator, [3], offset=4)
+        self.assertEqual(coordinator._link_count, 3)
+        self.assertEqual(coordinator.get_rssi_vector().tolist(), [2, 4, 3])
+        self.assertEqual(coordinator._links.keys(), [
+            self.links[0], self.links[2], self.links[3]
+        ])
+        self.assertEqual(coordinator._links.values(), [0, 2, 1])
+        callback.assert_called_once_with(1, 3)
+        self.assertEqual(coordinator._endpoints, [
+            self.links[0], self.links[3], self.links[2], None
+        ])
+
+        weight_matrix = Weight_Matrix(self.arguments, (0, 0), (4, 4))
+        for index in [0, 3, 2]:
+            weight_matrix.update(*self.links[index])
+
+        self.assertTrue(np.array_equal(coordinator.get_weight_matrix(),
+                                       weight_matrix.output()))
+
+        # Links that are measured again are kept.
+        callback.reset_mock()
+        self._update(coordinator, [2, 2], offset=5)
+        self.assertEqual(callback.call_args_list, [call(0, 2)])
+        self.assertEqual(coordinator._link_count, 2)
+        self.assertEqual(coordinator.get_rssi_vector().tolist(), [6, 4])
+        self.assertEqual(coordinator._endpoints, [
+            self.links[2], self.links[3], None, None
+        ])
+
+        # The last link in the arrays is removed without moving other links.
+        self._update(coordinator, [2], offset=7)
+        self.assertEqual(coordinator._link_count, 1)
+        self.assertEqual(coordinator.get_rssi_vector().tolist(), [7])
+        self.assertEqual(coordinator._endpoints, [
+            self.links[2], None, None, None
+        ])
+        self.assertEqual(coordinator._weight_matrix._matrix.shape, (4, 16))
+        self.assertEqual(coordinator.get_weight_matrix().shape, (1, 16))
+
+    def test_update_window_sparse(self):
+        self.settings.set("link_window", 2)
+        self.settings.set("sparse_matrix", True)
+        self.settings.set("model_class", "Ellipse_Model")
+        coordinator = Coordinator(self.arguments, self.buffer)
+
+        # Removed links make place for the last links in the sparse matrix.
+        self._update(coordinator, [0, 1, 2, 3, 1, 0, 2])
+        weight_matrix = Weight_Matrix(self.arguments, (0, 0), (4, 4))
+        for index in [2, 0]:
+            weight_matrix.update(*self.links[index])
+
+        self.assertEqual(coordinator._endpoints[:2], [
+            self.links[2], self.links[0]
+        ])
+        matrix = coordinator.get_weight_matrix()
+        self.assertEqual(matrix.nnz, np.count_nonzero(matrix.toarray()))
+        self.assertTrue(np.array_equal(matrix.toarray(),
+                                       weight_matrix.output().toarray()))
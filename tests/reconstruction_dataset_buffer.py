@@ -1,3 +1,4 @@
+import numpy as np
 from ..reconstruction.Dataset_Buffer import Dataset_Buffer
 from ..settings import Arguments
 from settings import SettingsTestCase
@@ -42,6 +43,30 @@ class TestReconstructionDatasetBuffer(SettingsTestCase):
         self.assertEqual(self.dataset_buffer.origin, (0, 0))
         self.assertEqual(self.dataset_buffer.size, self.size)
 
+        self.assertEqual(self.dataset_buffer._position_ids[(0, 9)], 3)
+        self.assertEqual(self.dataset_buffer._position_array.tolist(),
+                         [list(position) for position in self.positions])
+
+        # The calibration values are only available for the destination in
+        # the calibration file.
+        matrix = self.dataset_buffer._calibration_matrix
+        self.assertEqual(matrix.shape, (len(self.positions),) * 2)
+        self.assertEqual(matrix[self.sensor_id].tolist(), self.calibration)
+        self.assertTrue(np.isnan(np.delete(matrix, self.sensor_id, axis=0)).all())
+        self.assertEqual(len(self.dataset_buffer._calibration),
+                         len(self.positions) - 1)
+
+        # The measurements are stored in arrays in the order of the file.
+        sources = [index for index in range(len(self.positions))
+                   if index != self.sensor_id]
+        self.assertEqual(self.dataset_buffer._sources.tolist(), sources)
+        self.assertEqual(self.dataset_buffer._destinations.tolist(),
+                         [self.sensor_id] * len(sources))
+        self.assertEqual(self.dataset_buffer._rssi.tolist(),
+                         [self.rssi[index] for index in sources])
+        self.assertEqual(self.dataset_buffer._index, 0)
+        self.assertEqual(self.dataset_buffer._length, len(sources))
+
     def test_count(self):
         # One data point is ignored because a sensor cannot send to itself.
         self.assertEqual(self.dataset_buffer.count(), len(self.positions) - 1)
@@ -76,6 +101,64 @@ class TestReconstructionDatasetBuffer(SettingsTestCase):
         with self.assertRaises(KeyError):
             self.dataset_buffer.get()
 
+    def test_get_many(self):
+        sources, destinations, calibrated_rssi = self.dataset_buffer.get_many(3)
+
+        # The locations are given as `(x, y)` coordinate pairs.
+        self.assertEqual(sources.tolist(), [[0, 0], [0, 3], [0, 6]])
+        self.assertEqual(destinations.tolist(),
+                         [list(self.positions[self.sensor_id])] * 3)
+        self.assertEqual(calibrated_rssi.tolist(), [
+            self.rssi[index] - self.calibration[index] for index in range(3)
+        ])
+        self.assertEqual(self.dataset_buffer.count(), len(self.positions) - 4)
+
+        # Links that are not in the calibration file have NaN values.
+        self.dataset_buffer.put([(0, 0), (0, 3), -50])
+        sources, destinations, calibrated_rssi = \
+            self.dataset_buffer.get_many(len(self.positions))
+        self.assertEqual(len(sources), len(self.positions) - 3)
+        self.assertEqual(sources[-1].tolist(), [0, 0])
+        self.assertEqual(destinations[-1].tolist(), [0, 3])
+        self.assertTrue(np.isnan(calibrated_rssi[-1]))
+        self.assertFalse(np.isnan(calibrated_rssi[:-1]).any())
+        self.assertEqual(self.dataset_buffer.count(), 0)
+
+    def test_get_packets(self):
+        # The packets are equal to those from `get`.
+        expected = [self.dataset_buffer.get() for _ in range(3)]
+        self.dataset_buffer._index = 0
+
+        packets = self.dataset_buffer.get_packets(3)
+        self.assertEqual(len(packets), 3)
+        for (packet, calibrated_rssi), (expected_packet, expected_rssi) in \
+                zip(packets, expected):
+            self.assertEqual(packet.get_all(), expected_packet.get_all())
+            self.assertEqual(calibrated_rssi, expected_rssi)
+
+        self.assertEqual(self.dataset_buffer.count(), len(self.positions) - 4)
+
+        # Links that are not in the calibration file have NaN values.
+        self.dataset_buffer.put([(0, 0), (0, 3), -50])
+        packets = self.dataset_buffer.get_packets(len(self.positions))
+        self.assertEqual(len(packets), len(self.positions) - 3)
+        packet, calibrated_rssi = packets[-1]
+        self.assertEqual(packet.get("sensor_id"), 2)
+        self.assertEqual(packet.get("rssi"), -50)
+        self.assertTrue(np.isnan(calibrated_rssi))
+        self.assertEqual(self.dataset_buffer.get_packets(1), [])
+
+    def test_iterate(self):
+        chunks = list(self.dataset_buffer.iterate(10))
+        self.assertEqual([len(chunk[2]) for chunk in chunks], [10, 10, 7])
+
+        calibrated_rssi = np.concatenate([chunk[2] for chunk in chunks])
+        self.assertEqual(calibrated_rssi.tolist(), [
+            self.rssi[index] - self.calibration[index]
+            for index in range(len(self.positions)) if index != self.sensor_id
+        ])
+        self.assertEqual(self.dataset_buffer.count(), 0)
+
     def test_put(self):
         # Verify that only lists can be put in the buffer.
         with self.assertRaises(ValueError):
@@ -84,3 +167,37 @@ class TestReconstructionDatasetBuffer(SettingsTestCase):
         # Verify that only lists of valid length can be put in the buffer.
         with self.assertRaises(ValueError):
             self.dataset_buffer.put([1, 2])
+
+        # Verify that only positions of sensors can be put in the buffer.
+        with self.assertRaises(ValueError):
+            self.dataset_buffer.put([(1, 1), (0, 3), -50])
+        with self.assertRaises(ValueError):
+            self.dataset_buffer.put([(0, 3), (1, 1), -50])
+
+        self.dataset_buffer.put([(0, 0), (0, 3), -50])
+        self.assertEqual(self.dataset_buffer.count(), len(self.positions))
+
+        # The arrays double their capacity when they are full.
+        capacity = 2 * (len(self.positions) - 1)
+        self.assertEqual(self.dataset_buffer._length, len(self.positions))
+        self.assertEqual(self.dataset_buffer._rssi.shape, (capacity,))
+        self.assertEqual(self.dataset_buffer._sources.shape, (capacity,))
+        self.assertEqual(self.dataset_buffer._destinations.shape, (capacity,))
+
+        self.dataset_buffer.put([(0, 3), (0, 0), -45])
+        self.assertEqual(self.dataset_buffer.count(), len(self.positions) + 1)
+        self.assertEqual(self.dataset_buffer._rssi.shape, (capacity,))
+
+        for _ in range(len(self.positions) - 1):
+            self.dataset_buffer.get()
+
+        with self.assertRaises(KeyError):
+            self.dataset_buffer.get()
+
+        # The unused capacity is not part of the packets in the buffer.
+        sources, destinations, calibrated_rssi = self.dataset_buffer.get_many(5)
+        self.assertEqual(sources.tolist(), [[0, 3]])
+        self.assertEqual(destinations.tolist(), [[0, 0]])
+        self.assertEqual(calibrated_rssi.shape, (1,))
+        self.assertEqual(self.dataset_buffer.count(), 0)
+        self.assertIsNone(self.dataset_buffer.get())
@@ -1,3 +1,4 @@
+import numpy as np
 from ..reconstruction.Dump_Buffer import Dump_Buffer
 from ..settings import Arguments
 from settings import SettingsTestCase
@@ -21,6 +22,9 @@ class TestReconstructionDumpBuffer(SettingsTestCase):
         self.assertEqual(self.dump_buffer.origin, (0, 0))
         self.assertEqual(self.dump_buffer.size, (10, 10))
 
+        # The buffer has room for all packets in the dump.
+        self.assertEqual(self.dump_buffer._queue.size, 2)
+
     def test_count(self):
         self.assertEqual(self.dump_buffer.count(), 2)
 
@@ -58,6 +62,28 @@ class TestReconstructionDumpBuffer(SettingsTestCase):
         self.assertEqual(self.dump_buffer.get(), None)
         self.assertEqual(self.dump_buffer.count(), 0)
 
+    def test_get_packets(self):
+        # The packets are equal to those from `get`.
+        expected = self.dump_buffer.get()
+        self.dump_buffer.put(expected[0].get_dump())
+        self.dump_buffer.put([2, 0, 2, True, 6, 10, True, -41])
+
+        packets = self.dump_buffer.get_packets(3)
+        self.assertEqual(len(packets), 2)
+        self.assertEqual(packets[0][0].get_all(), expected[0].get_all())
+        self.assertEqual(packets[0][1], expected[1])
+        self.assertEqual(packets[1][1], -41 - -38)
+        self.assertEqual(self.dump_buffer.count(), 0)
+
+        # Links that are not in the calibration file have NaN values.
+        self.dump_buffer._calibration = {}
+        self.dump_buffer.put([2, 0, 2, True, 6, 10, True, -41])
+        packets = self.dump_buffer.get_packets(1)
+        self.assertEqual(packets[0][0].get("rssi"), -41)
+        self.assertTrue(np.isnan(packets[0][1]))
+
+        self.assertEqual(self.dump_buffer.get_packets(1), [])
+
     def test_get_missing_calibration(self):
         # When a calibration value is missing, a `KeyError` must be raised.
         self.dump_buffer._calibration = []
@@ -23,6 +23,10 @@ class TestReconstructionEllipseModel(ModelTestCase):
         # The `type` property must be implemented and correct.
         self.assertEqual(self.model.type, "reconstruction_ellipse_model")
 
+    def test_get_extent(self):
+        # The pixels with weights lie within the ellipse of the model.
+        self.assertEqual(self.model.get_extent(), self.settings.get("lambda"))
+
     def test_assign(self):
         length, source_distances, destination_distances = self.get_assign_data()
 
@@ -23,6 +23,11 @@ class TestReconstructionLineModel(ModelTestCase):
         # The `type` property must be implemented and correct.
         self.assertEqual(self.model.type, "reconstruction_line_model")
 
+    def test_get_extent(self):
+        # The pixels with weights lie within the threshold of the line.
+        self.assertEqual(self.model.get_extent(),
+                         self.settings.get("threshold"))
+
     def test_assign(self):
         length, source_distances, destination_distances = self.get_assign_data()
 
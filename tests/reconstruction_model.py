@@ -68,6 +68,19 @@ class TestReconstructionModel(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             dummy = self.model.type
 
+    def test_get_cache_key(self):
+        type_mock = PropertyMock(return_value="reconstruction_line_model")
+        with patch.object(Model, "type", new_callable=type_mock):
+            model = Model(self.arguments)
+            settings = self.arguments.get_settings("reconstruction_line_model")
+            key = ("reconstruction_line_model", ("threshold",
+                                                 settings.get("threshold")))
+            self.assertEqual(model.get_cache_key(), key)
+
+    def test_get_extent(self):
+        # Models may assign weights to all pixels by default.
+        self.assertEqual(self.model.get_extent(), np.inf)
+
     def test_assign(self):
         # Verify that the interface requires subclasses to implement
         # the `assign(length, source_distances, destination_distances)` method.
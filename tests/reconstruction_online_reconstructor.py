@@ -0,0 +1,136 @@
+import numpy as np
+import scipy.sparse
+from ..reconstruction.Online_Reconstructor import Online_Reconstructor
+from ..settings.Arguments import Arguments
+from settings import SettingsTestCase
+
+class TestReconstructionOnlineReconstructor(SettingsTestCase):
+    def setUp(self):
+        self.arguments = Arguments("settings.json", [])
+        self.settings = self.arguments.get_settings("reconstruction_online_reconstructor")
+        self.reconstructor = Online_Reconstructor(self.arguments)
+
+        self.weight_matrix = np.random.random((12, 9))
+        self.weight_matrix[self.weight_matrix < 0.5] = 0.0
+        self.rssi = np.random.random(12) * 10
+
+    def _solve(self, weight_matrix, rssi):
+        """
+        Calculate the regularized least squares solution directly.
+        """
+
+        regularization = self.settings.get("regularization")
+        A = weight_matrix
+        normal = A.T.dot(A) + regularization * np.eye(A.shape[1])
+        return np.linalg.solve(normal, A.T.dot(rssi))
+
+    def test_initialization(self):
+        self.assertEqual(self.reconstructor._settings, self.settings)
+        self.assertEqual(self.reconstructor._regularization,
+                         self.settings.get("regularization"))
+        self.assertIsNone(self.reconstructor._covariance)
+        self.assertIsNone(self.reconstructor._solution)
+        self.assertIsNone(self.reconstructor._rssi)
+        self.assertIsNone(self.reconstructor._rows)
+
+    def test_type(self):
+        self.assertEqual(self.reconstructor.type,
+                         "reconstruction_online_reconstructor")
+
+    def test_reset(self):
+        self.reconstructor.execute(self.weight_matrix, self.rssi)
+        self.reconstructor.reset(4)
+        self.assertTrue(np.array_equal(self.reconstructor._covariance,
+                                       np.eye(4) / self.settings.get("regularization")))
+        self.assertEqual(self.reconstructor._solution.tolist(), [0.0] * 4)
+        self.assertEqual(self.reconstructor._rssi.shape, (0,))
+        self.assertEqual(self.reconstructor._rows, [])
+
+    def test_execute(self):
+        # Appending rows in several steps gives the direct solution.
+        for count in (0, 5, 6, 12):
+            solution = self.reconstructor.execute(self.weight_matrix[:count],
+                                                  self.rssi[:count])
+            expected = self._solve(self.weight_matrix[:count],
+                                   self.rssi[:count])
+            self.assertTrue(np.allclose(solution, expected))
+
+        # Changed RSSI values of known rows are taken into account.
+        self.rssi[[2, 7]] += 3.0
+        solution = self.reconstructor.execute(self.weight_matrix, self.rssi)
+        self.assertTrue(np.allclose(solution,
+                                    self._solve(self.weight_matrix, self.rssi)))
+
+        # The returned solution is a copy.
+        solution[:] = 0.0
+        self.assertNotEqual(self.reconstructor._solution.tolist(),
+                            solution.tolist())
+
+    def test_execute_reset(self):
+        self.reconstructor.execute(self.weight_matrix, self.rssi)
+
+        # A smaller weight matrix starts a new reconstruction.
+        solution = self.reconstructor.execute(self.weight_matrix[6:],
+                                              self.rssi[6:])
+        expected = self._solve(self.weight_matrix[6:], self.rssi[6:])
+        self.assertTrue(np.allclose(solution, expected))
+
+        # So does a weight matrix for another number of pixels.
+        solution = self.reconstructor.execute(self.weight_matrix[:, :4],
+                                              self.rssi)
+        self.assertEqual(solution.shape, (4,))
+
+    def test_execute_sparse(self):
+        weight_matrix = scipy.sparse.csr_matrix(self.weight_matrix)
+        self.reconstructor.execute(weight_matrix[:3], self.rssi[:3])
+        solution = self.reconstructor.execute(weight_matrix, list(self.rssi))
+        expected = self._solve(self.weight_matrix, self.rssi)
+        self.assertTrue(np.allclose(solution, expected))
+
+    def test_remove(self):
+        # Removing rows before the first reconstruction has no effect.
+        self.reconstructor.remove(0, 0)
+        self.assertIsNone(self.reconstructor._rows)
+
+        order = range(12)
+        self.reconstructor.execute(self.weight_matrix[order[:8]],
+                                   self.rssi[order[:8]])
+
+        def remove(index):
+            self.reconstructor.remove(index, len(order) - 1)
+            order[index] = order[-1]
+            order.pop()
+
+        # The last row, which was not seen before, takes the place of a row
+        # which was seen before. Removing a row that was not seen before has
+        # no effect on the solution.
+        remove(2)
+        remove(9)
+        self.assertEqual(len(self.reconstructor._rows), 8)
+        self.assertIsNone(self.reconstructor._rows[2])
+        self.assertTrue(np.isnan(self.reconstructor._rssi[2]))
+        seen = [0, 1, 3, 4, 5, 6, 7]
+        self.assertTrue(np.allclose(self.reconstructor._solution,
+                                    self._solve(self.weight_matrix[seen],
+                                                self.rssi[seen])))
+
+        # The last row, which was seen before, takes the place of a row.
+        solution = self.reconstructor.execute(self.weight_matrix[order],
+                                              self.rssi[order])
+        self.assertTrue(np.allclose(solution,
+                                    self._solve(self.weight_matrix[order],
+                                                self.rssi[order])))
+        remove(4)
+        remove(len(order) - 1)
+        self.assertEqual(len(self.reconstructor._rows), len(order))
+        self.assertTrue(np.allclose(self.reconstructor._solution,
+                                    self._solve(self.weight_matrix[order],
+                                                self.rssi[order])))
+
+        # Moved rows are not mistaken for changed RSSI values.
+        self.rssi[order[1]] += 2.0
+        solution = self.reconstructor.execute(self.weight_matrix[order],
+                                              self.rssi[order])
+        self.assertTrue(np.allclose(solution,
+                                    self._solve(self.weight_matrix[order],
+                                                self.rssi[order])))
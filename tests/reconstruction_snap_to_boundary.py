@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from ..reconstruction.Snap_To_Boundary import Snap_To_Boundary, Point
 
 class TestReconstructionSnapToBoundary(unittest.TestCase):
@@ -25,6 +26,11 @@ class TestReconstructionSnapToBoundary(unittest.TestCase):
         # Both start and end point outside the network are fine.
         self.assertIsNotNone(self.snapper.execute([-1, 5], [5, 3]))
 
+    def test_is_outside_points(self):
+        points = np.array([[[1, 3], [5, 3]], [[0, 4], [3, 3]]])
+        outside = self.snapper.is_outside_points(points)
+        self.assertEqual(outside.tolist(), [[False, True], [True, False]])
+
     def test_execute(self):
         # Left and right boundary, decreasing line (negative delta y).
         expected = [Point(0, 14/3.0), Point(4, 10/3.0)]
@@ -146,3 +152,58 @@ class TestReconstructionSnapToBoundary(unittest.TestCase):
         # Vertical line with one point inside and one point outside.
         expected = [Point(2, 2), Point(2, 6)]
         self.assertEqual(self.snapper.execute([2, 1], [2, 5]), expected)
+
+    def _check_batch(self, links):
+        """
+        Check whether the batch snapping of the given `links` has the same
+        results as snapping each link separately.
+        """
+
+        snapped, valid = self.snapper.execute_batch(np.array(links))
+        self.assertEqual(snapped.shape, (len(links), 2, 2))
+        for i, link in enumerate(links):
+            expected = self.snapper.execute(*link)
+            if expected is None or None in expected:
+                self.assertFalse(valid[i])
+                self.assertEqual(snapped[i].tolist(), [[0, 0], [0, 0]])
+            else:
+                self.assertTrue(valid[i])
+                self.assertEqual(snapped[i].tolist(),
+                                 [list(point) for point in expected])
+
+        return valid
+
+    def test_execute_batch(self):
+        links = [
+            [[-1, 5], [5, 3]], [[-1, 5], [5, 6]], [[0, 1], [2, 7]],
+            [[3, 1], [2, 7]], [[-1, 4], [5, 4]], [[2, 1], [2, 7]],
+            [[2, 6], [2, 2]], [[0, 3], [4, 3]], [[2, 1], [5, 3]],
+            [[3, 1], [5, 3]], [[2, 0], [5, 2]], [[-1, 7], [5, 7]],
+            [[5, 1], [5, 7]], [[2, 6], [2, 6]], [[1, 3], [5, 3]],
+            [[-1, 5], [3, 3]], [[1, 3], [3, 3]]
+        ]
+        valid = self._check_batch(links)
+        self.assertEqual(valid.tolist(), [True] * 10 + [False] * 7)
+
+        # A single link is also accepted.
+        snapped, valid = self.snapper.execute_batch([[-1, 4], [5, 4]])
+        self.assertEqual(snapped.tolist(), [[[0, 4], [4, 4]]])
+        self.assertEqual(valid.tolist(), [True])
+
+    def test_execute_batch_snap_inside(self):
+        self.snapper._snap_inside = True
+
+        links = [
+            [[1, 5], [3, 4]], [[1, 3], [3, 4]], [[1, 5], [2, 3]],
+            [[1, 3], [2, 5]], [[1, 4], [2, 5]], [[2, 5], [3, 4]],
+            [[2, 3], [3, 4]], [[1, 4], [2, 3]], [[1, 4], [3, 4]],
+            [[2, 3], [2, 5]], [[0, 4], [1, 5]], [[-1, 4], [1, 3]],
+            [[5, 9], [2, 3]], [[2, 5], [6, 3]], [[1, 4], [5, 4]],
+            [[2, 1], [2, 5]], [[2, 0], [5, 2]]
+        ]
+        valid = self._check_batch(links)
+        self.assertEqual(valid.tolist(), [True] * 16 + [False])
+
+        # Random links have the same results as separate snapping.
+        random_links = np.random.randint(-2, 8, size=(200, 2, 2)) / 2.0
+        self._check_batch(random_links.tolist())
@@ -1,3 +1,4 @@
+import numpy as np
 from mock import MagicMock
 from ..reconstruction.Stream_Buffer import Stream_Buffer
 from ..settings import Arguments
@@ -37,6 +38,8 @@ class TestReconstructionStreamBuffer(SettingsTestCase):
         self.assertEqual(stream_buffer.number_of_sensors, 0)
         self.assertEqual(stream_buffer.origin, (1, 1))
         self.assertEqual(stream_buffer.size, (15, 15))
+        self.assertEqual(stream_buffer._queue.size,
+                         self.settings.get("stream_buffer_size"))
 
     def test_initialization_without_calibration(self):
         # When calibration mode is disabled, a calibration file for initial 
@@ -57,6 +60,47 @@ class TestReconstructionStreamBuffer(SettingsTestCase):
         self.assertEqual(self.stream_buffer.number_of_sensors, 42)
         self.assertEqual(self.mock_sensor.buffer, self.stream_buffer)
 
+    def test_put(self):
+        # Regular packets are inserted as is.
+        self.stream_buffer.put(self.packet)
+        self.assertEqual(self.stream_buffer.count(), 1)
+        self.assertEqual(self.stream_buffer.get(), (self.packet, -38))
+
+        # Batch packets are unpacked into a packet for each measurement.
+        packet = Packet()
+        packet.set("specification", "rssi_ground_station_batch")
+        packet.set("sensor_id", 2)
+        packet.set("measurements", [
+            [1, 0, True, 1, 10, True, -38],
+            [0, 2, True, 6, 10, False, -41]
+        ])
+        self.stream_buffer.put(packet)
+        self.assertEqual(self.stream_buffer.count(), 2)
+
+        first_packet, first_rssi = self.stream_buffer.get()
+        self.assertEqual(first_packet.get_all(), {
+            "specification": "rssi_ground_station",
+            "sensor_id": 2,
+            "from_latitude": 1,
+            "from_longitude": 0,
+            "from_valid": True,
+            "to_latitude": 1,
+            "to_longitude": 10,
+            "to_valid": True,
+            "rssi": -38
+        })
+        self.assertEqual(first_rssi, -38)
+
+        second_packet, second_rssi = self.stream_buffer.get()
+        self.assertEqual(second_packet.get("sensor_id"), 2)
+        self.assertEqual(second_packet.get("to_latitude"), 6)
+        self.assertFalse(second_packet.get("to_valid"))
+        self.assertEqual(second_rssi, -41)
+
+        # Invalid packets are refused.
+        with self.assertRaises(ValueError):
+            self.stream_buffer.put("foo")
+
     def test_get(self):
         # When the queue is empty, None should be returned.
         self.assertEqual(self.stream_buffer.get(), None)
@@ -103,6 +147,34 @@ class TestReconstructionStreamBuffer(SettingsTestCase):
         })
         self.assertEqual(buffer_calibrated_rssi, -38 - -34)
 
+    def test_get_packets(self):
+        self.assertEqual(self.stream_buffer.get_packets(2), [])
+
+        # If calibration mode is enabled, the original RSSI values are given.
+        self.stream_buffer.put(self.packet)
+        self.assertEqual(self.stream_buffer.get_packets(2),
+                         [(self.packet, -38)])
+
+        # Otherwise, the RSSI values are calibrated, or NaN if the calibration
+        # value is missing.
+        self.settings.set("stream_calibrate", False)
+        self.settings.set("stream_calibration_file",
+                          "tests/reconstruction/stream_empty.json")
+        stream_buffer = Stream_Buffer(self.settings)
+        stream_buffer.register_rf_sensor(self.mock_sensor)
+
+        other_packet = Packet()
+        other_packet.set("specification", "rssi_ground_station")
+        other_packet.set_dump(self.packet.get_dump())
+        other_packet.set("to_longitude", 9)
+        stream_buffer.put_many([self.packet, other_packet])
+
+        packets = stream_buffer.get_packets(2)
+        self.assertEqual(packets[0], (self.packet, -38 - -34))
+        self.assertEqual(packets[1][0], other_packet)
+        self.assertTrue(np.isnan(packets[1][1]))
+        self.assertEqual(stream_buffer.count(), 0)
+
     def test_get_missing_calibration(self):
         # When a calibration value is missing, a `KeyError` must be raised.
         self.settings.set("stream_calibrate", False)
@@ -0,0 +1,97 @@
+import numpy as np
+import scipy.sparse
+from mock import Mock
+from ..reconstruction.Tikhonov_Reconstructor import Tikhonov_Reconstructor
+from ..settings.Arguments import Arguments
+from settings import SettingsTestCase
+
+class TestReconstructionTikhonovReconstructor(SettingsTestCase):
+    def setUp(self):
+        self.arguments = Arguments("settings.json", [])
+        self.settings = self.arguments.get_settings("reconstruction_tikhonov_reconstructor")
+        self.reconstructor = Tikhonov_Reconstructor(self.arguments)
+
+        self.buffer = Mock(size=(3, 2))
+        self.weight_matrix = np.random.random((8, 6))
+        self.rssi = np.random.random(8) * 10
+
+    def test_initialization(self):
+        self.assertEqual(self.reconstructor._settings, self.settings)
+        self.assertEqual(self.reconstructor._alpha, self.settings.get("alpha"))
+        self.assertEqual(self.reconstructor._regularization, "difference")
+        self.assertIsNone(self.reconstructor._weight_matrix)
+        self.assertIsNone(self.reconstructor._size)
+        self.assertIsNone(self.reconstructor._factor)
+        self.assertIsNone(self.reconstructor._projection)
+
+    def test_type(self):
+        self.assertEqual(self.reconstructor.type,
+                         "reconstruction_tikhonov_reconstructor")
+
+    def test_execute(self):
+        with self.assertRaises(ValueError):
+            self.reconstructor.execute(self.weight_matrix, self.rssi)
+
+        solution = self.reconstructor.execute(self.weight_matrix, self.rssi,
+                                              buffer=self.buffer)
+
+        # The difference regularization penalizes each pair of neighboring 
+        # pixels in the 3x2 grid, as well as the mean of the pixels.
+        Q = self.reconstructor._get_regularization_matrix(6, (3, 2))
+        self.assertEqual(np.diag(Q).tolist(),
+                         [2 + 1/6.0, 3 + 1/6.0, 2 + 1/6.0] * 2)
+        self.assertAlmostEqual(Q[0, 1], -1 + 1/6.0)
+        self.assertAlmostEqual(Q[0, 3], -1 + 1/6.0)
+        self.assertAlmostEqual(Q[0, 4], 1/6.0)
+
+        A = self.weight_matrix
+        alpha = self.settings.get("alpha")
+        expected = np.linalg.solve(A.T.dot(A) + alpha * Q, A.T.dot(self.rssi))
+        self.assertTrue(np.allclose(solution, expected))
+
+    def test_execute_cached(self):
+        self.reconstructor.execute(self.weight_matrix, self.rssi,
+                                   buffer=self.buffer)
+        projection = self.reconstructor._projection
+
+        # New RSSI values for the same weight matrix reuse the projection.
+        rssi = list(np.random.random(8))
+        solution = self.reconstructor.execute(self.weight_matrix.copy(), rssi,
+                                              buffer=self.buffer)
+        self.assertIs(self.reconstructor._projection, projection)
+        self.assertTrue(np.allclose(solution, projection.dot(rssi)))
+
+        # Changes to the weight matrix or network size cause a recalculation.
+        weight_matrix = self.weight_matrix.copy()
+        weight_matrix[0, 0] += 1.0
+        self.reconstructor.execute(weight_matrix, rssi, buffer=self.buffer)
+        self.assertIsNot(self.reconstructor._projection, projection)
+
+        projection = self.reconstructor._projection
+        self.reconstructor.execute(weight_matrix, rssi, buffer=Mock(size=(2, 3)))
+        self.assertIsNot(self.reconstructor._projection, projection)
+
+        projection = self.reconstructor._projection
+        self.reconstructor.execute(weight_matrix[:4], rssi[:4],
+                                   buffer=Mock(size=(2, 3)))
+        self.assertIsNot(self.reconstructor._projection, projection)
+
+    def test_execute_identity(self):
+        self.reconstructor._regularization = "identity"
+        weight_matrix = scipy.sparse.csr_matrix(self.weight_matrix)
+        solution = self.reconstructor.execute(weight_matrix, self.rssi)
+
+        A = self.weight_matrix
+        alpha = self.settings.get("alpha")
+        expected = np.linalg.solve(A.T.dot(A) + alpha * np.eye(6),
+                                   A.T.dot(self.rssi))
+        self.assertTrue(np.allclose(solution, expected))
+
+        # Sparse weight matrices are compared to the cached copy.
+        projection = self.reconstructor._projection
+        self.reconstructor.execute(weight_matrix, self.rssi)
+        self.assertIs(self.reconstructor._projection, projection)
+
+        weight_matrix[0, 0] += 1.0
+        self.reconstructor.execute(weight_matrix, self.rssi)
+        self.assertIsNot(self.reconstructor._projection, projection)
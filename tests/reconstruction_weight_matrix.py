@@ -1,4 +1,7 @@
 import numpy as np
+from mock import patch
+import scipy.sparse
+from ..core.Cache import Cache
 from ..reconstruction.Snap_To_Boundary import Snap_To_Boundary
 from ..reconstruction.Weight_Matrix import Weight_Matrix
 from ..settings.Arguments import Arguments
@@ -15,6 +18,15 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
         self.weight_matrix = Weight_Matrix(self.arguments, self.origin,
                                            self.size)
 
+    def _create_sparse(self, number_of_links=0):
+        """
+        Create a weight matrix that stores its rows sparsely.
+        """
+
+        self.arguments.get_settings("reconstruction").set("sparse_matrix", True)
+        return Weight_Matrix(self.arguments, self.origin, self.size,
+                             number_of_links=number_of_links)
+
     def test_initialization(self):
         # Verify that only `Arguments` objects can be used to initialize.
         with self.assertRaises(TypeError):
@@ -22,8 +34,6 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
         with self.assertRaises(TypeError):
             Weight_Matrix(None, self.origin, self.size)
 
-        self.assertIsInstance(self.weight_matrix._distances, np.ndarray)
-        self.assertEqual(self.weight_matrix._distances.shape, (0, self.pixels))
         self.assertIsInstance(self.weight_matrix._matrix, np.ndarray)
         self.assertEqual(self.weight_matrix._matrix.shape, (0, self.pixels))
 
@@ -33,7 +43,21 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
         self.assertEqual(self.weight_matrix._number_of_links, 0)
 
         self.assertEqual(self.weight_matrix._link_count, 0)
-        self.assertEqual(self.weight_matrix._distance_count, 0)
+
+        self.assertFalse(self.weight_matrix._sparse)
+        self.assertIsNone(self.weight_matrix._data)
+        self.assertIsNone(self.weight_matrix._indices)
+        self.assertIsNone(self.weight_matrix._indptr)
+
+        self.assertIsInstance(self.weight_matrix._distance_cache, Cache)
+        self.assertEqual(self.weight_matrix._distance_cache.size, 1000)
+        self.assertIsInstance(self.weight_matrix._link_cache, Cache)
+        self.assertEqual(self.weight_matrix._link_cache.size, 1000)
+        self.assertEqual(self.weight_matrix._link_cache.eviction, "lru")
+
+        self.assertEqual(self.weight_matrix._geometry, (0, 0, 4, 4))
+        self.assertEqual(self.weight_matrix._link_key[:5],
+                         (0, 0, 4, 4, "reconstruction_gaussian_model"))
 
         self.assertIsInstance(self.weight_matrix._snapper, Snap_To_Boundary)
         self.assertIsInstance(self.weight_matrix._grid_x, np.ndarray)
@@ -43,17 +67,125 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
         weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
                                       number_of_links=self.links)
         self.assertEqual(weight_matrix._number_of_links, self.links)
-        self.assertEqual(weight_matrix._distances.shape,
-                         (self.links, self.pixels))
         self.assertEqual(weight_matrix._matrix.shape, (self.links, self.pixels))
         self.assertEqual(weight_matrix._link_count, 0)
-        self.assertEqual(weight_matrix._distance_count, 0)
+
+        # The reserved rows are not part of the output.
+        self.assertEqual(weight_matrix.output().shape, (0, self.pixels))
+
+    def test_initialization_sparse(self):
+        weight_matrix = self._create_sparse(number_of_links=self.links)
+        self.assertTrue(weight_matrix._sparse)
+        self.assertIsNone(weight_matrix._matrix)
+        self.assertEqual(weight_matrix._data.shape, (self.links * 4,))
+        self.assertEqual(weight_matrix._indices.shape, (self.links * 4,))
+        self.assertEqual(weight_matrix._indptr.tolist(), [0] * (self.links + 1))
 
     def test_is_valid_point(self):
         # Only points that are outside the network are valid points.
         self.assertTrue(self.weight_matrix.is_valid_point((4, 4)))
         self.assertFalse(self.weight_matrix.is_valid_point((3, 3)))
 
+    def test_get_distance_cache(self):
+        cache = Cache(10)
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                      distance_cache=cache)
+        self.assertEqual(weight_matrix.get_distance_cache(), cache)
+
+    def test_get_distances(self):
+        points = np.array([[0, 1], [4, 2.5], [0, 1]])
+        distances = self.weight_matrix._get_distances(points)
+        self.assertEqual(distances.shape, (3, self.pixels))
+        self.assertEqual(distances[0, 0], np.sqrt(0.5))
+        self.assertEqual(distances[1, 15], np.sqrt(0.5 ** 2 + 1))
+        self.assertTrue(np.array_equal(distances[0], distances[2]))
+
+        cache = self.weight_matrix.get_distance_cache()
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertIn((0, 0, 4, 4, 0, 1), cache)
+
+        # Cached distances cannot be altered.
+        with self.assertRaises(ValueError):
+            cache.get((0, 0, 4, 4, 0, 1), None)[0] = 0.0
+
+        self.assertEqual(self.weight_matrix._get_distances(np.empty((0, 2))).shape,
+                         (0, self.pixels))
+
+    def test_get_distances_shared(self):
+        # Weight matrices with different geometries can share a cache, and 
+        # the cache is kept when a weight matrix is reset.
+        cache = Cache(10)
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                      distance_cache=cache)
+        other_matrix = Weight_Matrix(self.arguments, [1, 1], [3, 3],
+                                     distance_cache=cache)
+
+        point = np.array([[0, 1]])
+        weight_matrix._get_distances(point)
+        weight_matrix.reset()
+        weight_matrix._get_distances(point)
+        self.assertEqual(cache.hits, 1)
+
+        distances = other_matrix._get_distances(point)
+        self.assertEqual(distances.shape, (1, 9))
+        self.assertEqual(distances[0, 0], np.sqrt(1.5 ** 2 + 0.5 ** 2))
+        self.assertEqual(len(cache), 2)
+
+    def test_get_link_cache(self):
+        cache = Cache(10)
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                      link_cache=cache)
+        self.assertEqual(weight_matrix.get_link_cache(), cache)
+
+    def test_is_valid_points(self):
+        points = np.array([[[4, 4], [3, 3]], [[0, 2], [2, 5]]])
+        valid = self.weight_matrix.is_valid_points(points)
+        self.assertEqual(valid.shape, (2, 2))
+        self.assertEqual(valid.tolist(), [[True, False], [True, True]])
+
+    def test_snap_links(self):
+        sources = np.array([[0, 5], [4, 4], [0, 1], [1, 0]])
+        destinations = np.array([[5, 5], [5, 5], [4, 1], [1, 4]])
+        snapped, valid = self.weight_matrix.snap_links(sources, destinations)
+
+        # Unsnappable links and links that are snapped to the same points are 
+        # marked as invalid.
+        self.assertEqual(valid.tolist(), [False, False, True, True])
+        self.assertEqual(snapped.shape, (4, 2, 2))
+        self.assertEqual(snapped[0].tolist(), [[0, 0], [0, 0]])
+        self.assertEqual(snapped[2].tolist(), [[0, 1], [4, 1]])
+        self.assertEqual(snapped[3].tolist(), [[1, 0], [1, 4]])
+
+    def test_get_link_rows(self):
+        sources = np.array([[0, 1], [1, 0], [0, 0.5]])
+        destinations = np.array([[4, 1], [1, 4], [4, 3.5]])
+        rows = self.weight_matrix.get_link_rows(sources, destinations)
+        self.assertEqual(rows.shape, (3, self.pixels))
+
+        # The rows must be the same as the rows added by separate updates.
+        for source, destination in zip(sources, destinations):
+            self.weight_matrix.update(tuple(source), tuple(destination))
+
+        self.assertTrue(np.array_equal(rows, self.weight_matrix.output()))
+
+        # The rows are cached and shared with updates.
+        cache = self.weight_matrix.get_link_cache()
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 3)
+
+        rows = self.weight_matrix.get_link_rows(sources[[1, 1]],
+                                                destinations[[1, 1]])
+        self.assertEqual(cache.hits, 5)
+        self.assertTrue(np.array_equal(rows[0], self.weight_matrix.output()[1]))
+        self.assertTrue(np.array_equal(rows[1], rows[0]))
+
+        # Cached rows cannot be altered.
+        key = self.weight_matrix._link_key + (0, 1, 4, 1)
+        with self.assertRaises(ValueError):
+            cache.lookup(key)[0] = 0.0
+
     def test_update(self):
         # Unsnappable points should be ignored.
         self.assertIsNone(self.weight_matrix.update((0, 5), (5, 5)))
@@ -74,6 +206,33 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
 
         self.assertTrue(self.weight_matrix.check())
 
+    def test_update_link_cache(self):
+        # Weight matrices with the same model share rows of the same links.
+        cache = Cache(10)
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                      link_cache=cache)
+        other_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                     link_cache=cache)
+
+        weight_matrix.update((0, 1), (4, 1))
+        weight_matrix.reset()
+        weight_matrix.update((0, 1), (4, 1))
+        other_matrix.update((0, 1), (4, 1))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        self.assertTrue(np.array_equal(weight_matrix.output(),
+                                       other_matrix.output()))
+
+        # Other models do not use the rows.
+        settings = self.arguments.get_settings("reconstruction")
+        settings.set("model_class", "Line_Model")
+        line_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
+                                    link_cache=cache)
+        line_matrix.update((0, 1), (4, 1))
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(np.all(np.in1d(line_matrix.output(), [0.0, 1.0])))
+
     def test_update_snap_inside(self):
         weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size,
                                       snap_inside=True, number_of_links=1)
@@ -88,8 +247,191 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
 
         self.assertEqual(weight_matrix._matrix.shape, (2, self.pixels))
 
+    def test_update_sparse(self):
+        weight_matrix = self._create_sparse()
+
+        # The sparse rows must be equal to the dense rows, even after the 
+        # arrays grow multiple times.
+        for i in range(0, 4):
+            for points in [[(0, i), (4, i)], [(i, 0), (i, 4)]]:
+                self.assertEqual(self.weight_matrix.update(*points), points)
+                self.assertEqual(weight_matrix.update(*points), points)
+
+        self.assertIsNone(weight_matrix.update((4, 4), (5, 5)))
+        self.assertEqual(weight_matrix._link_count, 8)
+        self.assertGreaterEqual(weight_matrix._indptr.shape[0], 9)
+
+        matrix = weight_matrix.output()
+        self.assertTrue(scipy.sparse.isspmatrix_csr(matrix))
+        self.assertEqual(matrix.shape, (8, self.pixels))
+        self.assertTrue(np.array_equal(matrix.toarray(),
+                                       self.weight_matrix.output()))
+
+        # Only nonzero weights are stored.
+        self.assertEqual(matrix.nnz, np.count_nonzero(matrix.toarray()))
+
+    def test_update_sparse_ellipse(self):
+        self.arguments.get_settings("reconstruction").set("model_class",
+                                                          "Ellipse_Model")
+        self.origin = [2, 1]
+        self.size = [20, 15]
+        self.pixels = self.size[0] * self.size[1]
+        dense_matrix = Weight_Matrix(self.arguments, self.origin, self.size)
+        weight_matrix = self._create_sparse()
+
+        # The sparse rows must be equal to the dense rows, while the model only
+        # assigns weights to the pixels around the link.
+        np.random.seed(1)
+        links = np.random.uniform(0, 25, size=(100, 2, 2))
+        links[:10, 1, 0] = links[:10, 0, 0]
+        links[10:20, 1, 1] = links[10:20, 0, 1]
+        with patch.object(weight_matrix._model, "assign",
+                          wraps=weight_matrix._model.assign) as assign_mock:
+            for source, destination in links.tolist():
+                self.assertEqual(weight_matrix.update(source, destination),
+                                 dense_matrix.update(source, destination))
+
+            self.assertTrue(all(
+                call[0][1].size < self.pixels
+                for call in assign_mock.call_args_list
+            ))
+
+        matrix = weight_matrix.output()
+        self.assertEqual(matrix.shape[0], dense_matrix.output().shape[0])
+        self.assertTrue(np.array_equal(matrix.toarray(), dense_matrix.output()))
+        self.assertEqual(matrix.nnz, np.count_nonzero(matrix.toarray()))
+
+    def test_remove(self):
+        links = [
+            ((0, 1), (4, 1)), ((0, 2), (4, 3)), ((1, 0), (1, 4)),
+            ((0, 3), (2, 4))
+        ]
+        for source, destination in links:
+            self.weight_matrix.update(source, destination)
+
+        rows = self.weight_matrix.output().copy()
+
+        with self.assertRaises(IndexError):
+            self.weight_matrix.remove(4)
+        with self.assertRaises(IndexError):
+            self.weight_matrix.remove(-1)
+
+        # The last row takes the place of the removed row.
+        self.weight_matrix.remove(1)
+        self.assertTrue(np.array_equal(self.weight_matrix.output(),
+                                       rows[[0, 3, 2]]))
+
+        # Removing the last row does not move other rows.
+        self.weight_matrix.remove(2)
+        self.assertTrue(np.array_equal(self.weight_matrix.output(),
+                                       rows[[0, 3]]))
+
+        # New rows are added after the remaining rows.
+        self.weight_matrix.update(*links[1])
+        self.assertTrue(np.array_equal(self.weight_matrix.output(),
+                                       rows[[0, 3, 1]]))
+
+    def test_remove_sparse(self):
+        self.arguments.get_settings("reconstruction").set("model_class",
+                                                          "Ellipse_Model")
+        self.arguments.get_settings("reconstruction_ellipse_model").set(
+            "lambda", 0.5
+        )
+        dense_matrix = Weight_Matrix(self.arguments, self.origin, self.size)
+        weight_matrix = self._create_sparse()
+
+        # The links have different numbers of nonzero weights.
+        links = [
+            ((0, 1), (4, 1)), ((0, 1), (1, 0)), ((1, 0), (1, 4)),
+            ((0, 3), (2, 4)), ((0, 2), (4, 3)), ((2, 0), (4, 2))
+        ]
+        for source, destination in links:
+            self.assertIsNotNone(dense_matrix.update(source, destination))
+            self.assertIsNotNone(weight_matrix.update(source, destination))
+
+        rows = dense_matrix.output().copy()
+        order = range(len(links))
+        for index in (1, 0, 2, 2, 0):
+            weight_matrix.remove(index)
+            order[index] = order[-1]
+            order.pop()
+
+            matrix = weight_matrix.output()
+            self.assertEqual(matrix.shape, (len(order), self.pixels))
+            self.assertEqual(matrix.nnz, np.count_nonzero(rows[order]))
+            self.assertTrue(np.array_equal(matrix.toarray(), rows[order]))
+
+        # New rows are added after the remaining rows.
+        weight_matrix.update(*links[1])
+        self.assertTrue(np.array_equal(weight_matrix.output().toarray(),
+                                       rows[order + [1]]))
+
+    def test_get_sparse_row(self):
+        weight_matrix = self._create_sparse()
+
+        # The Gaussian model assigns weights to all pixels.
+        pixels, weights = weight_matrix._get_sparse_row((0, 1), (4, 1), 4.0)
+        self.assertEqual(pixels.tolist(), range(self.pixels))
+        self.assertEqual(weights.shape, (self.pixels,))
+
+        # The sparse row is cached and cannot be altered.
+        cache = weight_matrix.get_link_cache()
+        cached_row = weight_matrix._get_sparse_row((0, 1), (4, 1), 4.0)
+        self.assertEqual(cache.hits, 1)
+        self.assertIs(cached_row[0], pixels)
+        with self.assertRaises(ValueError):
+            pixels[0] = 1
+
+        # The ellipse model only assigns weights to pixels close to the link.
+        self.arguments.get_settings("reconstruction").set("model_class",
+                                                          "Ellipse_Model")
+        self.arguments.get_settings("reconstruction_ellipse_model").set(
+            "lambda", 0.5
+        )
+        weight_matrix = self._create_sparse()
+        pixels, weights = weight_matrix._get_sparse_row((0, 1), (4, 1), 4.0)
+        self.assertEqual(pixels.tolist(), range(8))
+        self.assertEqual(weights.tolist(), [0.5] * 8)
+
+        pixels, weights = weight_matrix._get_sparse_row((1, 0), (1, 4), 4.0)
+        self.assertEqual(pixels.tolist(), [0, 1, 4, 5, 8, 9, 12, 13])
+
+        pixels, weights = weight_matrix._get_sparse_row((0, 0), (1, 1),
+                                                        np.sqrt(2))
+        self.assertEqual(pixels.tolist(), [0])
+
+    def test_get_bounding_box(self):
+        # The Gaussian model assigns weights to all pixels.
+        self.assertEqual(self.weight_matrix._get_bounding_box((0, 1), (4, 1),
+                                                              4.0),
+                         (0, 4, 0, 4))
+
+        self.arguments.get_settings("reconstruction").set("model_class",
+                                                          "Ellipse_Model")
+        self.settings.set("lambda", 0.5)
+        weight_matrix = Weight_Matrix(self.arguments, self.origin, self.size)
+        self.assertEqual(weight_matrix._get_bounding_box((0, 1), (4, 1), 4.0),
+                         (0, 4, 0, 2))
+        self.assertEqual(weight_matrix._get_bounding_box((1, 0), (1, 4), 4.0),
+                         (0, 2, 0, 4))
+        self.assertEqual(weight_matrix._get_bounding_box((0, 0), (1, 1),
+                                                         np.sqrt(2)),
+                         (0, 1, 0, 1))
+
+    def test_get_pixel_range(self):
+        centers = self.weight_matrix._x
+        self.assertEqual(self.weight_matrix._get_pixel_range(centers, 2, 1),
+                         (1, 3))
+        self.assertEqual(self.weight_matrix._get_pixel_range(centers, 2, 0.2),
+                         (2, 2))
+        self.assertEqual(self.weight_matrix._get_pixel_range(centers, 0, 0.5),
+                         (0, 1))
+        self.assertEqual(self.weight_matrix._get_pixel_range(centers, 1, np.inf),
+                         (0, 4))
+
     def test_check(self):
         # Matrices that contain columns with only zeros must fail the test.
+        self.weight_matrix._link_count = self.links
         self.weight_matrix._matrix = np.zeros((self.links, self.pixels))
         self.weight_matrix._matrix[:, 1] = 1
         self.assertEqual(self.weight_matrix.check(), False)
@@ -98,17 +440,47 @@ class TestReconstructionWeightMatrix(SettingsTestCase):
         self.weight_matrix._matrix = np.ones((self.links, self.pixels))
         self.assertEqual(self.weight_matrix.check(), True)
 
+        # Sparse matrices are checked using the pixels of the added links.
+        weight_matrix = self._create_sparse()
+        self.assertFalse(weight_matrix.check())
+        for i in range(0, 4):
+            weight_matrix.update((i, 0), (i, 4))
+
+        self.assertTrue(weight_matrix.check())
+
     def test_output(self):
-        # The internal matrix must be returned.
+        # The rows of the added links in the internal matrix must be returned.
+        self.weight_matrix._link_count = self.links - 2
         self.weight_matrix._matrix = np.random.random((self.links, self.pixels))
-        self.assertTrue(np.array_equal(self.weight_matrix.output(),
-                                       self.weight_matrix._matrix))
+        output = self.weight_matrix.output()
+        self.assertTrue(np.array_equal(output,
+                                       self.weight_matrix._matrix[:-2]))
+        self.assertTrue(np.may_share_memory(output,
+                                            self.weight_matrix._matrix))
+
+    def test_output_sparse(self):
+        weight_matrix = self._create_sparse(number_of_links=self.links)
+        weight_matrix.update((0, 1), (4, 1))
+
+        # The sparse matrix shares the arrays of the weight matrix.
+        output = weight_matrix.output()
+        self.assertTrue(scipy.sparse.isspmatrix_csr(output))
+        self.assertEqual(output.shape, (1, self.pixels))
+        self.assertTrue(np.may_share_memory(output.data, weight_matrix._data))
+        self.assertTrue(np.may_share_memory(output.indices,
+                                            weight_matrix._indices))
+        self.assertTrue(np.may_share_memory(output.indptr,
+                                            weight_matrix._indptr))
 
     def test_reset(self):
-        for i in range(0, 4):
-            self.weight_matrix.update((0, i), (4, i))
-            self.weight_matrix.update((i, 0), (i, 4))
+        sparse_weight_matrix = self._create_sparse()
+        for weight_matrix in (self.weight_matrix, sparse_weight_matrix):
+            for i in range(0, 4):
+                weight_matrix.update((0, i), (4, i))
+                weight_matrix.update((i, 0), (i, 4))
 
-        self.assertTrue(self.weight_matrix.check())
-        self.weight_matrix.reset()
-        self.assertFalse(self.weight_matrix.check())
+            self.assertTrue(weight_matrix.check())
+            weight_matrix.reset()
+            self.assertFalse(weight_matrix.check())
+
+        self.assertEqual(sparse_weight_matrix.output().shape, (0, self.pixels))
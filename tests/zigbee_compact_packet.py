@@ -0,0 +1,130 @@
+from mock import patch
+from ..zigbee.Compact_Packet import Compact_Packet
+from ..zigbee.Packet import Packet
+from zigbee_packet import ZigBeePacketTestCase
+
+class TestZigBeeCompactPacket(ZigBeePacketTestCase):
+    def setUp(self):
+        super(TestZigBeeCompactPacket, self).setUp()
+
+        self.packet_class = Compact_Packet.get_class("waypoint_add")
+        self.compact_packet = self.packet_class(
+            123456789.12, 123496785.34, 4.2, 1, 3, 6, 9, 22, 2
+        )
+
+    def test_initialization(self):
+        # Packets are instances of the generated class for the specification,
+        # which do not have a contents dictionary.
+        self.assertIsInstance(self.compact_packet, Compact_Packet)
+        self.assertIsInstance(self.compact_packet, Packet)
+        self.assertFalse(hasattr(self.compact_packet, "__dict__"))
+        self.assertEqual(self.compact_packet.get("wait_count"), 6)
+
+        # Packets without values do not have any fields set.
+        packet = self.packet_class()
+        self.assertEqual(packet.get_all(), {"specification": "waypoint_add"})
+
+        # The number of values must match the number of fields.
+        with self.assertRaises(ValueError):
+            self.packet_class(1, 2, 3)
+
+        # The base class cannot be instantiated.
+        with self.assertRaises(TypeError):
+            Compact_Packet()
+
+    def test_get_class(self):
+        # The generated class is cached.
+        self.assertEqual(self.packet_class.__name__, "Waypoint_Add_Packet")
+        self.assertEqual(self.packet_class._specification_name, "waypoint_add")
+        self.assertEqual(self.packet_class._fields, (
+            "latitude", "longitude", "altitude", "type", "wait_id",
+            "wait_count", "wait_waypoint", "index", "to_id"
+        ))
+        self.assertFalse(self.packet_class._specification_private)
+        self.assertIs(Compact_Packet.get_class("waypoint_add"),
+                      self.packet_class)
+
+        # Unknown specifications are refused.
+        with self.assertRaises(KeyError):
+            Compact_Packet.get_class("foo")
+
+        # The specifications are loaded when they are not yet available.
+        with patch.dict(Compact_Packet._classes, clear=True):
+            with patch.object(Packet, "_specifications", None):
+                packet_class = Compact_Packet.get_class("ping_pong")
+                self.assertIsInstance(Packet._specifications, dict)
+                self.assertEqual(packet_class._fields, ("sensor_id",))
+                self.assertTrue(packet_class._specification_private)
+
+    def test_set(self):
+        self.compact_packet.set("to_id", 5)
+        self.assertEqual(self.compact_packet.get("to_id"), 5)
+
+        # The specification itself can be set, but cannot be changed.
+        self.compact_packet.set("specification", "waypoint_add")
+        with self.assertRaises(ValueError):
+            self.compact_packet.set("specification", "waypoint_clear")
+
+        # Fields from other specifications are refused.
+        with self.assertRaises(KeyError):
+            self.compact_packet.set("foo", "bar")
+
+    def test_unset(self):
+        self.compact_packet.unset("to_id")
+        self.assertIsNone(self.compact_packet.get("to_id"))
+        self.assertNotIn("to_id", self.compact_packet.get_all())
+
+        # Unsetting a field that is not set or not part of the specification
+        # does nothing.
+        self.compact_packet.unset("to_id")
+        self.compact_packet.unset("foo")
+
+    def test_get(self):
+        self.assertEqual(self.compact_packet.get("specification"),
+                         "waypoint_add")
+        self.assertEqual(self.compact_packet.get("latitude"), 123456789.12)
+
+        # "None" should be returned for a field that is not set or not part
+        # of the specification.
+        self.assertIsNone(self.packet_class().get("latitude"))
+        self.assertIsNone(self.compact_packet.get("quux"))
+
+    def test_get_all(self):
+        self.assertEqual(self.compact_packet.get_all(),
+                         self.waypoint_add_packet.get_all())
+
+    def test_get_dump(self):
+        packet_class = Compact_Packet.get_class("rssi_ground_station")
+        packet = packet_class(1, 2, 3, True, 4, 5, False, 67)
+        self.assertEqual(packet.get_dump(), [1, 2, 3, True, 4, 5, False, 67])
+
+    def test_set_dump(self):
+        packet = Compact_Packet.get_class("rssi_ground_station")()
+        packet.set_dump([1, 2, 3, True, 4, 5, False, 67])
+        self.assertEqual(packet.get("from_valid"), True)
+        self.assertEqual(packet.get("rssi"), 67)
+
+    def test_serialize(self):
+        # Compact packets are serialized in the same way as packets.
+        self.assertEqual(self.compact_packet.serialize(),
+                         self.waypoint_add_message)
+
+        # All fields from the specification must be provided.
+        self.compact_packet.unset("index")
+        with self.assertRaises(KeyError):
+            self.compact_packet.serialize()
+
+    def test_unserialize(self):
+        packet = self.packet_class()
+        packet.unserialize(self.waypoint_add_message)
+        self.assertEqual(packet.get_all(), self.waypoint_add_packet.get_all())
+
+        # Messages of other specifications are refused.
+        with self.assertRaises(ValueError):
+            packet.unserialize(self.setting_add_message)
+
+    def test_is_private(self):
+        self.assertFalse(self.compact_packet.is_private())
+
+        packet = Compact_Packet.get_class("rssi_broadcast")()
+        self.assertTrue(packet.is_private())
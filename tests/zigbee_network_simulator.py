@@ -0,0 +1,281 @@
+# Core imports
+import socket
+import time
+
+# Library imports
+import numpy as np
+from mock import patch
+
+# Package imports
+from ..core.Thread_Manager import Thread_Manager
+from ..reconstruction.Weight_Matrix import Weight_Matrix
+from ..settings.Arguments import Arguments
+from ..zigbee.Network_Simulator import Network_Simulator
+from ..zigbee.Packet import Packet
+from ..zigbee.RF_Sensor_Simulator_Memory import RF_Sensor_Simulator_Memory
+from settings import SettingsTestCase
+
+class TestZigBeeNetworkSimulator(SettingsTestCase):
+    def setUp(self):
+        super(TestZigBeeNetworkSimulator, self).setUp()
+
+        self.arguments = Arguments("settings.json", [
+            "--number-of-sensors", "4", "--network-size", "4", "4",
+            "--network-attenuation-file", "tests/zigbee/attenuation.csv",
+            "--network-noise", "0"
+        ])
+        self.settings = self.arguments.get_settings("network_simulator")
+        self.thread_manager = Thread_Manager()
+        self.network_simulator = Network_Simulator(self.arguments,
+                                                   self.thread_manager)
+
+    def tearDown(self):
+        super(TestZigBeeNetworkSimulator, self).tearDown()
+
+        for wakeup in self.network_simulator._wakeups.values():
+            wakeup.close()
+
+    def test_initialization(self):
+        # Not providing an `Arguments` object raises an exception.
+        with self.assertRaises(TypeError):
+            Network_Simulator(None, self.thread_manager)
+
+        self.assertEqual(self.network_simulator._number_of_sensors, 4)
+        self.assertEqual(self.network_simulator._size, (4, 4))
+        self.assertEqual(self.network_simulator._bitrate,
+                         self.settings.get("network_bitrate"))
+        self.assertIsInstance(self.network_simulator._weight_matrix,
+                              Weight_Matrix)
+
+        # The attenuation image is flattened with rows along the y axis.
+        self.assertEqual(self.network_simulator._attenuation.shape, (16,))
+        self.assertEqual(self.network_simulator._attenuation[5], 5.0)
+        self.assertEqual(self.network_simulator._attenuation.sum(), 20.0)
+
+        # The attenuation image must match the size of the network.
+        self.settings.set("network_size", [3, 4])
+        with self.assertRaises(ValueError):
+            Network_Simulator(self.arguments, self.thread_manager)
+
+        # Without an attenuation image, there is no attenuation.
+        self.settings.set("network_size", [4, 4])
+        self.settings.set("network_attenuation_file", None)
+        network_simulator = Network_Simulator(self.arguments,
+                                              self.thread_manager)
+        self.assertTrue(np.all(network_simulator._attenuation == 0))
+
+        # The ground station and vehicle sensors are placed on the boundary.
+        self.assertEqual(self.network_simulator._positions, [
+            None, (0, 2), (2, 4), (4, 2), (2, 0)
+        ])
+        self.assertEqual(self.network_simulator._inboxes, {})
+        self.assertEqual(self.network_simulator._frames, 0)
+
+    def test_rf_sensors(self):
+        rf_sensors = self.network_simulator.rf_sensors
+        self.assertEqual(len(rf_sensors), 5)
+        for sensor_id, rf_sensor in enumerate(rf_sensors):
+            self.assertIsInstance(rf_sensor, RF_Sensor_Simulator_Memory)
+            self.assertEqual(rf_sensor.id, sensor_id)
+
+        # The sensors use the locations of their positions.
+        rf_sensor = rf_sensors[2]
+        self.assertEqual(rf_sensor._location_callback(), ((2, 4), 0))
+        self.assertTrue(rf_sensor._valid_callback(other_valid=True))
+
+    def test_get_perimeter_position(self):
+        self.assertEqual(self.network_simulator._get_perimeter_position(0.0),
+                         (0, 0))
+        self.assertEqual(self.network_simulator._get_perimeter_position(0.25),
+                         (0, 4))
+        self.assertEqual(self.network_simulator._get_perimeter_position(0.5),
+                         (4, 4))
+        self.assertEqual(self.network_simulator._get_perimeter_position(0.75),
+                         (4, 0))
+
+    def test_get_location(self):
+        self.assertEqual(self.network_simulator._get_location((1, 2)),
+                         ((1, 2), 0))
+
+    def test_receive_packet(self):
+        # Received packets are ignored.
+        self.network_simulator._receive_packet(Packet())
+
+    def test_location_valid(self):
+        self.assertTrue(self.network_simulator._location_valid())
+
+    def test_reset(self):
+        self.network_simulator._frames = 3
+        self.network_simulator._measurement_latency = [1.0, 0.5]
+        self.network_simulator.reset()
+
+        self.assertEqual(self.network_simulator._frames, 0)
+        self.assertEqual(self.network_simulator._measurement_latency, [0.0, 0.0])
+        self.assertIsNone(self.network_simulator._end_time)
+
+    def test_register(self):
+        connection = self.network_simulator.register(1)
+        try:
+            self.assertEqual(connection.family, socket.AF_UNIX)
+            self.assertTrue(self.network_simulator.is_registered(1))
+
+            # Registering again replaces the inbox and wakeup socket.
+            wakeup = self.network_simulator._wakeups[1]
+            other_connection = self.network_simulator.register(1)
+            other_connection.close()
+            self.assertNotEqual(self.network_simulator._wakeups[1], wakeup)
+        finally:
+            connection.close()
+
+    def test_is_registered(self):
+        self.assertFalse(self.network_simulator.is_registered(0))
+        self.network_simulator.register(0).close()
+        self.assertTrue(self.network_simulator.is_registered(0))
+
+    def test_transmit(self):
+        # Frames to unregistered sensors are dropped.
+        self.network_simulator.transmit(1, 2, "foo")
+        self.assertEqual(self.network_simulator._frames, 0)
+
+        connection = self.network_simulator.register(2)
+        try:
+            self.network_simulator.transmit(1, 2, "foo")
+            self.assertEqual(self.network_simulator._frames, 1)
+            self.assertEqual(len(self.network_simulator._inboxes[2]), 1)
+            self.assertEqual(connection.recv(16), "\0")
+
+            # A frame from another sensor that is sent while the first frame
+            # is still being sent collides with it.
+            self.network_simulator._busy_until[1] = time.time() + 10.0
+            self.network_simulator.transmit(3, 2, "bar")
+            self.assertEqual(self.network_simulator._collisions, 2)
+
+            # Frames from the same sensor are sent after each other.
+            busy_until = time.time() + 5.0
+            self.network_simulator._busy_until[3] = busy_until
+            self.network_simulator.transmit(3, 2, "baz")
+            self.assertEqual(self.network_simulator._collisions, 3)
+            arrival_time = self.network_simulator._inboxes[2][-1][2]
+            self.assertAlmostEqual(arrival_time, busy_until + 3 * 8.0 / 250000)
+        finally:
+            connection.close()
+
+        # Frames to deactivated sensors are not signaled.
+        self.network_simulator.transmit(1, 2, "foo")
+        self.assertEqual(self.network_simulator._frames, 4)
+
+    def test_receive(self):
+        connection = self.network_simulator.register(0)
+        try:
+            now = time.time()
+            self.network_simulator.transmit(1, 0, "foo", [now - 1.0])
+            self.network_simulator.transmit(2, 0, "bar", [now - 2.0, now - 0.5])
+
+            self.assertEqual(self.network_simulator.receive(0), ["foo", "bar"])
+            self.assertEqual(self.network_simulator.receive(0), [])
+
+            # The latencies of the frames and measurements are kept track of.
+            self.assertEqual(self.network_simulator._received_frames, 2)
+            self.assertEqual(self.network_simulator._measurements, 3)
+            self.assertGreaterEqual(self.network_simulator._measurement_latency[1], 2.0)
+            self.assertLess(self.network_simulator._measurement_latency[1], 3.0)
+        finally:
+            connection.close()
+
+    def test_add_latency(self):
+        latency = [0.0, 0.0]
+        self.network_simulator._add_latency(latency, 2.0)
+        self.network_simulator._add_latency(latency, 1.0)
+        self.assertEqual(latency, [3.0, 2.0])
+
+    def test_get_rssi(self):
+        source = self.network_simulator._positions[1]
+        destination = self.network_simulator._positions[3]
+
+        with patch.object(self.network_simulator, "_calculate_rssi",
+                          return_value=-50.4) as calculate_mock:
+            self.assertEqual(self.network_simulator.get_rssi(source, destination), -50)
+            self.assertEqual(self.network_simulator.get_rssi(source, destination), -50)
+
+            # The RSSI value without noise is cached per link.
+            calculate_mock.assert_called_once_with(source, destination)
+
+            # RSSI values are limited to what a packet can contain.
+            calculate_mock.configure_mock(return_value=-200.0)
+            self.assertEqual(self.network_simulator.get_rssi((0, 0), (4, 4)), -128)
+
+    def test_calculate_rssi(self):
+        tx_power = self.settings.get("network_tx_power")
+
+        # Links that do not cross the network are not attenuated.
+        rssi = self.network_simulator._calculate_rssi((0, 2), (0, 3))
+        self.assertEqual(rssi, tx_power)
+
+        # The path loss increases with the distance.
+        source = self.network_simulator._positions[1]
+        destination = self.network_simulator._positions[3]
+        rssi = self.network_simulator._calculate_rssi(source, destination)
+
+        self.settings.set("network_attenuation_file", None)
+        network_simulator = Network_Simulator(self.arguments,
+                                              self.thread_manager)
+        free_rssi = network_simulator._calculate_rssi(source, destination)
+        self.assertAlmostEqual(free_rssi, tx_power - 20 * np.log10(4))
+
+        # The attenuation along the link decreases the RSSI value.
+        self.assertLess(rssi, free_rssi)
+
+    def test_run(self):
+        self.arguments.get_settings("zigbee_tdma_scheduler").set("sweep_delay", 0.1)
+        network_simulator = Network_Simulator(self.arguments,
+                                              self.thread_manager)
+
+        statistics = network_simulator.run(0.3)
+
+        # The sensors have sent measurements to the ground station.
+        self.assertGreater(statistics["frames"], 0)
+        self.assertGreater(statistics["measurements"], 0)
+        self.assertGreaterEqual(statistics["duration"], 0.3)
+
+        # The sensors are deactivated and their loops have finished.
+        for rf_sensor in network_simulator.rf_sensors:
+            self.assertFalse(rf_sensor._activated)
+            self.assertTrue(rf_sensor.join(0.0))
+
+        self.assertEqual(network_simulator._inboxes, {})
+        self.assertEqual(network_simulator._wakeups, {})
+
+        # The duration from the settings is used by default.
+        with patch.object(time, "sleep") as sleep_mock:
+            network_simulator.run()
+            sleep_mock.assert_any_call(self.settings.get("network_duration"))
+
+    def test_get_statistics(self):
+        # Statistics without any frames are well-defined.
+        statistics = self.network_simulator.get_statistics()
+        self.assertEqual(statistics["frames"], 0)
+        self.assertEqual(statistics["collision_rate"], 0.0)
+        self.assertEqual(statistics["measurement_latency_mean"], 0.0)
+
+        self.network_simulator._start_time = 10.0
+        self.network_simulator._end_time = 12.0
+        self.network_simulator._frames = 8
+        self.network_simulator._received_frames = 4
+        self.network_simulator._collisions = 2
+        self.network_simulator._measurements = 6
+        self.network_simulator._frame_latency = [2.0, 1.0]
+        self.network_simulator._measurement_latency = [3.0, 1.5]
+
+        self.assertEqual(self.network_simulator.get_statistics(), {
+            "duration": 2.0,
+            "frames": 8,
+            "frames_per_second": 4.0,
+            "measurements": 6,
+            "measurements_per_second": 3.0,
+            "collisions": 2,
+            "collision_rate": 0.25,
+            "frame_latency_mean": 0.5,
+            "frame_latency_max": 1.0,
+            "measurement_latency_mean": 0.5,
+            "measurement_latency_max": 1.5
+        })
@@ -1,5 +1,6 @@
 import struct
 import unittest
+from mock import patch
 from ..zigbee.Packet import Packet
 
 class ZigBeePacketTestCase(unittest.TestCase):
@@ -33,6 +34,13 @@ class ZigBeePacketTestCase(unittest.TestCase):
         self.setting_add_list_message = "\n\x01\x00\x00\x00\x05items" + \
                                         "\x00\x11x\x9c\x8b6\xd4Q0\xd2Q0" + \
                                         "\x8e\x05\x00\t\x85\x01\xe7\x01"
+        self.rssi_ground_station_batch_message = "\x0e\x02\x02" + \
+            "\x00\x00\x00\x00\x00\x00\xf8?\x00\x00\x00\x00\x00\x00\x04@" + \
+            "\x01\x00\x00\x00\x00\x00\x00\x0c@\x00\x00\x00\x00\x00\x00\x12@" + \
+            "\x00\xda" + \
+            "\x00\x00\x00\x00\x00\x00\x14@\x00\x00\x00\x00\x00\x00\x18@" + \
+            "\x00\x00\x00\x00\x00\x00\x00\x1c@\x00\x00\x00\x00\x00\x00 @" + \
+            "\x01\xd7"
 
 class TestZigBeePacket(ZigBeePacketTestCase):
     def test_initialization(self):
@@ -42,6 +50,39 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         # The specifications dictionary must be set.
         self.assertIsInstance(self.packet._specifications, dict)
 
+        # The specifications are shared between packets.
+        self.assertIs(Packet()._specifications, Packet._specifications)
+
+        # The specifications are loaded for the first packet.
+        with patch.object(Packet, "_specifications", None):
+            Packet()
+            self.assertIsInstance(Packet._specifications, dict)
+
+        # The identifier lookup table and the codecs must be set.
+        self.assertEqual(self.packet._specification_names[6], "waypoint_add")
+        self.assertEqual(len(self.packet._specification_names),
+                         len(self.packet._specifications))
+        self.assertEqual(sorted(self.packet._codecs.keys()),
+                         sorted(self.packet._specifications.keys()))
+
+        # Fixed-size fields are combined into one segment, while fields with
+        # the special formats have their own segment.
+        codec = self.packet._codecs["setting_add"]
+        self.assertEqual(len(codec), 4)
+        self.assertEqual(codec[0][0].format, "=Bi")
+        self.assertEqual([field["name"] for field in codec[0][1]],
+                         ["id", "index"])
+        self.assertIsNone(codec[1][0])
+        self.assertEqual([field["name"] for field in codec[1][1]], ["key"])
+        self.assertIsNone(codec[2][0])
+        self.assertEqual([field["name"] for field in codec[2][1]], ["value"])
+        self.assertEqual(codec[3][0].format, "=B")
+
+        codec = self.packet._codecs["waypoint_add"]
+        self.assertEqual(len(codec), 1)
+        self.assertEqual(codec[0][0].format, "=BdddBBiiiB")
+        self.assertEqual(codec[0][0].size, len(self.waypoint_add_message))
+
         # The packet must be private by default.
         self.assertTrue(self.packet._private)
 
@@ -159,6 +200,13 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         with self.assertRaises(ValueError):
             self.packet.serialize()
 
+        # The field that cannot be serialized is mentioned in the error.
+        self.waypoint_add_packet.set("wait_count", "6")
+        with self.assertRaisesRegexp(ValueError, "'wait_count'"):
+            self.waypoint_add_packet.serialize()
+
+        self.waypoint_add_packet.set("wait_count", 6)
+
         # When all fields are provided, the specification field must be
         # unset and the packed message must be valid.
         packed_message = self.waypoint_add_packet.serialize()
@@ -184,6 +232,45 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         packed_message = self.packet.serialize()
         self.assertEqual(packed_message, self.setting_add_list_message)
 
+    def test_serialize_list(self):
+        self.packet.set("specification", "rssi_ground_station_batch")
+        self.packet.set("sensor_id", 2)
+        self.packet.set("measurements", [
+            [1.5, 2.5, True, 3.5, 4.5, False, -38],
+            [5.0, 6.0, False, 7.0, 8.0, True, -41]
+        ])
+
+        packed_message = self.packet.serialize()
+        self.assertEqual(packed_message, self.rssi_ground_station_batch_message)
+
+        # Items must have a value for each format in the list format.
+        self.packet.set("measurements", [[1.5, 2.5, True]])
+        with self.assertRaisesRegexp(ValueError, "'measurements'"):
+            self.packet.serialize()
+
+    def test_get_list_sizes(self):
+        with self.assertRaises(KeyError):
+            Packet.get_list_sizes("foo")
+
+        # The specifications are loaded if no packet has been created yet.
+        with patch.object(Packet, "_specifications", None):
+            self.assertEqual(Packet.get_list_sizes("waypoint_add")[1], {})
+            self.assertIsInstance(Packet._specifications, dict)
+
+        # Specifications with string or object fields have a variable size.
+        with self.assertRaisesRegexp(ValueError, "'key'"):
+            Packet.get_list_sizes("setting_add")
+
+        size, item_sizes = Packet.get_list_sizes("waypoint_add")
+        self.assertEqual(size, len(self.waypoint_add_message))
+        self.assertEqual(item_sizes, {})
+
+        size, item_sizes = Packet.get_list_sizes("rssi_ground_station_batch")
+        self.assertEqual(size, 3)
+        self.assertEqual(item_sizes, {"measurements": 35})
+        self.assertEqual(size + 2 * item_sizes["measurements"],
+                         len(self.rssi_ground_station_batch_message))
+
     def test_unserialize(self):
         # Empty strings must be refused.
         with self.assertRaises(struct.error):
@@ -198,6 +285,13 @@ class TestZigBeePacket(ZigBeePacketTestCase):
             # Final part of packet missing
             self.packet.unserialize("\n\x00\x00\x00\x00\x03bar")
 
+        # The field that is incomplete is mentioned in the error.
+        with self.assertRaisesRegexp(ValueError, "'wait_count' at offset 27"):
+            self.packet.unserialize(self.waypoint_add_message[:30])
+
+        self.assertEqual(self.packet.get("type"), 1)
+        self.assertEqual(self.packet.get("wait_id"), 3)
+
         # Reset the packet as the previous test changed some fields in the packet.
         self.packet = Packet()
 
@@ -239,6 +333,22 @@ class TestZigBeePacket(ZigBeePacketTestCase):
         })
         self.assertFalse(self.packet.is_private())
 
+    def test_unserialize_list(self):
+        self.packet.unserialize(self.rssi_ground_station_batch_message)
+        self.assertEqual(self.packet.get_all(), {
+            "specification": "rssi_ground_station_batch",
+            "sensor_id": 2,
+            "measurements": [
+                [1.5, 2.5, True, 3.5, 4.5, False, -38],
+                [5.0, 6.0, False, 7.0, 8.0, True, -41]
+            ]
+        })
+        self.assertTrue(self.packet.is_private())
+
+        # Incomplete items must be refused.
+        with self.assertRaisesRegexp(ValueError, "'measurements'"):
+            self.packet.unserialize(self.rssi_ground_station_batch_message[:-1])
+
     def test_is_private(self):
         # The private property should be returned.
         private = self.packet.is_private()
@@ -87,6 +87,17 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
 
         self.assertEqual(self.rf_sensor._loop_delay, self.settings.get("loop_delay"))
 
+        # Batching is disabled by default. The batch size is the number of
+        # measurements that fit in the maximum packet size.
+        self.assertFalse(self.rf_sensor._batch)
+        self.assertEqual(self.rf_sensor._batch_size, 2)
+
+        self.settings.set("ground_station_mtu", 1)
+        type_mock = PropertyMock(return_value="zigbee_base")
+        with patch.object(RF_Sensor, "type", new_callable=type_mock):
+            rf_sensor = self._create_sensor(RF_Sensor)
+            self.assertEqual(rf_sensor._batch_size, 1)
+
         self.assertTrue(hasattr(self.rf_sensor._location_callback, "__call__"))
         self.assertTrue(hasattr(self.rf_sensor._receive_callback, "__call__"))
         self.assertTrue(hasattr(self.rf_sensor._valid_callback, "__call__"))
@@ -274,6 +285,35 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
                 update_mock.assert_called_once_with()
                 send_mock.assert_called_once_with()
 
+        with patch.object(RF_Sensor, "_wait") as wait_mock:
+            # The sensor waits for at most the loop delay.
+            self.rf_sensor._started = False
+            self.rf_sensor._loop_body()
+            wait_mock.assert_called_once_with(self.settings.get("loop_delay"))
+            wait_mock.reset_mock()
+
+            # When the sensor has been started, it waits no longer than until
+            # its next slot in the schedule.
+            self.rf_sensor._started = True
+            self.rf_sensor._scheduler.timestamp = time.time() + 60.0
+            with patch.object(RF_Sensor, "_send"):
+                self.rf_sensor._loop_body()
+
+            timeout = wait_mock.call_args[0][0]
+            self.assertEqual(timeout, self.settings.get("loop_delay"))
+            wait_mock.reset_mock()
+
+            self.rf_sensor._scheduler.timestamp = time.time() + 0.001
+            self.rf_sensor._loop_body()
+            timeout = wait_mock.call_args[0][0]
+            self.assertGreaterEqual(timeout, 0.0)
+            self.assertLessEqual(timeout, 0.001)
+
+    def test_wait(self):
+        with patch.object(time, "sleep") as sleep_mock:
+            self.rf_sensor._wait(0.5)
+            sleep_mock.assert_called_once_with(0.5)
+
     def test_send(self):
         self.rf_sensor._packets.append(self.rf_sensor._create_rssi_broadcast_packet())
 
@@ -305,6 +345,42 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
 
             self.assertEqual(self.rf_sensor._packets, [])
 
+    def test_send_ground_station_packets(self):
+        rssi_broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet()
+        packets = []
+        for rssi in range(-40, -45, -1):
+            packet = self.rf_sensor._create_rssi_ground_station_packet(rssi_broadcast_packet)
+            packet.set("rssi", rssi)
+            packets.append(packet)
+
+        # Without batching, each packet is sent to the ground station.
+        with patch.object(RF_Sensor, "_send_tx_frame") as send_tx_frame_mock:
+            self.rf_sensor._send_ground_station_packets(packets)
+
+            self.assertEqual(send_tx_frame_mock.call_count, len(packets))
+            for call, packet in zip(send_tx_frame_mock.call_args_list, packets):
+                self.assertEqual(call[0], (packet, 0))
+
+        # With batching, the packets are combined into as few batch packets as
+        # the batch size allows.
+        self.rf_sensor._batch = True
+        with patch.object(RF_Sensor, "_send_tx_frame") as send_tx_frame_mock:
+            self.rf_sensor._send_ground_station_packets(packets)
+
+            self.assertEqual(send_tx_frame_mock.call_count, 3)
+            measurements = []
+            for call in send_tx_frame_mock.call_args_list:
+                packet, to = call[0]
+                self.assertEqual(packet.get("specification"),
+                                 "rssi_ground_station_batch")
+                self.assertEqual(to, 0)
+                self.assertLessEqual(len(packet.serialize()),
+                                     self.settings.get("ground_station_mtu"))
+                measurements.extend(packet.get("measurements"))
+
+            self.assertEqual([measurement[-1] for measurement in measurements],
+                             [-40, -41, -42, -43, -44])
+
     def test_send_custom_packets(self):
         self.packet.set("specification", "waypoint_clear")
         self.packet.set("to_id", 2)
@@ -367,3 +443,19 @@ class TestZigBeeRFSensor(ZigBeeRFSensorTestCase):
         self.assertEqual(packet.get("to_latitude"), 0)
         self.assertEqual(packet.get("to_longitude"), 0)
         self.assertTrue(packet.get("to_valid"))
+
+    def test_create_rssi_ground_station_batch_packet(self):
+        rssi_broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet()
+        ground_station_packet = self.rf_sensor._create_rssi_ground_station_packet(rssi_broadcast_packet)
+        ground_station_packet.set("rssi", -38)
+
+        packet = self.rf_sensor._create_rssi_ground_station_batch_packet([
+            ground_station_packet
+        ])
+
+        self.assertIsInstance(packet, Packet)
+        self.assertEqual(packet.get("specification"), "rssi_ground_station_batch")
+        self.assertEqual(packet.get("sensor_id"), self.rf_sensor.id)
+        self.assertEqual(packet.get("measurements"), [
+            ground_station_packet.get_dump()[1:]
+        ])
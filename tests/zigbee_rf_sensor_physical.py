@@ -86,6 +86,13 @@ class TestZigBeeRFSensorPhysical(ZigBeeRFSensorTestCase):
         self.rf_sensor._process(self.packet)
         buffer_mock.put.assert_called_once_with(self.packet)
 
+        # RSSI ground station batch packets must be put in the buffer as well.
+        buffer_mock.reset_mock()
+        self.packet.set("specification", "rssi_ground_station_batch")
+
+        self.rf_sensor._process(self.packet)
+        buffer_mock.put.assert_called_once_with(self.packet)
+
         # RSSI broadcast packets must raise an exception on the ground station.
         self.packet.set("specification", "rssi_broadcast")
 
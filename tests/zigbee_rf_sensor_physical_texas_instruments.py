@@ -1,4 +1,5 @@
 # Core imports
+import select
 import struct
 import thread
 import time
@@ -144,13 +145,12 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
 
         with patch.object(TDMA_Scheduler, "shift") as shift_mock:
             with patch.object(TDMA_Scheduler, "update") as update_mock:
-                with patch.object(RF_Sensor_Physical_Texas_Instruments, "_receive") as receive_mock:
+                with patch.object(RF_Sensor_Physical_Texas_Instruments, "_wait") as wait_mock:
                     try:
                         self.rf_sensor._loop_body()
                     except DisabledException:
                         pass
 
-                    receive_mock.assert_called_once_with()
                     self.assertEqual(shift_mock.call_count, 1)
                     self.assertEqual(update_mock.call_count, 1)
                     self.assertNotEqual(self.rf_sensor._polling_time, 0.0)
@@ -158,11 +158,34 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
         # Regular updates must be handled.
         self.rf_sensor._started = False
 
-        with patch.object(RF_Sensor_Physical_Texas_Instruments, "_receive") as receive_mock:
-            # The receive method must be called.
+        with patch.object(RF_Sensor_Physical_Texas_Instruments, "_wait") as wait_mock:
+            # The sensor must wait for packets.
             self.rf_sensor._loop_body()
 
-            receive_mock.assert_called_once_with()
+            wait_mock.assert_called_once_with(self.settings.get("loop_delay"))
+
+    @patch.object(RF_Sensor_Physical_Texas_Instruments, "_receive")
+    def test_wait(self, receive_mock):
+        # A `DisabledException` must be raised when the sensor has been
+        # deactivated.
+        with self.assertRaises(DisabledException):
+            self.rf_sensor._wait(0.0)
+
+        with patch.object(self.rf_sensor, "_connection") as connection_mock:
+            with patch.object(select, "select") as select_mock:
+                # When the serial connection has no data before the timeout,
+                # nothing is received.
+                select_mock.configure_mock(return_value=([], [], []))
+                self.rf_sensor._wait(0.5)
+                select_mock.assert_called_once_with([connection_mock], [], [], 0.5)
+                receive_mock.assert_not_called()
+
+                # When the serial connection has data, all complete packets
+                # are received.
+                select_mock.configure_mock(return_value=([connection_mock], [], []))
+                receive_mock.configure_mock(side_effect=[True, True, False])
+                self.rf_sensor._wait(0.5)
+                self.assertEqual(receive_mock.call_count, 3)
 
     def test_send_tx_frame(self):
         self.packet.set("specification", "waypoint_clear")
@@ -185,7 +208,7 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
             # Nothing should be done when there is not enough data in the 
             # serial buffer.
             connection_mock.in_waiting = 0
-            self.rf_sensor._receive()
+            self.assertFalse(self.rf_sensor._receive())
             connection_mock.read.assert_not_called()
 
             # Create the `Packet` object for processing if there is enough data 
@@ -194,7 +217,7 @@ class TestZigBeeRFSensorPhysicalTexasInstruments(ZigBeeRFSensorTestCase, USBMana
             connection_mock.in_waiting = len(serialized_packet)
             connection_mock.read.configure_mock(return_value=serialized_packet)
 
-            self.rf_sensor._receive()
+            self.assertTrue(self.rf_sensor._receive())
 
             self.assertNotEqual(self.rf_sensor._polling_time, 0.0)
 
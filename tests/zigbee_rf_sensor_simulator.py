@@ -1,6 +1,8 @@
 # Core imports
 import errno
+import select
 import socket
+import time
 
 # Library imports
 from mock import patch, MagicMock
@@ -79,40 +81,72 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
         self.assertIsInstance(self.rf_sensor._connection, socket.socket)
 
     @patch.object(RF_Sensor_Simulator, "_receive")
-    @patch.object(RF_Sensor_Simulator, "_send")
-    def test_loop_body(self, send_mock, receive_mock):
+    def test_wait(self, receive_mock):
+        # A `DisabledException` must be raised when the sensor has been
+        # deactivated.
+        with self.assertRaises(DisabledException):
+            self.rf_sensor._wait(0.0)
+
         with patch.object(self.rf_sensor, "_connection") as connection_mock:
             recv_mock = connection_mock.recv
 
-            # The socket's receive method must be called, but when a socket
-            # error occurs (i.e., when there is no data available), we ignore
-            # the error and continue.
-            recv_mock.configure_mock(side_effect=socket.error)
-            self.rf_sensor._loop_body()
-            recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
-            recv_mock.reset_mock()
-
-            # The socket's receive method must be called, but when an
-            # attribute error occurs (i.e., when the sensor has been
-            # deactivated), a `DisabledException` must be raised.
-            recv_mock.configure_mock(side_effect=AttributeError)
-            with self.assertRaises(DisabledException):
-                self.rf_sensor._loop_body()
-
-            recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
-            recv_mock.reset_mock()
-
-            # Correct serialized packets must be received.
-            recv_mock.configure_mock(side_effect=None,
-                                     return_value=self.waypoint_add_message)
-
-            self.rf_sensor._loop_body()
-
-            recv_mock.assert_called_once_with(self.settings.get("buffer_size"))
-            self.assertEqual(receive_mock.call_count, 1)
-            kwargs = receive_mock.call_args[1]
-            self.assertEqual(kwargs["packet"].get_all(),
-                             self.waypoint_add_packet.get_all())
+            with patch.object(select, "select") as select_mock:
+                # When the socket has no data before the timeout, nothing is
+                # received.
+                select_mock.configure_mock(return_value=([], [], []))
+                self.rf_sensor._wait(0.5)
+                select_mock.assert_called_once_with([connection_mock], [], [], 0.5)
+                recv_mock.assert_not_called()
+
+                # When the socket has data, all packets are received until
+                # a socket error occurs (i.e., no more data is available).
+                select_mock.configure_mock(return_value=([connection_mock], [], []))
+                recv_mock.configure_mock(side_effect=[
+                    self.waypoint_add_message, self.waypoint_add_message,
+                    socket.error
+                ])
+                self.rf_sensor._wait(0.5)
+
+                self.assertEqual(recv_mock.call_count, 3)
+                recv_mock.assert_called_with(self.settings.get("buffer_size"))
+                self.assertEqual(receive_mock.call_count, 2)
+                for call in receive_mock.call_args_list:
+                    self.assertEqual(call[1]["packet"].get_all(),
+                                     self.waypoint_add_packet.get_all())
+
+    def test_wait_socket(self):
+        # Packets sent to the socket wake up the sensor before the timeout.
+        self.rf_sensor._setup()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            address = (self.rf_sensor._ip, self.rf_sensor._port + self.rf_sensor.id)
+            sender.sendto(self.waypoint_add_message, address)
+            sender.sendto(self.waypoint_add_message, address)
+
+            with patch.object(RF_Sensor_Simulator, "_receive") as receive_mock:
+                start = time.time()
+                self.rf_sensor._wait(5.0)
+                self.assertLess(time.time() - start, 1.0)
+                self.assertEqual(receive_mock.call_count, 2)
+        finally:
+            sender.close()
+            self.rf_sensor._connection.close()
+
+    def test_read(self):
+        with patch.object(self.rf_sensor, "_connection") as connection_mock:
+            # All data is read from the socket until a socket error occurs.
+            connection_mock.recv.configure_mock(side_effect=[
+                self.waypoint_add_message, self.setting_add_message,
+                socket.error
+            ])
+            self.assertEqual(list(self.rf_sensor._read()), [
+                self.waypoint_add_message, self.setting_add_message
+            ])
+
+        # A `DisabledException` must be raised when the sensor has been
+        # deactivated in the meantime.
+        with self.assertRaises(DisabledException):
+            list(self.rf_sensor._read())
 
     def test_send_tx_frame(self):
         self.packet.set("specification", "waypoint_clear")
@@ -157,3 +191,14 @@ class TestZigBeeRFSensorSimulator(ZigBeeRFSensorTestCase):
         self.rf_sensor._receive(packet)
 
         self.rf_sensor.buffer.put.assert_called_once_with(packet)
+
+    def test_get_rssi(self):
+        packet = self.rf_sensor._create_rssi_ground_station_packet(
+            self.rf_sensor._create_rssi_broadcast_packet()
+        )
+
+        # Simulated RF sensors use a random RSSI value.
+        rssi = self.rf_sensor._get_rssi(packet)
+        self.assertIsInstance(rssi, int)
+        self.assertGreaterEqual(rssi, -70)
+        self.assertLessEqual(rssi, -30)
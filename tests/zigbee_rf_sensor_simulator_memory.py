@@ -0,0 +1,181 @@
+# Core imports
+import socket
+import thread
+
+# Library imports
+from mock import patch, MagicMock
+
+# Package imports
+from ..zigbee.Network_Simulator import Network_Simulator
+from ..zigbee.RF_Sensor import RF_Sensor, DisabledException
+from ..zigbee.RF_Sensor_Simulator_Memory import RF_Sensor_Simulator_Memory
+from zigbee_rf_sensor import ZigBeeRFSensorTestCase
+
+class TestZigBeeRFSensorSimulatorMemory(ZigBeeRFSensorTestCase):
+    def setUp(self):
+        super(TestZigBeeRFSensorSimulatorMemory, self).setUp()
+
+        self.settings = self.arguments.get_settings("rf_sensor_simulator")
+        self.network = MagicMock(spec=Network_Simulator)
+        self.rf_sensor = self._create_sensor(RF_Sensor_Simulator_Memory,
+                                             network=self.network,
+                                             sensor_id=2)
+
+    def test_initialization(self):
+        # Not providing a network raises an exception.
+        with self.assertRaises(TypeError):
+            self._create_sensor(RF_Sensor_Simulator_Memory)
+
+        self.assertEqual(self.rf_sensor._network, self.network)
+
+        # The provided sensor ID overrides the one from the settings.
+        self.assertEqual(self.rf_sensor.id, 2)
+        self.assertEqual(self.rf_sensor._scheduler.id, 2)
+        self.assertEqual(self.rf_sensor.thread_name, "rf_sensor_2")
+        self.assertEqual(self.rf_sensor._address, "memory:2")
+
+        rf_sensor = self._create_sensor(RF_Sensor_Simulator_Memory,
+                                        network=self.network)
+        self.assertEqual(rf_sensor.id, self.settings.get("rf_sensor_id"))
+
+        self.assertEqual(self.rf_sensor._measurement_timestamps, [])
+        self.assertTrue(self.rf_sensor._finished.is_set())
+
+    def test_activate(self):
+        with patch.object(thread, "start_new_thread") as start_new_thread_mock:
+            self.rf_sensor.activate()
+
+            # The sensor loop is not finished until it has been stopped.
+            self.assertFalse(self.rf_sensor._finished.is_set())
+            self.network.register.assert_called_once_with(2)
+            self.assertEqual(start_new_thread_mock.call_count, 1)
+
+            # Activating the sensor again does not change anything.
+            self.rf_sensor.activate()
+            self.assertFalse(self.rf_sensor._finished.is_set())
+            self.assertEqual(start_new_thread_mock.call_count, 1)
+
+    def test_join(self):
+        self.assertTrue(self.rf_sensor.join())
+
+        self.rf_sensor._finished.clear()
+        self.assertFalse(self.rf_sensor.join(0.0))
+
+    def test_discover(self):
+        self.network.is_registered.configure_mock(
+            side_effect=lambda vehicle_id: vehicle_id != 3
+        )
+
+        callback_mock = MagicMock()
+        self.rf_sensor.discover(callback_mock)
+
+        # Only the sensors that are registered in the network are discovered.
+        self.assertEqual(callback_mock.call_count,
+                         self.rf_sensor.number_of_sensors - 1)
+        callback_mock.assert_any_call({"id": 1, "address": "memory:1"})
+        callback_mock.assert_any_call({"id": 4, "address": "memory:4"})
+
+        callback_mock.reset_mock()
+        self.rf_sensor.discover(callback_mock, required_sensors=set([3]))
+        callback_mock.assert_not_called()
+
+        # The required sensors are checked.
+        with self.assertRaises(TypeError):
+            self.rf_sensor.discover(callback_mock, required_sensors=[1])
+
+    def test_loop(self):
+        self.rf_sensor._finished.clear()
+        self.rf_sensor._activated = True
+
+        # The loop must indicate that it has finished.
+        with patch.object(RF_Sensor, "_loop_body",
+                          side_effect=DisabledException):
+            self.rf_sensor._loop()
+
+        self.assertTrue(self.rf_sensor._finished.is_set())
+
+    def test_setup(self):
+        self.rf_sensor._setup()
+
+        # The connection is the one from the network.
+        self.network.register.assert_called_once_with(2)
+        self.assertEqual(self.rf_sensor._connection,
+                         self.network.register.return_value)
+
+    def test_read(self):
+        self.network.receive.configure_mock(return_value=[
+            self.waypoint_add_message
+        ])
+
+        with patch.object(self.rf_sensor, "_connection") as connection_mock:
+            connection_mock.recv.configure_mock(side_effect=["\0\0",
+                                                             socket.error])
+
+            # The wakeup signals are discarded and the packets are received
+            # from the network.
+            self.assertEqual(self.rf_sensor._read(),
+                             [self.waypoint_add_message])
+            self.assertEqual(connection_mock.recv.call_count, 2)
+            self.network.receive.assert_called_once_with(2)
+
+    def test_send_tx_frame(self):
+        self.packet.set("specification", "waypoint_clear")
+        self.packet.set("to_id", 1)
+
+        # The sensor must be activated.
+        with self.assertRaises(DisabledException):
+            self.rf_sensor._send_tx_frame(self.packet, to=1)
+
+        self.rf_sensor._connection = MagicMock()
+
+        # Packets to other sensors are transmitted through the network.
+        self.rf_sensor._send_tx_frame(self.packet, to=1)
+        self.network.transmit.assert_called_once_with(2, 1,
+                                                      self.packet.serialize(),
+                                                      [])
+
+        # Packets to the ground station contain the timestamps of the
+        # measurements.
+        self.rf_sensor._measurement_timestamps = [1.0, 2.0, 3.0]
+        packet = self.rf_sensor._create_rssi_ground_station_packet(
+            self.rf_sensor._create_rssi_broadcast_packet()
+        )
+        packet.set("rssi", -40)
+        self.rf_sensor._measurement_timestamps = [1.0, 2.0, 3.0]
+
+        self.network.transmit.reset_mock()
+        self.rf_sensor._send_tx_frame(packet, to=0)
+        self.network.transmit.assert_called_once_with(2, 0,
+                                                      packet.serialize(),
+                                                      [1.0])
+        self.assertEqual(self.rf_sensor._measurement_timestamps, [2.0, 3.0])
+
+        batch_packet = self.rf_sensor._create_rssi_ground_station_batch_packet(
+            [packet, packet]
+        )
+
+        self.network.transmit.reset_mock()
+        self.rf_sensor._send_tx_frame(batch_packet, to=0)
+        self.network.transmit.assert_called_once_with(2, 0,
+                                                      batch_packet.serialize(),
+                                                      [2.0, 3.0])
+        self.assertEqual(self.rf_sensor._measurement_timestamps, [])
+
+    def test_create_rssi_ground_station_packet(self):
+        broadcast_packet = self.rf_sensor._create_rssi_broadcast_packet()
+        packet = self.rf_sensor._create_rssi_ground_station_packet(broadcast_packet)
+
+        self.assertEqual(packet.get("specification"), "rssi_ground_station")
+        self.assertEqual(self.rf_sensor._measurement_timestamps,
+                         [broadcast_packet.get("timestamp")])
+
+    def test_get_rssi(self):
+        self.location_callback.configure_mock(return_value=((1, 2), 0))
+        packet = self.rf_sensor._create_rssi_ground_station_packet(
+            self.rf_sensor._create_rssi_broadcast_packet()
+        )
+
+        # The network determines the RSSI value from the locations.
+        self.network.get_rssi.configure_mock(return_value=-42)
+        self.assertEqual(self.rf_sensor._get_rssi(packet), -42)
+        self.network.get_rssi.assert_called_once_with((1, 2), (1, 2))
@@ -0,0 +1,129 @@
+from Packet import Packet
+
+class Compact_Packet(Packet):
+    """
+    A packet with a fixed specification, which keeps the values of its fields
+    in slots instead of a contents key-value store.
+
+    A compact packet class is generated for each specification using the
+    `get_class` method. The generated classes are compatible with `Packet`
+    objects, but they only accept the fields of their specification. This
+    makes them suitable for large numbers of measurement packets.
+    """
+
+    __slots__ = ()
+
+    # Generated packet classes, keyed by specification name.
+    _classes = {}
+
+    # The specification of a generated class, the names of the fields in the
+    # specification that do not have a fixed value (in order) and whether the
+    # packets of the specification are private.
+    _specification_name = None
+    _fields = ()
+    _specification_private = True
+
+    @classmethod
+    def get_class(cls, specification_name):
+        """
+        Retrieve the compact packet class for the specification with the given
+        `specification_name`, generating it if necessary.
+        """
+
+        if specification_name in cls._classes:
+            return cls._classes[specification_name]
+
+        if Packet._specifications is None:
+            Packet._load_specifications()
+
+        if specification_name not in Packet._specifications:
+            raise KeyError("Unknown specification '{}' has been provided".format(specification_name))
+
+        specification = Packet._specifications[specification_name]
+        fields = tuple(field["name"] for field in specification if "value" not in field)
+
+        class_name = "{}_Packet".format(specification_name.title())
+        packet_class = type(class_name, (Compact_Packet,), {
+            "__slots__": fields,
+            "_specification_name": specification_name,
+            "_fields": fields,
+            "_specification_private": specification[0]["private"]
+        })
+
+        cls._classes[specification_name] = packet_class
+        return packet_class
+
+    def __init__(self, *values):
+        """
+        Initialize the packet. If `values` are given, then they are the values
+        of the fields of the specification that do not have a fixed value,
+        in the same order as in the specification.
+        """
+
+        # The base class initialization is not called, since compact packets
+        # do not have a contents key-value store.
+        # pylint: disable=super-init-not-called
+
+        if self._specification_name is None:
+            raise TypeError("Compact packets must be created using a class from `Compact_Packet.get_class`")
+
+        if values and len(values) != len(self._fields):
+            raise ValueError("Specification '{}' has {} fields, but {} values are provided".format(self._specification_name, len(self._fields), len(values)))
+
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+
+    def set(self, key, value):
+        """
+        Set a key and value in the packet. The key must be a field of the
+        specification, and the specification itself cannot be changed.
+        """
+
+        if key == "specification":
+            if value != self._specification_name:
+                raise ValueError("The specification of a compact packet cannot be changed")
+        elif key in self._fields:
+            setattr(self, key, value)
+        else:
+            raise KeyError("Field '{}' is not part of specification '{}'".format(key, self._specification_name))
+
+    def unset(self, key):
+        """
+        Unset a key in the packet.
+        """
+
+        if key in self._fields and hasattr(self, key):
+            delattr(self, key)
+
+    def get(self, key):
+        """
+        Get the value of a key in the packet.
+        """
+
+        if key == "specification":
+            return self._specification_name
+
+        if key in self._fields:
+            return getattr(self, key, None)
+
+        return None
+
+    def get_all(self):
+        """
+        Get all keys and values in the packet as a dictionary.
+        """
+
+        contents = {"specification": self._specification_name}
+        for name in self._fields:
+            if hasattr(self, name):
+                contents[name] = getattr(self, name)
+
+        return contents
+
+    def is_private(self):
+        """
+        Return if the packet is private, indicating that it belongs to
+        internal code and cannot be enqueued.
+        """
+
+        return self._specification_private
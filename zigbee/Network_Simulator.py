@@ -0,0 +1,409 @@
+# Core imports
+import collections
+from functools import partial
+import math
+import random
+import socket
+import threading
+import time
+
+# Library imports
+import numpy as np
+
+# Package imports
+from ..reconstruction.Weight_Matrix import Weight_Matrix
+from ..settings import Arguments
+from RF_Sensor_Simulator_Memory import RF_Sensor_Simulator_Memory
+
+class Network_Simulator(object):
+    """
+    Simulator for a network of RF sensors and a ground station within a single
+    process, suitable for benchmarking the TDMA scheduler settings.
+
+    The simulated RF sensors send their packets through the simulator instead
+    of through sockets. The simulator delivers the packets, determines the
+    RSSI values of the links from a path loss model and keeps track of the
+    number of packets, slot collisions and latencies.
+    """
+
+    def __init__(self, arguments, thread_manager):
+        """
+        Initialize the network simulator.
+
+        The `arguments` is an `Arguments` object, which is used for the
+        settings of the simulator as well as those of the RF sensors and the
+        weight matrix. The `thread_manager` is a `Thread_Manager` object with
+        which the threads of the RF sensors are registered.
+        """
+
+        if isinstance(arguments, Arguments):
+            self._settings = arguments.get_settings("network_simulator")
+        else:
+            raise TypeError("'arguments' must be an instance of Arguments")
+
+        self._number_of_sensors = self._settings.get("number_of_sensors")
+        self._origin = self._settings.get("network_origin")
+        self._size = self._settings.get("network_size")
+
+        self._tx_power = self._settings.get("network_tx_power")
+        self._path_loss_exponent = self._settings.get("network_path_loss_exponent")
+        self._noise = self._settings.get("network_noise")
+        self._bitrate = self._settings.get("network_bitrate")
+        self._duration = self._settings.get("network_duration")
+
+        # The sensor loops stop within the loop delay after deactivation.
+        self._join_timeout = 1.0 + self._settings.get("loop_delay")
+
+        # The attenuation image contains the attenuation in dB of each pixel
+        # in the network, with a row for each pixel along the y axis starting
+        # at the origin. Without an image, there is no attenuation.
+        width, height = self._size
+        attenuation_file = self._settings.get("network_attenuation_file")
+        if attenuation_file is None:
+            self._attenuation = np.zeros(width * height)
+        else:
+            attenuation = np.loadtxt(attenuation_file, delimiter=",", ndmin=2)
+            if attenuation.shape != (height, width):
+                raise ValueError("The attenuation image must have {} rows and {} columns".format(height, width))
+
+            self._attenuation = attenuation.flatten()
+
+        self._weight_matrix = Weight_Matrix(arguments, self._origin, self._size)
+
+        # The deterministic part of the RSSI value of each link, which is
+        # shared between the threads of the RF sensors.
+        self._link_rssi = {}
+        self._lock = threading.Lock()
+
+        # Inboxes with the delivered frames and the sockets that are used to
+        # wake up the RF sensors when frames are delivered, keyed by sensor ID.
+        self._inboxes = {}
+        self._wakeups = {}
+
+        # The times until which the RF sensors are transmitting, and whether
+        # the last frame of each RF sensor has collided with another frame.
+        self._busy_until = {}
+        self._collided = {}
+
+        self.reset()
+
+        # Create the ground station and the vehicle sensors, which are placed
+        # at fixed positions on the boundary of the network.
+        self._positions = [None]
+        for vehicle_id in range(1, self._number_of_sensors + 1):
+            fraction = (vehicle_id - 0.5) / self._number_of_sensors
+            self._positions.append(self._get_perimeter_position(fraction))
+
+        self._rf_sensors = []
+        for sensor_id in range(self._number_of_sensors + 1):
+            location_callback = partial(self._get_location,
+                                        self._positions[sensor_id])
+            rf_sensor = RF_Sensor_Simulator_Memory(arguments, thread_manager,
+                                                   location_callback,
+                                                   self._receive_packet,
+                                                   self._location_valid,
+                                                   network=self,
+                                                   sensor_id=sensor_id)
+            self._rf_sensors.append(rf_sensor)
+
+    @property
+    def rf_sensors(self):
+        """
+        Retrieve the list of simulated RF sensors, indexed by their ID.
+        """
+
+        return self._rf_sensors
+
+    def _get_perimeter_position(self, fraction):
+        """
+        Determine the location of a point on the boundary of the network, at
+        the given `fraction` of the perimeter counterclockwise from the origin.
+
+        The location is a tuple in `(latitude, longitude)` form, where the
+        latitude is the y coordinate and the longitude is the x coordinate.
+        """
+
+        width, height = self._size
+        distance = fraction * 2 * (width + height)
+        if distance < width:
+            x, y = distance, 0
+        elif distance < width + height:
+            x, y = width, distance - width
+        elif distance < 2 * width + height:
+            x, y = 2 * width + height - distance, height
+        else:
+            x, y = 0, 2 * (width + height) - distance
+
+        return (self._origin[1] + y, self._origin[0] + x)
+
+    def _get_location(self, position):
+        """
+        Retrieve the location of an RF sensor at the given `position` and the
+        waypoint index. The RF sensors are stationary, so they do not have
+        waypoints.
+        """
+
+        return position, 0
+
+    def _receive_packet(self, packet):
+        """
+        Receive a packet from an RF sensor. The simulator only keeps track of
+        the packets in its statistics, so the packet is ignored here.
+        """
+
+        pass
+
+    def _location_valid(self, other_valid=None, other_id=None, other_index=None):
+        """
+        Check whether the location of an RF sensor is valid. The RF sensors
+        are stationary on the boundary, so their locations are always valid.
+        """
+
+        return True
+
+    def reset(self):
+        """
+        Reset the statistics of the simulated network.
+        """
+
+        self._start_time = time.time()
+        self._end_time = None
+        self._frames = 0
+        self._received_frames = 0
+        self._collisions = 0
+        self._measurements = 0
+        self._frame_latency = [0.0, 0.0]
+        self._measurement_latency = [0.0, 0.0]
+
+    def register(self, sensor_id):
+        """
+        Register the RF sensor with the given `sensor_id` in the network.
+
+        Returns a socket which becomes readable when frames are delivered to
+        the RF sensor.
+        """
+
+        connection, wakeup = socket.socketpair()
+        connection.setblocking(0)
+        wakeup.setblocking(0)
+
+        with self._lock:
+            if sensor_id in self._wakeups:
+                self._wakeups[sensor_id].close()
+
+            self._inboxes[sensor_id] = collections.deque()
+            self._wakeups[sensor_id] = wakeup
+
+        return connection
+
+    def is_registered(self, sensor_id):
+        """
+        Check whether the RF sensor with the given `sensor_id` is registered.
+        """
+
+        return sensor_id in self._inboxes
+
+    def transmit(self, from_id, to_id, data, timestamps=None):
+        """
+        Transmit a frame with serialized packet `data` from the RF sensor with
+        ID `from_id` to the RF sensor with ID `to_id`.
+
+        The `timestamps` is a list of creation times of the broadcast packets
+        of the measurements in the packet, if it is sent to the ground station.
+
+        The frame occupies the channel for the time that it takes to send the
+        data at the bit rate of the network. If the frame overlaps with a frame
+        from another RF sensor, then both frames are counted as collided slots.
+        The frames are still delivered, so that the TDMA schedule is kept.
+        """
+
+        if to_id not in self._inboxes:
+            return
+
+        now = time.time()
+        airtime = len(data) * 8.0 / self._bitrate
+
+        with self._lock:
+            # Frames of the same RF sensor are sent after each other.
+            start = max(now, self._busy_until.get(from_id, now))
+            self._busy_until[from_id] = start + airtime
+            self._collided[from_id] = False
+            self._frames += 1
+
+            for other_id, busy_until in self._busy_until.items():
+                if other_id == from_id or busy_until <= start:
+                    continue
+
+                for sensor_id in (from_id, other_id):
+                    if not self._collided.get(sensor_id, False):
+                        self._collided[sensor_id] = True
+                        self._collisions += 1
+
+            self._inboxes[to_id].append((data, now, start + airtime, timestamps))
+
+            try:
+                self._wakeups[to_id].send("\0")
+            except socket.error:
+                # The RF sensor has been deactivated.
+                pass
+
+    def receive(self, sensor_id):
+        """
+        Receive all the frames that have been delivered to the RF sensor with
+        the given `sensor_id`. Returns a list of byte-encoded strings of packets.
+        """
+
+        inbox = self._inboxes[sensor_id]
+        now = time.time()
+        packets = []
+        while inbox:
+            data, send_time, arrival_time, timestamps = inbox.popleft()
+            packets.append(data)
+
+            # Frames are delivered immediately, but they cannot be received
+            # before they have been sent completely.
+            receive_time = max(now, arrival_time)
+
+            with self._lock:
+                self._received_frames += 1
+                self._add_latency(self._frame_latency, receive_time - send_time)
+                if sensor_id == 0 and timestamps:
+                    self._measurements += len(timestamps)
+                    for timestamp in timestamps:
+                        self._add_latency(self._measurement_latency,
+                                          receive_time - timestamp)
+
+        return packets
+
+    def _add_latency(self, latency, value):
+        """
+        Add a latency `value` to a running `latency` statistic, which is a list
+        containing the sum and the maximum of the latencies.
+        """
+
+        latency[0] += value
+        latency[1] = max(latency[1], value)
+
+    def get_rssi(self, source, destination):
+        """
+        Determine the RSSI value of a link between a `source` and `destination`
+        location, both given as tuples in `(latitude, longitude)` form.
+
+        The RSSI value follows from a log-distance path loss model with the
+        attenuation of the pixels in the network along the link, which are
+        weighted by the rows of the weight matrix, and Gaussian noise.
+        """
+
+        link = (tuple(source), tuple(destination))
+        with self._lock:
+            if link not in self._link_rssi:
+                self._link_rssi[link] = self._calculate_rssi(*link)
+
+            rssi = self._link_rssi[link]
+
+        rssi += random.gauss(0.0, self._noise)
+        return int(min(127, max(-128, round(rssi))))
+
+    def _calculate_rssi(self, source, destination):
+        """
+        Calculate the RSSI value without noise of a link between a `source` and
+        `destination` location, both given as tuples in `(latitude, longitude)`
+        form.
+        """
+
+        # The x coordinate corresponds to the longitude and the y coordinate
+        # corresponds to the latitude, which is why we invert the indexing.
+        sources = np.array([[source[1], source[0]]], dtype=float)
+        destinations = np.array([[destination[1], destination[0]]], dtype=float)
+
+        distance = np.linalg.norm(destinations[0] - sources[0])
+        rssi = self._tx_power - 10 * self._path_loss_exponent * math.log10(max(distance, 1.0))
+
+        snapped, valid = self._weight_matrix.snap_links(sources, destinations)
+        if valid[0]:
+            row = self._weight_matrix.get_link_rows(snapped[:, 0], snapped[:, 1])[0]
+            rssi -= row.dot(self._attenuation)
+
+        return rssi
+
+    def run(self, duration=None):
+        """
+        Run the simulated network for `duration` seconds, or the duration from
+        the settings if it is not given.
+
+        The RF sensors are activated and start their measurements, and they are
+        stopped and deactivated afterward. Returns the statistics of the run.
+        """
+
+        if duration is None:
+            duration = self._duration
+
+        for rf_sensor in self._rf_sensors:
+            rf_sensor.activate()
+
+        try:
+            with self._lock:
+                self.reset()
+
+            for rf_sensor in self._rf_sensors:
+                rf_sensor.start()
+
+            time.sleep(duration)
+
+            for rf_sensor in self._rf_sensors:
+                rf_sensor.stop()
+
+            with self._lock:
+                self._end_time = time.time()
+        finally:
+            for rf_sensor in self._rf_sensors:
+                rf_sensor.deactivate()
+
+            # Wait for the sensor loops to notice that they are deactivated.
+            for rf_sensor in self._rf_sensors:
+                rf_sensor.join(self._join_timeout)
+
+            with self._lock:
+                for wakeup in self._wakeups.values():
+                    wakeup.close()
+
+                self._inboxes = {}
+                self._wakeups = {}
+
+        return self.get_statistics()
+
+    def get_statistics(self):
+        """
+        Retrieve the statistics of the simulated network.
+
+        The statistics are a dictionary with the duration of the measurements
+        in seconds, the number of frames and measurements that were sent and
+        their rates per second, the number of slot collisions and the ratio of
+        frames that collided, and the mean and maximum latencies in seconds of
+        frames and of measurements from broadcast to the ground station.
+        """
+
+        with self._lock:
+            end_time = self._end_time
+            if end_time is None:
+                end_time = time.time()
+
+            duration = max(end_time - self._start_time, 1e-9)
+
+            frame_count = max(self._frames, 1)
+            received_count = max(self._received_frames, 1)
+            measurement_count = max(self._measurements, 1)
+
+            return {
+                "duration": duration,
+                "frames": self._frames,
+                "frames_per_second": self._frames / duration,
+                "measurements": self._measurements,
+                "measurements_per_second": self._measurements / duration,
+                "collisions": self._collisions,
+                "collision_rate": float(self._collisions) / frame_count,
+                "frame_latency_mean": self._frame_latency[0] / received_count,
+                "frame_latency_max": self._frame_latency[1],
+                "measurement_latency_mean": self._measurement_latency[0] / measurement_count,
+                "measurement_latency_max": self._measurement_latency[1]
+            }
@@ -1,12 +1,31 @@
 import json
+import os
 import struct
 import zlib
 
 class Packet(object):
+    # Packets only have a contents key-value store and a private property.
+    __slots__ = ("_private", "_contents")
+
     # Packet type specifications loaded from the JSON file.
     # The specifications are cached between packets.
     _specifications = None
 
+    # Lookup table from specification identifiers to specification names.
+    _specification_names = None
+
+    # Compiled codecs of the specifications, keyed by specification name.
+    _codecs = None
+
+    # Formats for packing the types of values of fields with the special
+    # object format.
+    _object_types = {
+        bool: "?",
+        int: "i",
+        float: "d",
+        str: "$"
+    }
+
     def __init__(self):
         """
         Initialize the packet with an empty contents key-value store.
@@ -15,17 +34,105 @@ class Packet(object):
         """
 
         if self._specifications is None:
-            with open("zigbee/specifications.json") as specifications_file:
-                self._specifications = json.load(specifications_file)
+            self._load_specifications()
 
         self._private = True
         self._contents = {}
-        self._object_types = {
-            bool: "?",
-            int: "i",
-            float: "d",
-            str: "$"
-        }
+
+    @classmethod
+    def _load_specifications(cls):
+        """
+        Load the specifications from the JSON file and compile a codec for
+        each specification. The specifications, the identifier lookup table
+        and the codecs are shared by all packets, including those of classes
+        that inherit this class.
+        """
+
+        filename = os.path.join(os.path.dirname(__file__), "specifications.json")
+        with open(filename) as specifications_file:
+            specifications = json.load(specifications_file)
+
+        Packet._specification_names = {}
+        Packet._codecs = {}
+        for name, specification in specifications.iteritems():
+            Packet._specification_names[specification[0]["value"]] = name
+            Packet._codecs[name] = cls._compile(specification)
+
+        Packet._specifications = specifications
+
+    @classmethod
+    def _compile(cls, specification):
+        """
+        Compile a codec for the given `specification`.
+
+        The codec is a list of segments, where each segment is a tuple of
+        a `struct.Struct` object and the fields that it packs. Consecutive
+        fields with a fixed size are combined into one segment, whose
+        `struct.Struct` uses standard sizes without alignment so that it packs
+        the fields in the same way as packing them one by one. Fields with the
+        special string, object or list formats have a segment of their own
+        without a `struct.Struct` object, since their size depends on their
+        value.
+        """
+
+        codec = []
+        fields = []
+        for field in specification:
+            if field["format"][0] in ("$", "@", "*"):
+                if fields:
+                    codec.append(cls._compile_segment(fields))
+                    fields = []
+
+                codec.append((None, [field]))
+            else:
+                fields.append(field)
+
+        if fields:
+            codec.append(cls._compile_segment(fields))
+
+        return codec
+
+    @classmethod
+    def _compile_segment(cls, fields):
+        formats = "".join(field["format"] for field in fields)
+        return (struct.Struct("=" + formats), fields)
+
+    @classmethod
+    def get_list_sizes(cls, specification_name):
+        """
+        Get the number of bytes in a serialized packet with the specification
+        `specification_name` when its fields with the special list format are
+        empty, and a dictionary of the number of bytes that each item adds to
+        these fields by field name.
+
+        The sizes are determined from the compiled codec of the specification
+        without serializing a packet. If the specification has fields with the
+        special string or object formats, then the size of a serialized packet
+        depends on their values, so a `ValueError` is raised.
+        """
+
+        if cls._specifications is None:
+            cls._load_specifications()
+
+        if specification_name not in cls._specifications:
+            raise KeyError("Unknown specification '{}' has been provided".format(specification_name))
+
+        size = 0
+        item_sizes = {}
+        for segment, fields in cls._codecs[specification_name]:
+            if segment is not None:
+                size += segment.size
+                continue
+
+            field = fields[0]
+            if field["format"][0] != "*":
+                raise ValueError("Specification '{}' has field '{}' with a variable size".format(specification_name, field["name"]))
+
+            # The number of items is packed before the items themselves.
+            size += struct.calcsize("B")
+            item_sizes[field["name"]] = struct.calcsize("=" + field["format"][1:])
+
+        return size, item_sizes
 
     def set(self, key, value):
         """
@@ -120,10 +227,11 @@ class Packet(object):
         """
 
         # Verify that the specification has been provided.
-        if "specification" not in self._contents:
+        contents = self.get_all()
+        if "specification" not in contents:
             raise KeyError("No specification has been provided")
 
-        specification_name = self._contents["specification"]
+        specification_name = contents["specification"]
 
         # Verify that the provided specification exists.
         if specification_name not in self._specifications:
@@ -136,21 +244,38 @@ class Packet(object):
         # Verify that all fields in the specification have been provided.
         # In case of fields with a value (usually identifier fields), instead
         # use the provided value.
-        packed_message = ""
+        values = []
         for field in specification:
             if "value" in field:
-                value = field["value"]
-            elif field["name"] in self._contents:
-                value = self._contents[field["name"]]
+                values.append(field["value"])
+            elif field["name"] in contents:
+                values.append(contents[field["name"]])
             else:
                 raise KeyError("Unable to serialize packet with specification '{}': Field '{}' has not been provided.".format(specification_name, field["name"]))
 
-            try:
-                packed_message += self._pack_field(field["format"], value)
-            except struct.error as e:
-                raise ValueError("Unable to serialize packet with specification '{}': struct error for field '{}': {}".format(specification_name, field["name"], e.message))
-
-        return packed_message
+        # Pack each segment of the compiled codec at once.
+        packed_message = []
+        index = 0
+        for segment, fields in self._codecs[specification_name]:
+            segment_values = values[index:index + len(fields)]
+            index += len(fields)
+
+            if segment is not None:
+                try:
+                    packed_message.append(segment.pack(*segment_values))
+                    continue
+                except struct.error:
+                    # Pack the fields one by one in order to find out which
+                    # field has a value that cannot be packed.
+                    pass
+
+            for field, value in zip(fields, segment_values):
+                try:
+                    packed_message.append(self._pack_field(field["format"], value))
+                except struct.error as e:
+                    raise ValueError("Unable to serialize packet with specification '{}': struct error for field '{}': {}".format(specification_name, field["name"], e.message))
+
+        return "".join(packed_message)
 
     def _pack_field(self, format, value):
         if format == "$":
@@ -178,6 +303,14 @@ class Packet(object):
                 contents = struct.pack("?", False)
                 contents += struct.pack("B", len(compressed_data))
                 contents += compressed_data
+        elif format[0] == "*":
+            # Special list format: pack the number of items in one byte, 
+            # followed by the items. Each item is a list of values that are 
+            # packed according to the remainder of the format, using standard 
+            # sizes without alignment.
+            item_format = "=" + format[1:]
+            contents = struct.pack("B", len(value))
+            contents += "".join(struct.pack(item_format, *item) for item in value)
         else:
             contents = struct.pack(format, value)
 
@@ -196,38 +329,45 @@ class Packet(object):
         """
 
         # Unpack the specification identifier.
-        specification_id, offset = self._read_packed("B", contents, 0)
+        specification_id = self._read_packed("B", contents, 0)[0]
 
         # Fetch the specification belonging to the found identifier.
-        specification = None
-        specification_name = ""
-        for name, fields in self._specifications.iteritems():
-            if fields[0]["value"] == specification_id:
-                specification = fields
-                specification_name = name
-                break
-
-        if specification is None:
+        if specification_id not in self._specification_names:
             raise KeyError("Invalid specification {} has been provided".format(specification_id))
 
-        # Loop through all fields in the specification that do not have
-        # a fixed value (in order). Using the format of the field, we
-        # can unpack the right part of the byte-encoded string. The offset
-        # is used to continue from the last read part of the string.
-        self._contents["specification"] = specification_name
-        self._private = specification[0]["private"]
-        for field in specification:
-            if "value" in field:
+        specification_name = self._specification_names[specification_id]
+
+        # Loop through all segments of the compiled codec of the specification
+        # in order, and unpack the fields that do not have a fixed value. The
+        # offset is used to continue from the last read part of the string.
+        self.set("specification", specification_name)
+        offset = 0
+        for segment, fields in self._codecs[specification_name]:
+            if segment is not None and len(contents) - offset >= segment.size:
+                data = segment.unpack_from(contents, offset)
+                offset += segment.size
+                for field, value in zip(fields, data):
+                    if "value" not in field:
+                        self.set(field["name"], value)
+
                 continue
 
-            name = field["name"]
-            format = field["format"]
-            try:
-                data, offset = self._read_format(format, contents, offset)
-            except struct.error as e:
-                raise ValueError("Unable to unserialize packet with specification '{}': struct error for field '{}' at offset {}: {}".format(specification_name, name, offset, e.message))
+            # Using the format of each field, we can unpack the right part of
+            # the byte-encoded string. This is also done for incomplete
+            # segments in order to find out which field is incomplete.
+            for field in fields:
+                format = field["format"]
+                if "value" in field:
+                    offset += struct.calcsize(format)
+                    continue
+
+                name = field["name"]
+                try:
+                    data, offset = self._read_format(format, contents, offset)
+                except struct.error as e:
+                    raise ValueError("Unable to unserialize packet with specification '{}': struct error for field '{}' at offset {}: {}".format(specification_name, name, offset, e.message))
 
-            self._contents[name] = data
+                self.set(name, data)
 
     def _read_format(self, format, contents, offset):
         if format == "$":
@@ -249,6 +389,15 @@ class Packet(object):
                                                        offset)
 
                 data = json.loads(zlib.decompress(compressed))
+        elif format[0] == "*":
+            count, offset = self._read_packed("B", contents, offset)
+
+            item_format = "=" + format[1:]
+            item_size = struct.calcsize(item_format)
+            data = []
+            for _ in xrange(count):
+                data.append(list(struct.unpack_from(item_format, contents, offset)))
+                offset += item_size
         else:
             data, offset = self._read_packed(format, contents, offset)
 
@@ -8,6 +8,7 @@ import time
 from ..core.Threadable import Threadable
 from ..reconstruction.Buffer import Buffer
 from ..settings import Arguments
+from Compact_Packet import Compact_Packet
 from Packet import Packet
 from TDMA_Scheduler import TDMA_Scheduler
 
@@ -84,6 +85,15 @@ class RF_Sensor(Threadable):
 
         self._loop_delay = self._settings.get("loop_delay")
 
+        # Determine how many measurements fit in a batch packet for the ground
+        # station, which is at most the number that a packet can count.
+        self._batch = self._settings.get("ground_station_batch")
+        header_size, item_sizes = Packet.get_list_sizes("rssi_ground_station_batch")
+        measurement_size = item_sizes["measurements"]
+
+        mtu = self._settings.get("ground_station_mtu")
+        self._batch_size = min(255, max(1, (mtu - header_size) // measurement_size))
+
         self._location_callback = location_callback
         self._receive_callback = receive_callback
         self._valid_callback = valid_callback
@@ -284,7 +294,25 @@ class RF_Sensor(Threadable):
             self._send()
             self._scheduler.update()
 
-        time.sleep(self._loop_delay)
+        # Wait for incoming packets, but no longer than the loop delay and no
+        # longer than until our next slot in the schedule starts.
+        timeout = self._loop_delay
+        if self._started and self._id > 0:
+            timeout = min(timeout, max(0.0, self._scheduler.timestamp - time.time()))
+
+        self._wait(timeout)
+
+    def _wait(self, timeout):
+        """
+        Wait for at most `timeout` seconds for incoming packets, and receive
+        all the packets that are available.
+
+        Classes that inherit this base class may override this method in order
+        to stop waiting as soon as packets are available. By default, we wait
+        for the full `timeout`, since packets are received elsewhere.
+        """
+
+        time.sleep(timeout)
 
     def _send(self):
         """
@@ -303,11 +331,27 @@ class RF_Sensor(Threadable):
             self._send_tx_frame(packet, to_id)
 
         # Send collected packets to the ground station.
-        for packet in self._packets:
-            self._send_tx_frame(packet, 0)
-
+        self._send_ground_station_packets(self._packets)
         self._packets = []
 
+    def _send_ground_station_packets(self, packets):
+        """
+        Send a list of completed RSSI ground station `packets` to the ground
+        station. If batching is enabled, then the packets are combined into
+        as few RSSI ground station batch packets as possible.
+        """
+
+        if not self._batch:
+            for packet in packets:
+                self._send_tx_frame(packet, 0)
+
+            return
+
+        for start in xrange(0, len(packets), self._batch_size):
+            batch = packets[start:start + self._batch_size]
+            packet = self._create_rssi_ground_station_batch_packet(batch)
+            self._send_tx_frame(packet, 0)
+
     def _send_custom_packets(self):
         """
         Send custom packets to their destinations.
@@ -378,8 +422,7 @@ class RF_Sensor(Threadable):
                                               other_id=from_id,
                                               other_index=from_waypoint_index)
 
-        packet = Packet()
-        packet.set("specification", "rssi_ground_station")
+        packet = Compact_Packet.get_class("rssi_ground_station")()
         packet.set("sensor_id", self._id)
         packet.set("from_latitude", rssi_broadcast_packet.get("latitude"))
         packet.set("from_longitude", rssi_broadcast_packet.get("longitude"))
@@ -389,3 +432,23 @@ class RF_Sensor(Threadable):
         packet.set("to_valid", location_valid)
 
         return packet
+
+    def _create_rssi_ground_station_batch_packet(self, packets):
+        """
+        Create a `Packet` object according to the "rssi_ground_station_batch"
+        specification, which contains the measurements of the given list of
+        completed RSSI ground station `packets`.
+
+        Each measurement is a list of the values of an RSSI ground station
+        packet (in order) without the sensor ID, since the ground station
+        packets are all created by the current RF sensor.
+        """
+
+        packet = Packet()
+        packet.set("specification", "rssi_ground_station_batch")
+        packet.set("sensor_id", self._id)
+        packet.set("measurements", [
+            ground_station_packet.get_dump()[1:] for ground_station_packet in packets
+        ])
+
+        return packet
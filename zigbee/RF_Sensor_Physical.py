@@ -90,8 +90,8 @@ class RF_Sensor_Physical(RF_Sensor):
             return False
 
         if self._id == 0:
-            # Handle an RSSI ground station packet.
-            if specification == "rssi_ground_station":
+            # Handle an RSSI ground station packet or a batch thereof.
+            if specification in ("rssi_ground_station", "rssi_ground_station_batch"):
                 if self._buffer is not None:
                     self._buffer.put(packet)
 
@@ -1,11 +1,13 @@
 # Core imports
 import random
+import select
 import struct
 import time
 
 # Package imports
 from ..core.WiringPi import WiringPi
 from ..zigbee.Packet import Packet
+from ..zigbee.RF_Sensor import DisabledException
 from ..zigbee.RF_Sensor_Physical import RF_Sensor_Physical
 
 class Raspberry_Pi_GPIO_Pin_Mode(object):
@@ -162,8 +164,6 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
         as for keeping the `_loop` implementation in the base class.
         """
 
-        self._receive()
-
         # We should have received a packet from another sensor. If not, it is very
         # likely that their schedules interfere because of their activation time.
         # Resolve this by randomly shifting the schedule. This will be corrected
@@ -175,6 +175,24 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
 
         super(RF_Sensor_Physical_Texas_Instruments, self)._loop_body()
 
+    def _wait(self, timeout):
+        """
+        Wait for at most `timeout` seconds until the serial connection has
+        data, and receive all the complete packets that are available.
+        """
+
+        try:
+            readable = select.select([self._connection], [], [], timeout)[0]
+        except (TypeError, ValueError, IOError, select.error):
+            # The connection has been closed since the sensor is deactivated.
+            raise DisabledException
+
+        if not readable:
+            return
+
+        while self._receive():
+            pass
+
     def _send_tx_frame(self, packet, to=None):
         """
         Send a TX frame with `packet` as payload `to` another sensor.
@@ -194,13 +212,16 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
     def _receive(self, packet=None):
         """
         Receive and process a `packet` from another sensor in the network.
+
+        Returns whether a complete packet was available on the serial
+        connection.
         """
 
         # Read the UART packet from the serial connection (if available) and parse it.
         serialized_packet_format = "<B{}sb".format(self._packet_length)
         serialized_packet_length = struct.calcsize(serialized_packet_format)
         if self._connection.in_waiting < serialized_packet_length:
-            return
+            return False
 
         uart_packet = self._connection.read(size=serialized_packet_length)
         length, data, rssi = struct.unpack(serialized_packet_format, uart_packet)
@@ -217,6 +238,8 @@ class RF_Sensor_Physical_Texas_Instruments(RF_Sensor_Physical):
             # Any errors must be logged, but must not crash the process.
             self._thread_manager.log(self.type)
 
+        return True
+
     def _process(self, packet, rssi=None, **kwargs):
         """
         Process a `Packet` object `packet`.
@@ -192,16 +192,19 @@ class RF_Sensor_Physical_XBee(RF_Sensor_Physical):
             self._send_tx_frame(packet, to_id)
 
         # Send collected packets to the ground station. Only send completed 
-        # packets, and remove them after sending. We have to iterate over 
+        # packets, and remove them before sending. We have to iterate over 
         # a copy to avoid changing the dictionary during iteration.
+        packets = []
         for frame_id in self._packets.copy():
             packet = self._packets[frame_id]
             if packet.get("rssi") is None:
                 continue
 
-            self._send_tx_frame(packet, 0)
+            packets.append(packet)
             self._packets.pop(frame_id)
 
+        self._send_ground_station_packets(packets)
+
     def _send_tx_frame(self, packet, to=None):
         """
         Send a TX frame with `packet` as payload `to` another sensor.
@@ -1,6 +1,7 @@
 # Core imports
 import errno
 import random
+import select
 import socket
 
 # Package imports
@@ -95,28 +96,43 @@ class RF_Sensor_Simulator(RF_Sensor):
         self._connection.bind((self._ip, self._port + self._id))
         self._connection.setblocking(0)
 
-    def _loop_body(self):
+    def _wait(self, timeout):
         """
-        Body of the sensor loop.
-
-        This is extracted into a separate method to make testing easier, as well
-        as for keeping the `_loop` implementation in the base class.
+        Wait for at most `timeout` seconds until the socket has data, and
+        receive all the packets that are available in the socket's buffer.
         """
 
-        super(RF_Sensor_Simulator, self)._loop_body()
-
-        # Process any data in the socket's buffer.
         try:
-            data = self._connection.recv(self._buffer_size)
+            readable = select.select([self._connection], [], [], timeout)[0]
+        except (TypeError, ValueError, IOError, select.error):
+            # The connection has been closed since the sensor is deactivated.
+            raise DisabledException
+
+        if not readable:
+            return
 
-            # Unserialize the data (byte-encoded string).
+        # Unserialize the data (byte-encoded strings).
+        for data in self._read():
             packet = Packet()
             packet.unserialize(data)
             self._receive(packet=packet)
-        except AttributeError:
-            raise DisabledException
-        except socket.error:
-            return
+
+    def _read(self):
+        """
+        Read all the data that is available in the socket's buffer. Returns
+        a generator of byte-encoded strings of packets.
+        """
+
+        while True:
+            try:
+                data = self._connection.recv(self._buffer_size)
+            except AttributeError:
+                # The connection has been closed since the sensor is deactivated.
+                raise DisabledException
+            except socket.error:
+                return
+
+            yield data
 
     def _send_tx_frame(self, packet, to=None):
         """
@@ -144,7 +160,17 @@ class RF_Sensor_Simulator(RF_Sensor):
 
             # Create and complete the packet for the ground station.
             ground_station_packet = self._create_rssi_ground_station_packet(packet)
-            ground_station_packet.set("rssi", -random.randint(30, 70))
+            ground_station_packet.set("rssi", self._get_rssi(ground_station_packet))
             self._packets.append(ground_station_packet)
         elif self._buffer is not None:
             self._buffer.put(packet)
+
+    def _get_rssi(self, ground_station_packet):
+        """
+        Determine the RSSI value of the link in an RSSI ground station packet
+        `ground_station_packet` that is otherwise complete.
+
+        Simulated RF sensors use a random RSSI value.
+        """
+
+        return -random.randint(30, 70)
@@ -0,0 +1,172 @@
+# Core imports
+import threading
+
+# Package imports
+from ..zigbee.RF_Sensor_Simulator import RF_Sensor_Simulator
+
+class RF_Sensor_Simulator_Memory(RF_Sensor_Simulator):
+    """
+    Simulated RF sensor that sends and receives packets through an in-memory
+    network, which is shared with other simulated RF sensors in the same
+    process.
+    """
+
+    def __init__(self, arguments, thread_manager, location_callback,
+                 receive_callback, valid_callback, network=None,
+                 sensor_id=None, **kwargs):
+        """
+        Initialize the simulated RF sensor.
+
+        The `network` is a `Network_Simulator` object that transports the
+        packets between the sensors and determines the RSSI values of links.
+        The `sensor_id` overrides the ID of the sensor from the settings, so
+        that multiple sensors can be created from the same settings.
+        """
+
+        super(RF_Sensor_Simulator_Memory, self).__init__(arguments, thread_manager,
+                                                         location_callback,
+                                                         receive_callback,
+                                                         valid_callback)
+
+        if network is None:
+            raise TypeError("A network simulator must be provided")
+
+        self._network = network
+
+        if sensor_id is not None:
+            self._id = sensor_id
+            self._scheduler.id = sensor_id
+
+        # Each sensor has its own thread, which must be registered separately.
+        self._name = "rf_sensor_{}".format(self._id)
+        self._address = "memory:{}".format(self._id)
+
+        # Timestamps of the RSSI broadcast packets of the collected ground
+        # station packets, in the same order as the packets.
+        self._measurement_timestamps = []
+
+        # Event that is set when the sensor loop is not running.
+        self._finished = threading.Event()
+        self._finished.set()
+
+    def activate(self):
+        """
+        Activate the sensor to start sending and receiving packets.
+        """
+
+        if not self._activated:
+            self._finished.clear()
+
+        super(RF_Sensor_Simulator_Memory, self).activate()
+
+    def join(self, timeout=None):
+        """
+        Wait for at most `timeout` seconds, or indefinitely if it is not given,
+        until the sensor loop has finished after deactivating the sensor.
+
+        Returns whether the sensor loop has finished.
+        """
+
+        return self._finished.wait(timeout)
+
+    def discover(self, callback, required_sensors=None):
+        """
+        Discover RF sensors in the network. The `callback` callable function is
+        called when an RF sensor reports its identity. The `required_sensors`
+        set indicates which sensors should be discovered; if it is not
+        provided, then all RF sensors are discovered.
+
+        Simulated sensors are discovered if they are registered in the network.
+        """
+
+        # Skip the discovery of the parent class, which checks for sockets.
+        # pylint: disable=bad-super-call
+        super(RF_Sensor_Simulator, self).discover(callback,
+                                                  required_sensors=required_sensors)
+
+        if required_sensors is None:
+            required_sensors = set(range(1, self._number_of_sensors + 1))
+
+        for vehicle_id in sorted(required_sensors):
+            if self._network.is_registered(vehicle_id):
+                callback({
+                    "id": vehicle_id,
+                    "address": "memory:{}".format(vehicle_id)
+                })
+
+    def _loop(self):
+        """
+        Execute the sensor loop. This runs in a separate thread.
+        """
+
+        try:
+            super(RF_Sensor_Simulator_Memory, self)._loop()
+        finally:
+            self._finished.set()
+
+    def _setup(self):
+        """
+        Setup the RF sensor by registering it in the network.
+        """
+
+        self._connection = self._network.register(self._id)
+
+    def _read(self):
+        """
+        Read all the packets that the network has delivered to the sensor.
+        Returns a list of byte-encoded strings of packets.
+        """
+
+        # Discard the signals from the network that wake up the sensor.
+        for _ in super(RF_Sensor_Simulator_Memory, self)._read():
+            pass
+
+        return self._network.receive(self._id)
+
+    def _send_tx_frame(self, packet, to=None):
+        """
+        Send a TX frame with `packet` as payload `to` another sensor.
+        """
+
+        # Skip the parent class, which sends the packet through a socket.
+        # pylint: disable=bad-super-call
+        super(RF_Sensor_Simulator, self)._send_tx_frame(packet, to)
+
+        # Pass along the timestamps of the measurements that are sent to the
+        # ground station, so that the network can determine their latency.
+        timestamps = []
+        if to == 0:
+            count = 1
+            if packet.get("specification") == "rssi_ground_station_batch":
+                count = len(packet.get("measurements"))
+
+            timestamps = self._measurement_timestamps[:count]
+            del self._measurement_timestamps[:count]
+
+        self._network.transmit(self._id, to, packet.serialize(), timestamps)
+
+    def _create_rssi_ground_station_packet(self, rssi_broadcast_packet):
+        """
+        Create a `Packet` object according to the "rssi_ground_station"
+        specification using data from an `rssi_broadcast_packet`, and keep
+        track of the time at which the broadcast packet was created.
+        """
+
+        packet = super(RF_Sensor_Simulator_Memory, self)._create_rssi_ground_station_packet(rssi_broadcast_packet)
+        self._measurement_timestamps.append(rssi_broadcast_packet.get("timestamp"))
+        return packet
+
+    def _get_rssi(self, ground_station_packet):
+        """
+        Determine the RSSI value of the link in an RSSI ground station packet
+        `ground_station_packet` that is otherwise complete.
+
+        The network determines the RSSI value from the locations of the link.
+        """
+
+        source = (ground_station_packet.get("from_latitude"),
+                  ground_station_packet.get("from_longitude"))
+        destination = (ground_station_packet.get("to_latitude"),
+                       ground_station_packet.get("to_longitude"))
+
+        return self._network.get_rssi(source, destination)